@@ -2,7 +2,10 @@
 Route modules for API v1
 """
 from . import analysis
+from . import batch
+from . import evaluation
 from . import health  
+from . import metrics
 from . import system
 
-__all__ = ['analysis', 'health', 'system']
+__all__ = ['analysis', 'batch', 'evaluation', 'health', 'metrics', 'system']
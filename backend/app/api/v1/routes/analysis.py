@@ -1,23 +1,85 @@
 """
 Analysis API Routes - Handles video analysis endpoints
 """
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from werkzeug.exceptions import BadRequest
 import traceback
 
+from ....models.analysis import AnalysisStatus
+from ....models.analysis_options import AnalysisOptions
+from ....models.rubric import RubricProfile
+from ....utils.exceptions import ProcessingError, ValidationError
+
+
+def parse_analysis_options() -> AnalysisOptions:
+    """
+    Build analysis options from the current request's form fields
+
+    Raises:
+        ValidationError: If a profile, preset or analyzer name is invalid
+    """
+    return AnalysisOptions.from_request(
+        profile=request.form.get('profile'),
+        analyzers=','.join(request.form.getlist('analyzers')),
+        target_fps=request.form.get('target_fps', type=float),
+        preset=request.form.get('preset'),
+        min_fps=request.form.get('min_fps', type=float)
+    )
+
+
+def parse_rubric() -> RubricProfile:
+    """
+    Build a rubric profile from the current request's JSON body
+
+    Raises:
+        ValidationError: If the body is not a JSON object or the rubric is invalid
+    """
+    data = request.get_json(silent=True)
+    if data is None and not request.data:
+        data = {}
+    if not isinstance(data, dict):
+        raise ValidationError("Request body must be a JSON object")
+    return RubricProfile.from_request(
+        profile=data.get('profile'),
+        weights=data.get('weights'),
+        score_ranges=data.get('score_ranges')
+    )
+
 
 def register_routes(bp: Blueprint):
     """Register analysis routes"""
-    
+
+    def get_record_or_404(analysis_id):
+        """Look up an analysis record, returning (record, error_response)"""
+        record = current_app.analyzer_service.get_analysis_record(analysis_id)
+        if not record:
+            return None, (jsonify({'error': 'Analysis not found'}), 404)
+        return record, None
+
+    def require_completed(analysis_id):
+        """Look up a completed analysis record, returning (record, error_response)"""
+        record, error = get_record_or_404(analysis_id)
+        if error:
+            return None, error
+        if record.status != AnalysisStatus.COMPLETED:
+            return None, (jsonify({'error': 'Analysis not yet completed'}), 400)
+        return record, None
+
     @bp.route('/analyze-video', methods=['POST'])
     def analyze_video():
         """
         Comprehensive video analysis endpoint
-        
+
         Accepts:
             - video: Video file (multipart/form-data)
-            - target_fps: Optional target FPS (default: 5.0)
-            
+            - preset: Optional quality/speed preset (draft, standard, thorough; default: standard)
+            - target_fps: Optional target FPS (default: the preset's FPS)
+            - min_fps: Optional floor FPS for static segments; motion analyzers sample
+              adaptively between min_fps and target_fps (default: the preset's setting)
+            - profile: Optional analyzer profile (full, motion_only, video_only, speech_only)
+            - analyzers: Optional analyzer names, repeated or comma-separated
+              (e.g. "head_pitch,gaze_motion"); cannot be combined with profile
+
         Returns:
             JSON with analysis ID for tracking
         """
@@ -25,60 +87,241 @@ def register_routes(bp: Blueprint):
             # Validate request
             if 'video' not in request.files:
                 return jsonify({'error': 'No video file provided'}), 400
-            
+
             video_file = request.files['video']
             if video_file.filename == '':
                 return jsonify({'error': 'No file selected'}), 400
-            
+
             # Get optional parameters
-            target_fps = request.form.get('target_fps', 5.0, type=float)
-            
-            # For now, return a simple response since we need to fix the service imports
+            options = parse_analysis_options()
+
+            # Analysis runs on a worker thread; progress is available via status/events
+            analysis_id = current_app.video_analysis_service.submit_video_file(
+                video_file, options=options
+            )
+
             return jsonify({
-                'message': 'New modular backend structure is working!',
-                'status': 'success',
-                'note': 'Video analysis service will be connected once imports are fixed'
-            })
-            
+                'analysisId': analysis_id,
+                'status': AnalysisStatus.PROCESSING.value,
+                'analyzers': options.analyzers,
+                'preset': options.preset.name,
+                'status_url': f"/api/analysis/{analysis_id}/status",
+                'events_url': f"/api/analysis/{analysis_id}/events"
+            }), 202
+
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
             print(f"Analysis error: {error_msg}")
             print(traceback.format_exc())
             return jsonify({'error': error_msg}), 500
-    
+
     @bp.route('/analysis/<analysis_id>/status', methods=['GET'])
     def get_analysis_status(analysis_id):
         """Get the status of an ongoing analysis"""
-        return jsonify({
-            'analysisId': analysis_id,
-            'status': 'pending',
-            'message': 'Analysis service will be connected'
-        })
-    
+        status = current_app.video_analysis_service.get_analysis_status(analysis_id)
+        if not status:
+            return jsonify({'error': 'Analysis not found'}), 404
+        return jsonify(status)
+
+    @bp.route('/analysis/<analysis_id>', methods=['DELETE'])
+    def delete_analysis(analysis_id):
+        """Delete a finished analysis and its recorded landmarks"""
+        record, error = get_record_or_404(analysis_id)
+        if error:
+            return error
+        if record.status in (AnalysisStatus.PENDING, AnalysisStatus.PROCESSING):
+            return jsonify({'error': 'Analysis is still running'}), 409
+
+        current_app.analyzer_service.delete_analysis_record(analysis_id)
+        return jsonify({'analysis_id': analysis_id, 'deleted': True})
+
+    @bp.route('/analysis/<analysis_id>/events', methods=['GET'])
+    def stream_analysis_events(analysis_id):
+        """
+        Stream analysis progress as Server-Sent Events
+
+        Emits 'progress', 'step_start', 'step_finish', 'content_update' (running
+        content scores per transcript chunk) and 'evaluation_update' events while
+        the analysis runs and closes the stream after 'complete' or 'error'.
+        """
+        _, error = get_record_or_404(analysis_id)
+        if error:
+            return error
+
+        service = current_app.video_analysis_service
+        heartbeat_interval = current_app.config.get('SSE_HEARTBEAT_SECONDS', 15)
+
+        def generate():
+            for event in service.iter_analysis_events(analysis_id, heartbeat_interval):
+                if event is None:
+                    # SSE comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                else:
+                    yield event.to_sse()
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
     @bp.route('/analysis/<analysis_id>/results', methods=['GET'])
     def get_analysis_results(analysis_id):
-        """Get the full results of a completed analysis"""
-        return jsonify({
-            'analysisId': analysis_id,
-            'message': 'Results service will be connected'
-        })
-    
+        """
+        Get the results of an analysis
+
+        Returns the full results once the analysis completed. While it is still
+        running, returns the steps that are ready, a provisional evaluation and
+        the list of pending steps.
+        """
+        record, error = get_record_or_404(analysis_id)
+        if error:
+            return error
+
+        service = current_app.video_analysis_service
+        if record.status == AnalysisStatus.COMPLETED:
+            return jsonify(service.get_analysis_results(analysis_id))
+        return jsonify(service.get_partial_results(analysis_id))
+
+    @bp.route('/analysis/<analysis_id>/profile', methods=['GET'])
+    def get_analysis_profile(analysis_id):
+        """
+        Get the resource profile of each pipeline stage
+
+        Wall time, CPU time, peak RSS growth and frames decoded/inferred per
+        stage, with totals and the stage that took longest.
+        """
+        profile = current_app.video_analysis_service.get_analysis_profile(analysis_id)
+        if not profile:
+            return jsonify({'error': 'Analysis not found'}), 404
+        return jsonify(profile)
+
+    @bp.route('/analysis/<analysis_id>/timeline', methods=['GET'])
+    def get_analysis_timeline(analysis_id):
+        """
+        Get the time-indexed tracks of an analysis
+
+        Disfluencies with start and end seconds (from the transcript's word
+        timestamps) alongside the motion of each recorded landmark source
+        (sample times, detections and movement between samples).
+        """
+        _, error = require_completed(analysis_id)
+        if error:
+            return error
+        return jsonify(current_app.video_analysis_service.get_analysis_timeline(analysis_id))
+
     @bp.route('/analysis/<analysis_id>/score', methods=['GET'])
     def get_presentation_score(analysis_id):
         """Get just the presentation score and key feedback"""
-        return jsonify({
-            'analysisId': analysis_id,
-            'message': 'Score service will be connected'
-        })
-    
+        _, error = require_completed(analysis_id)
+        if error:
+            return error
+
+        score = current_app.video_analysis_service.get_presentation_score(analysis_id)
+        if not score:
+            return jsonify({'error': 'Evaluation not available for this analysis'}), 400
+        return jsonify(score)
+
     @bp.route('/analysis/<analysis_id>/detailed-feedback', methods=['GET'])
     def get_detailed_feedback(analysis_id):
         """Get detailed category-wise feedback"""
-        return jsonify({
-            'analysisId': analysis_id,
-            'message': 'Detailed feedback service will be connected'
-        })
-    
+        _, error = require_completed(analysis_id)
+        if error:
+            return error
+
+        feedback = current_app.video_analysis_service.get_detailed_feedback(analysis_id)
+        if not feedback:
+            return jsonify({'error': 'Detailed feedback not available'}), 400
+        return jsonify(feedback)
+
+    @bp.route('/analysis/<analysis_id>/recompute', methods=['POST'])
+    def recompute_motion_statistics(analysis_id):
+        """
+        Recompute motion statistics and the evaluation with new thresholds
+
+        Uses the landmarks recorded during the analysis, so no video decoding
+        or detection is needed; the stored results are left unchanged.
+
+        Accepts (JSON, optional):
+            Parameters keyed by analyzer, e.g.
+            {"head_motion": {"tilt_threshold": 8}, "head_pitch": {"pitch_threshold": 10},
+             "body_tilt": {"tilt_threshold": 6}, "hand_motion": {"zscore_threshold": 2.5},
+             "body_rotation": {"reference_quantile": 0.95}}
+
+        Returns:
+            JSON with the recomputed motion results, evaluation and the parameters used
+        """
+        _, error = require_completed(analysis_id)
+        if error:
+            return error
+
+        parameters = request.get_json(silent=True)
+        if request.data and parameters is None:
+            return jsonify({'error': 'Request body must be JSON'}), 400
+
+        try:
+            result = current_app.video_analysis_service.recompute_motion_statistics(analysis_id, parameters)
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(result)
+
+    @bp.route('/analysis/<analysis_id>/rescore', methods=['POST'])
+    def rescore_analysis(analysis_id):
+        """
+        Re-run only the evaluation with another rubric profile
+
+        Scores the stored analyzer results and transcript, so nothing is
+        re-analyzed. The evaluation is stored under the profile name and
+        available from /evaluations; the original evaluation is unchanged.
+
+        Accepts (JSON, optional):
+            - profile: Built-in rubric name, or the name to store a custom rubric under
+              (default: "default"; with weights or score_ranges, a name derived from
+              them, e.g. "custom-1a2b3c4d", returned in the rubric)
+            - weights: Category weights, e.g. {"content_quality": 0.5, "technical_aspects": 0}
+            - score_ranges: Grade boundaries, e.g. {"pass": [50, 100], "fail": [0, 49.9]}
+
+        Returns:
+            JSON with the rubric, evaluation and presentation summary
+        """
+        _, error = require_completed(analysis_id)
+        if error:
+            return error
+
+        try:
+            rubric = parse_rubric()
+            result = current_app.video_analysis_service.rescore_analysis(analysis_id, rubric)
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except ProcessingError as e:
+            return jsonify({'error': str(e)}), 503
+        return jsonify(result)
+
+    @bp.route('/analysis/<analysis_id>/evaluations', methods=['GET'])
+    def get_evaluations(analysis_id):
+        """Get the presentation summary of the evaluation for each rubric profile"""
+        _, error = require_completed(analysis_id)
+        if error:
+            return error
+        return jsonify(current_app.video_analysis_service.get_evaluations(analysis_id))
+
+    @bp.route('/analysis/<analysis_id>/evaluations/<profile>', methods=['GET'])
+    def get_evaluation(analysis_id, profile):
+        """Get the full evaluation for one rubric profile"""
+        _, error = require_completed(analysis_id)
+        if error:
+            return error
+
+        evaluation = current_app.video_analysis_service.get_evaluation(analysis_id, profile)
+        if not evaluation:
+            return jsonify({'error': f"No evaluation for rubric profile '{profile}'"}), 404
+        return jsonify(evaluation)
+
     @bp.route('/summary', methods=['GET'])
     def get_summary():
         """Return a summary of recent analyses"""
@@ -0,0 +1,184 @@
+"""
+Batch API Routes - Analyze many videos in one request
+"""
+from flask import Blueprint, Response, request, jsonify, current_app
+from werkzeug.utils import secure_filename
+import os
+import traceback
+import uuid
+from urllib.parse import quote
+
+from ....utils.exceptions import ProcessingError, ValidationError
+from .analysis import parse_analysis_options, parse_rubric
+
+
+def register_routes(bp: Blueprint):
+    """Register batch routes"""
+
+    def get_manifest_path(batch_id):
+        """Get the manifest location of a batch"""
+        return os.path.join(current_app.config['BATCH_FOLDER'], batch_id, 'manifest.json')
+
+    def get_batch_or_404(batch_id):
+        """Look up a batch (loading its manifest after a restart), returning (batch, error_response)"""
+        try:
+            uuid.UUID(batch_id)
+        except ValueError:
+            return None, (jsonify({'error': 'Batch not found'}), 404)
+
+        batch = current_app.batch_service.get_batch(batch_id, get_manifest_path(batch_id))
+        if not batch:
+            return None, (jsonify({'error': 'Batch not found'}), 404)
+        return batch, None
+
+    def batch_response(batch):
+        """Build the status payload of a batch"""
+        data = batch.to_dict()
+        data['running'] = current_app.batch_service.is_running(batch.batch_id)
+        data['results_url'] = f"/api/batches/{batch.batch_id}/results"
+        return data
+
+    @bp.route('/batches', methods=['POST'])
+    def create_batch():
+        """
+        Batch video analysis endpoint
+
+        Accepts:
+            - videos: Video files (multipart/form-data, repeated field)
+            - preset, profile, analyzers, target_fps: Same options as /analyze-video,
+              applied to every video
+
+        Returns:
+            JSON with batch ID for tracking
+        """
+        try:
+            video_files = [f for f in request.files.getlist('videos') if f.filename]
+            if not video_files:
+                return jsonify({'error': 'No video files provided'}), 400
+
+            options = parse_analysis_options()
+
+            batch_service = current_app.batch_service
+            validator = current_app.video_analysis_service.file_handler.validator
+            for video_file in video_files:
+                validator.validate_file(video_file)
+
+            # Uploads are kept in the batch folder until analyzed so the batch can be resumed
+            batch_id = str(uuid.uuid4())
+            batch_dir = os.path.join(current_app.config['BATCH_FOLDER'], batch_id)
+            os.makedirs(batch_dir, exist_ok=True)
+
+            video_paths = []
+            for index, video_file in enumerate(video_files):
+                video_path = os.path.join(batch_dir, f"{index:04d}_{secure_filename(video_file.filename)}")
+                video_file.save(video_path)
+                video_paths.append(video_path)
+
+            batch = batch_service.create_batch(
+                video_paths, options,
+                manifest_path=get_manifest_path(batch_id),
+                batch_id=batch_id,
+                owns_videos=True,
+                filenames=[video_file.filename for video_file in video_files]
+            )
+            batch_service.submit_batch(batch)
+
+            return jsonify({
+                'batchId': batch.batch_id,
+                'status': batch.status.value,
+                'total_items': len(batch.items),
+                'status_url': f"/api/batches/{batch.batch_id}",
+                'results_url': f"/api/batches/{batch.batch_id}/results"
+            }), 202
+
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            error_msg = f"Unexpected error: {str(e)}"
+            print(f"Batch error: {error_msg}")
+            print(traceback.format_exc())
+            return jsonify({'error': error_msg}), 500
+
+    @bp.route('/batches/<batch_id>', methods=['GET'])
+    def get_batch_status(batch_id):
+        """Get the status of a batch and each of its videos"""
+        batch, error = get_batch_or_404(batch_id)
+        if error:
+            return error
+        return jsonify(batch_response(batch))
+
+    @bp.route('/batches/<batch_id>/resume', methods=['POST'])
+    def resume_batch(batch_id):
+        """Re-run the unfinished videos of a batch (e.g. after a server restart)"""
+        batch, error = get_batch_or_404(batch_id)
+        if error:
+            return error
+
+        batch_service = current_app.batch_service
+        if batch_service.is_running(batch_id):
+            return jsonify({'error': 'Batch is already running'}), 409
+        if not batch.get_pending_items():
+            return jsonify(batch_response(batch))
+
+        batch_service.submit_batch(batch)
+        return jsonify(batch_response(batch)), 202
+
+    @bp.route('/batches/<batch_id>/rescore', methods=['POST'])
+    def rescore_batch(batch_id):
+        """
+        Re-score every completed video of the batch with another rubric profile
+
+        Accepts the same JSON body as /analysis/<id>/rescore (profile, weights,
+        score_ranges). Only the evaluation runs, so the whole batch is re-graded
+        without re-analyzing any video.
+
+        Returns:
+            JSON with the rubric and the number of re-scored videos
+        """
+        batch, error = get_batch_or_404(batch_id)
+        if error:
+            return error
+
+        batch_service = current_app.batch_service
+        if batch_service.is_running(batch_id):
+            return jsonify({'error': 'Batch is still running'}), 409
+
+        try:
+            rubric = parse_rubric()
+            result = batch_service.rescore_batch(batch, rubric)
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except ProcessingError as e:
+            return jsonify({'error': str(e)}), 503
+
+        result['results_url'] = f"/api/batches/{batch_id}/results?profile={quote(rubric.name)}"
+        return jsonify(result)
+
+    @bp.route('/batches/<batch_id>/results', methods=['GET'])
+    def get_batch_results(batch_id):
+        """
+        Export the presentation_summary scores of every video in the batch
+
+        Query parameters:
+            - format: 'csv' (default) or 'json'
+            - profile: Rubric profile the batch was re-scored with (default: the
+              pipeline's own evaluation)
+        """
+        batch, error = get_batch_or_404(batch_id)
+        if error:
+            return error
+
+        export_format = request.args.get('format', 'csv').lower()
+        try:
+            document = current_app.batch_service.export_results(
+                batch, export_format, profile=request.args.get('profile')
+            )
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+
+        mimetype = 'application/json' if export_format == 'json' else 'text/csv'
+        return Response(
+            document,
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=batch_{batch_id}.{export_format}'}
+        )
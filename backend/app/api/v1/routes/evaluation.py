@@ -0,0 +1,61 @@
+"""
+Evaluation API Routes - Score many stored analyses at once
+"""
+from flask import Blueprint, request, jsonify, current_app
+import os
+import uuid
+
+from ....utils.exceptions import ProcessingError, ValidationError
+from .analysis import parse_rubric
+
+
+def register_routes(bp: Blueprint):
+    """Register evaluation routes"""
+
+    def get_batch_analysis_ids(batch_id):
+        """Get the analysis IDs of a batch's videos"""
+        try:
+            uuid.UUID(str(batch_id))
+        except ValueError:
+            raise ValidationError(f"Batch not found: {batch_id}")
+
+        manifest_path = os.path.join(current_app.config['BATCH_FOLDER'], batch_id, 'manifest.json')
+        batch = current_app.batch_service.get_batch(batch_id, manifest_path)
+        if not batch:
+            raise ValidationError(f"Batch not found: {batch_id}")
+        return [item.analysis_id for item in batch.items if item.analysis_id]
+
+    @bp.route('/evaluations/bulk', methods=['POST'])
+    def evaluate_bulk():
+        """
+        Score many completed analyses with a rubric in one vectorized pass
+
+        Accepts (JSON, optional):
+            - profile, weights, score_ranges: Rubric, as for /analysis/<id>/rescore
+            - analysis_ids: Analyses to score
+            - batch_id: Score the videos of a batch
+            (default: every completed analysis)
+
+        Returns:
+            JSON with per-analysis scores, grades and percentile ranks, the grade
+            distribution and score statistics
+        """
+        try:
+            rubric = parse_rubric()
+            data = request.get_json(silent=True) or {}
+
+            analysis_ids = data.get('analysis_ids')
+            if analysis_ids is not None and (
+                    not isinstance(analysis_ids, list)
+                    or not all(isinstance(analysis_id, str) for analysis_id in analysis_ids)):
+                raise ValidationError("analysis_ids must be a list of analysis IDs")
+            if data.get('batch_id') is not None:
+                batch_ids = get_batch_analysis_ids(data['batch_id'])
+                analysis_ids = batch_ids if analysis_ids is None else analysis_ids + batch_ids
+
+            result = current_app.video_analysis_service.evaluate_analyses(rubric, analysis_ids)
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except ProcessingError as e:
+            return jsonify({'error': str(e)}), 503
+        return jsonify(result)
@@ -1,22 +1,31 @@
 """
 Health and system status routes
 """
-from flask import jsonify
+from flask import jsonify, current_app
 from datetime import datetime
 
 def register_routes(bp):
     """Register health routes"""
     
     @bp.route('/health', methods=['GET'])
+    @bp.route('/health/live', methods=['GET'])
     def health_check():
-        """Health check endpoint"""
+        """Liveness check: the server is up (models may still be loading)"""
         return jsonify({
             'status': 'healthy',
             'service': 'Auto PPT Evaluation API',
             'version': '2.0.0',
+            'ready': current_app.analyzer_service.is_ready(),
             'timestamp': datetime.now().isoformat()
         })
     
+    @bp.route('/health/ready', methods=['GET'])
+    def readiness_check():
+        """Readiness check: 200 once the analyzer models are loaded, 503 while they load"""
+        readiness = current_app.analyzer_service.get_readiness()
+        readiness['timestamp'] = datetime.now().isoformat()
+        return jsonify(readiness), 200 if readiness['ready'] else 503
+    
     @bp.route('/ping', methods=['GET'])
     def ping():
         """Simple ping endpoint"""
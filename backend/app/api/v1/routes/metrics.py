@@ -0,0 +1,20 @@
+"""
+Metrics API Routes - Prometheus scrape endpoint
+"""
+from flask import Blueprint, Response, current_app
+
+
+def register_routes(bp: Blueprint):
+    """Register metrics routes"""
+
+    @bp.route('/metrics', methods=['GET'])
+    def get_metrics():
+        """
+        Expose service metrics in the Prometheus text format
+
+        Covers step and per-frame latencies, frames processed, Gemini request
+        latency and retries, the Whisper realtime factor, active and queued
+        jobs and the size of the in-memory analysis store.
+        """
+        metrics_service = current_app.metrics_service
+        return Response(metrics_service.render(), content_type=metrics_service.content_type)
@@ -37,11 +37,24 @@ def register_routes(bp):
             'api_endpoints': [
                 'POST /api/analyze-video - Upload and analyze presentation video',
                 'GET /api/analysis/{id}/status - Check analysis progress',
+                'GET /api/analysis/{id}/events - Stream analysis progress (Server-Sent Events)',
                 'GET /api/analysis/{id}/results - Get full analysis results',
+                'GET /api/analysis/{id}/profile - Get per-stage timing and resource usage',
                 'GET /api/analysis/{id}/score - Get presentation score and feedback',
                 'GET /api/analysis/{id}/detailed-feedback - Get detailed category feedback',
+                'POST /api/analysis/{id}/recompute - Recompute motion statistics with new thresholds',
+                'POST /api/analysis/{id}/rescore - Re-run the evaluation with a rubric profile',
+                'GET /api/analysis/{id}/evaluations - Get the evaluations per rubric profile',
+                'POST /api/evaluations/bulk - Score many analyses with a rubric profile',
+                'POST /api/batches - Upload and analyze many videos',
+                'GET /api/batches/{id} - Check batch progress',
+                'POST /api/batches/{id}/resume - Re-run unfinished videos of a batch',
+                'POST /api/batches/{id}/rescore - Re-grade a batch with a rubric profile',
+                'GET /api/batches/{id}/results - Export batch scores (CSV or JSON)',
                 'GET /api/summary - Get analysis summary statistics',
-                'GET /api/health - Health check',
+                'GET /api/health - Health check (liveness, also /api/health/live)',
+                'GET /api/health/ready - Readiness (503 while models load)',
+                'GET /api/metrics - Prometheus metrics',
                 'GET /api/test - This endpoint',
                 'GET /api/info - System information'
             ]
@@ -5,10 +5,15 @@ from flask import Flask
 from datetime import datetime
 import os
 
+from audio_analysis.request_observers import add_request_observer
 from .config import get_config
 from .extensions import init_extensions
 from .api import register_blueprints
 from .services.analyzer_service import AnalyzerService
+from .services.video_analysis_service import VideoAnalysisService
+from .services.batch_service import BatchAnalysisService
+from .services.metrics_service import MetricsService
+from .utils.preload import freeze_loaded_models, get_memory_usage
 
 
 def create_app(config_name=None):
@@ -32,12 +37,24 @@ def create_app(config_name=None):
     # Initialize extensions (CORS, etc.)
     init_extensions(app)
     
-    # Initialize analyzer service
-    analyzer_service = AnalyzerService()
-    analyzer_service.initialize_all_analyzers()
+    # Initialize analyzer service (models load in the background, see /api/health/ready,
+    # unless they are preloaded for forked workers)
+    preload_models = app.config.get('PRELOAD_MODELS', False)
+    analyzer_service = AnalyzerService(config_class.get_analyzer_config())
+    analyzer_service.initialize_all_analyzers(
+        background=app.config.get('WARMUP_IN_BACKGROUND', True) and not preload_models
+    )
     
-    # Store analyzer service in app context for dependency injection
+    # Store services in app context for dependency injection
     app.analyzer_service = analyzer_service
+    app.metrics_service = MetricsService()
+    app.video_analysis_service = VideoAnalysisService(analyzer_service, metrics=app.metrics_service)
+    app.batch_service = BatchAnalysisService(
+        app.video_analysis_service,
+        max_workers=app.config.get('BATCH_MAX_WORKERS', 2)
+    )
+    app.metrics_service.track_services(analyzer_service, app.batch_service)
+    add_request_observer(app.metrics_service)
     
     # Register API blueprints
     register_blueprints(app)
@@ -48,10 +65,19 @@ def create_app(config_name=None):
     print(f"🔧 Environment: {app.config.get('ENV', 'unknown')}")
     print(f"🌐 Server: http://{app.config.get('HOST', 'localhost')}:{app.config.get('PORT', 5000)}")
     print("✅ Application ready!")
+    if not analyzer_service.is_ready():
+        print("⏳ Loading analyzer models in the background (see /api/health/ready)")
     
     # Add error handlers
     register_error_handlers(app)
     
+    if preload_models:
+        # Workers forked from this process share the frozen model pages copy-on-write
+        frozen = freeze_loaded_models(analyzer_service)
+        memory = get_memory_usage()
+        print(f"🧊 Models preloaded in {analyzer_service.warmup_seconds}s and frozen "
+              f"({frozen} torch modules), RSS {memory.get('rss', 'n/a')} MB")
+    
     return app
 
 
@@ -0,0 +1,135 @@
+"""
+Batch CLI - Analyze many presentation videos from the command line
+
+Usage (from the backend directory):
+    python -m app.batch_cli submissions/ --output scores.csv
+    python -m app.batch_cli a.mp4 b.mp4 --output scores.json --workers 4 --preset draft
+
+Finished videos are recorded in a manifest next to the output file, so
+running the same command again only analyzes the videos that are missing.
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from .config import get_config
+from .models.analysis_options import (
+    AnalysisOptions, ANALYSIS_PRESETS, ANALYZER_PROFILES, SELECTABLE_ANALYZERS
+)
+from .services.analyzer_service import AnalyzerService
+from .services.batch_service import BatchAnalysisService, EXPORT_FORMATS
+from .services.video_analysis_service import VideoAnalysisService
+from .utils.exceptions import ValidationError
+
+
+def collect_video_paths(inputs: List[str], supported_formats: List[str]) -> List[str]:
+    """
+    Expand files and directories into a sorted list of video paths
+
+    Args:
+        inputs: Video files and/or directories (searched recursively)
+        supported_formats: Accepted video file extensions
+
+    Returns:
+        List of video paths
+
+    Raises:
+        ValidationError: If an input does not exist
+    """
+    video_paths = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in supported_formats:
+                        video_paths.append(os.path.join(root, name))
+        elif os.path.isfile(path):
+            video_paths.append(path)
+        else:
+            raise ValidationError(f"Input not found: {path}")
+    return sorted(video_paths)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        prog='python -m app.batch_cli',
+        description='Analyze many presentation videos and export their scores.'
+    )
+    parser.add_argument('inputs', nargs='+', help='Video files or directories of videos')
+    parser.add_argument('-o', '--output', required=True,
+                        help='Output file for the consolidated scores (.csv or .json)')
+    parser.add_argument('--format', choices=EXPORT_FORMATS,
+                        help='Output format (default: from the output file extension)')
+    parser.add_argument('--manifest',
+                        help='Manifest used to resume the batch (default: <output>.manifest.json)')
+    parser.add_argument('-w', '--workers', type=int,
+                        help='Number of videos analyzed concurrently (default: BATCH_MAX_WORKERS)')
+    parser.add_argument('--preset', choices=list(ANALYSIS_PRESETS.keys()),
+                        help='Quality/speed preset (default: standard)')
+    parser.add_argument('--profile', choices=list(ANALYZER_PROFILES.keys()),
+                        help='Analyzer profile')
+    parser.add_argument('--analyzers',
+                        help=f"Comma-separated analyzers ({', '.join(SELECTABLE_ANALYZERS)})")
+    parser.add_argument('--target-fps', type=float, help="Target FPS (default: the preset's FPS)")
+    parser.add_argument('--min-fps', type=float,
+                        help="Floor FPS for static segments (default: the preset's setting)")
+    parser.add_argument('--config', help='Configuration name (development, production)')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    config_class = get_config(args.config)
+
+    export_format = args.format or os.path.splitext(args.output)[1].lstrip('.').lower()
+    if export_format not in EXPORT_FORMATS:
+        print(f"Cannot infer output format from {args.output}; use --format", file=sys.stderr)
+        return 2
+
+    try:
+        options = AnalysisOptions.from_request(
+            profile=args.profile,
+            analyzers=args.analyzers,
+            target_fps=args.target_fps,
+            preset=args.preset,
+            min_fps=args.min_fps
+        )
+        video_paths = collect_video_paths(args.inputs, config_class.SUPPORTED_VIDEO_FORMATS)
+        if not video_paths:
+            raise ValidationError("No videos found in the given inputs")
+    except ValidationError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    # Analyzers are loaded once and shared by every worker
+    analyzer_service = AnalyzerService(config_class.get_analyzer_config())
+    analyzer_service.initialize_all_analyzers()
+    batch_service = BatchAnalysisService(
+        VideoAnalysisService(analyzer_service),
+        max_workers=args.workers or config_class.BATCH_MAX_WORKERS
+    )
+
+    batch = batch_service.create_batch(
+        video_paths, options,
+        manifest_path=args.manifest or f"{args.output}.manifest.json"
+    )
+    skipped = len(batch.items) - len(batch.get_pending_items())
+    if skipped:
+        print(f"Resuming batch {batch.batch_id}: skipping {skipped} finished video(s)")
+
+    batch_service.run_batch(batch)
+
+    with open(args.output, 'w', encoding='utf-8', newline='') as f:
+        f.write(batch_service.export_results(batch, export_format))
+
+    counts = batch.get_status_counts()
+    print(f"\nBatch {batch.batch_id} finished: {counts['completed']} completed, {counts['failed']} failed")
+    print(f"Scores written to {args.output}")
+    return 0 if counts['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,7 @@
 Configuration settings for Auto PPT Evaluation Backend
 """
 import os
+import tempfile
 from typing import Dict, Any
 
 class Config:
@@ -15,6 +16,17 @@ class Config:
     # API Keys
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     
+    # LLM backend of the content and disfluency analyzers: 'gemini' (SDK), 'http' (a server speaking
+    # the Gemini REST API at LLM_BASE_URL, e.g. python -m audio_analysis.mock_llm) or 'mock' (in-process)
+    LLM_BACKEND = os.environ.get('LLM_BACKEND', 'gemini').lower()
+    LLM_BASE_URL = os.environ.get('LLM_BASE_URL', 'http://127.0.0.1:8765')
+    
+    # Mock backend behavior (LLM_BACKEND=mock)
+    MOCK_LLM_LATENCY = os.environ.get('MOCK_LLM_LATENCY', '0')
+    MOCK_LLM_RATE_LIMIT_RATE = float(os.environ.get('MOCK_LLM_RATE_LIMIT_RATE', 0))
+    MOCK_LLM_MALFORMED_RATE = float(os.environ.get('MOCK_LLM_MALFORMED_RATE', 0))
+    MOCK_LLM_SEED = int(os.environ.get('MOCK_LLM_SEED', 0))
+    
     # Model settings
     WHISPER_MODEL = os.environ.get('WHISPER_MODEL', 'base')
     FACIAL_EXPRESSION_MODEL = os.environ.get('FACIAL_EXPRESSION_MODEL', 'prithivMLmods/Facial-Emotion-Detection-SigLIP2')
@@ -28,6 +40,37 @@ class Config:
     # Processing settings
     MIN_DETECTION_CONFIDENCE = 0.7
     ANALYSIS_TIMEOUT_SECONDS = 300  # 5 minutes
+    SSE_HEARTBEAT_SECONDS = 15  # Keep-alive interval for /events streams
+    GEMINI_REQUESTS_PER_MINUTE = int(os.environ.get('GEMINI_REQUESTS_PER_MINUTE', 15))
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 4))  # LLM requests in flight at once
+    LLM_MAX_ATTEMPTS = int(os.environ.get('LLM_MAX_ATTEMPTS', 5))  # Per request, including retries
+    LLM_REQUEST_DEADLINE_SECONDS = float(os.environ.get('LLM_REQUEST_DEADLINE_SECONDS', 120))
+    # Ask for JSON output matching the analyzers' response schemas
+    LLM_STRUCTURED_OUTPUT = os.environ.get('LLM_STRUCTURED_OUTPUT', 'True').lower() == 'true'
+    # Transcript chunks of the content analysis (estimated tokens; one request per chunk)
+    CONTENT_CHUNK_TOKENS = int(os.environ.get('CONTENT_CHUNK_TOKENS', 4000))
+    CONTENT_CHUNK_OVERLAP_TOKENS = int(os.environ.get('CONTENT_CHUNK_OVERLAP_TOKENS', 0))
+    
+    # Load ML models on a background thread so the server answers health checks immediately
+    WARMUP_IN_BACKGROUND = os.environ.get('WARMUP_IN_BACKGROUND', 'True').lower() == 'true'
+    
+    # Pre-fork servers: load and freeze all models before workers are forked (see gunicorn.conf.py)
+    PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', 'False').lower() == 'true'
+    
+    # Decoded-frame cache (reused across analyzers and re-runs of the same video)
+    FRAME_CACHE_ENABLED = os.environ.get('FRAME_CACHE_ENABLED', 'False').lower() == 'true'
+    FRAME_CACHE_DIR = os.environ.get('FRAME_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'auto_ppt_frame_cache'))
+    FRAME_CACHE_MAX_MB = int(os.environ.get('FRAME_CACHE_MAX_MB', 4096))
+    
+    # Raw detector landmarks per analysis (used to recompute motion statistics with new thresholds);
+    # least recently used analyses are removed once the store exceeds LANDMARK_STORE_MAX_MB
+    LANDMARK_STORE_ENABLED = os.environ.get('LANDMARK_STORE_ENABLED', 'True').lower() == 'true'
+    LANDMARK_STORE_DIR = os.environ.get('LANDMARK_STORE_DIR', os.path.join(tempfile.gettempdir(), 'auto_ppt_landmarks'))
+    LANDMARK_STORE_MAX_MB = int(os.environ.get('LANDMARK_STORE_MAX_MB', 1024))
+    
+    # Batch settings
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 2))
+    BATCH_FOLDER = os.environ.get('BATCH_FOLDER', os.path.join(tempfile.gettempdir(), 'auto_ppt_batches'))
     
     @classmethod
     def get_analyzer_config(cls) -> Dict[str, Any]:
@@ -37,7 +80,26 @@ class Config:
             'use_gpu': cls.USE_GPU,
             'whisper_model': cls.WHISPER_MODEL,
             'facial_expression_model': cls.FACIAL_EXPRESSION_MODEL,
-            'gemini_api_key': cls.GEMINI_API_KEY
+            'gemini_api_key': cls.GEMINI_API_KEY,
+            'gemini_requests_per_minute': cls.GEMINI_REQUESTS_PER_MINUTE,
+            'llm_max_concurrency': cls.LLM_MAX_CONCURRENCY,
+            'llm_max_attempts': cls.LLM_MAX_ATTEMPTS,
+            'llm_request_deadline_seconds': cls.LLM_REQUEST_DEADLINE_SECONDS,
+            'llm_structured_output': cls.LLM_STRUCTURED_OUTPUT,
+            'content_chunk_tokens': cls.CONTENT_CHUNK_TOKENS,
+            'content_chunk_overlap_tokens': cls.CONTENT_CHUNK_OVERLAP_TOKENS,
+            'llm_backend': cls.LLM_BACKEND,
+            'llm_base_url': cls.LLM_BASE_URL,
+            'mock_llm': {
+                'latency': cls.MOCK_LLM_LATENCY,
+                'rate_limit_rate': cls.MOCK_LLM_RATE_LIMIT_RATE,
+                'malformed_rate': cls.MOCK_LLM_MALFORMED_RATE,
+                'seed': cls.MOCK_LLM_SEED
+            },
+            'frame_cache_dir': cls.FRAME_CACHE_DIR if cls.FRAME_CACHE_ENABLED else None,
+            'frame_cache_max_bytes': cls.FRAME_CACHE_MAX_MB * 1024 * 1024,
+            'landmark_store_dir': cls.LANDMARK_STORE_DIR if cls.LANDMARK_STORE_ENABLED else None,
+            'landmark_store_max_bytes': cls.LANDMARK_STORE_MAX_MB * 1024 * 1024
         }
     
     @classmethod
@@ -45,7 +107,7 @@ class Config:
         """Validate configuration and return any warnings"""
         warnings = []
         
-        if not cls.GEMINI_API_KEY:
+        if cls.LLM_BACKEND == 'gemini' and not cls.GEMINI_API_KEY:
             warnings.append("GEMINI_API_KEY not set - AI analysis features will be disabled")
         
         if cls.USE_GPU:
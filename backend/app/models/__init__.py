@@ -2,6 +2,7 @@
 Models package for Auto PPT Evaluation System
 """
 from .analysis import AnalysisRecord
+from .batch import BatchItem, BatchRecord
 from .presentation import PresentationResult
 
-__all__ = ['AnalysisRecord', 'PresentationResult']
+__all__ = ['AnalysisRecord', 'BatchItem', 'BatchRecord', 'PresentationResult']
@@ -3,7 +3,7 @@ Analysis Record Model for tracking presentation analysis data
 """
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from enum import Enum
 import uuid
 
@@ -16,6 +16,15 @@ class AnalysisStatus(Enum):
     FAILED = "failed"
 
 
+class StepStatus(Enum):
+    """Enumeration for pipeline step status"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
 @dataclass
 class AnalysisRecord:
     """
@@ -30,6 +39,9 @@ class AnalysisRecord:
     results: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    step_status: Dict[str, StepStatus] = field(default_factory=dict)
+    partial_results: Dict[str, Any] = field(default_factory=dict)
+    evaluations: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # Re-scored evaluations by rubric profile
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation"""
@@ -42,7 +54,9 @@ class AnalysisRecord:
             'progress': self.progress,
             'results': self.results,
             'error_message': self.error_message,
-            'metadata': self.metadata
+            'metadata': self.metadata,
+            'step_status': self.get_step_status(),
+            'rubric_profiles': list(self.evaluations.keys())
         }
     
     def update_status(self, status: AnalysisStatus, error_message: Optional[str] = None):
@@ -70,3 +84,46 @@ class AnalysisRecord:
             self.metadata = {}
         self.metadata[key] = value
         self.updated_at = datetime.now()
+    
+    def set_evaluation(self, profile: str, evaluation: Dict[str, Any]):
+        """Store the evaluation produced with a rubric profile (replacing an earlier one)"""
+        self.evaluations[profile] = evaluation
+        self.updated_at = datetime.now()
+    
+    def init_steps(self, step_keys: List[str]):
+        """Register pipeline steps as pending"""
+        self.step_status = {key: StepStatus.PENDING for key in step_keys}
+        self.partial_results = {}
+        self.updated_at = datetime.now()
+    
+    def start_step(self, step_key: str):
+        """Mark a pipeline step as running"""
+        self.step_status[step_key] = StepStatus.RUNNING
+        self.updated_at = datetime.now()
+    
+    def skip_step(self, step_key: str):
+        """Mark a pipeline step as skipped (not requested)"""
+        self.step_status[step_key] = StepStatus.SKIPPED
+        self.updated_at = datetime.now()
+    
+    def publish_step_result(self, step_key: str, result: Dict[str, Any], status: StepStatus):
+        """Store the result of a finished pipeline step"""
+        self.partial_results[step_key] = result
+        self.step_status[step_key] = status
+        self.updated_at = datetime.now()
+    
+    def add_partial_result(self, key: str, value: Any):
+        """Store an intermediate result that is not a pipeline step (e.g. transcript)"""
+        self.partial_results[key] = value
+        self.updated_at = datetime.now()
+    
+    def get_step_status(self) -> Dict[str, str]:
+        """Get step status values keyed by step"""
+        return {key: status.value for key, status in list(self.step_status.items())}
+    
+    def get_pending_steps(self) -> List[str]:
+        """Get steps that have not finished yet"""
+        return [
+            key for key, status in list(self.step_status.items())
+            if status in (StepStatus.PENDING, StepStatus.RUNNING)
+        ]
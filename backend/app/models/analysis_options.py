@@ -0,0 +1,201 @@
+"""
+Analysis Options Model - Selects which analyzers run for a request
+"""
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Union
+
+from ..utils.exceptions import ValidationError
+
+
+# Video motion analysis steps, in pipeline order
+MOTION_ANALYZERS = [
+    ('body_rotation', 'Body Rotation Analysis'),
+    ('head_motion', 'Head Motion Analysis'),
+    ('head_rotation', 'Head Rotation Analysis'),
+    ('head_pitch', 'Head Pitch Analysis'),
+    ('hand_motion', 'Hand Motion Analysis'),
+    ('gaze_motion', 'Gaze Motion Analysis'),
+    ('body_tilt', 'Body Tilt Analysis')
+]
+
+MOTION_ANALYZER_NAMES = [name for name, _ in MOTION_ANALYZERS]
+
+# Analyzers a client can select; the evaluation step always runs
+SELECTABLE_ANALYZERS = MOTION_ANALYZER_NAMES + ['expression', 'content', 'disfluency']
+
+# Disfluency tagging needs the transcript produced by the content step
+ANALYZER_DEPENDENCIES = {
+    'disfluency': ['content']
+}
+
+# Analyzers that cannot run without an LLM (content falls back to transcription only)
+LLM_ANALYZERS = ['disfluency']
+
+ANALYZER_PROFILES = {
+    'full': SELECTABLE_ANALYZERS,
+    'motion_only': MOTION_ANALYZER_NAMES,
+    'video_only': MOTION_ANALYZER_NAMES + ['expression'],
+    'speech_only': ['content', 'disfluency']
+}
+
+DEFAULT_PROFILE = 'full'
+
+
+@dataclass(frozen=True)
+class AnalysisPreset:
+    """
+    Quality/speed settings applied consistently across the whole pipeline
+    """
+    name: str
+    target_fps: float
+    min_fps: Optional[float]           # Floor FPS for static segments (None = fixed-rate sampling)
+    max_resolution: Optional[int]      # Longest side of analyzed frames (None = native)
+    model_complexity: int              # MediaPipe model complexity (0 = fastest)
+    whisper_model: Optional[str]       # Whisper model size (None = configured default)
+    expression_batch_size: int         # Frames per expression model forward pass
+    use_llm: bool                      # Whether Gemini based analysis runs
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation"""
+        return asdict(self)
+
+
+ANALYSIS_PRESETS = {
+    'draft': AnalysisPreset(
+        name='draft', target_fps=2.0, min_fps=0.5, max_resolution=640, model_complexity=0,
+        whisper_model='tiny', expression_batch_size=16, use_llm=False
+    ),
+    # Matches the pipeline defaults before presets existed
+    'standard': AnalysisPreset(
+        name='standard', target_fps=5.0, min_fps=None, max_resolution=None, model_complexity=1,
+        whisper_model=None, expression_batch_size=8, use_llm=True
+    ),
+    'thorough': AnalysisPreset(
+        name='thorough', target_fps=10.0, min_fps=None, max_resolution=None, model_complexity=2,
+        whisper_model='small', expression_batch_size=8, use_llm=True
+    )
+}
+
+DEFAULT_PRESET = 'standard'
+
+
+@dataclass
+class AnalysisOptions:
+    """
+    Options controlling a single analysis run
+    """
+    analyzers: List[str] = field(default_factory=lambda: list(SELECTABLE_ANALYZERS))
+    target_fps: float = 5.0
+    profile: Optional[str] = DEFAULT_PROFILE
+    preset: AnalysisPreset = ANALYSIS_PRESETS[DEFAULT_PRESET]
+    min_fps: Optional[float] = None
+
+    @classmethod
+    def from_request(cls,
+                     profile: Optional[str] = None,
+                     analyzers: Optional[Union[str, List[str]]] = None,
+                     target_fps: Optional[float] = None,
+                     preset: Optional[str] = None,
+                     min_fps: Optional[float] = None) -> 'AnalysisOptions':
+        """
+        Build options from request parameters
+
+        Args:
+            profile: Named analyzer profile (e.g. 'motion_only')
+            analyzers: Analyzer names, as a list or a comma-separated string
+            target_fps: Target frames per second for analysis (default: preset FPS)
+            preset: Quality/speed preset name (draft, standard, thorough)
+            min_fps: Floor FPS for static segments; motion analyzers sample adaptively
+                between min_fps and target_fps (default: preset setting)
+
+        Returns:
+            AnalysisOptions instance
+
+        Raises:
+            ValidationError: If the profile, preset or an analyzer name is unknown
+        """
+        preset = preset or DEFAULT_PRESET
+        if preset not in ANALYSIS_PRESETS:
+            raise ValidationError(
+                f"Unknown preset: {preset}. "
+                f"Available presets: {', '.join(ANALYSIS_PRESETS.keys())}"
+            )
+        preset_config = ANALYSIS_PRESETS[preset]
+
+        if target_fps is None:
+            target_fps = preset_config.target_fps
+        if target_fps <= 0:
+            raise ValidationError("target_fps must be a positive number")
+
+        if min_fps is None:
+            min_fps = preset_config.min_fps
+        elif min_fps <= 0:
+            raise ValidationError("min_fps must be a positive number")
+        if min_fps is not None and min_fps >= target_fps:
+            min_fps = None
+
+        if isinstance(analyzers, str):
+            analyzers = [name.strip() for name in analyzers.split(',') if name.strip()]
+
+        if profile and analyzers:
+            raise ValidationError("Specify either 'profile' or 'analyzers', not both")
+
+        if analyzers:
+            unknown = [name for name in analyzers if name not in SELECTABLE_ANALYZERS]
+            if unknown:
+                raise ValidationError(
+                    f"Unknown analyzers: {', '.join(unknown)}. "
+                    f"Available analyzers: {', '.join(SELECTABLE_ANALYZERS)}"
+                )
+            return cls(analyzers=cls._resolve_dependencies(analyzers), target_fps=target_fps,
+                       profile=None, preset=preset_config, min_fps=min_fps)
+
+        profile = profile or DEFAULT_PROFILE
+        if profile not in ANALYZER_PROFILES:
+            raise ValidationError(
+                f"Unknown profile: {profile}. "
+                f"Available profiles: {', '.join(ANALYZER_PROFILES.keys())}"
+            )
+        return cls(analyzers=list(ANALYZER_PROFILES[profile]), target_fps=target_fps,
+                   profile=profile, preset=preset_config, min_fps=min_fps)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AnalysisOptions':
+        """Restore options from their dictionary representation (see to_dict)"""
+        preset = data.get('preset') or {}
+        preset_name = preset.get('name') if isinstance(preset, dict) else preset
+        return cls(
+            analyzers=list(data.get('analyzers', SELECTABLE_ANALYZERS)),
+            target_fps=data.get('target_fps', 5.0),
+            profile=data.get('profile'),
+            preset=ANALYSIS_PRESETS.get(preset_name, ANALYSIS_PRESETS[DEFAULT_PRESET]),
+            min_fps=data.get('min_fps')
+        )
+
+    @staticmethod
+    def _resolve_dependencies(analyzers: List[str]) -> List[str]:
+        """Add required analyzers and return names in pipeline order"""
+        selected = set(analyzers)
+        for name in analyzers:
+            selected.update(ANALYZER_DEPENDENCIES.get(name, []))
+        return [name for name in SELECTABLE_ANALYZERS if name in selected]
+
+    def is_selected(self, analyzer_name: str) -> bool:
+        """Check whether an analyzer runs in this analysis"""
+        return analyzer_name in self.analyzers
+
+    def runs_step(self, step_key: str) -> bool:
+        """Check whether a pipeline step runs, given the selection and the preset's LLM usage"""
+        if not self.is_selected(step_key):
+            return False
+        return self.preset.use_llm or step_key not in LLM_ANALYZERS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation"""
+        return {
+            'profile': self.profile,
+            'analyzers': self.analyzers,
+            'target_fps': self.target_fps,
+            'min_fps': self.min_fps,
+            'preset': self.preset.to_dict()
+        }
@@ -0,0 +1,116 @@
+"""
+Batch Analysis Models - Track multi-video analysis runs
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .analysis import AnalysisStatus
+
+
+@dataclass
+class BatchItem:
+    """Single video of a batch, identified by its content hash"""
+    filename: str
+    video_path: str
+    content_hash: str
+    status: AnalysisStatus = AnalysisStatus.PENDING
+    analysis_id: Optional[str] = None
+    presentation_summary: Optional[Dict[str, Any]] = None
+    rubric_summaries: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # Re-scored summaries by rubric profile
+    error_message: Optional[str] = None
+    completed_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether the item completed successfully and can be skipped on resume"""
+        return self.status == AnalysisStatus.COMPLETED
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation"""
+        return {
+            'filename': self.filename,
+            'video_path': self.video_path,
+            'content_hash': self.content_hash,
+            'status': self.status.value,
+            'analysis_id': self.analysis_id,
+            'presentation_summary': self.presentation_summary,
+            'rubric_summaries': self.rubric_summaries,
+            'error_message': self.error_message,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BatchItem':
+        """Create an item from its dictionary representation"""
+        completed_at = data.get('completed_at')
+        return cls(
+            filename=data['filename'],
+            video_path=data['video_path'],
+            content_hash=data['content_hash'],
+            status=AnalysisStatus(data.get('status', AnalysisStatus.PENDING.value)),
+            analysis_id=data.get('analysis_id'),
+            presentation_summary=data.get('presentation_summary'),
+            rubric_summaries=data.get('rubric_summaries') or {},
+            error_message=data.get('error_message'),
+            completed_at=datetime.fromisoformat(completed_at) if completed_at else None
+        )
+
+
+@dataclass
+class BatchRecord:
+    """Model for tracking a batch of video analyses"""
+    batch_id: str
+    items: List[BatchItem] = field(default_factory=list)
+    options: Dict[str, Any] = field(default_factory=dict)
+    manifest_path: Optional[str] = None
+    owns_videos: bool = False      # Videos were uploaded into the batch folder and are removed once analyzed
+    status: AnalysisStatus = AnalysisStatus.PENDING
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """Get number of items per status"""
+        counts = {status.value: 0 for status in AnalysisStatus}
+        for item in self.items:
+            counts[item.status.value] += 1
+        return counts
+
+    def get_pending_items(self) -> List[BatchItem]:
+        """Get items that still need to be analyzed"""
+        return [item for item in self.items if not item.is_finished]
+
+    def update_status(self, status: AnalysisStatus):
+        """Update batch status"""
+        self.status = status
+        self.updated_at = datetime.now()
+
+    def to_dict(self, include_items: bool = True) -> Dict[str, Any]:
+        """Convert to dictionary representation"""
+        data = {
+            'batch_id': self.batch_id,
+            'status': self.status.value,
+            'total_items': len(self.items),
+            'item_counts': self.get_status_counts(),
+            'options': self.options,
+            'owns_videos': self.owns_videos,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+        if include_items:
+            data['items'] = [item.to_dict() for item in self.items]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], manifest_path: Optional[str] = None) -> 'BatchRecord':
+        """Create a batch from its manifest representation"""
+        return cls(
+            batch_id=data['batch_id'],
+            items=[BatchItem.from_dict(item) for item in data.get('items', [])],
+            options=data.get('options', {}),
+            manifest_path=manifest_path,
+            owns_videos=data.get('owns_videos', False),
+            status=AnalysisStatus(data.get('status', AnalysisStatus.PENDING.value)),
+            created_at=datetime.fromisoformat(data['created_at']) if data.get('created_at') else datetime.now(),
+            updated_at=datetime.fromisoformat(data['updated_at']) if data.get('updated_at') else datetime.now()
+        )
@@ -0,0 +1,165 @@
+"""
+Rubric Profile Model - Category weights and grade boundaries used for scoring
+"""
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+
+from ..utils.exceptions import ValidationError
+
+
+# Evaluation categories a rubric weights (PresentationEvaluator weight keys)
+RUBRIC_CATEGORIES = ['body_language', 'vocal_delivery', 'content_quality', 'facial_expression', 'technical_aspects']
+
+
+@dataclass(frozen=True)
+class RubricProfile:
+    """
+    Scoring settings applied by the PresentationEvaluator
+
+    Weights need not sum to 1; the overall score is normalized by the weights
+    of the categories that were evaluated.
+    """
+    name: str
+    weights: Dict[str, float]
+    score_ranges: Dict[str, Tuple[float, float]]    # Grade -> (min score, max score)
+
+    @classmethod
+    def from_request(cls,
+                     profile: Optional[str] = None,
+                     weights: Optional[Dict[str, Any]] = None,
+                     score_ranges: Optional[Dict[str, Any]] = None) -> 'RubricProfile':
+        """
+        Build a rubric from request parameters
+
+        Args:
+            profile: Name of a registered rubric, or the name to store a custom
+                rubric under (custom rubrics start from the default rubric). A
+                custom rubric without a name is named after its settings
+                ("custom-" and a short hash), so the same settings reuse one name
+            weights: Category weights overriding the profile's weights
+            score_ranges: Grade boundaries replacing the profile's boundaries,
+                e.g. {"pass": [50, 100], "fail": [0, 49.9]}
+
+        Returns:
+            RubricProfile instance
+
+        Raises:
+            ValidationError: If the profile is unknown or a weight or range is invalid
+        """
+        custom = weights is not None or score_ranges is not None
+        if not profile:
+            profile = None if custom else DEFAULT_RUBRIC
+        elif not isinstance(profile, str) or not profile.strip():
+            raise ValidationError("profile must be a non-empty string")
+        else:
+            profile = profile.strip()
+
+        if profile in RUBRIC_PROFILES:
+            if custom:
+                raise ValidationError(
+                    f"'{profile}' is a built-in rubric profile; "
+                    f"use a different profile name for custom weights or score ranges"
+                )
+            return RUBRIC_PROFILES[profile]
+        if not custom:
+            raise ValidationError(
+                f"Unknown rubric profile: {profile}. "
+                f"Available profiles: {', '.join(RUBRIC_PROFILES.keys())} "
+                f"(or pass weights/score_ranges to define a custom profile)"
+            )
+
+        base = RUBRIC_PROFILES[DEFAULT_RUBRIC]
+        merged_weights = cls._parse_weights(weights, base.weights)
+        parsed_ranges = cls._parse_score_ranges(score_ranges) if score_ranges is not None else base.score_ranges
+        return cls(
+            name=profile or cls._derive_name(merged_weights, parsed_ranges),
+            weights=merged_weights,
+            score_ranges=parsed_ranges
+        )
+
+    @staticmethod
+    def _derive_name(weights: Dict[str, float], score_ranges: Dict[str, Tuple[float, float]]) -> str:
+        """Name of an unnamed custom rubric, stable for the same weights and ranges"""
+        settings = json.dumps({'weights': weights, 'score_ranges': [[grade, list(bounds)]
+                                                                    for grade, bounds in score_ranges.items()]},
+                              sort_keys=True)
+        return f"custom-{hashlib.sha256(settings.encode('utf-8')).hexdigest()[:8]}"
+
+    @staticmethod
+    def _parse_weights(weights: Optional[Dict[str, Any]], base: Dict[str, float]) -> Dict[str, float]:
+        """Merge weight overrides into the base weights"""
+        merged = dict(base)
+        if weights is None:
+            return merged
+        if not isinstance(weights, dict):
+            raise ValidationError("weights must be an object keyed by category")
+
+        for category, weight in weights.items():
+            if category not in RUBRIC_CATEGORIES:
+                raise ValidationError(
+                    f"Unknown category: {category}. "
+                    f"Available categories: {', '.join(RUBRIC_CATEGORIES)}"
+                )
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) \
+                    or not math.isfinite(weight) or weight < 0:
+                raise ValidationError(f"Weight of '{category}' must be a non-negative number")
+            merged[category] = float(weight)
+
+        if sum(merged.values()) <= 0:
+            raise ValidationError("At least one category weight must be positive")
+        return merged
+
+    @staticmethod
+    def _parse_score_ranges(score_ranges: Any) -> Dict[str, Tuple[float, float]]:
+        """Validate grade boundaries, keeping their order"""
+        if not isinstance(score_ranges, dict) or not score_ranges:
+            raise ValidationError("score_ranges must be a non-empty object keyed by grade")
+
+        parsed = {}
+        for grade, bounds in score_ranges.items():
+            if not grade.strip():
+                raise ValidationError("Grade names must not be empty")
+            if not isinstance(bounds, (list, tuple)) or len(bounds) != 2 or any(
+                    isinstance(bound, bool) or not isinstance(bound, (int, float)) or not math.isfinite(bound)
+                    for bound in bounds):
+                raise ValidationError(f"Score range of '{grade}' must be a [min, max] pair of numbers")
+            min_score, max_score = float(bounds[0]), float(bounds[1])
+            if not 0 <= min_score <= max_score <= 100:
+                raise ValidationError(f"Score range of '{grade}' must satisfy 0 <= min <= max <= 100")
+            parsed[grade] = (min_score, max_score)
+        return parsed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation"""
+        return {
+            'name': self.name,
+            'weights': dict(self.weights),
+            'score_ranges': {grade: list(bounds) for grade, bounds in self.score_ranges.items()}
+        }
+
+
+RUBRIC_PROFILES = {
+    # Matches the PresentationEvaluator's built-in weights and grades
+    'default': RubricProfile(
+        name='default',
+        weights={
+            'body_language': 0.25,
+            'vocal_delivery': 0.20,
+            'content_quality': 0.30,
+            'facial_expression': 0.15,
+            'technical_aspects': 0.10
+        },
+        score_ranges={
+            'excellent': (90, 100),
+            'very_good': (80, 89),
+            'good': (70, 79),
+            'fair': (60, 69),
+            'needs_improvement': (0, 59)
+        }
+    )
+}
+
+DEFAULT_RUBRIC = 'default'
@@ -3,5 +3,9 @@ Services package for Auto PPT Evaluation System
 """
 from .analyzer_service import AnalyzerService
 from .video_analysis_service import VideoAnalysisService
+from .batch_service import BatchAnalysisService
+from .event_bus import AnalysisEvent, AnalysisEventBus
+from .metrics_service import MetricsService
 
-__all__ = ['AnalyzerService', 'VideoAnalysisService']
+__all__ = ['AnalyzerService', 'VideoAnalysisService', 'BatchAnalysisService', 'AnalysisEvent', 'AnalysisEventBus',
+           'MetricsService']
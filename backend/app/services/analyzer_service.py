@@ -2,13 +2,35 @@
 Analyzer Service - Orchestrates various analysis modules
 """
 
+import contextlib
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 
+from ..models.analysis import AnalysisRecord, AnalysisStatus
+from ..utils.optional_imports import is_installed
+
 logger = logging.getLogger(__name__)
 
 
+# Names of all analyzers managed by the service, in pipeline order
+ANALYZER_NAMES = [
+    'body_rotation', 'head_motion', 'head_rotation', 'head_pitch',
+    'hand_motion', 'gaze_motion', 'body_tilt', 'expression',
+    'content', 'disfluency', 'whisper', 'evaluator'
+]
+
+# Analyzers that keep per-video state on the instance and must not run concurrently.
+# Whisper's transcribe installs forward hooks (KV cache, word alignment) on the model's
+# modules and toggles a class-level attention flag, so one lock covers every model size.
+STATEFUL_ANALYZERS = ['hand_motion', 'whisper']
+
+# Model loading steps of the warm-up, in order (each imports its ML stack on first use)
+WARMUP_COMPONENTS = ['video_analyzers', 'expression', 'audio']
+
+
 @dataclass
 class AnalysisResult:
     """Container for analysis results"""
@@ -20,21 +42,371 @@ class AnalysisResult:
 class AnalyzerService:
     """Service to orchestrate various analysis modules"""
     
-    def __init__(self):
+    def __init__(self, analyzer_config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize analyzer service
+        
+        Args:
+            analyzer_config: Analyzer settings (see Config.get_analyzer_config)
+        """
         self.logger = logging.getLogger(__name__)
         self.initialized = False
+        self.analyzer_config = analyzer_config or {}
+        self.analyzers: Dict[str, Any] = {}
+        self.dependencies: Dict[str, bool] = {}
+        
+        # Whisper models by size; the configured default is loaded at startup, others on first use
+        self.whisper_models: Dict[str, Any] = {}
+        self._whisper_lock = threading.Lock()
+        
+        # Shared across concurrent analyses so batch runs respect the Gemini quota
+        self.llm_runner = None
+        self._analyzer_locks = {name: threading.Lock() for name in STATEFUL_ANALYZERS}
+        
+        # Raw landmarks of each analysis, for recomputing motion statistics (None if disabled)
+        self.landmark_store = None
         
-    def initialize_all_analyzers(self):
-        """Initialize all analysis modules"""
+        # In-memory storage for analysis records (in production, use a database)
+        self.analysis_records: Dict[str, AnalysisRecord] = {}
+        self._records_lock = threading.Lock()
+        
+        # Model warm-up state; the service is ready once every component finished loading
+        self.warmup_status: Dict[str, str] = {name: 'pending' for name in WARMUP_COMPONENTS}
+        self.warmup_seconds: Optional[float] = None
+        self._ready = threading.Event()
+        
+    def initialize_all_analyzers(self, background: bool = False):
+        """
+        Initialize all analysis modules
+        
+        The lightweight parts (frame cache, landmark store, evaluator) are set
+        up immediately. The ML models (MediaPipe, the expression model, Whisper
+        and the Gemini clients) are imported and loaded by the warm-up.
+        
+        Args:
+            background: Run the warm-up on a background thread so the caller
+                (e.g. the HTTP server) can start serving right away; see is_ready()
+        """
+        self.logger.info("Initializing all analyzers...")
+        self._initialize_frame_cache()
+        self._initialize_landmark_store()
+        self._initialize_evaluator()
+        
+        if background:
+            threading.Thread(target=self._warm_up, name='analyzer-warmup', daemon=True).start()
+        else:
+            self._warm_up()
+    
+    def _warm_up(self):
+        """Load the ML models, recording the outcome of each component"""
+        started_at = time.perf_counter()
+        steps = {
+            'video_analyzers': self._initialize_video_analyzers,
+            'expression': self._initialize_expression_analyzer,
+            'audio': self._initialize_audio_analyzers
+        }
         try:
-            self.logger.info("Initializing all analyzers...")
-            # TODO: Initialize actual analyzer modules here
-            # This would load ML models, configure analyzers, etc.
+            for name in WARMUP_COMPONENTS:
+                self.warmup_status[name] = 'loading'
+                try:
+                    steps[name]()
+                    self.warmup_status[name] = 'ready'
+                except Exception as e:
+                    self.warmup_status[name] = 'failed'
+                    self.logger.error(f"Failed to initialize {name}: {str(e)}")
             self.initialized = True
-            self.logger.info("All analyzers initialized successfully")
+            self.logger.info(
+                f"Analyzers initialized: {self.get_available_analyzer_count()}/{self.get_total_analyzer_count()} available"
+            )
+        finally:
+            self.warmup_seconds = round(time.perf_counter() - started_at, 2)
+            self._ready.set()
+    
+    def is_ready(self) -> bool:
+        """Whether the warm-up finished (analyzers that could be loaded are available)"""
+        return self._ready.is_set()
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the warm-up finished
+        
+        Args:
+            timeout: Maximum seconds to wait (None = no limit)
+            
+        Returns:
+            True if the service is ready
+        """
+        return self._ready.wait(timeout)
+    
+    def get_readiness(self) -> Dict[str, Any]:
+        """Get the warm-up state of the service"""
+        return {
+            'ready': self.is_ready(),
+            'components': dict(self.warmup_status),
+            'warmup_seconds': self.warmup_seconds
+        }
+    
+    def _initialize_frame_cache(self):
+        """Enable the decoded-frame cache shared by all video analyzers, if configured"""
+        cache_dir = self.analyzer_config.get('frame_cache_dir')
+        if not cache_dir:
+            return
+        try:
+            from video_analysis.frame_cache import configure_frame_cache
+            configure_frame_cache(cache_dir, self.analyzer_config.get('frame_cache_max_bytes', 0))
+            self.logger.info(f"Frame cache enabled at {cache_dir}")
+        except (ImportError, OSError) as e:
+            self.logger.warning(f"Frame cache not available: {e}")
+    
+    def _initialize_landmark_store(self):
+        """Enable recording of detector landmarks per analysis, if configured"""
+        store_dir = self.analyzer_config.get('landmark_store_dir')
+        if not store_dir:
+            return
+        try:
+            from video_analysis.landmark_store import LandmarkStore
+            self.landmark_store = LandmarkStore(store_dir, self.analyzer_config.get('landmark_store_max_bytes', 0))
+            # Evicts the tracks of analyses recorded before a restart first, if over the limit
+            self.landmark_store.evict()
+            self.logger.info(f"Landmark store enabled at {store_dir}")
+        except (ImportError, OSError) as e:
+            self.logger.warning(f"Landmark store not available: {e}")
+    
+    def _initialize_video_analyzers(self):
+        """Initialize MediaPipe based motion analyzers"""
+        try:
+            from video_analysis.motion_analyzer import (
+                BodyRotationAnalyzer, HeadMotionAnalyzer, HeadRotationAnalyzer, HeadPitchAnalyzer,
+                HandMotionAnalyzer, GazeMotionAnalyzer, BodyTiltAnalyzer
+            )
+            self.dependencies['video_analysis_available'] = True
+        except ImportError as e:
+            self.dependencies['video_analysis_available'] = False
+            self.logger.warning(f"Video analysis modules not available: {e}")
+            return
+        
+        confidence = self.analyzer_config.get('min_detection_confidence', 0.7)
+        analyzer_classes = {
+            'body_rotation': BodyRotationAnalyzer,
+            'head_motion': HeadMotionAnalyzer,
+            'head_rotation': HeadRotationAnalyzer,
+            'head_pitch': HeadPitchAnalyzer,
+            'hand_motion': HandMotionAnalyzer,
+            'gaze_motion': GazeMotionAnalyzer,
+            'body_tilt': BodyTiltAnalyzer
+        }
+        for name, analyzer_class in analyzer_classes.items():
+            try:
+                self.analyzers[name] = analyzer_class(min_detection_confidence=confidence)
+            except Exception as e:
+                self.logger.warning(f"Failed to initialize {name} analyzer: {e}")
+    
+    def _initialize_expression_analyzer(self):
+        """Initialize facial expression analyzer"""
+        try:
+            from video_analysis.expression_analyzer import FacialExpressionAnalyzer
+            self.dependencies['expression_analysis_available'] = True
+        except ImportError as e:
+            self.dependencies['expression_analysis_available'] = False
+            self.logger.warning(f"Expression analysis not available: {e}")
+            return
+        
+        try:
+            self.analyzers['expression'] = FacialExpressionAnalyzer(
+                model_name=self.analyzer_config.get('facial_expression_model'),
+                use_gpu=self.analyzer_config.get('use_gpu', True)
+            )
         except Exception as e:
-            self.logger.error(f"Failed to initialize analyzers: {str(e)}")
-            raise
+            self.logger.warning(f"Failed to initialize expression analyzer: {e}")
+    
+    def _initialize_audio_analyzers(self):
+        """Initialize Whisper and Gemini based analyzers"""
+        try:
+            import whisper
+            self.dependencies['whisper_available'] = True
+            try:
+                model_size = self.analyzer_config.get('whisper_model', 'base')
+                self.analyzers['whisper'] = whisper.load_model(model_size, device=self._get_whisper_device())
+                self.whisper_models[model_size] = self.analyzers['whisper']
+            except Exception as e:
+                self.logger.warning(f"Failed to load Whisper model: {e}")
+        except ImportError:
+            self.dependencies['whisper_available'] = False
+            self.logger.warning("Whisper not available. Audio transcription will be disabled.")
+        
+        # moviepy itself is imported on first use by the audio/video processors
+        self.dependencies['moviepy_available'] = is_installed('moviepy')
+        
+        try:
+            from audio_analysis.content_analyzer.content import DEFAULT_CHUNK_TOKENS, ContentAnalyzer
+            from audio_analysis.disfluency_analyzer.disfluency import DisfluencyTagger
+            from audio_analysis.llm_client import create_llm_client
+            from audio_analysis.llm_runner import LLMRunner, RetryPolicy
+            from audio_analysis.rate_limiter import RateLimiter
+            from audio_analysis.sentences import ensure_sentence_tokenizer
+            self.dependencies['audio_analysis_available'] = True
+        except ImportError as e:
+            self.dependencies['audio_analysis_available'] = False
+            self.logger.warning(f"Audio analysis modules not available: {e}")
+            return
+        
+        # Preload the sentence tokenizer for transcript segmentation (installed NLTK data only, never downloaded)
+        self.dependencies['sentence_tokenizer_available'] = ensure_sentence_tokenizer()
+        if not self.dependencies['sentence_tokenizer_available']:
+            self.logger.warning("NLTK Punkt data not installed (python -m nltk.downloader punkt_tab); "
+                                "transcripts are split into sentences on punctuation.")
+        
+        # The mock and HTTP backends (local stand-in server) work without a Gemini key
+        llm_backend = self.analyzer_config.get('llm_backend', 'gemini')
+        gemini_api_key = self.analyzer_config.get('gemini_api_key')
+        if llm_backend == 'gemini' and not gemini_api_key:
+            self.logger.warning("GEMINI_API_KEY not found. Content and disfluency analysis will be disabled.")
+            return
+        
+        try:
+            # One client (pooled connections), rate limiter, concurrency cap and retry policy for both analyzers
+            llm_client = create_llm_client(
+                llm_backend, api_key=gemini_api_key,
+                base_url=self.analyzer_config.get('llm_base_url'),
+                mock_options=self.analyzer_config.get('mock_llm')
+            )
+            self.llm_runner = LLMRunner(
+                llm_client,
+                rate_limiter=RateLimiter(self.analyzer_config.get('gemini_requests_per_minute', 15)),
+                retry_policy=RetryPolicy(max_attempts=self.analyzer_config.get('llm_max_attempts', 5)),
+                max_concurrency=self.analyzer_config.get('llm_max_concurrency', 4),
+                default_deadline=self.analyzer_config.get('llm_request_deadline_seconds'),
+                structured_output=self.analyzer_config.get('llm_structured_output', True)
+            )
+            self.analyzers['content'] = ContentAnalyzer(
+                api_key=gemini_api_key, runner=self.llm_runner,
+                max_chunk_tokens=self.analyzer_config.get('content_chunk_tokens', DEFAULT_CHUNK_TOKENS),
+                chunk_overlap_tokens=self.analyzer_config.get('content_chunk_overlap_tokens', 0)
+            )
+            self.analyzers['disfluency'] = DisfluencyTagger(api_key=gemini_api_key, runner=self.llm_runner)
+            if llm_backend != 'gemini':
+                self.logger.info(f"Content and disfluency analysis use the '{llm_backend}' LLM backend")
+        except Exception as e:
+            self.logger.warning(f"Failed to initialize AI analyzers: {e}")
+    
+    def _initialize_evaluator(self):
+        """Initialize presentation evaluator"""
+        try:
+            from evaluation.evaluator import PresentationEvaluator
+            self.dependencies['evaluation_available'] = True
+            self.analyzers['evaluator'] = PresentationEvaluator()
+        except Exception as e:
+            self.dependencies['evaluation_available'] = False
+            self.logger.warning(f"Presentation evaluator not available: {e}")
+    
+    def get_whisper_model(self, model_size: Optional[str] = None):
+        """
+        Get a Whisper model by size, loading it on first use
+        
+        Args:
+            model_size: Whisper model size (None = configured default)
+            
+        Returns:
+            Whisper model or None if Whisper is not available
+        """
+        if model_size is None:
+            return self.analyzers.get('whisper')
+        if not self.dependencies.get('whisper_available'):
+            return None
+        
+        with self._whisper_lock:
+            if model_size not in self.whisper_models:
+                try:
+                    import whisper
+                    self.whisper_models[model_size] = whisper.load_model(model_size, device=self._get_whisper_device())
+                except Exception as e:
+                    self.logger.warning(f"Failed to load Whisper model '{model_size}': {e}")
+                    return self.analyzers.get('whisper')
+            return self.whisper_models[model_size]
+    
+    def _get_whisper_device(self) -> Optional[str]:
+        """Whisper device: its default (CUDA if available) unless the GPU is disabled"""
+        return None if self.analyzer_config.get('use_gpu', True) else 'cpu'
+    
+    def get_analyzer(self, name: str) -> Optional[Any]:
+        """Get an initialized analyzer by name"""
+        return self.analyzers.get(name)
+    
+    def get_analyzer_lock(self, name: str):
+        """
+        Get a context manager that serializes use of a stateful analyzer
+        
+        Stateless analyzers return a no-op context so they run concurrently.
+        """
+        return self._analyzer_locks.get(name) or contextlib.nullcontext()
+    
+    def is_analyzer_available(self, name: str) -> bool:
+        """Check whether an analyzer is initialized"""
+        return name in self.analyzers
+    
+    def get_analyzer_status(self) -> Dict[str, bool]:
+        """Get availability of every known analyzer"""
+        return {name: self.is_analyzer_available(name) for name in ANALYZER_NAMES}
+    
+    def get_dependency_status(self) -> Dict[str, bool]:
+        """Get availability of optional dependencies"""
+        return dict(self.dependencies)
+    
+    def get_available_analyzer_count(self) -> int:
+        """Get number of initialized analyzers"""
+        return sum(1 for name in ANALYZER_NAMES if self.is_analyzer_available(name))
+    
+    def get_total_analyzer_count(self) -> int:
+        """Get number of known analyzers"""
+        return len(ANALYZER_NAMES)
+    
+    def create_analysis_record(self, filename: str) -> AnalysisRecord:
+        """Create and store a new analysis record"""
+        record = AnalysisRecord(filename=filename)
+        with self._records_lock:
+            self.analysis_records[record.analysis_id] = record
+        return record
+    
+    def get_analysis_record(self, analysis_id: str) -> Optional[AnalysisRecord]:
+        """Get an analysis record by ID"""
+        with self._records_lock:
+            return self.analysis_records.get(analysis_id)
+    
+    def delete_analysis_record(self, analysis_id: str) -> bool:
+        """
+        Drop an analysis record together with its recorded landmarks
+        
+        Returns:
+            True if the record existed
+        """
+        with self._records_lock:
+            record = self.analysis_records.pop(analysis_id, None)
+        if self.landmark_store is not None:
+            self.landmark_store.delete(analysis_id)
+        return record is not None
+    
+    def list_analysis_records(self) -> List[AnalysisRecord]:
+        """Get all analysis records"""
+        with self._records_lock:
+            return list(self.analysis_records.values())
+    
+    def update_analysis_progress(self, analysis_id: str, progress: int):
+        """Update progress of an analysis"""
+        record = self.get_analysis_record(analysis_id)
+        if record:
+            record.update_progress(progress)
+    
+    def set_analysis_results(self, analysis_id: str, results: Dict[str, Any]):
+        """Store final results and mark the analysis as completed"""
+        record = self.get_analysis_record(analysis_id)
+        if record:
+            record.set_results(results)
+    
+    def set_analysis_error(self, analysis_id: str, error_message: str):
+        """Mark an analysis as failed"""
+        record = self.get_analysis_record(analysis_id)
+        if record:
+            record.update_status(AnalysisStatus.FAILED, error_message)
         
     def analyze_content(self, audio_path: str, transcript: str = None) -> AnalysisResult:
         """Analyze content quality from audio/transcript"""
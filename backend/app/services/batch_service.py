@@ -0,0 +1,361 @@
+"""
+Batch Analysis Service - Runs many video analyses on a shared worker pool
+"""
+import csv
+import io
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Dict, Any, List, Optional
+
+from ..models.analysis import AnalysisStatus
+from ..models.analysis_options import AnalysisOptions
+from ..models.batch import BatchItem, BatchRecord
+from ..models.rubric import RubricProfile, DEFAULT_RUBRIC
+from ..utils.exceptions import ValidationError
+from .video_analysis_service import VideoAnalysisService
+
+
+# Columns of the consolidated score export, in order
+EXPORT_FIELDS = [
+    'filename', 'status', 'overall_score', 'grade', 'top_strengths',
+    'improvement_areas', 'key_suggestions', 'analysis_id', 'content_hash', 'error_message'
+]
+
+EXPORT_FORMATS = ['csv', 'json']
+
+
+class BatchAnalysisService:
+    """
+    Service to analyze many videos at once
+
+    Videos of a batch are scheduled on a thread pool. All workers share the
+    analyzers loaded by the AnalyzerService (including the Gemini rate
+    limiter), so adding workers does not load additional models. Progress is
+    written to a JSON manifest after every item, keyed by content hash, so a
+    restarted batch skips the videos that already finished.
+    """
+
+    def __init__(self, video_analysis_service: VideoAnalysisService, max_workers: int = 2):
+        """
+        Initialize batch analysis service
+
+        Args:
+            video_analysis_service: Service used to analyze each video
+            max_workers: Number of videos analyzed concurrently
+        """
+        self.video_analysis_service = video_analysis_service
+        self.file_handler = video_analysis_service.file_handler
+        self.max_workers = max(1, max_workers)
+        self.batches: Dict[str, BatchRecord] = {}
+        self._running_batches = set()
+        self._batches_lock = threading.Lock()
+        self._manifest_lock = threading.Lock()
+
+    def create_batch(self, video_paths: List[str], options: AnalysisOptions,
+                     manifest_path: Optional[str] = None, batch_id: Optional[str] = None,
+                     owns_videos: bool = False, filenames: Optional[List[str]] = None) -> BatchRecord:
+        """
+        Create a batch, reusing finished items from an existing manifest
+
+        Args:
+            video_paths: Paths of the videos to analyze
+            options: Analysis options applied to every video
+            manifest_path: JSON manifest used to persist and resume the batch
+            batch_id: Batch ID (default: ID from the manifest or a new one)
+            owns_videos: Delete each video once it has been analyzed
+            filenames: Display names of the videos (default: file basenames)
+
+        Returns:
+            The registered batch record
+
+        Raises:
+            ValidationError: If no videos are given
+        """
+        if not video_paths:
+            raise ValidationError("No videos provided for batch analysis")
+
+        previous = None
+        if manifest_path and os.path.exists(manifest_path):
+            previous = self.load_manifest(manifest_path)
+        finished = {item.content_hash: item for item in previous.items if item.is_finished} if previous else {}
+
+        batch = BatchRecord(
+            batch_id=batch_id or (previous.batch_id if previous else str(uuid.uuid4())),
+            options=options.to_dict(),
+            manifest_path=manifest_path,
+            owns_videos=owns_videos
+        )
+
+        filenames = filenames or [os.path.basename(video_path) for video_path in video_paths]
+        for video_path, filename in zip(video_paths, filenames):
+            content_hash = self.file_handler.compute_file_hash(video_path)
+            if content_hash in finished:
+                item = finished.pop(content_hash)
+                item.video_path = video_path
+            else:
+                item = BatchItem(
+                    filename=filename,
+                    video_path=video_path,
+                    content_hash=content_hash
+                )
+            batch.items.append(item)
+
+        self.register_batch(batch)
+        self.save_manifest(batch)
+        return batch
+
+    def register_batch(self, batch: BatchRecord) -> None:
+        """Make a batch available for lookup by ID"""
+        with self._batches_lock:
+            self.batches[batch.batch_id] = batch
+
+    def get_batch(self, batch_id: str, manifest_path: Optional[str] = None) -> Optional[BatchRecord]:
+        """
+        Get a batch by ID
+
+        Args:
+            batch_id: Batch ID
+            manifest_path: Manifest to load the batch from if it is not registered
+                (e.g. after a restart)
+
+        Returns:
+            Batch record or None if not found
+        """
+        with self._batches_lock:
+            batch = self.batches.get(batch_id)
+        if batch is None and manifest_path and os.path.exists(manifest_path):
+            batch = self.load_manifest(manifest_path)
+            self.register_batch(batch)
+        return batch
+
+    def is_running(self, batch_id: str) -> bool:
+        """Whether a batch is currently being processed by this service"""
+        with self._batches_lock:
+            return batch_id in self._running_batches
+
+    def count_queued_items(self) -> int:
+        """Number of videos in running batches that wait for a worker"""
+        with self._batches_lock:
+            running = [self.batches[batch_id] for batch_id in self._running_batches if batch_id in self.batches]
+        return sum(
+            1 for batch in running for item in list(batch.items) if item.status == AnalysisStatus.PENDING
+        )
+
+    def run_batch(self, batch: BatchRecord) -> BatchRecord:
+        """
+        Analyze every unfinished item of a batch and wait for completion
+
+        Args:
+            batch: Batch to run
+
+        Returns:
+            The batch, with item results filled in
+        """
+        with self._batches_lock:
+            self._running_batches.add(batch.batch_id)
+        try:
+            return self._run_pending_items(batch)
+        finally:
+            with self._batches_lock:
+                self._running_batches.discard(batch.batch_id)
+
+    def _run_pending_items(self, batch: BatchRecord) -> BatchRecord:
+        options = AnalysisOptions.from_dict(batch.options)
+        pending = batch.get_pending_items()
+        for item in pending:
+            item.status = AnalysisStatus.PENDING
+            item.error_message = None
+
+        batch.update_status(AnalysisStatus.PROCESSING)
+        self.save_manifest(batch)
+        print(f"Batch {batch.batch_id}: {len(pending)} of {len(batch.items)} videos to analyze "
+              f"with {self.max_workers} worker(s)")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix=f"batch-{batch.batch_id[:8]}") as executor:
+            list(executor.map(partial(self._run_item, batch, options), pending))
+
+        all_finished = all(item.is_finished for item in batch.items)
+        batch.update_status(AnalysisStatus.COMPLETED if all_finished else AnalysisStatus.FAILED)
+        self.save_manifest(batch)
+        return batch
+
+    def submit_batch(self, batch: BatchRecord) -> None:
+        """Run a batch on a background thread"""
+        batch.update_status(AnalysisStatus.PROCESSING)
+        with self._batches_lock:
+            self._running_batches.add(batch.batch_id)
+        worker = threading.Thread(
+            target=self.run_batch,
+            args=(batch,),
+            name=f"batch-{batch.batch_id}",
+            daemon=True
+        )
+        worker.start()
+
+    def _run_item(self, batch: BatchRecord, options: AnalysisOptions, item: BatchItem) -> None:
+        """Analyze a single batch item and record its outcome in the manifest"""
+        item.status = AnalysisStatus.PROCESSING
+        self.save_manifest(batch)
+
+        try:
+            item.analysis_id = self.video_analysis_service.analyze_video_path(
+                item.video_path, options, filename=item.filename
+            )
+            results = self.video_analysis_service.get_analysis_results(item.analysis_id) or {}
+            item.presentation_summary = results.get('presentation_summary')
+            item.status = AnalysisStatus.COMPLETED
+            item.completed_at = datetime.now()
+            if batch.owns_videos:
+                self.file_handler.cleanup_files(item.video_path)
+        except Exception as e:
+            item.status = AnalysisStatus.FAILED
+            item.error_message = str(e)
+            print(f"Batch {batch.batch_id}: {item.filename} failed: {e}")
+
+        batch.updated_at = datetime.now()
+        self.save_manifest(batch)
+
+    def save_manifest(self, batch: BatchRecord) -> None:
+        """Atomically write the batch manifest, if the batch has one"""
+        if not batch.manifest_path:
+            return
+
+        with self._manifest_lock:
+            manifest_dir = os.path.dirname(os.path.abspath(batch.manifest_path))
+            os.makedirs(manifest_dir, exist_ok=True)
+            temp_path = f"{batch.manifest_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(batch.to_dict(), f, indent=2, default=str)
+            os.replace(temp_path, batch.manifest_path)
+
+    def load_manifest(self, manifest_path: str) -> BatchRecord:
+        """
+        Load a batch from its manifest
+
+        Items that were in progress when the manifest was written are reset
+        to pending so they run again.
+        """
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            batch = BatchRecord.from_dict(json.load(f), manifest_path=manifest_path)
+
+        for item in batch.items:
+            if item.status == AnalysisStatus.PROCESSING:
+                item.status = AnalysisStatus.PENDING
+        return batch
+
+    def rescore_batch(self, batch: BatchRecord, rubric: RubricProfile) -> Dict[str, Any]:
+        """
+        Re-score every completed item of a batch with a rubric profile
+
+        Only the evaluation runs, from each item's stored analysis results.
+        Each item's summary is kept under the profile name (and written to the
+        manifest) for export with that profile.
+
+        Args:
+            batch: Batch to re-score
+            rubric: Rubric profile to score with
+
+        Returns:
+            Profile name and the number of items re-scored and unavailable
+            (not completed, or their analysis results are no longer in memory)
+
+        Raises:
+            ProcessingError: If the presentation evaluator is not available
+        """
+        rescored = 0
+        unavailable = []
+        for item in batch.items:
+            result = None
+            if item.is_finished and item.analysis_id:
+                result = self.video_analysis_service.rescore_analysis(item.analysis_id, rubric)
+            if result is None:
+                unavailable.append(item.filename)
+                continue
+            item.rubric_summaries[rubric.name] = result['presentation_summary']
+            rescored += 1
+
+        batch.updated_at = datetime.now()
+        self.save_manifest(batch)
+        return {
+            'batch_id': batch.batch_id,
+            'profile': rubric.name,
+            'rubric': rubric.to_dict(),
+            'rescored_items': rescored,
+            'unavailable_items': unavailable
+        }
+
+    def get_item_summary(self, item: BatchItem, profile: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get an item's presentation_summary for a rubric profile (default: the pipeline's own)"""
+        if profile and profile in item.rubric_summaries:
+            return item.rubric_summaries[profile]
+        if not profile or profile == DEFAULT_RUBRIC:
+            return item.presentation_summary
+        return None
+
+    def get_export_rows(self, batch: BatchRecord, profile: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Flatten each item's presentation_summary into one export row"""
+        rows = []
+        for item in batch.items:
+            summary = self.get_item_summary(item, profile) or {}
+            rows.append({
+                'filename': item.filename,
+                'status': item.status.value,
+                'overall_score': summary.get('overall_score'),
+                'grade': summary.get('grade'),
+                'top_strengths': '; '.join(summary.get('top_strengths', [])),
+                'improvement_areas': '; '.join(summary.get('improvement_areas', [])),
+                'key_suggestions': '; '.join(summary.get('key_suggestions', [])),
+                'analysis_id': item.analysis_id,
+                'content_hash': item.content_hash,
+                'error_message': item.error_message
+            })
+        return rows
+
+    def export_results(self, batch: BatchRecord, export_format: str = 'csv',
+                       profile: Optional[str] = None) -> str:
+        """
+        Export the consolidated scores of a batch
+
+        Args:
+            batch: Batch to export
+            export_format: 'csv' or 'json'
+            profile: Rubric profile whose scores are exported (default: the
+                pipeline's own evaluation); items not re-scored with it have no score
+
+        Returns:
+            Exported document as a string
+
+        Raises:
+            ValidationError: If the format is not supported
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                f"Unsupported export format: {export_format}. "
+                f"Supported formats: {', '.join(EXPORT_FORMATS)}"
+            )
+
+        if export_format == 'json':
+            results = []
+            for item in batch.items:
+                data = item.to_dict()
+                data['presentation_summary'] = self.get_item_summary(item, profile)
+                results.append(data)
+            return json.dumps({
+                'batch_id': batch.batch_id,
+                'status': batch.status.value,
+                'options': batch.options,
+                'profile': profile or DEFAULT_RUBRIC,
+                'results': results
+            }, indent=2, default=str)
+
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(self.get_export_rows(batch, profile))
+        return output.getvalue()
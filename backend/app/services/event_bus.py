@@ -0,0 +1,125 @@
+"""
+Analysis Event Bus - In-process publish/subscribe for analysis progress events
+"""
+import json
+import queue
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+
+# Events after which no further events are published for an analysis
+TERMINAL_EVENTS = ('complete', 'error')
+
+
+@dataclass
+class AnalysisEvent:
+    """Single progress event published for an analysis"""
+    event: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    @property
+    def is_terminal(self) -> bool:
+        """Whether this event ends the event stream"""
+        return self.event in TERMINAL_EVENTS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation"""
+        return {
+            'event': self.event,
+            'data': self.data,
+            'timestamp': self.timestamp.isoformat()
+        }
+
+    def to_sse(self) -> str:
+        """Format the event as a Server-Sent Events message"""
+        payload = dict(self.data)
+        payload['timestamp'] = self.timestamp.isoformat()
+        return f"event: {self.event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+class AnalysisEventBus:
+    """
+    Thread-safe pub/sub for analysis events
+
+    Analyses run on worker threads and publish events; each subscriber
+    (e.g. an SSE connection) receives them through its own queue.
+    """
+
+    def __init__(self, max_queue_size: int = 1000):
+        """
+        Initialize event bus
+
+        Args:
+            max_queue_size: Maximum number of undelivered events per subscriber
+        """
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, analysis_id: str) -> queue.Queue:
+        """
+        Subscribe to events of an analysis
+
+        Args:
+            analysis_id: Analysis ID
+
+        Returns:
+            Queue receiving AnalysisEvent objects
+        """
+        subscriber = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(analysis_id, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, analysis_id: str, subscriber: queue.Queue) -> None:
+        """
+        Remove a subscriber queue
+
+        Args:
+            analysis_id: Analysis ID
+            subscriber: Queue returned by subscribe()
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(analysis_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(analysis_id, None)
+
+    def publish(self, analysis_id: str, event: str, data: Optional[Dict[str, Any]] = None) -> AnalysisEvent:
+        """
+        Publish an event to all subscribers of an analysis
+
+        Args:
+            analysis_id: Analysis ID
+            event: Event type (e.g. 'progress', 'step_start', 'complete')
+            data: Event payload
+
+        Returns:
+            The published event
+        """
+        analysis_event = AnalysisEvent(event=event, data=data or {})
+
+        with self._lock:
+            subscribers = list(self._subscribers.get(analysis_id, []))
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(analysis_event)
+            except queue.Full:
+                # Slow consumer: drop the oldest event so terminal events still get through
+                try:
+                    subscriber.get_nowait()
+                    subscriber.put_nowait(analysis_event)
+                except (queue.Empty, queue.Full):
+                    pass
+
+        return analysis_event
+
+    def subscriber_count(self, analysis_id: str) -> int:
+        """Get number of active subscribers for an analysis"""
+        with self._lock:
+            return len(self._subscribers.get(analysis_id, []))
@@ -0,0 +1,148 @@
+"""
+Metrics Service - Operational metrics of the analysis service for /api/metrics
+"""
+from collections import Counter as CountOf
+from typing import Any, Dict, Optional
+
+from audio_analysis.request_observers import RequestObserver
+from ..models.analysis import AnalysisStatus
+from ..utils.metrics import CONTENT_TYPE, MetricsRegistry
+
+
+# Per-frame detector/model time
+FRAME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Whisper processing time divided by audio duration (below 1 = faster than real time)
+REALTIME_FACTOR_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0, 8.0)
+
+
+class MetricsService(RequestObserver):
+    """
+    Collects counters and histograms of the analysis pipeline
+
+    Pipeline events (steps, frames, transcriptions, Gemini requests) are
+    recorded as they happen; job and store gauges are read from the tracked
+    services whenever the metrics are rendered.
+    """
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        registry = self.registry
+        self.analyzer_service = None
+        self.batch_service = None
+
+        self.analyses = registry.counter(
+            'auto_ppt_analyses_total', 'Finished analyses by outcome', ['status'])
+        self.analysis_duration = registry.histogram(
+            'auto_ppt_analysis_duration_seconds', 'Wall time of whole analyses')
+        self.step_duration = registry.histogram(
+            'auto_ppt_step_duration_seconds', 'Wall time of each analyzer step', ['step'])
+        self.step_cpu = registry.counter(
+            'auto_ppt_step_cpu_seconds_total', 'Process CPU time spent in each analyzer step', ['step'])
+        self.steps = registry.counter(
+            'auto_ppt_steps_total', 'Finished analyzer steps by outcome', ['step', 'status'])
+        self.frame_inference = registry.histogram(
+            'auto_ppt_frame_inference_seconds', 'Time an analyzer spends on one sampled frame',
+            ['step'], buckets=FRAME_BUCKETS)
+        self.frames_inferred = registry.counter(
+            'auto_ppt_frames_inferred_total', 'Frames passed to a detector or model', ['step'])
+        self.frames_decoded = registry.counter(
+            'auto_ppt_frames_decoded_total', 'Frames decoded from videos (cache replays excluded)', ['step'])
+        self.step_fps = registry.gauge(
+            'auto_ppt_step_frames_per_second', 'Frames processed per second by the last run of each step',
+            ['step'])
+        self.llm_request_duration = registry.histogram(
+            'auto_ppt_gemini_request_seconds', 'Latency of Gemini API requests', ['analyzer', 'outcome'])
+        self.llm_retries = registry.counter(
+            'auto_ppt_gemini_retries_total', 'Retried Gemini API requests by reason', ['analyzer', 'reason'])
+        self.llm_retries_avoided = registry.counter(
+            'auto_ppt_gemini_retries_avoided_total', 'Malformed Gemini answers repaired locally instead of retried',
+            ['analyzer', 'repair'])
+        self.whisper_realtime_factor = registry.histogram(
+            'auto_ppt_whisper_realtime_factor', 'Whisper transcription time divided by audio duration',
+            ['model'], buckets=REALTIME_FACTOR_BUCKETS)
+        self.jobs = registry.gauge(
+            'auto_ppt_jobs', 'Analyses running (active) or waiting to run (queued)', ['state'])
+        self.store_records = registry.gauge(
+            'auto_ppt_analysis_store_records', 'Analysis records held in memory by status', ['status'])
+        self.models_ready = registry.gauge(
+            'auto_ppt_models_ready', '1 once the analyzer models are loaded')
+
+        registry.add_collector(self._collect_state)
+
+    @property
+    def content_type(self) -> str:
+        """Content type of the rendered metrics"""
+        return CONTENT_TYPE
+
+    def track_services(self, analyzer_service, batch_service=None) -> None:
+        """
+        Report job, store and readiness gauges from these services
+
+        Args:
+            analyzer_service: Service holding the analysis records
+            batch_service: Service whose running batches contribute queued jobs
+        """
+        self.analyzer_service = analyzer_service
+        self.batch_service = batch_service
+
+    def observe_analysis(self, status: AnalysisStatus, seconds: float) -> None:
+        """Record a finished analysis"""
+        self.analyses.inc(status=status.value)
+        self.analysis_duration.observe(seconds)
+
+    def observe_step(self, step: str, status: str, profile: Dict[str, Any]) -> None:
+        """
+        Record a finished pipeline step
+
+        Args:
+            step: Step key (e.g. 'head_pitch')
+            status: Step status value
+            profile: Stage profile from profile_stage()
+        """
+        self.steps.inc(step=step, status=status)
+        self.step_duration.observe(profile['wall_seconds'], step=step)
+        self.step_cpu.inc(max(0.0, profile['cpu_seconds']), step=step)
+        if profile['frames_inferred']:
+            self.frames_inferred.inc(profile['frames_inferred'], step=step)
+            self.frames_decoded.inc(profile['frames_decoded'], step=step)
+            if profile['wall_seconds'] > 0:
+                self.step_fps.set(profile['frames_inferred'] / profile['wall_seconds'], step=step)
+
+    def observe_frame(self, step: str, seconds: float) -> None:
+        """Record the time an analyzer spent on one frame"""
+        self.frame_inference.observe(seconds, step=step)
+
+    def observe_transcription(self, model: str, seconds: float, audio_seconds: Optional[float]) -> None:
+        """Record a Whisper transcription (ignored if the audio duration is unknown)"""
+        if audio_seconds:
+            self.whisper_realtime_factor.observe(seconds / audio_seconds, model=model)
+
+    def on_request(self, analyzer: str, seconds: float, outcome: str) -> None:
+        self.llm_request_duration.observe(seconds, analyzer=analyzer, outcome=outcome)
+
+    def on_retry(self, analyzer: str, reason: str) -> None:
+        self.llm_retries.inc(analyzer=analyzer, reason=reason)
+    
+    def on_repair(self, analyzer: str, repair: str) -> None:
+        self.llm_retries_avoided.inc(analyzer=analyzer, repair=repair)
+
+    def _collect_state(self) -> None:
+        """Update the gauges that mirror current service state"""
+        if self.analyzer_service is None:
+            return
+
+        statuses = CountOf(record.status for record in self.analyzer_service.list_analysis_records())
+        for status in AnalysisStatus:
+            self.store_records.set(statuses[status], status=status.value)
+
+        queued = statuses[AnalysisStatus.PENDING]
+        if self.batch_service is not None:
+            queued += self.batch_service.count_queued_items()
+        self.jobs.set(statuses[AnalysisStatus.PROCESSING], state='active')
+        self.jobs.set(queued, state='queued')
+        self.models_ready.set(1 if self.analyzer_service.is_ready() else 0)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format"""
+        return self.registry.render()
@@ -1,32 +1,54 @@
 """
 Video Analysis Service - Handles comprehensive video analysis workflow
 """
+import copy
+import math
 import os
+import queue
 import tempfile
-from typing import Dict, Any, Optional, Tuple
+import threading
+import time
+from functools import partial
+from typing import Dict, Any, Optional, Tuple, Iterator, List
 from datetime import datetime
 import traceback
 
-from ..models.analysis import AnalysisRecord, AnalysisStatus
+from audio_analysis.transcript import TranscriptDocument
+from ..models.analysis import AnalysisRecord, AnalysisStatus, StepStatus
+from ..models.analysis_options import AnalysisOptions, MOTION_ANALYZERS
+from ..models.rubric import RubricProfile, RUBRIC_PROFILES, DEFAULT_RUBRIC
 from ..models.presentation import PresentationResult, MotionAnalysisResult, ExpressionAnalysisResult, AudioAnalysisResult, PresentationScore
 from ..utils.file_handler import FileHandler
 from ..utils.audio_processor import AudioProcessor
 from ..utils.video_processor import VideoProcessor
 from ..utils.exceptions import ProcessingError, ValidationError
+from ..utils.profiling import profile_stage
 from .analyzer_service import AnalyzerService
+from .event_bus import AnalysisEvent, AnalysisEventBus
+from .metrics_service import MetricsService
 
 
 class VideoAnalysisService:
     """Service for coordinating comprehensive video analysis workflow"""
     
-    def __init__(self, analyzer_service: AnalyzerService):
+    # Video motion analysis steps (7 steps)
+    MOTION_ANALYZERS = MOTION_ANALYZERS
+    
+    TOTAL_STEPS = 11
+    
+    def __init__(self, analyzer_service: AnalyzerService, event_bus: Optional[AnalysisEventBus] = None,
+                 metrics: Optional[MetricsService] = None):
         """
         Initialize video analysis service
         
         Args:
             analyzer_service: Initialized analyzer service instance
+            event_bus: Event bus for progress events (created if not given)
+            metrics: Metrics recorded for every analysis (created if not given)
         """
         self.analyzer_service = analyzer_service
+        self.event_bus = event_bus or AnalysisEventBus()
+        self.metrics = metrics or MetricsService()
         self.file_handler = FileHandler()
         self.video_processor = VideoProcessor()
         
@@ -34,13 +56,15 @@ class VideoAnalysisService:
         whisper_model = self.analyzer_service.get_analyzer('whisper')
         self.audio_processor = AudioProcessor(whisper_model)
     
-    def analyze_video_file(self, video_file, target_fps: float = 5.0) -> str:
+    def analyze_video_file(self, video_file, target_fps: float = 5.0,
+                           options: Optional[AnalysisOptions] = None) -> str:
         """
         Perform comprehensive video analysis
         
         Args:
             video_file: Uploaded video file object
             target_fps: Target frames per second for analysis
+            options: Analysis options (analyzer selection); overrides target_fps
             
         Returns:
             Analysis ID for tracking progress
@@ -49,192 +73,530 @@ class VideoAnalysisService:
             ValidationError: If file validation fails
             ProcessingError: If processing fails
         """
+        options = options or AnalysisOptions(target_fps=target_fps)
+        analysis_id, video_path, audio_path = self._prepare_analysis(video_file, options)
+        self._run_analysis(analysis_id, video_path, audio_path, options, raise_errors=True)
+        return analysis_id
+    
+    def submit_video_file(self, video_file, target_fps: float = 5.0,
+                          options: Optional[AnalysisOptions] = None) -> str:
+        """
+        Start comprehensive video analysis on a background worker thread
+        
+        Args:
+            video_file: Uploaded video file object
+            target_fps: Target frames per second for analysis
+            options: Analysis options (analyzer selection); overrides target_fps
+            
+        Returns:
+            Analysis ID for tracking progress
+            
+        Raises:
+            ValidationError: If file validation fails
+        """
+        options = options or AnalysisOptions(target_fps=target_fps)
+        analysis_id, video_path, audio_path = self._prepare_analysis(video_file, options)
+        
+        worker = threading.Thread(
+            target=self._run_analysis,
+            args=(analysis_id, video_path, audio_path, options),
+            name=f"analysis-{analysis_id}",
+            daemon=True
+        )
+        worker.start()
+        
+        return analysis_id
+    
+    def analyze_video_path(self, video_path: str, options: Optional[AnalysisOptions] = None,
+                           filename: Optional[str] = None) -> str:
+        """
+        Analyze a video that is already on disk (used by batch runs)
+        
+        The video file is left in place; only the extracted audio is removed.
+        
+        Args:
+            video_path: Path to the video file
+            options: Analysis options
+            filename: Display name for the analysis record (default: file basename)
+            
+        Returns:
+            Analysis ID
+            
+        Raises:
+            ValidationError: If the file is missing or not a supported video
+            ProcessingError: If processing fails
+        """
+        options = options or AnalysisOptions()
+        self.file_handler.validator.validate_file_path(video_path)
+        
+        analysis_record = self.analyzer_service.create_analysis_record(filename or os.path.basename(video_path))
+        analysis_id = analysis_record.analysis_id
+        analysis_record.add_metadata('options', options.to_dict())
+        analysis_record.add_metadata('file_info', self.file_handler.get_file_info(video_path))
+        
+        audio_path = self.file_handler.create_audio_path()
+        self._run_analysis(analysis_id, video_path, audio_path, options,
+                           raise_errors=True, keep_video=True)
+        return analysis_id
+    
+    def _prepare_analysis(self, video_file, options: AnalysisOptions) -> Tuple[str, str, str]:
+        """
+        Create the analysis record and save the uploaded file
+        
+        Args:
+            video_file: Uploaded video file object
+            options: Analysis options
+            
+        Returns:
+            Tuple of (analysis_id, video_path, audio_path)
+        """
         # Create analysis record
         analysis_record = self.analyzer_service.create_analysis_record(video_file.filename)
         analysis_id = analysis_record.analysis_id
+        analysis_record.add_metadata('options', options.to_dict())
         
         try:
             # Save uploaded file and prepare paths
             video_path, audio_path = self.file_handler.save_uploaded_video(video_file)
-            
-            # Add file metadata
-            file_info = self.file_handler.get_file_info(video_path)
-            analysis_record.add_metadata('file_info', file_info)
-            
+        except ValidationError as e:
+            self.analyzer_service.set_analysis_error(analysis_id, str(e))
+            raise
+        
+        # Add file metadata
+        file_info = self.file_handler.get_file_info(video_path)
+        analysis_record.add_metadata('file_info', file_info)
+        
+        return analysis_id, video_path, audio_path
+    
+    def _run_analysis(self, analysis_id: str, video_path: str, audio_path: str,
+                      options: AnalysisOptions, raise_errors: bool = False,
+                      keep_video: bool = False) -> None:
+        """
+        Run the analysis pipeline for a prepared analysis and publish the outcome
+        
+        Args:
+            analysis_id: Analysis ID
+            video_path: Path to saved video file
+            audio_path: Path for audio extraction
+            options: Analysis options
+            raise_errors: Re-raise failures as ProcessingError instead of only recording them
+            keep_video: Leave the video file in place after the analysis
+        """
+        started_at = time.perf_counter()
+        try:
             # Update status to processing
-            analysis_record.update_status(AnalysisStatus.PROCESSING)
+            record = self.analyzer_service.get_analysis_record(analysis_id)
+            record.update_status(AnalysisStatus.PROCESSING)
+            
+            # Analyses submitted during the startup warm-up wait for the models
+            self.analyzer_service.wait_until_ready()
             
             # Perform analysis
             results = self._perform_comprehensive_analysis(
-                analysis_id, video_path, audio_path, target_fps
+                analysis_id, video_path, audio_path, options
             )
             
             # Set final results
             self.analyzer_service.set_analysis_results(analysis_id, results)
-            
-            return analysis_id
+            self.metrics.observe_analysis(AnalysisStatus.COMPLETED, time.perf_counter() - started_at)
+            self.event_bus.publish(analysis_id, 'complete', {
+                'analysisId': analysis_id,
+                'status': AnalysisStatus.COMPLETED.value,
+                'presentation_summary': results.get('presentation_summary')
+            })
             
         except Exception as e:
             error_msg = f"Analysis failed: {str(e)}"
+            print(error_msg)
+            print(traceback.format_exc())
             self.analyzer_service.set_analysis_error(analysis_id, error_msg)
-            raise ProcessingError(error_msg) from e
+            self.metrics.observe_analysis(AnalysisStatus.FAILED, time.perf_counter() - started_at)
+            self.event_bus.publish(analysis_id, 'error', {
+                'analysisId': analysis_id,
+                'status': AnalysisStatus.FAILED.value,
+                'error': error_msg
+            })
+            if raise_errors:
+                raise ProcessingError(error_msg) from e
         
         finally:
             # Clean up temporary files
-            if 'video_path' in locals() and 'audio_path' in locals():
+            if keep_video:
+                self.file_handler.cleanup_files(audio_path)
+            else:
                 self.file_handler.cleanup_files(video_path, audio_path)
     
     def _perform_comprehensive_analysis(self, analysis_id: str, video_path: str, 
-                                       audio_path: str, target_fps: float) -> Dict[str, Any]:
+                                       audio_path: str, options: AnalysisOptions) -> Dict[str, Any]:
         """
         Perform the actual comprehensive analysis
         
+        Steps for analyzers not selected in the options are skipped entirely,
+        including their video decoding and model inference. The options'
+        preset sets sampling, resolution, model sizes and LLM usage for every step.
+        
         Args:
             analysis_id: Analysis ID for progress tracking
             video_path: Path to video file
             audio_path: Path for audio extraction
-            target_fps: Target FPS for analysis
+            options: Analysis options
             
         Returns:
             Dictionary with all analysis results
         """
         results = {}
-        total_steps = 11
-        current_step = 0
-        transcript = None
-        
-        # Video motion analysis steps (7 steps)
-        motion_analyzers = [
-            ('body_rotation', 'Body Rotation Analysis'),
-            ('head_motion', 'Head Motion Analysis'),
-            ('head_rotation', 'Head Rotation Analysis'),
-            ('head_pitch', 'Head Pitch Analysis'),
-            ('hand_motion', 'Hand Motion Analysis'),
-            ('gaze_motion', 'Gaze Motion Analysis'),
-            ('body_tilt', 'Body Tilt Analysis')
+        landmark_store = self.analyzer_service.landmark_store
+        context = {'transcript': None, 'transcript_document': None, 'category_evaluations': {}, 'skipped_steps': [],
+                   'options': options,
+                   'landmark_recorder': landmark_store.create_recorder(analysis_id) if landmark_store else None}
+        
+        steps = [
+            (name, step_name, partial(self._run_motion_analyzer, name, step_name, video_path, options, context))
+            for name, step_name in self.MOTION_ANALYZERS
+        ]
+        steps += [
+            # Facial expression analysis (1 step)
+            ('expression', 'Facial Expression Analysis',
+             partial(self._run_expression_analysis, video_path, options)),
+            # Audio transcription and content analysis (1 step)
+            ('content', 'Content Analysis',
+             partial(self._run_content_analysis, analysis_id, video_path, audio_path, context)),
+            # Disfluency analysis (1 step)
+            ('disfluency', 'Disfluency Analysis',
+             partial(self._run_disfluency_analysis, context)),
+            # Comprehensive evaluation (1 step)
+            ('evaluation', 'Presentation Evaluation',
+             partial(self._run_evaluation, results, context))
         ]
         
-        for analyzer_name, step_name in motion_analyzers:
-            try:
-                self._update_progress(analysis_id, current_step, total_steps)
-                
-                if self.analyzer_service.is_analyzer_available(analyzer_name):
-                    analyzer = self.analyzer_service.get_analyzer(analyzer_name)
-                    stats = analyzer.process_video(video_path, target_fps=target_fps)
-                    results[analyzer_name] = self._convert_motion_stats_to_dict(stats)
-                else:
-                    results[analyzer_name] = {'error': f'{step_name} not available'}
-                
-                current_step += 1
-                
-            except Exception as e:
-                print(f"{step_name} failed: {e}")
-                results[analyzer_name] = {'error': str(e)}
-                current_step += 1
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        record.init_steps([step_key for step_key, _, _ in steps])
+        record.add_metadata('profile', {})
         
-        # Facial expression analysis (1 step)
-        try:
-            self._update_progress(analysis_id, current_step, total_steps)
-            
-            if self.analyzer_service.is_analyzer_available('expression'):
-                analyzer = self.analyzer_service.get_analyzer('expression')
-                expression_stats = analyzer.process_video(video_path, target_fps=target_fps)
-                results['expression'] = {
-                    'emotion_scores': expression_stats.emotion_scores,
-                    'average_scores': expression_stats.average_scores
-                }
-            else:
-                results['expression'] = {'error': 'Expression analyzer not available'}
+        # The evaluation step always runs
+        for step_key, _, _ in steps:
+            if step_key != 'evaluation' and not options.runs_step(step_key):
+                context['skipped_steps'].append(step_key)
+                record.skip_step(step_key)
+        steps = [step for step in steps if step[0] not in context['skipped_steps']]
+        total_steps = len(steps)
+        
+        for current_step, (step_key, step_name, step_func) in enumerate(steps):
+            results[step_key] = self._run_step(
+                analysis_id, step_key, step_name, current_step, total_steps, step_func
+            )
             
-            current_step += 1
+            if step_key == 'content' and context['transcript']:
+                results['transcript'] = context['transcript']
             
-        except Exception as e:
-            print(f"Expression analysis failed: {e}")
-            results['expression'] = {'error': str(e)}
-            current_step += 1
-        
-        # Audio transcription and content analysis (1 step)
-        try:
-            self._update_progress(analysis_id, current_step, total_steps)
-            
-            if self.analyzer_service.is_analyzer_available('whisper'):
-                # Extract audio and transcribe
-                if self.audio_processor.extract_audio_from_video(video_path, audio_path):
-                    transcript = self.audio_processor.transcribe_audio(audio_path)
-                    
-                    if transcript and self.analyzer_service.is_analyzer_available('content'):
-                        content_analyzer = self.analyzer_service.get_analyzer('content')
-                        content_analysis = content_analyzer.analyze_content(transcript)
-                        results['content'] = content_analysis
-                        results['transcript'] = transcript
-                    else:
-                        results['content'] = {'error': 'Content analysis unavailable'}
-                else:
-                    results['content'] = {'error': 'Audio extraction failed'}
+            if step_key == 'evaluation':
+                summary = None
+                if 'error' not in results['evaluation']:
+                    summary = self._build_presentation_summary(results['evaluation'])
+                if summary is not None:
+                    results['presentation_summary'] = summary
+                    record.add_partial_result('presentation_summary', summary)
             else:
-                results['content'] = {'error': 'Whisper model not available'}
-            
-            current_step += 1
+                self._update_partial_evaluation(analysis_id, results, context)
+        
+        recorder = context['landmark_recorder']
+        if recorder is not None and recorder.sources:
+            record.add_metadata('landmark_sources', recorder.sources)
+        
+        # Final progress update
+        self._update_progress(analysis_id, total_steps, total_steps)
+        
+        return results
+    
+    def _run_step(self, analysis_id: str, step_key: str, step_name: str,
+                  current_step: int, total_steps: int, step_func) -> Dict[str, Any]:
+        """
+        Run a single pipeline step, publishing step events and its resource profile
+        
+        Args:
+            analysis_id: Analysis ID
+            step_key: Result key of the step (e.g. 'head_pitch')
+            step_name: Human readable step name
+            current_step: Zero-based index of the step
+            total_steps: Total number of steps
+            step_func: Callable returning the step result dictionary
             
-        except Exception as e:
-            print(f"Content analysis failed: {e}")
-            results['content'] = {'error': str(e)}
-            current_step += 1
+        Returns:
+            Step result, or a dictionary with an 'error' key on failure
+        """
+        self._update_progress(analysis_id, current_step, total_steps)
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        record.start_step(step_key)
+        self.event_bus.publish(analysis_id, 'step_start', {
+            'step': step_key,
+            'name': step_name,
+            'index': current_step,
+            'total_steps': total_steps
+        })
         
-        # Disfluency analysis (1 step)
+        with profile_stage(on_frame=partial(self.metrics.observe_frame, step_key)) as stage_profile:
+            try:
+                result = step_func()
+            except Exception as e:
+                print(f"{step_name} failed: {e}")
+                result = {'error': str(e)}
+        
+        # Publish to the record right away so results are readable before the run finishes
+        status = StepStatus.FAILED if 'error' in result else StepStatus.COMPLETED
+        record.publish_step_result(step_key, result, status)
+        
+        # Replace (not mutate) the profile so concurrent readers never see it change
+        stage_profile.update({'name': step_name, 'status': status.value})
+        profile = dict(record.metadata.get('profile', {}))
+        profile[step_key] = stage_profile
+        record.add_metadata('profile', profile)
+        self.metrics.observe_step(step_key, status.value, stage_profile)
+        
+        self.event_bus.publish(analysis_id, 'step_finish', {
+            'step': step_key,
+            'name': step_name,
+            'index': current_step,
+            'total_steps': total_steps,
+            'status': status.value,
+            'duration_seconds': round(stage_profile['wall_seconds'], 3),
+            'profile': stage_profile,
+            'result': result
+        })
+        
+        return result
+    
+    def _run_motion_analyzer(self, analyzer_name: str, step_name: str, video_path: str,
+                             options: AnalysisOptions, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one motion analyzer over the video
+        
+        The first analyzer using each detector (Pose, Face Mesh, Hands) records
+        the detected landmarks, so the statistics can be recomputed later.
+        """
+        if not self.analyzer_service.is_analyzer_available(analyzer_name):
+            return {'error': f'{step_name} not available'}
+        
+        analyzer = self.analyzer_service.get_analyzer(analyzer_name)
+        recorder = context['landmark_recorder']
+        landmark_source = getattr(analyzer, 'LANDMARK_SOURCE', None)
+        kwargs = {}
+        if recorder is not None and landmark_source:
+            kwargs['landmark_writer'] = recorder.create_writer(landmark_source)
+        
+        with self.analyzer_service.get_analyzer_lock(analyzer_name):
+            stats = analyzer.process_video(
+                video_path,
+                target_fps=options.target_fps,
+                max_resolution=options.preset.max_resolution,
+                model_complexity=options.preset.model_complexity,
+                min_fps=options.min_fps,
+                **kwargs
+            )
+        
+        if kwargs.get('landmark_writer') is not None:
+            try:
+                recorder.save(kwargs['landmark_writer'])
+            except OSError as e:
+                print(f"Could not save {landmark_source} landmarks: {e}")
+        if stats is None:
+            return {'error': f'{step_name} produced no detections'}
+        return self._convert_motion_stats_to_dict(stats)
+    
+    def _run_expression_analysis(self, video_path: str, options: AnalysisOptions) -> Dict[str, Any]:
+        """Run facial expression analysis over the video"""
+        if not self.analyzer_service.is_analyzer_available('expression'):
+            return {'error': 'Expression analyzer not available'}
+        
+        analyzer = self.analyzer_service.get_analyzer('expression')
+        expression_stats = analyzer.process_video(
+            video_path,
+            target_fps=options.target_fps,
+            max_resolution=options.preset.max_resolution,
+            batch_size=options.preset.expression_batch_size
+        )
+        return {
+            'emotion_scores': expression_stats.emotion_scores,
+            'average_scores': expression_stats.average_scores
+        }
+    
+    def _run_content_analysis(self, analysis_id: str, video_path: str, audio_path: str,
+                              context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract and transcribe audio, then analyze transcript content
+        
+        The transcript is published as soon as it is ready, and content scores
+        as each transcript chunk is analyzed (see _publish_content_update).
+        """
+        preset = context['options'].preset
+        whisper_model = self.analyzer_service.get_whisper_model(preset.whisper_model)
+        if whisper_model is None:
+            return {'error': 'Whisper model not available'}
+        
+        # Extract audio and transcribe
+        if not self.audio_processor.extract_audio_from_video(video_path, audio_path):
+            return {'error': 'Audio extraction failed'}
+        
+        # Concurrent analyses and batch workers share the Whisper models
+        with self.analyzer_service.get_analyzer_lock('whisper'):
+            started_at = time.perf_counter()
+            transcription = self.audio_processor.transcribe_audio_result(audio_path, whisper_model)
+        self._observe_transcription(preset.whisper_model, time.perf_counter() - started_at, audio_path)
+        
+        # Segmented once here; the content and disfluency analyzers share the document
+        document = TranscriptDocument.from_whisper(transcription)
+        transcript = document.text
+        context['transcript'] = transcript
+        context['transcript_document'] = document
+        if transcript:
+            self.analyzer_service.get_analysis_record(analysis_id).add_partial_result('transcript', transcript)
+        
+        if transcript and not preset.use_llm:
+            # Transcript feeds speech pace scoring; LLM content analysis is disabled by the preset
+            return {'llm_analysis': False, 'word_count': len(transcript.split())}
+        
+        if transcript and self.analyzer_service.is_analyzer_available('content'):
+            content_analyzer = self.analyzer_service.get_analyzer('content')
+            analysis = {}
+            for update in content_analyzer.stream_content_analysis(document):
+                analysis = update['analysis']
+                self._publish_content_update(analysis_id, update)
+            return analysis
+        return {'error': 'Content analysis unavailable'}
+    
+    def _publish_content_update(self, analysis_id: str, update: Dict[str, Any]) -> None:
+        """
+        Publish the running content analysis after a transcript chunk finished
+        
+        The combined analysis so far becomes the record's 'content' partial
+        result (marked partial until the step result replaces it) and a
+        'content_update' event carries the chunk's and the running scores.
+        """
+        analysis = update['analysis']
+        progress = {key: update[key] for key in ('chunks_completed', 'chunks_failed', 'chunks_total')}
+        if analysis:
+            record = self.analyzer_service.get_analysis_record(analysis_id)
+            record.add_partial_result('content', {**analysis, 'partial': True, **progress})
+        
+        presentation_analysis = analysis.get('presentationAnalysis', {})
+        self.event_bus.publish(analysis_id, 'content_update', {
+            'chunk_index': update['chunk_index'],
+            'chunk_scores': update['chunk_scores'],
+            'error': update.get('error'),
+            **progress,
+            'scores': {dimension: data['score'] for dimension, data
+                       in presentation_analysis.get('contentQualityMetrics', {}).items()},
+            'overall_score': presentation_analysis.get('overallScore')
+        })
+    
+    def _observe_transcription(self, model_size: Optional[str], seconds: float, audio_path: str) -> None:
+        """Record the Whisper realtime factor of a transcription"""
         try:
-            self._update_progress(analysis_id, current_step, total_steps)
-            
-            if transcript and self.analyzer_service.is_analyzer_available('disfluency'):
-                disfluency_analyzer = self.analyzer_service.get_analyzer('disfluency')
-                disfluency_analysis = disfluency_analyzer.analyze_disfluency(transcript)
-                results['disfluency'] = disfluency_analysis
-            else:
-                results['disfluency'] = {'error': 'Disfluency analysis unavailable'}
-            
-            current_step += 1
-            
-        except Exception as e:
-            print(f"Disfluency analysis failed: {e}")
-            results['disfluency'] = {'error': str(e)}
-            current_step += 1
+            audio_seconds = self.audio_processor.get_audio_duration(audio_path)
+        except ProcessingError:
+            audio_seconds = None
+        model = model_size or self.analyzer_service.analyzer_config.get('whisper_model', 'base')
+        self.metrics.observe_transcription(model, seconds, audio_seconds)
+    
+    def _run_disfluency_analysis(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze disfluencies in the transcript"""
+        transcript = context['transcript']
+        if not transcript or not self.analyzer_service.is_analyzer_available('disfluency'):
+            return {'error': 'Disfluency analysis unavailable'}
+        
+        disfluency_analyzer = self.analyzer_service.get_analyzer('disfluency')
+        return disfluency_analyzer.analyze_disfluency(context['transcript_document'] or transcript)
+    
+    def _run_evaluation(self, results: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Score the presentation from the collected results"""
+        if not self.analyzer_service.is_analyzer_available('evaluator'):
+            return {'error': 'Presentation evaluator not available'}
+        
+        evaluator = self.analyzer_service.get_analyzer('evaluator')
+        return evaluator.evaluate_presentation(
+            results, context['transcript'],
+            categories=self._get_relevant_categories(evaluator, context)
+        )
+    
+    def _get_relevant_categories(self, evaluator, context: Dict[str, Any]) -> List[str]:
+        """Get evaluation categories that have at least one input analyzer in this run"""
+        skipped = set(context['skipped_steps'])
+        selected = [
+            step for inputs in evaluator.CATEGORY_INPUTS.values()
+            for step in inputs if step not in skipped
+        ]
+        categories = evaluator.get_relevant_categories(selected)
+        if not context['options'].preset.use_llm:
+            # Content quality is only scored from the LLM analysis
+            categories = [category for category in categories if category != 'content_quality']
+        return categories
+    
+    def _update_partial_evaluation(self, analysis_id: str, results: Dict[str, Any],
+                                   context: Dict[str, Any]) -> None:
+        """
+        Re-score categories whose inputs have all finished and publish a provisional evaluation
+        
+        Only categories that became ready since the last call are evaluated, so
+        each category is scored once as its inputs arrive.
+        """
+        if not self.analyzer_service.is_analyzer_available('evaluator'):
+            return
+        
+        evaluator = self.analyzer_service.get_analyzer('evaluator')
+        category_evaluations = context['category_evaluations']
+        relevant_categories = self._get_relevant_categories(evaluator, context)
+        finished_steps = list(results.keys()) + context['skipped_steps']
+        ready_categories = [
+            category for category in evaluator.get_ready_categories(finished_steps)
+            if category in relevant_categories
+            and evaluator.CATEGORY_NAMES[category] not in category_evaluations
+        ]
+        if not ready_categories:
+            return
         
-        # Comprehensive evaluation (1 step)
         try:
-            self._update_progress(analysis_id, current_step, total_steps)
-            
-            if self.analyzer_service.is_analyzer_available('evaluator'):
-                evaluator = self.analyzer_service.get_analyzer('evaluator')
-                evaluation_results = evaluator.evaluate_presentation(results, transcript)
-                results['evaluation'] = evaluation_results
-                
-                # Add summary for quick access
-                results['presentation_summary'] = {
-                    'overall_score': evaluation_results['overall_evaluation']['overall_score'],
-                    'grade': evaluation_results['overall_evaluation']['grade'],
-                    'top_strengths': evaluation_results['summary']['strengths'],
-                    'improvement_areas': evaluation_results['summary']['areas_for_improvement'],
-                    'key_suggestions': evaluation_results['improvement_suggestions'][:3]
-                }
-            else:
-                results['evaluation'] = {'error': 'Presentation evaluator not available'}
-            
-            current_step += 1
+            for category in ready_categories:
+                category_eval = evaluator.evaluate_category(category, results, context['transcript'])
+                category_evaluations[category_eval['category']] = category_eval
             
+            evaluation = evaluator.build_evaluation(dict(category_evaluations))
+            evaluation['provisional'] = True
         except Exception as e:
-            print(f"Presentation evaluation failed: {e}")
-            results['evaluation'] = {'error': str(e)}
-            current_step += 1
+            print(f"Provisional evaluation failed: {e}")
+            return
         
-        # Final progress update
-        self._update_progress(analysis_id, total_steps, total_steps)
+        summary = self._build_presentation_summary(evaluation)
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        record.add_partial_result('evaluation', evaluation)
+        if summary is not None:
+            record.add_partial_result('presentation_summary', summary)
         
-        return results
+        self.event_bus.publish(analysis_id, 'evaluation_update', {
+            'provisional': True,
+            'evaluated_categories': list(category_evaluations.keys()),
+            'presentation_summary': summary
+        })
+    
+    def _build_presentation_summary(self, evaluation_results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build the quick-access summary of an evaluation (None if it has no overall score)"""
+        if evaluation_results['overall_evaluation']['overall_score'] is None:
+            return None
+        return {
+            'overall_score': evaluation_results['overall_evaluation']['overall_score'],
+            'grade': evaluation_results['overall_evaluation']['grade'],
+            'top_strengths': evaluation_results['summary']['strengths'],
+            'improvement_areas': evaluation_results['summary']['areas_for_improvement'],
+            'key_suggestions': evaluation_results['improvement_suggestions'][:3]
+        }
     
     def _update_progress(self, analysis_id: str, current_step: int, total_steps: int):
         """Update analysis progress"""
         progress = int((current_step / total_steps) * 100)
         self.analyzer_service.update_analysis_progress(analysis_id, progress)
+        self.event_bus.publish(analysis_id, 'progress', {
+            'progress': progress,
+            'current_step': current_step,
+            'total_steps': total_steps
+        })
     
     def _convert_motion_stats_to_dict(self, stats) -> Dict[str, Any]:
         """
@@ -284,6 +646,382 @@ class VideoAnalysisService:
         
         return result
     
+    def recompute_motion_statistics(self, analysis_id: str,
+                                    parameters: Optional[Dict[str, Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Recompute motion statistics and the evaluation from recorded landmarks
+        
+        Replays the landmarks recorded during the analysis through each motion
+        analyzer's measurement step with the given parameters; neither the
+        video nor the detectors are needed. The stored results are not changed.
+        
+        Args:
+            analysis_id: Analysis ID of a completed analysis
+            parameters: New parameter values by analyzer, e.g.
+                {'head_pitch': {'pitch_threshold': 8}}; analyzers without
+                parameters are recomputed with their current settings
+            
+        Returns:
+            Recomputed motion results, evaluation and effective parameters, or
+            None if the analysis is not found or not completed
+            
+        Raises:
+            ValidationError: If a parameter is invalid or no landmarks were recorded
+        """
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        if not record or record.status != AnalysisStatus.COMPLETED or not record.results:
+            return None
+        
+        parameters = parameters or {}
+        tuned_analyzers = self._get_tuned_analyzers(parameters)
+        
+        landmark_store = self.analyzer_service.landmark_store
+        sources = record.metadata.get('landmark_sources', [])
+        if landmark_store is None or not sources:
+            raise ValidationError("No landmarks were recorded for this analysis")
+        
+        started_at = time.perf_counter()
+        tracks = {}
+        results = dict(record.results)
+        recomputed = {}
+        for name, analyzer in tuned_analyzers.items():
+            if 'error' in results.get(name, {'error': None}) or analyzer.LANDMARK_SOURCE not in sources:
+                if name in parameters:
+                    raise ValidationError(f"No recorded landmarks for '{name}' in this analysis")
+                continue
+            
+            source = analyzer.LANDMARK_SOURCE
+            if source not in tracks:
+                tracks[source] = landmark_store.load_track(analysis_id, source)
+            if tracks[source] is None:
+                raise ValidationError(f"Recorded {source} landmarks are no longer available")
+            
+            stats = analyzer.recompute(tracks[source])
+            results[name] = (self._convert_motion_stats_to_dict(stats) if stats is not None
+                             else {'error': f'{name} produced no detections'})
+            recomputed[name] = {param: getattr(analyzer, param) for param in analyzer.TUNABLE_PARAMETERS}
+        
+        response = {
+            'analysisId': analysis_id,
+            'parameters': recomputed,
+            'results': {name: results[name] for name in recomputed}
+        }
+        
+        if self.analyzer_service.is_analyzer_available('evaluator'):
+            evaluator = self.analyzer_service.get_analyzer('evaluator')
+            evaluation = evaluator.evaluate_presentation(
+                results, results.get('transcript'),
+                categories=self._get_stored_categories(evaluator, record)
+            )
+            response['evaluation'] = evaluation
+            summary = None if 'error' in evaluation else self._build_presentation_summary(evaluation)
+            if summary is not None:
+                response['presentation_summary'] = summary
+        
+        response['duration_seconds'] = round(time.perf_counter() - started_at, 4)
+        return response
+    
+    def _get_stored_categories(self, evaluator, record: AnalysisRecord) -> List[str]:
+        """Get the evaluation categories of a finished analysis, as scored by the pipeline"""
+        context = {
+            'skipped_steps': [key for key, status in record.step_status.items()
+                              if status == StepStatus.SKIPPED],
+            'options': AnalysisOptions.from_dict(record.metadata.get('options', {}))
+        }
+        return self._get_relevant_categories(evaluator, context)
+    
+    def rescore_analysis(self, analysis_id: str, rubric: RubricProfile) -> Optional[Dict[str, Any]]:
+        """
+        Re-run only the evaluation of a completed analysis with another rubric
+        
+        Scores the stored analyzer results and transcript with the rubric's
+        weights and grade boundaries and stores the evaluation on the record,
+        keyed by rubric profile name. The original evaluation is not changed.
+        
+        Args:
+            analysis_id: Analysis ID of a completed analysis
+            rubric: Rubric profile to score with
+            
+        Returns:
+            Rubric, evaluation and presentation summary, or None if the analysis
+            is not found or not completed
+            
+        Raises:
+            ProcessingError: If the presentation evaluator is not available
+        """
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        if not record or record.status != AnalysisStatus.COMPLETED or not record.results:
+            return None
+        if not self.analyzer_service.is_analyzer_available('evaluator'):
+            raise ProcessingError("Presentation evaluator not available")
+        
+        started_at = time.perf_counter()
+        evaluator = self.analyzer_service.get_analyzer('evaluator').with_rubric(
+            rubric.weights, rubric.score_ranges
+        )
+        results = record.results
+        evaluation = evaluator.evaluate_presentation(
+            results, results.get('transcript'),
+            categories=self._get_stored_categories(evaluator, record)
+        )
+        entry = {
+            'rubric': rubric.to_dict(),
+            'evaluation': evaluation,
+            'presentation_summary': self._build_presentation_summary(evaluation)
+        }
+        record.set_evaluation(rubric.name, entry)
+        
+        response = {'analysisId': analysis_id, 'profile': rubric.name}
+        response.update(entry)
+        response['duration_seconds'] = round(time.perf_counter() - started_at, 4)
+        return response
+    
+    def evaluate_analyses(self, rubric: RubricProfile,
+                          analysis_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Score many completed analyses at once with a rubric
+        
+        Uses the vectorized BatchEvaluator over the stored analyzer results,
+        so thousands of analyses are scored in one pass. Nothing is stored.
+        
+        Args:
+            rubric: Rubric profile to score with
+            analysis_ids: Analyses to score (default: every completed analysis)
+            
+        Returns:
+            Per-analysis scores, grades and percentile ranks, plus the grade
+            distribution and score statistics
+            
+        Raises:
+            ProcessingError: If the presentation evaluator is not available
+        """
+        if not self.analyzer_service.is_analyzer_available('evaluator'):
+            raise ProcessingError("Presentation evaluator not available")
+        
+        from evaluation.batch_evaluator import BatchEvaluator
+        
+        started_at = time.perf_counter()
+        if analysis_ids is None:
+            records = self.analyzer_service.list_analysis_records()
+        else:
+            records = [self.analyzer_service.get_analysis_record(analysis_id) for analysis_id in analysis_ids]
+        completed = [record for record in records
+                     if record and record.status == AnalysisStatus.COMPLETED and record.results]
+        unavailable = [] if analysis_ids is None else sorted(
+            set(analysis_ids) - {record.analysis_id for record in completed}
+        )
+        
+        evaluator = self.analyzer_service.get_analyzer('evaluator').with_rubric(
+            rubric.weights, rubric.score_ranges
+        )
+        batch_evaluator = BatchEvaluator(evaluator)
+        evaluation = batch_evaluator.evaluate(
+            [record.results for record in completed],
+            [record.results.get('transcript') for record in completed],
+            [self._get_stored_categories(evaluator, record) for record in completed]
+        )
+        
+        category_names = [evaluator.CATEGORY_NAMES[category] for category in batch_evaluator.categories]
+        analyses = []
+        for i, record in enumerate(completed):
+            # No score, grade or rank without any weighted category
+            overall_score = float(evaluation['overall_scores'][i])
+            percentile_rank = float(evaluation['percentile_ranks'][i])
+            analyses.append({
+                'analysisId': record.analysis_id,
+                'filename': record.filename,
+                'overall_score': None if math.isnan(overall_score) else overall_score,
+                'grade': evaluation['grades'][i],
+                'percentile_rank': None if math.isnan(percentile_rank) else percentile_rank,
+                'category_scores': {
+                    name: float(score)
+                    for name, score in zip(category_names, evaluation['category_scores'][i].tolist())
+                    if not math.isnan(score)
+                }
+            })
+        
+        return {
+            'profile': rubric.name,
+            'rubric': rubric.to_dict(),
+            'analyses': analyses,
+            'grade_distribution': evaluation['grade_distribution'],
+            'statistics': evaluation['statistics'],
+            'category_means': evaluation['category_means'],
+            'unavailable_analyses': unavailable,
+            'duration_seconds': round(time.perf_counter() - started_at, 4)
+        }
+    
+    def get_evaluations(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the presentation summary of every evaluation of a completed analysis
+        
+        The pipeline's own evaluation is listed under the default profile
+        unless that profile was re-scored explicitly.
+        
+        Args:
+            analysis_id: Analysis ID
+            
+        Returns:
+            Summaries keyed by rubric profile, or None if not found/completed
+        """
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        if not record or record.status != AnalysisStatus.COMPLETED or not record.results:
+            return None
+        
+        evaluations = {}
+        if 'presentation_summary' in record.results:
+            evaluations[DEFAULT_RUBRIC] = {
+                'rubric': RUBRIC_PROFILES[DEFAULT_RUBRIC].to_dict(),
+                'presentation_summary': record.results['presentation_summary']
+            }
+        for profile, entry in list(record.evaluations.items()):
+            evaluations[profile] = {
+                'rubric': entry['rubric'],
+                'presentation_summary': entry['presentation_summary']
+            }
+        return {'analysisId': analysis_id, 'evaluations': evaluations}
+    
+    def get_evaluation(self, analysis_id: str, profile: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the full evaluation of a completed analysis for one rubric profile
+        
+        Args:
+            analysis_id: Analysis ID
+            profile: Rubric profile name
+            
+        Returns:
+            Rubric, evaluation and presentation summary, or None if not available
+        """
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        if not record or record.status != AnalysisStatus.COMPLETED or not record.results:
+            return None
+        
+        entry = record.evaluations.get(profile)
+        if entry is None and profile == DEFAULT_RUBRIC and 'evaluation' in record.results:
+            entry = {
+                'rubric': RUBRIC_PROFILES[DEFAULT_RUBRIC].to_dict(),
+                'evaluation': record.results['evaluation'],
+                'presentation_summary': record.results.get('presentation_summary')
+            }
+        if entry is None:
+            return None
+        
+        response = {'analysisId': analysis_id, 'profile': profile}
+        response.update(entry)
+        return response
+    
+    def _get_tuned_analyzers(self, parameters: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Get copies of the recomputable motion analyzers with parameters applied
+        
+        Copies are used so tuning never changes the shared analyzers (or the
+        per-video state of stateful ones) used by running analyses.
+        
+        Raises:
+            ValidationError: If an analyzer or parameter is unknown or a value is out of range
+        """
+        tuned = {}
+        for name, _ in self.MOTION_ANALYZERS:
+            analyzer = self.analyzer_service.get_analyzer(name)
+            if analyzer is not None and getattr(analyzer, 'LANDMARK_SOURCE', None):
+                tuned[name] = copy.copy(analyzer)
+        
+        if not isinstance(parameters, dict):
+            raise ValidationError("Parameters must be an object keyed by analyzer name")
+        for name, values in parameters.items():
+            if name not in tuned:
+                raise ValidationError(f"Analyzer '{name}' cannot be recomputed from landmarks")
+            if not isinstance(values, dict):
+                raise ValidationError(f"Parameters for '{name}' must be an object")
+            
+            analyzer = tuned[name]
+            for param, value in values.items():
+                if param not in analyzer.TUNABLE_PARAMETERS:
+                    allowed = ', '.join(analyzer.TUNABLE_PARAMETERS) or 'none'
+                    raise ValidationError(f"Unknown parameter '{param}' for '{name}' (allowed: {allowed})")
+                low, high = analyzer.TUNABLE_PARAMETERS[param]
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) \
+                        or not low <= value <= high:
+                    raise ValidationError(f"'{name}.{param}' must be a number between {low} and {high}")
+                setattr(analyzer, param, float(value))
+        return tuned
+    
+    def get_analysis_timeline(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the time-indexed tracks of a completed analysis
+        
+        Disfluencies are located with the transcript's word timestamps during
+        the disfluency step; motion tracks come from the recorded landmarks
+        (one per detector, e.g. pose, face_mesh, hands).
+        
+        Args:
+            analysis_id: Analysis ID
+            
+        Returns:
+            Disfluency events ({type, text, start, end, sentence_index,
+            approximate}, in seconds) and motion series by landmark source
+            ({times, detected, movement}), or None if not completed
+        """
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        if not record or record.status != AnalysisStatus.COMPLETED or not record.results:
+            return None
+        
+        disfluency = record.results.get('disfluency', {})
+        disfluencies = disfluency.get('timeline', []) if 'error' not in disfluency else []
+        durations = [max(event['end'] for event in disfluencies)] if disfluencies else []
+        
+        motion = {}
+        landmark_store = self.analyzer_service.landmark_store
+        if landmark_store is not None:
+            for source in record.metadata.get('landmark_sources', []):
+                track = landmark_store.load_track(analysis_id, source)
+                if track is not None:
+                    motion[source] = track.motion_series()
+                    durations.append(track.duration)
+        
+        return {
+            'analysisId': analysis_id,
+            'duration_seconds': round(max(durations), 2) if durations else None,
+            'disfluencies': disfluencies,
+            'motion': motion
+        }
+    
+    def get_analysis_profile(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the per-stage resource profile of an analysis
+        
+        Stages are listed in pipeline order as they finish, so the profile of
+        a running analysis covers its finished stages. Skipped stages are not listed.
+        
+        Args:
+            analysis_id: Analysis ID
+            
+        Returns:
+            Per-stage wall time, CPU time, peak RSS growth and frame counts,
+            with totals and each stage's share of the wall time, or None if not found
+        """
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        if not record:
+            return None
+        
+        stages = [dict(stage, step=key) for key, stage in record.metadata.get('profile', {}).items()]
+        total_wall = sum(stage['wall_seconds'] for stage in stages)
+        for stage in stages:
+            stage['wall_share'] = round(stage['wall_seconds'] / total_wall, 4) if total_wall > 0 else 0.0
+        
+        return {
+            'analysisId': analysis_id,
+            'status': record.status.value,
+            'stages': stages,
+            'totals': {
+                'wall_seconds': round(total_wall, 4),
+                'cpu_seconds': round(sum(stage['cpu_seconds'] for stage in stages), 4),
+                'frames_decoded': sum(stage['frames_decoded'] for stage in stages),
+                'frames_inferred': sum(stage['frames_inferred'] for stage in stages)
+            },
+            'dominant_stage': max(stages, key=lambda stage: stage['wall_seconds'])['step'] if stages else None
+        }
+    
     def get_analysis_status(self, analysis_id: str) -> Optional[Dict[str, Any]]:
         """
         Get analysis status
@@ -307,6 +1045,63 @@ class VideoAnalysisService:
             'error_message': record.error_message
         }
     
+    def iter_analysis_events(self, analysis_id: str,
+                             heartbeat_interval: float = 15.0) -> Iterator[Optional[AnalysisEvent]]:
+        """
+        Stream progress events of an analysis until it completes or fails
+        
+        The first event is a snapshot of the current record so late subscribers
+        start from the right state. None is yielded whenever no event arrived
+        within heartbeat_interval, so callers can keep the connection alive.
+        
+        Args:
+            analysis_id: Analysis ID
+            heartbeat_interval: Seconds to wait for an event before yielding None
+            
+        Yields:
+            AnalysisEvent objects, or None as a heartbeat
+        """
+        # Subscribe before reading the snapshot so no event is missed in between
+        subscriber = self.event_bus.subscribe(analysis_id)
+        try:
+            record = self.analyzer_service.get_analysis_record(analysis_id)
+            if not record:
+                return
+            
+            yield AnalysisEvent('progress', {
+                'progress': record.progress,
+                'status': record.status.value
+            })
+            
+            if record.status == AnalysisStatus.COMPLETED:
+                yield AnalysisEvent('complete', {
+                    'analysisId': analysis_id,
+                    'status': record.status.value,
+                    'presentation_summary': (record.results or {}).get('presentation_summary')
+                })
+                return
+            
+            if record.status == AnalysisStatus.FAILED:
+                yield AnalysisEvent('error', {
+                    'analysisId': analysis_id,
+                    'status': record.status.value,
+                    'error': record.error_message
+                })
+                return
+            
+            while True:
+                try:
+                    event = subscriber.get(timeout=heartbeat_interval)
+                except queue.Empty:
+                    yield None
+                    continue
+                
+                yield event
+                if event.is_terminal:
+                    return
+        finally:
+            self.event_bus.unsubscribe(analysis_id, subscriber)
+    
     def get_analysis_results(self, analysis_id: str) -> Optional[Dict[str, Any]]:
         """
         Get full analysis results
@@ -325,6 +1120,33 @@ class VideoAnalysisService:
         results['analysisId'] = analysis_id
         return results
     
+    def get_partial_results(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the results that are ready so far, plus the steps still pending
+        
+        Args:
+            analysis_id: Analysis ID
+            
+        Returns:
+            Partial results or None if not found
+        """
+        record = self.analyzer_service.get_analysis_record(analysis_id)
+        if not record:
+            return None
+        
+        results = dict(record.partial_results)
+        results.update({
+            'analysisId': analysis_id,
+            'status': record.status.value,
+            'progress': record.progress,
+            'partial': True,
+            'step_status': record.get_step_status(),
+            'pending_steps': record.get_pending_steps()
+        })
+        if record.error_message:
+            results['error_message'] = record.error_message
+        return results
+    
     def get_presentation_score(self, analysis_id: str) -> Optional[Dict[str, Any]]:
         """
         Get presentation score and key feedback
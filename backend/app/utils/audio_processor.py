@@ -2,9 +2,10 @@
 Audio processing utilities for the Auto PPT Evaluation System
 """
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from .exceptions import ProcessingError
+from .optional_imports import import_optional
 
 
 class AudioProcessor:
@@ -18,15 +19,16 @@ class AudioProcessor:
             whisper_model: Pre-loaded Whisper model for transcription
         """
         self.whisper_model = whisper_model
-        
-        # Check for moviepy availability
-        try:
-            import moviepy.editor as mp
-            self.moviepy = mp
-            self.moviepy_available = True
-        except ImportError:
-            self.moviepy = None
-            self.moviepy_available = False
+    
+    @property
+    def moviepy(self):
+        """moviepy.editor, imported on first use (None if not installed)"""
+        return import_optional('moviepy.editor')
+    
+    @property
+    def moviepy_available(self) -> bool:
+        """Whether moviepy can be used"""
+        return self.moviepy is not None
     
     def extract_audio_from_video(self, video_path: str, audio_path: str) -> bool:
         """
@@ -67,12 +69,13 @@ class AudioProcessor:
         except Exception as e:
             raise ProcessingError(f"Failed to extract audio: {e}")
     
-    def transcribe_audio(self, audio_path: str) -> Optional[str]:
+    def transcribe_audio(self, audio_path: str, whisper_model=None) -> Optional[str]:
         """
         Transcribe audio file using Whisper
         
         Args:
             audio_path: Path to the audio file
+            whisper_model: Whisper model to use instead of the pre-loaded one
             
         Returns:
             Transcribed text or None if transcription fails
@@ -80,15 +83,35 @@ class AudioProcessor:
         Raises:
             ProcessingError: If transcription fails
         """
-        if self.whisper_model is None:
+        result = self.transcribe_audio_result(audio_path, whisper_model, word_timestamps=False)
+        return result.get("text", "").strip()
+    
+    def transcribe_audio_result(self, audio_path: str, whisper_model=None,
+                                word_timestamps: bool = True) -> Dict[str, Any]:
+        """
+        Transcribe audio file using Whisper, keeping its segments
+        
+        Args:
+            audio_path: Path to the audio file
+            whisper_model: Whisper model to use instead of the pre-loaded one
+            word_timestamps: Also time each word (segments then carry 'words')
+            
+        Returns:
+            Whisper result with 'text' and 'segments'
+            
+        Raises:
+            ProcessingError: If transcription fails
+        """
+        if whisper_model is None:
+            whisper_model = self.whisper_model
+        if whisper_model is None:
             raise ProcessingError("Whisper model not available for transcription")
         
         if not os.path.exists(audio_path):
             raise ProcessingError(f"Audio file not found: {audio_path}")
         
         try:
-            result = self.whisper_model.transcribe(audio_path)
-            return result.get("text", "").strip()
+            return whisper_model.transcribe(audio_path, word_timestamps=word_timestamps)
             
         except Exception as e:
             raise ProcessingError(f"Failed to transcribe audio: {e}")
@@ -1,6 +1,7 @@
 """
 File handling utilities for the Auto PPT Evaluation System
 """
+import hashlib
 import os
 import tempfile
 import uuid
@@ -93,3 +94,24 @@ class FileHandler:
             'filename': os.path.basename(file_path),
             'extension': os.path.splitext(file_path)[1].lower()
         }
+    
+    def compute_file_hash(self, file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Compute the SHA-256 hash of a file's content
+        
+        Args:
+            file_path: Path to the file
+            chunk_size: Number of bytes read at a time
+            
+        Returns:
+            Hex digest of the file content
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def create_audio_path(self) -> str:
+        """Get a unique temporary path for extracted audio"""
+        return os.path.join(self.temp_dir, f"{uuid.uuid4()}_audio.wav")
@@ -0,0 +1,198 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format
+
+Counters, gauges and histograms are kept in a MetricsRegistry and rendered
+on demand by /api/metrics; nothing is pushed to an external service. Every
+process (e.g. every Gunicorn worker) keeps its own values, so a scraper
+sees the worker that answered the request.
+"""
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds, from per-frame inference up to whole analyses
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    """Format label pairs as {name="value",...}"""
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value"""
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class of metrics with a fixed set of label names"""
+
+    TYPE = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        """Label values in label name order"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_pairs(self, key: Tuple[str, ...]) -> List[Tuple[str, str]]:
+        return list(zip(self.labelnames, key))
+
+    def _render_samples(self, key: Tuple[str, ...], value) -> List[str]:
+        return [f"{self.name}{_format_labels(self._label_pairs(key))} {_format_value(value)}"]
+
+    def _snapshot(self) -> List[Tuple[Tuple[str, ...], object]]:
+        """Current values sorted by labels"""
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> List[str]:
+        """Render the HELP and TYPE lines and every sample"""
+        items = self._snapshot()
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        for key, value in items:
+            lines.extend(self._render_samples(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    TYPE = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """Increase the counter of a label combination"""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    TYPE = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        """Set the value of a label combination"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """Distribution of observations over cumulative buckets"""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if not math.isinf(bound)))
+
+    def observe(self, value: float, **labels) -> None:
+        """Record an observation for a label combination"""
+        key = self._key(labels)
+        # Buckets are inclusive upper bounds; the last slot is +Inf
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_samples(self, key: Tuple[str, ...], value) -> List[str]:
+        bucket_counts, total, count = value
+        pairs = self._label_pairs(key)
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+            cumulative += bucket_count
+            le = '+Inf' if math.isinf(bound) else _format_value(bound)
+            lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(pairs)} {count}")
+        return lines
+
+    def _snapshot(self) -> List[Tuple[Tuple[str, ...], object]]:
+        # Copy the bucket lists so concurrent observations do not change them mid-render
+        with self._lock:
+            return sorted((key, [list(state[0]), state[1], state[2]]) for key, state in self._values.items())
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together
+
+    Collectors are called before every render to update gauges that reflect
+    current state (e.g. queue depth) rather than events.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge"""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Create and register a histogram"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callable run before every render"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format"""
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics)
+        for collector in collectors:
+            collector()
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,48 @@
+"""
+Deferred imports of optional, slow-to-import dependencies
+
+Modules such as moviepy, torch or whisper take seconds to import. Importing
+them on first use (or during the background warm-up) keeps application
+startup fast, so health checks answer while models are still loading.
+"""
+import importlib
+import importlib.util
+import threading
+from types import ModuleType
+from typing import Dict, Optional
+
+
+_modules: Dict[str, Optional[ModuleType]] = {}
+_import_lock = threading.Lock()
+
+
+def is_installed(module_name: str) -> bool:
+    """Check whether a module can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        # find_spec imports parent packages of dotted names, which may fail
+        return False
+
+
+def import_optional(module_name: str) -> Optional[ModuleType]:
+    """
+    Import a module on first use
+
+    Args:
+        module_name: Module to import (e.g. 'moviepy.editor')
+
+    Returns:
+        The module, or None if it (or one of its dependencies) is not installed;
+        the outcome is cached either way
+    """
+    if module_name in _modules:
+        return _modules[module_name]
+
+    with _import_lock:
+        if module_name not in _modules:
+            try:
+                _modules[module_name] = importlib.import_module(module_name)
+            except ImportError:
+                _modules[module_name] = None
+        return _modules[module_name]
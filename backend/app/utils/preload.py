@@ -0,0 +1,118 @@
+"""
+Model preloading for pre-fork servers (e.g. Gunicorn with preload_app)
+
+The master process loads every model once, freezes it and then forks the
+workers, which share the model pages copy-on-write instead of each loading
+its own Whisper, SigLIP and MediaPipe copies.
+"""
+import gc
+import os
+import sys
+from typing import Any, Dict, Iterator
+
+from .exceptions import ConfigurationError
+
+
+def iter_torch_modules(analyzer_service) -> Iterator[Any]:
+    """Yield the torch modules held by the analyzers (Whisper models, the expression model)"""
+    torch = sys.modules.get('torch')
+    if torch is None:
+        return
+    candidates = list(analyzer_service.analyzers.values()) + list(analyzer_service.whisper_models.values())
+    seen = set()
+    for candidate in candidates:
+        for module in (candidate, getattr(candidate, 'model', None)):
+            if isinstance(module, torch.nn.Module) and id(module) not in seen:
+                seen.add(id(module))
+                yield module
+
+
+def freeze_loaded_models(analyzer_service) -> int:
+    """
+    Prepare loaded models to be shared with forked workers
+
+    Puts torch modules in inference mode without gradients, so workers never
+    write to the weight pages, and moves every object allocated so far into
+    the permanent GC generation, so collections in the workers do not touch
+    (and thereby copy) the master's pages.
+
+    Args:
+        analyzer_service: Analyzer service whose models finished loading
+
+    Returns:
+        Number of torch modules frozen
+
+    Raises:
+        ConfigurationError: If CUDA was initialized (CUDA contexts do not survive fork)
+    """
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_initialized():
+        raise ConfigurationError(
+            "CUDA was initialized while preloading models; CUDA contexts cannot be shared "
+            "with forked workers. Set USE_GPU=False or disable preloading (PRELOAD_MODELS=False)."
+        )
+
+    frozen = 0
+    for module in iter_torch_modules(analyzer_service):
+        module.eval()
+        module.requires_grad_(False)
+        frozen += 1
+
+    gc.collect()
+    gc.freeze()
+    return frozen
+
+
+def configure_worker_threads(num_threads: int) -> None:
+    """
+    Limit the intra-op threads of the numeric libraries in this process
+
+    Every worker otherwise starts one thread per core, so N workers
+    oversubscribe the CPU N times. Libraries already imported are configured
+    directly; libraries imported later read the environment variables.
+
+    Args:
+        num_threads: Threads per worker process
+    """
+    num_threads = max(1, int(num_threads))
+    for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[variable] = str(num_threads)
+
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(num_threads)
+    cv2 = sys.modules.get('cv2')
+    if cv2 is not None:
+        cv2.setNumThreads(num_threads)
+
+
+def get_memory_usage() -> Dict[str, float]:
+    """
+    Get the memory usage of this process in MB
+
+    Returns:
+        'rss' (resident), plus on Linux 'pss' (proportional share of shared
+        pages), 'shared' (resident pages shared with other processes, e.g. the
+        preloaded models) and 'private' (pages only this process uses)
+    """
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup', 'r', encoding='utf-8') as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) / 1024
+        usage['rss'] = fields.get('Rss', 0.0)
+        usage['pss'] = fields.get('Pss', 0.0)
+        usage['shared'] = fields.get('Shared_Clean', 0.0) + fields.get('Shared_Dirty', 0.0)
+        usage['private'] = fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0)
+    except OSError:
+        try:
+            import resource
+        except ImportError:
+            return usage
+        # ru_maxrss is the peak RSS, in KB on Linux and bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage['rss'] = max_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return {name: round(value, 1) for name, value in usage.items()}
@@ -0,0 +1,57 @@
+"""
+Per-stage resource profiling of the analysis pipeline
+
+Measures the wall time, CPU time, growth of the peak resident set size and
+the frames decoded and inferred while one pipeline stage runs.
+"""
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from video_analysis.frame_counters import count_frames
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """Get the peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+@contextmanager
+def profile_stage(on_frame: Optional[Callable[[float], None]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Profile the code run inside the block
+
+    The yielded dictionary is filled in when the block exits:
+        - wall_seconds: Elapsed time
+        - cpu_seconds: Process CPU time (includes the intra-op threads of
+          torch/OpenCV and any analysis running concurrently)
+        - peak_rss_delta_mb: How much the process's peak RSS grew, i.e. the
+          memory the stage needed beyond the previous high-water mark
+        - frames_decoded, frames_inferred: Frames decoded from the video and
+          frames passed to a detector or model on this thread
+
+    Args:
+        on_frame: Called with the seconds an analyzer spent on each sampled frame
+    """
+    profile: Dict[str, Any] = {}
+    peak_rss_before = get_peak_rss_mb()
+    cpu_before = time.process_time()
+    started_at = time.perf_counter()
+    try:
+        with count_frames(on_frame) as counts:
+            yield profile
+    finally:
+        profile['wall_seconds'] = round(time.perf_counter() - started_at, 4)
+        profile['cpu_seconds'] = round(time.process_time() - cpu_before, 4)
+        peak_rss_after = get_peak_rss_mb()
+        profile['peak_rss_delta_mb'] = (
+            round(peak_rss_after - peak_rss_before, 1) if peak_rss_before is not None else None
+        )
+        profile.update(counts)
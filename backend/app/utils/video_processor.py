@@ -5,21 +5,24 @@ import os
 from typing import Dict, Any, Optional
 
 from .exceptions import ProcessingError
+from .optional_imports import import_optional
 
 
 class VideoProcessor:
     """Handles video processing operations"""
     
     def __init__(self):
-        """Initialize video processor"""
-        # Check for moviepy availability
-        try:
-            import moviepy.editor as mp
-            self.moviepy = mp
-            self.moviepy_available = True
-        except ImportError:
-            self.moviepy = None
-            self.moviepy_available = False
+        """Initialize video processor (moviepy is imported on first use)"""
+    
+    @property
+    def moviepy(self):
+        """moviepy.editor, imported on first use (None if not installed)"""
+        return import_optional('moviepy.editor')
+    
+    @property
+    def moviepy_available(self) -> bool:
+        """Whether moviepy can be used"""
+        return self.moviepy is not None
     
     def get_video_info(self, video_path: str) -> Dict[str, Any]:
         """
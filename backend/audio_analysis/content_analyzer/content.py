@@ -1,29 +1,108 @@
 import json
-import time
-import random
-from typing import Dict, Any, List, Optional
-import google.generativeai as genai
-import nltk
-from nltk.tokenize import sent_tokenize
+from typing import Dict, Any, Iterator, List, Optional, Union
 
-class ContentAnalyzer:
-    def __init__(self, api_key=None, model="gemini-2.0-flash"):
-        """Initialize the content analyzer with API key and model selection."""
-        self.api_key = api_key
-        if not self.api_key:
-            raise ValueError("API key not provided. Set GEMINI_API_KEY environment variable or pass api_key parameter.")
+from ..llm_client import DEFAULT_MODEL, GeminiClient, LLMClient
+from ..llm_runner import InvalidResponseError, LLMRunner
+from ..rate_limiter import RateLimiter
+from ..transcript import TranscriptDocument
+
+# Token budget of a transcript chunk (one request each); most talks fit in one or two
+DEFAULT_CHUNK_TOKENS = 4000
+
+class CombinedAnalysis:
+    """Running combination of chunk analyses: average scores, longest feedback, most frequent actions."""
+    
+    FEEDBACK_FIELDS = ("description", "positive feedback", "negative feedback")
+    
+    def __init__(self, dimensions: List[str]):
+        self.dimensions = dimensions
+        self.count = 0
+        self._score_sums = {}
+        self._score_counts = {}
+        self._feedback = {}
+        self._action_counts = {}
+        self._summary = None
+    
+    def add(self, result: Dict[str, Any]) -> None:
+        """Fold in the analysis of one more chunk."""
+        self.count += 1
+        analysis = result.get("presentationAnalysis", {})
+        metrics = analysis.get("contentQualityMetrics", {})
+        for dimension in self.dimensions:
+            if dimension not in metrics:
+                continue
+            dim_data = metrics[dimension]
+            self._score_sums[dimension] = self._score_sums.get(dimension, 0) + dim_data.get("score", 0)
+            self._score_counts[dimension] = self._score_counts.get(dimension, 0) + 1
+            # Keep the longest text of each field (the first one on ties)
+            feedback = self._feedback.setdefault(dimension, {})
+            for field in self.FEEDBACK_FIELDS:
+                text = dim_data.get(field, "")
+                if field not in feedback or len(text) > len(feedback[field]):
+                    feedback[field] = text
         
-        # Configure the genai library with the API key
-        genai.configure(api_key=self.api_key)
+        for action in analysis.get("recommendedActions", []):
+            self._action_counts[action] = self._action_counts.get(action, 0) + 1
+        
+        summary = analysis.get("summaryFeedback", "")
+        if self._summary is None or len(summary) > len(self._summary):
+            self._summary = summary
+    
+    def result(self) -> Dict[str, Any]:
+        """Combined analysis of the chunks added so far (empty before the first)."""
+        if not self.count:
+            return {}
+        
+        metrics = {}
+        for dimension in self.dimensions:
+            if dimension in self._score_counts:
+                metrics[dimension] = {
+                    "score": round(self._score_sums[dimension] / self._score_counts[dimension], 1),
+                    **self._feedback[dimension]
+                }
+        
+        # Overall score is the average of the dimension scores
+        overall_score = 0
+        if metrics:
+            overall_score = round(sum(dim_data["score"] for dim_data in metrics.values()) / len(metrics), 2)
+        
+        return {
+            "presentationAnalysis": {
+                "contentQualityMetrics": metrics,
+                "overallScore": overall_score,
+                "summaryFeedback": self._summary,
+                # Top 4 recommended actions by frequency
+                "recommendedActions": [
+                    a for a, _ in sorted(self._action_counts.items(), key=lambda x: x[1], reverse=True)[:4]
+                ]
+            }
+        }
+
+
+class ContentAnalyzer:
+    def __init__(self, api_key=None, model=DEFAULT_MODEL, rate_limiter=None, client: Optional[LLMClient] = None,
+                 runner: Optional[LLMRunner] = None, max_chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+                 chunk_overlap_tokens: int = 0):
+        """
+        Initialize the content analyzer with API key and model selection, an LLM client, or a shared runner.
         
+        Long transcripts are analyzed in chunks of up to max_chunk_tokens (estimated) tokens,
+        each repeating up to chunk_overlap_tokens of the previous chunk's last sentences.
+        """
+        if not 0 <= chunk_overlap_tokens < max_chunk_tokens:
+            raise ValueError("chunk_overlap_tokens must be between 0 and max_chunk_tokens")
+        self.api_key = api_key
         self.model = model
-        self.client = genai.GenerativeModel(model_name=self.model, generation_config={"temperature": 0.0})
+        self.max_chunk_tokens = max_chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
         
-        # Download NLTK resources for sentence tokenization if not already downloaded
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
+        # Requests go through a runner (retries, rate limiting, concurrency cap); the analyzer service
+        # shares one between the analyzers. Without a client, talk to Gemini through the SDK.
+        if runner is None:
+            client = client if client is not None else GeminiClient(api_key, model)
+            runner = LLMRunner(client, rate_limiter or RateLimiter())
+        self.runner = runner
+        self.client = runner.client
         
         # Define content quality dimensions
         self.quality_dimensions = [
@@ -37,28 +116,48 @@ class ContentAnalyzer:
             "conciseness",
             "readability"
         ]
-    
-    def split_text_into_chunks(self, text: str, max_chunk_size: int = 1000) -> List[str]:
-        """Split text into manageable chunks for API processing."""
-        # First split into sentences
-        sentences = sent_tokenize(text)
         
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            # If adding this sentence would exceed max_chunk_size, start a new chunk
-            if len(current_chunk) + len(sentence) > max_chunk_size and current_chunk:
-                chunks.append(current_chunk)
-                current_chunk = sentence
-            else:
-                current_chunk += (" " + sentence if current_chunk else sentence)
-        
-        # Add the last chunk if not empty
-        if current_chunk:
-            chunks.append(current_chunk)
-            
-        return chunks
+        # Structured output: Gemini answers with JSON matching this schema (no fences or prose to strip)
+        self.response_schema = self._build_response_schema(self.quality_dimensions)
+    
+    @staticmethod
+    def _build_response_schema(dimensions: List[str]) -> Dict[str, Any]:
+        """Response schema (Gemini's OpenAPI subset) of the presentationAnalysis format."""
+        feedback_fields = ["score", "description", "positive feedback", "negative feedback"]
+        metric = {
+            "type": "OBJECT",
+            "properties": {field: {"type": "NUMBER" if field == "score" else "STRING"} for field in feedback_fields},
+            "required": feedback_fields
+        }
+        return {
+            "type": "OBJECT",
+            "properties": {
+                "presentationAnalysis": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "contentQualityMetrics": {
+                            "type": "OBJECT",
+                            "properties": {dimension: metric for dimension in dimensions},
+                            "required": list(dimensions)
+                        },
+                        "overallScore": {"type": "NUMBER"},
+                        "summaryFeedback": {"type": "STRING"},
+                        "recommendedActions": {"type": "ARRAY", "items": {"type": "STRING"}}
+                    },
+                    "required": ["contentQualityMetrics", "overallScore", "summaryFeedback", "recommendedActions"]
+                }
+            },
+            "required": ["presentationAnalysis"]
+        }
+    
+    def split_text_into_chunks(self, text: Union[str, TranscriptDocument], max_chunk_tokens: Optional[int] = None,
+                               overlap_tokens: Optional[int] = None) -> List[str]:
+        """Split text into chunks of whole sentences within the token budget (default: the analyzer's)."""
+        # A transcript document brings its sentences and token counts, segmented once for both analyzers
+        return TranscriptDocument.coerce(text).chunks(
+            max_chunk_tokens if max_chunk_tokens is not None else self.max_chunk_tokens,
+            overlap_tokens if overlap_tokens is not None else self.chunk_overlap_tokens
+        )
     
     def create_content_analysis_prompt(self, text: str) -> str:
         """Create a prompt for analyzing content in the desired format."""
@@ -113,156 +212,127 @@ class ContentAnalyzer:
         """
         return prompt
     
-    def analyze_with_retry(self, prompt: str, max_retries=5, initial_retry_delay=2, max_retry_delay=60) -> Dict[str, Any]:
-        """Send prompt to Gemini API with exponential backoff for rate limits."""
-        retry_delay = initial_retry_delay
+    def analyze_with_retry(self, prompt: str, deadline: Optional[float] = None, cancel=None) -> Dict[str, Any]:
+        """Send a prompt to the LLM; rate limits, errors and invalid answers are retried by the runner."""
+        result = self.runner.generate_json('content', prompt, self._validate_analysis, deadline, cancel,
+                                           self.response_schema)
+        return self._complete_analysis(result)
+    
+    def _validate_analysis(self, result: Any) -> None:
+        """
+        Reject answers without a score for every dimension (retried like invalid JSON).
         
-        for attempt in range(max_retries):
-            try:
-                response = self.client.generate_content(prompt)
-                
-                # Extract JSON from response, handling markdown code blocks
-                response_text = response.text
-                
-                # Check if response is wrapped in markdown code blocks
-                if response_text.startswith("```") and "```" in response_text[3:]:
-                    # Extract content between markdown code blocks
-                    start_idx = response_text.find("\n") + 1
-                    end_idx = response_text.rfind("```")
-                    response_text = response_text[start_idx:end_idx].strip()
-                
-                # Remove "json" if it appears at the start of the code block
-                if response_text.startswith("json"):
-                    response_text = response_text[4:].strip()
-                
-                try:
-                    result = json.loads(response_text)
-                    return result
-                except json.JSONDecodeError as e:
-                    if attempt == max_retries - 1:
-                        raise ValueError(f"Failed to parse JSON from response: {response_text}\nError: {str(e)}")
-            
-            except Exception as e:
-                error_str = str(e).lower()
-                
-                # Check if error is related to rate limiting
-                is_rate_limit = any(phrase in error_str for phrase in ["rate limit", "quota", "too many requests", "429"])
-                
-                if attempt == max_retries - 1:
-                    raise
-                
-                # Apply exponential backoff with jitter for rate limits
-                if is_rate_limit:
-                    # Add jitter to prevent all retries happening simultaneously
-                    jitter = random.uniform(0.5, 1.5)
-                    wait_time = min(retry_delay * jitter, max_retry_delay)
-                    print(f"Rate limit hit. Attempt {attempt+1} failed: {str(e)}. Waiting for {wait_time:.2f} seconds...")
-                    time.sleep(wait_time)
-                    # Exponential backoff
-                    retry_delay *= 2
-                else:
-                    # For other errors, use standard retry
-                    print(f"Attempt {attempt+1} failed: {str(e)}. Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    
-        # If we've made it here, all retries failed
-        raise Exception(f"Failed to analyze text after {max_retries} attempts")
+        The trailing summary and actions may be missing from a repaired, truncated answer.
+        """
+        analysis = result.get("presentationAnalysis") if isinstance(result, dict) else None
+        metrics = analysis.get("contentQualityMetrics") if isinstance(analysis, dict) else None
+        if not isinstance(metrics, dict):
+            raise InvalidResponseError("Missing presentationAnalysis.contentQualityMetrics in response")
+        for dimension in self.quality_dimensions:
+            score = metrics.get(dimension, {}).get("score") if isinstance(metrics.get(dimension), dict) else None
+            if not isinstance(score, (int, float)) or isinstance(score, bool):
+                raise InvalidResponseError(f"Missing score for '{dimension}' in response")
+    
+    @staticmethod
+    def _complete_analysis(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in fields a repaired answer lost to truncation."""
+        analysis = result["presentationAnalysis"]
+        if not isinstance(analysis.get("overallScore"), (int, float)):
+            scores = [data["score"] for data in analysis["contentQualityMetrics"].values()]
+            analysis["overallScore"] = round(sum(scores) / len(scores), 2)
+        analysis.setdefault("summaryFeedback", "")
+        analysis.setdefault("recommendedActions", [])
+        return result
     
-    def analyze_content(self, text: str) -> Dict[str, Any]:
+    def analyze_content(self, text: Union[str, TranscriptDocument], deadline: Optional[float] = None,
+                        cancel=None) -> Dict[str, Any]:
         """
         Perform content analysis and return in the desired JSON format.
         
         Args:
-            text: Content to analyze
+            text: Content to analyze (text or an already segmented transcript)
+            deadline: Seconds each LLM request may take including retries
+            cancel: threading.Event that aborts the requests when set
             
         Returns:
             Dictionary with analysis results in the presentationAnalysis format
         """
-        chunks = self.split_text_into_chunks(text)
-        
-        # If multiple chunks, analyze each and combine results
-        if len(chunks) > 1:
-            all_results = []
-            for i, chunk in enumerate(chunks):
-                print(f"Analyzing chunk {i+1}/{len(chunks)}...")
-                try:
-                    prompt = self.create_content_analysis_prompt(chunk)
-                    result = self.analyze_with_retry(prompt)
-                    all_results.append(result)
-                    # Sleep between chunks to avoid rate limits
-                    if i < len(chunks) - 1:
-                        time.sleep(2)
-                except Exception as e:
-                    print(f"Error analyzing chunk {i+1}: {str(e)}")
-            
-            # Combine results from all chunks
-            return self._combine_analysis_results(all_results)
-        else:
-            # Single chunk, analyze directly
-            prompt = self.create_content_analysis_prompt(text)
-            return self.analyze_with_retry(prompt)
+        analysis = {}
+        for update in self.stream_content_analysis(text, deadline, cancel):
+            analysis = update["analysis"]
+        return analysis
     
-    def _combine_analysis_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Combine analysis results from multiple chunks."""
-        if not results:
-            return {}
+    def stream_content_analysis(self, text: Union[str, TranscriptDocument], deadline: Optional[float] = None,
+                                cancel=None) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze content chunk by chunk, yielding the running combined analysis as each chunk completes.
         
-        combined = {
-            "presentationAnalysis": {
-                "contentQualityMetrics": {},
-                "overallScore": 0,
-                "summaryFeedback": "",
-                "recommendedActions": []
-            }
-        }
+        Chunks are analyzed concurrently and reported in completion order. A failed
+        chunk is reported with its error and left out of the combination; with a
+        single chunk the error is raised instead.
         
-        # Process quality metrics by taking the average score across chunks
-        for dimension in self.quality_dimensions:
-            scores = []
-            descriptions = []
-            positive_feedbacks = []
-            negative_feedbacks = []
-            
-            for result in results:
-                metrics = result.get("presentationAnalysis", {}).get("contentQualityMetrics", {})
-                if dimension in metrics:
-                    dim_data = metrics[dimension]
-                    scores.append(dim_data.get("score", 0))
-                    descriptions.append(dim_data.get("description", ""))
-                    positive_feedbacks.append(dim_data.get("positive feedback", ""))
-                    negative_feedbacks.append(dim_data.get("negative feedback", ""))
+        Args:
+            text: Content to analyze (text or an already segmented transcript)
+            deadline: Seconds each LLM request may take including retries
+            cancel: threading.Event that aborts the requests when set
             
-            if scores:
-                combined["presentationAnalysis"]["contentQualityMetrics"][dimension] = {
-                    "score": round(sum(scores) / len(scores), 1),
-                    "description": max(descriptions, key=len),  # Use longest description
-                    "positive feedback": max(positive_feedbacks, key=len),  # Use longest positive feedback
-                    "negative feedback": max(negative_feedbacks, key=len)   # Use longest negative feedback
-                }
+        Returns:
+            Iterator of updates with chunk_index, chunks_total, chunks_completed,
+            chunks_failed, chunk_scores (dimension scores of the chunk, None if it
+            failed), error (if it failed) and analysis (the combined analysis so
+            far in the presentationAnalysis format); the last update holds the
+            final analysis
+        """
+        document = TranscriptDocument.coerce(text)
+        chunks = self.split_text_into_chunks(document)
         
-        # Calculate overall score as average of dimension scores
-        metrics = combined["presentationAnalysis"]["contentQualityMetrics"]
-        if metrics:
-            dimension_scores = [dim_data["score"] for dim_data in metrics.values()]
-            combined["presentationAnalysis"]["overallScore"] = round(sum(dimension_scores) / len(dimension_scores), 2)
+        # Single chunk, analyze directly
+        if len(chunks) <= 1:
+            result = self.analyze_with_retry(self.create_content_analysis_prompt(document.text), deadline, cancel)
+            yield {
+                "chunk_index": 0,
+                "chunks_total": 1,
+                "chunks_completed": 1,
+                "chunks_failed": 0,
+                "chunk_scores": self._chunk_scores(result),
+                "analysis": result
+            }
+            return
         
-        # Combine recommended actions and select most frequent
-        action_counts = {}
+        # Multiple chunks are analyzed concurrently, combined as their results arrive
+        print(f"Analyzing {len(chunks)} chunks...")
+        prompts = [self.create_content_analysis_prompt(chunk) for chunk in chunks]
+        combined = CombinedAnalysis(self.quality_dimensions)
+        failed = 0
+        results = self.runner.iter_json('content', prompts, self._validate_analysis, deadline, cancel,
+                                        self.response_schema)
+        for i, result in results:
+            update = {"chunk_index": i, "chunks_total": len(chunks)}
+            if isinstance(result, Exception):
+                print(f"Error analyzing chunk {i+1}: {str(result)}")
+                failed += 1
+                update.update(chunk_scores=None, error=str(result))
+            else:
+                result = self._complete_analysis(result)
+                combined.add(result)
+                update["chunk_scores"] = self._chunk_scores(result)
+            update.update(chunks_completed=combined.count, chunks_failed=failed, analysis=combined.result())
+            yield update
+    
+    @staticmethod
+    def _chunk_scores(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Dimension scores and overall score of one analysis."""
+        analysis = result["presentationAnalysis"]
+        scores = {dimension: data["score"] for dimension, data in analysis["contentQualityMetrics"].items()}
+        scores["overall"] = analysis["overallScore"]
+        return scores
+    
+    def _combine_analysis_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine analysis results from multiple chunks."""
+        combined = CombinedAnalysis(self.quality_dimensions)
         for result in results:
-            actions = result.get("presentationAnalysis", {}).get("recommendedActions", [])
-            for action in actions:
-                action_counts[action] = action_counts.get(action, 0) + 1
-        
-        # Select top 4 recommended actions
-        combined["presentationAnalysis"]["recommendedActions"] = [
-            a for a, _ in sorted(action_counts.items(), key=lambda x: x[1], reverse=True)[:4]
-        ]
-        
-        # Use the most comprehensive summary feedback
-        summaries = [result.get("presentationAnalysis", {}).get("summaryFeedback", "") for result in results]
-        combined["presentationAnalysis"]["summaryFeedback"] = max(summaries, key=len)
-        
-        return combined
+            combined.add(result)
+        return combined.result()
     
     def print_analysis(self, analysis: Dict[str, Any]):
         """Print the analysis results in a well-formatted way."""
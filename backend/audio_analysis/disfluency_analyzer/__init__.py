@@ -1,4 +1,6 @@
 from .disfluency import DisfluencyTagger
+from .timeline import build_disfluency_timeline
 __all__ = [
-    'DisfluencyTagger'
+    'DisfluencyTagger',
+    'build_disfluency_timeline'
 ]
\ No newline at end of file
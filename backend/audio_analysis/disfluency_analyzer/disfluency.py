@@ -1,32 +1,25 @@
-import os
-import json
-import time
-import random
-import re
-from typing import Dict, Any, List
-import google.generativeai as genai
-import nltk
-from nltk.tokenize import sent_tokenize
-nltk.download('punkt_tab')
+from typing import Dict, Any, List, Optional, Union
+
+from ..llm_client import DEFAULT_MODEL, GeminiClient, LLMClient
+from ..llm_runner import InvalidResponseError, LLMRunner
+from ..rate_limiter import RateLimiter
+from ..transcript import TranscriptDocument
+from .timeline import build_disfluency_timeline, iter_disfluency_spans
 
 class DisfluencyTagger:
-    def __init__(self, api_key=None, model="gemini-2.0-flash"):
-        """Initialize the tagger with API key and model selection."""
+    def __init__(self, api_key=None, model=DEFAULT_MODEL, rate_limiter=None, client: Optional[LLMClient] = None,
+                 runner: Optional[LLMRunner] = None):
+        """Initialize the tagger with API key and model selection, an LLM client, or a shared runner."""
         self.api_key = api_key
-        if not self.api_key:
-            raise ValueError("API key not provided. Set GEMINI_API_KEY environment variable or pass api_key parameter.")
-        
-        # Configure the genai library with the API key
-        genai.configure(api_key=self.api_key)
-        
         self.model = model
-        self.client = genai.GenerativeModel(model_name=self.model, generation_config={"temperature": 0.0})
         
-        # Download NLTK resources for sentence tokenization if not already downloaded
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
+        # Requests go through a runner (retries, rate limiting, concurrency cap); the analyzer service
+        # shares one between the analyzers. Without a client, talk to Gemini through the SDK.
+        if runner is None:
+            client = client if client is not None else GeminiClient(api_key, model)
+            runner = LLMRunner(client, rate_limiter or RateLimiter())
+        self.runner = runner
+        self.client = runner.client
         
         # Define disfluency types for prompt engineering
         self.disfluency_types = [
@@ -42,6 +35,19 @@ class DisfluencyTagger:
             "INCOMPLETE",  # incomplete sentences
             "INFORMAL"     # informal language/slang
         ]
+        
+        # Structured output: Gemini answers with JSON matching this schema, tags limited to valid BIO tags
+        tags = ["O"] + [f"{prefix}-{disfluency_type}" for disfluency_type in self.disfluency_types
+                        for prefix in ("B", "I")]
+        self.response_schema = {
+            "type": "OBJECT",
+            "properties": {
+                "tokens": {"type": "ARRAY", "items": {"type": "STRING"}},
+                "tags": {"type": "ARRAY", "items": {"type": "STRING", "enum": tags}},
+                "explanation": {"type": "STRING"}
+            },
+            "required": ["tokens", "tags", "explanation"]
+        }
     
     def create_prompt(self, text: str) -> str:
         """Create a prompt for the Gemini model."""
@@ -102,117 +108,67 @@ class DisfluencyTagger:
         """
         return prompt
 
-    def split_text_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences using NLTK."""
-        return sent_tokenize(text)
+    def split_text_into_sentences(self, text: Union[str, TranscriptDocument]) -> List[str]:
+        """Sentences of the text (NLTK Punkt), or of a transcript document as segmented for the content analyzer."""
+        return TranscriptDocument.coerce(text).sentences
 
-    def tag_text(self, text: str, max_retries=5, initial_retry_delay=2, max_retry_delay=60) -> Dict[str, Any]:
-        """Tag disfluencies in the text using Gemini with exponential backoff for rate limits."""
+    def tag_text(self, text: str, deadline: Optional[float] = None, cancel=None) -> Dict[str, Any]:
+        """Tag disfluencies in the text; rate limits, errors and invalid answers are retried by the runner."""
         prompt = self.create_prompt(text)
-        retry_delay = initial_retry_delay
-        
-        for attempt in range(max_retries):
-            try:
-                response = self.client.generate_content(prompt)
-                
-                # Extract JSON from response, handling markdown code blocks
-                response_text = response.text
-                
-                # Check if response is wrapped in markdown code blocks
-                if response_text.startswith("```") and "```" in response_text[3:]:
-                    # Extract content between markdown code blocks
-                    start_idx = response_text.find("\n") + 1
-                    end_idx = response_text.rfind("```")
-                    response_text = response_text[start_idx:end_idx].strip()
-                
-                # Remove "json" if it appears at the start of the code block
-                if response_text.startswith("json"):
-                    response_text = response_text[4:].strip()
-                
-                try:
-                    result = json.loads(response_text)
-                    # Validate response structure
-                    if not all(k in result for k in ["tokens", "tags", "explanation"]):
-                        raise ValueError("Missing required fields in response")
-                    if len(result["tokens"]) != len(result["tags"]):
-                        raise ValueError("Token and tag counts don't match")
-                    return result
-                except json.JSONDecodeError as e:
-                    if attempt == max_retries - 1:
-                        raise ValueError(f"Failed to parse JSON from response: {response_text}\nError: {str(e)}")
-            
-            except Exception as e:
-                error_str = str(e).lower()
-                
-                # Check if error is related to rate limiting
-                is_rate_limit = any(phrase in error_str for phrase in ["rate limit", "quota", "too many requests", "429"])
-                
-                if attempt == max_retries - 1:
-                    raise
-                
-                # Apply exponential backoff with jitter for rate limits
-                if is_rate_limit:
-                    # Add jitter to prevent all retries happening simultaneously
-                    jitter = random.uniform(0.5, 1.5)
-                    wait_time = min(retry_delay * jitter, max_retry_delay)
-                    print(f"Rate limit hit. Attempt {attempt+1} failed: {str(e)}. Waiting for {wait_time:.2f} seconds...")
-                    time.sleep(wait_time)
-                    # Exponential backoff
-                    retry_delay *= 2
-                else:
-                    # For other errors, use standard retry
-                    print(f"Attempt {attempt+1} failed: {str(e)}. Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    
-        # If we've made it here, all retries failed
-        raise Exception(f"Failed to tag text after {max_retries} attempts")
+        return self.runner.generate_json('disfluency', prompt, self._validate_tagging, deadline, cancel,
+                                         self.response_schema)
     
-    def tag_passage(self, passage: str, batch_size=1) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _validate_tagging(result: Any) -> None:
+        """Reject answers with missing fields or misaligned tokens and tags (retried like invalid JSON)."""
+        if not isinstance(result, dict) or not all(k in result for k in ["tokens", "tags", "explanation"]):
+            raise InvalidResponseError("Missing required fields in response")
+        if len(result["tokens"]) != len(result["tags"]):
+            raise InvalidResponseError("Token and tag counts don't match")
+    
+    def tag_passage(self, passage: Union[str, TranscriptDocument], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Tag an entire passage by splitting it into sentences and processing each one.
-        Optionally processes sentences in batches to control API usage.
+        Sentences of a batch are tagged concurrently (up to the runner's concurrency cap).
         
         Args:
-            passage: A text passage to analyze
-            batch_size: Number of sentences to process in each batch
+            passage: A text passage or an already segmented transcript
+            batch_size: Number of sentences to submit together (default: all)
             
         Returns:
             List of dictionaries with tagged results for each sentence
         """
-        # Split the passage into sentences
-        sentences = self.split_text_into_sentences(passage)
+        # Split the passage into sentences, skipping empty ones (keeping each sentence's index)
+        sentences = [(index, sentence) for index, sentence in enumerate(self.split_text_into_sentences(passage))
+                     if sentence.strip()]
+        batch_size = batch_size or max(1, len(sentences))
         results = []
         
         # Process sentences in batches
         for i in range(0, len(sentences), batch_size):
             batch = sentences[i:i+batch_size]
+            prompts = [self.create_prompt(sentence) for _, sentence in batch]
             
-            for sentence in batch:
-                # Skip empty sentences
-                if not sentence.strip():
-                    continue
-                    
-                try:
-                    result = self.tag_text(sentence)
-                    # Add the original sentence to the result
-                    result["sentence"] = sentence
-                    results.append(result)
-                    print(f"Successfully tagged: {sentence}")
-                except Exception as e:
+            tagged = self.runner.map_json('disfluency', prompts, self._validate_tagging, schema=self.response_schema)
+            for (index, sentence), result in zip(batch, tagged):
+                if isinstance(result, Exception):
                     print(f"Error tagging sentence: {sentence}")
-                    print(f"Error details: {str(e)}")
+                    print(f"Error details: {str(result)}")
                     # Add a failed result to maintain the sentence order
                     results.append({
                         "sentence": sentence,
+                        "sentence_index": index,
                         "tokens": [],
                         "tags": [],
-                        "explanation": f"Failed to tag: {str(e)}",
-                        "error": str(e)
+                        "explanation": f"Failed to tag: {str(result)}",
+                        "error": str(result)
                     })
-                    
-            # Sleep between batches to avoid hitting rate limits too quickly
-            if i + batch_size < len(sentences):
-                time.sleep(2)  # 2-second pause between batches
+                else:
+                    # Add the original sentence to the result
+                    result["sentence"] = sentence
+                    result["sentence_index"] = index
+                    results.append(result)
+                    print(f"Successfully tagged: {sentence}")
                 
         return results
     
@@ -250,37 +206,24 @@ class DisfluencyTagger:
                 stats["sentences_with_disfluencies"] += 1
             
             # Count disfluencies by type and collect examples
-            i = 0
-            while i < len(tags):
-                if tags[i].startswith("B-"):
-                    # Extract the disfluency type
-                    disfluency_type = tags[i][2:]  # Remove "B-" prefix
-                    
-                    # Count the disfluency
-                    stats["disfluency_counts"][disfluency_type] += 1
-                    
-                    # Collect example
-                    start_idx = i
-                    i += 1
-                    while i < len(tags) and tags[i].startswith("I-"):
-                        i += 1
-                    
-                    # Extract the disfluency example
-                    disfluency_text = " ".join(tokens[start_idx:i])
-                    
-                    # Get some context (up to 5 tokens before and after)
-                    context_start = max(0, start_idx - 5)
-                    context_end = min(len(tokens), i + 5)
-                    context = " ".join(tokens[context_start:context_end])
-                    
-                    # Store example with context
-                    if len(stats["disfluency_examples"][disfluency_type]) < 5:  # Limit to 5 examples per type
-                        stats["disfluency_examples"][disfluency_type].append({
-                            "text": disfluency_text,
-                            "context": context
-                        })
-                else:
-                    i += 1
+            for disfluency_type, start_idx, end_idx in iter_disfluency_spans(tags):
+                # Count the disfluency
+                stats["disfluency_counts"][disfluency_type] += 1
+                
+                # Extract the disfluency example
+                disfluency_text = " ".join(tokens[start_idx:end_idx])
+                
+                # Get some context (up to 5 tokens before and after)
+                context_start = max(0, start_idx - 5)
+                context_end = min(len(tokens), end_idx + 5)
+                context = " ".join(tokens[context_start:context_end])
+                
+                # Store example with context
+                if len(stats["disfluency_examples"][disfluency_type]) < 5:  # Limit to 5 examples per type
+                    stats["disfluency_examples"][disfluency_type].append({
+                        "text": disfluency_text,
+                        "context": context
+                    })
         
         # Calculate percentages
         if stats["total_tokens"] > 0:
@@ -292,13 +235,13 @@ class DisfluencyTagger:
             
         return stats
     
-    def analyze_passage(self, passage: str, batch_size=1) -> Dict[str, Any]:
+    def analyze_passage(self, passage: Union[str, TranscriptDocument], batch_size: Optional[int] = None) -> Dict[str, Any]:
         """
         Analyze a passage and return both tagged results and statistics without writing to files.
         
         Args:
-            passage: A text passage to analyze
-            batch_size: Number of sentences to process in each batch
+            passage: A text passage or an already segmented transcript
+            batch_size: Number of sentences to submit together (default: all)
             
         Returns:
             Dictionary with 'results' (tagged sentences) and 'stats' (disfluency statistics)
@@ -314,6 +257,35 @@ class DisfluencyTagger:
             "results": results,
             "stats": stats
         }
+    
+    def analyze_disfluency(self, transcript: Union[str, TranscriptDocument],
+                           batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Analyze a transcript for the analysis pipeline.
+        
+        Args:
+            transcript: Transcript text or document
+            batch_size: Number of sentences to submit together (default: all)
+            
+        Returns:
+            The disfluency statistics with total_disfluencies (read by the evaluator),
+            the tagged sentences under 'results' and, for a document with word
+            timestamps, the disfluencies located in time under 'timeline'; or an
+            'error' if no sentence could be tagged
+        """
+        document = TranscriptDocument.coerce(transcript)
+        analysis = self.analyze_passage(document, batch_size)
+        results = analysis["results"]
+        if results and all("error" in result for result in results):
+            return {"error": f"Failed to tag any sentence: {results[-1]['error']}"}
+        
+        stats = analysis["stats"]
+        return {
+            **stats,
+            "total_disfluencies": sum(stats["disfluency_counts"].values()),
+            "results": results,
+            "timeline": build_disfluency_timeline(document, results)
+        }
 
     def print_disfluency_stats(self, stats: Dict[str, Any]):
         """
@@ -0,0 +1,134 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..transcript import TranscriptDocument, normalize_word
+
+# Transcribed words searched past the current one when a token does not match it
+# (words the LLM dropped); keeps the merge linear
+RESYNC_WINDOW = 3
+
+
+def iter_disfluency_spans(tags: List[str]) -> Iterator[Tuple[str, int, int]]:
+    """Yield (type, first token, end token) of each B-/I- tagged disfluency."""
+    i = 0
+    while i < len(tags):
+        if tags[i].startswith("B-"):
+            start = i
+            i += 1
+            while i < len(tags) and tags[i].startswith("I-"):
+                i += 1
+            yield tags[start][2:], start, i
+        else:
+            i += 1
+
+
+def align_tokens(tokens: List[str], words: List[str], first: int, end: int) -> List[Optional[Tuple[int, int]]]:
+    """
+    Match tagged tokens to transcribed words [first, end) in one forward pass.
+
+    Tokens and words are compared without case or punctuation, character by
+    character, so a token may cover part of a word ("do" + "n't") or several
+    words. A token that does not continue at the current word is tried at the
+    next RESYNC_WINDOW words, and left unmatched otherwise (an LLM
+    normalization such as "sooo" for "so", or a word Whisper did not time).
+
+    Returns:
+        Per token, the (first, last) index of the words it covers, or None
+    """
+    normalized = [normalize_word(word) for word in words[first:end]]
+    matches: List[Optional[Tuple[int, int]]] = []
+    word, offset = 0, 0
+
+    def consume(text: str, word: int, offset: int) -> Optional[Tuple[int, int, int]]:
+        """Match text from (word, offset); returns (first word, next word, next offset)."""
+        start = None
+        position = 0
+        while position < len(text):
+            if word >= len(normalized):
+                return None
+            remainder = normalized[word][offset:]
+            if not remainder:
+                word, offset = word + 1, 0
+                continue
+            size = min(len(remainder), len(text) - position)
+            if remainder[:size] != text[position:position + size]:
+                return None
+            if start is None:
+                start = word
+            position += size
+            offset += size
+            if offset == len(normalized[word]):
+                word, offset = word + 1, 0
+        return start, word, offset
+
+    for token in tokens:
+        text = normalize_word(token)
+        if not text:
+            matches.append(None)
+            continue
+        match = consume(text, word, offset)
+        for skip in range(1, RESYNC_WINDOW + 1):
+            if match is not None:
+                break
+            match = consume(text, word + skip, 0)
+        if match is None:
+            matches.append(None)
+            continue
+        start, word, offset = match
+        last = word - 1 if offset == 0 else word
+        matches.append((first + start, first + last))
+    return matches
+
+
+def build_disfluency_timeline(document: TranscriptDocument,
+                              tagged_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Locate the tagged disfluencies in time using the transcript's word timestamps.
+
+    Each sentence's tokens are merged with the words spoken in it (see
+    align_tokens). A disfluency whose tokens all went unmatched is placed
+    between its nearest matched neighbours and marked approximate.
+
+    Args:
+        document: Transcript with word timestamps
+        tagged_results: Tagged sentences from DisfluencyTagger.tag_passage
+
+    Returns:
+        Disfluencies ordered by time, each with type, text, start and end
+        seconds, sentence_index and approximate
+    """
+    if not document.has_word_times:
+        return []
+
+    times = document.word_times
+    timeline = []
+    for result in tagged_results:
+        index = result.get("sentence_index")
+        tokens, tags = result.get("tokens", []), result.get("tags", [])
+        if "error" in result or index is None or not tokens:
+            continue
+        first, end = document.sentence_words(index)
+        if first == end:
+            continue
+        matches = align_tokens(tokens, document.words, first, end)
+
+        for disfluency_type, start_token, end_token in iter_disfluency_spans(tags):
+            matched = [match for match in matches[start_token:end_token] if match is not None]
+            approximate = not matched
+            if matched:
+                start, stop = float(times[matched[0][0], 0]), float(times[matched[-1][1], 1])
+            else:
+                before = next((m for m in reversed(matches[:start_token]) if m is not None), None)
+                after = next((m for m in matches[end_token:] if m is not None), None)
+                start = float(times[before[1], 1]) if before else float(times[first, 0])
+                stop = float(times[after[0], 0]) if after else float(times[end - 1, 1])
+            timeline.append({
+                "type": disfluency_type,
+                "text": " ".join(tokens[start_token:end_token]),
+                "start": round(start, 2),
+                "end": round(max(start, stop), 2),
+                "sentence_index": index,
+                "approximate": approximate
+            })
+
+    timeline.sort(key=lambda event: event["start"])
+    return timeline
@@ -0,0 +1,185 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+
+# How a response was parsed (reported to request observers when not None)
+EXTRACTED = 'extracted'  # JSON found inside surrounding prose
+REPAIRED = 'repaired'    # Syntax fixed locally (truncation, trailing commas)
+
+_STRUCTURAL = '{}[]:,'
+_DECODER = json.JSONDecoder(strict=False)
+
+
+class InvalidResponseError(ValueError):
+    """The LLM answered, but not with the JSON the caller expects."""
+
+
+class _Frame:
+    """An open object or array while scanning."""
+
+    __slots__ = ('closer', 'safe', 'expect_key')
+
+    def __init__(self, closer: str, safe: int):
+        self.closer = closer
+        # Output length up to the last complete member; a truncated document is cut back to it
+        self.safe = safe
+        self.expect_key = closer == '}'
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+        while out and out[-1].isspace():
+            out.pop()
+
+
+def _is_scalar(text: str) -> bool:
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
+
+
+def repair_json(text: str) -> Optional[str]:
+    """
+    Turn the first JSON object or array in the text into valid JSON in one pass.
+
+    Trailing commas are dropped and a truncated document is cut back to its
+    last complete member (a truncated string value is kept and closed) before
+    the open strings, objects and arrays are closed. Text after the value is
+    ignored.
+
+    Returns:
+        The repaired JSON text, or None if the text has no object or array
+    """
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if not starts:
+        return None
+
+    out: List[str] = []
+    stack: List[_Frame] = []
+    in_string = escape = string_is_key = False
+    scalar_start = None
+
+    def complete_value():
+        if stack:
+            stack[-1].safe = len(out)
+
+    for ch in text[min(starts):]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if not string_is_key:
+                    complete_value()
+            continue
+
+        if scalar_start is not None and (ch in _STRUCTURAL or ch.isspace() or ch == '"'):
+            scalar_start = None
+            complete_value()
+
+        if ch == '"':
+            in_string = True
+            string_is_key = bool(stack) and stack[-1].expect_key
+            if string_is_key:
+                stack[-1].expect_key = False
+            out.append(ch)
+        elif ch in '{[':
+            out.append(ch)
+            stack.append(_Frame('}' if ch == '{' else ']', len(out)))
+        elif ch in '}]':
+            if not stack or stack[-1].closer != ch:
+                break
+            _strip_trailing_comma(out)
+            out.append(stack.pop().closer)
+            if not stack:
+                return ''.join(out)
+            complete_value()
+        elif ch == ',':
+            out.append(ch)
+            if stack and stack[-1].closer == '}':
+                stack[-1].expect_key = True
+        elif ch == ':' or ch.isspace():
+            out.append(ch)
+        else:
+            if scalar_start is None:
+                scalar_start = len(out)
+            out.append(ch)
+
+    if not stack:
+        return ''.join(out)
+
+    # Truncated: keep what is complete, then close every open container
+    if in_string and not string_is_key:
+        if escape:
+            out.pop()
+        out.append('"')
+        complete_value()
+    elif scalar_start is not None and _is_scalar(''.join(out[scalar_start:])):
+        complete_value()
+    del out[stack[-1].safe:]
+    for frame in reversed(stack):
+        _strip_trailing_comma(out)
+        out.append(frame.closer)
+    return ''.join(out)
+
+
+def _strip_code_fence(text: str) -> str:
+    # Check if response is wrapped in markdown code blocks
+    if text.startswith("```") and "```" in text[3:]:
+        start_idx = text.find("\n") + 1
+        end_idx = text.rfind("```")
+        text = text[start_idx:end_idx].strip()
+    # Remove "json" if it appears at the start of the code block
+    if text.startswith("json"):
+        text = text[4:].strip()
+    return text
+
+
+def parse_json_response(text: str) -> Tuple[Any, Optional[str]]:
+    """
+    Parse the JSON of an LLM answer, repairing it locally if needed.
+
+    Tries, in order: the whole text (structured output), the text inside a
+    ```json code block, the first JSON value inside surrounding prose, and
+    the first value after repair_json.
+
+    Returns:
+        Tuple of (parsed value, None | EXTRACTED | REPAIRED)
+
+    Raises:
+        InvalidResponseError: If no JSON can be recovered
+    """
+    text = (text or '').strip()
+    try:
+        return json.loads(text), None
+    except ValueError:
+        pass
+
+    body = _strip_code_fence(text)
+    if body is not text:
+        try:
+            return json.loads(body), None
+        except ValueError:
+            pass
+
+    starts = [i for i in (body.find('{'), body.find('[')) if i >= 0]
+    if starts:
+        try:
+            value, _ = _DECODER.raw_decode(body, min(starts))
+            return value, EXTRACTED
+        except ValueError:
+            pass
+        repaired = repair_json(body)
+        try:
+            return _DECODER.decode(repaired), REPAIRED
+        except ValueError:
+            pass
+    raise InvalidResponseError(f"Failed to parse JSON from response: {text[:200]}")
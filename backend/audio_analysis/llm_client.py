@@ -0,0 +1,261 @@
+import http.client
+import json
+import queue
+import socket
+import threading
+from http import HTTPStatus
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+LLM_BACKENDS = ('gemini', 'http', 'mock')
+
+
+class LLMResponse:
+    """Text of a generated answer (the part of a Gemini response the analyzers use)."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LLMRequestError(Exception):
+    """
+    A request rejected by the LLM API.
+
+    Carries the HTTP status, used by the retry policy to tell rate limits (429)
+    and server errors (5xx) from requests that will never succeed (other 4xx).
+    """
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = 'Error'
+        super().__init__(f"{status} {reason}: {message}")
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class LLMClient:
+    """
+    Interface the content and disfluency analyzers use to call the LLM.
+
+    Implementations must be safe to call from several threads at once.
+    """
+
+    def generate_content(self, prompt: str, timeout: Optional[float] = None,
+                         response_schema: Optional[Dict[str, Any]] = None) -> LLMResponse:
+        """
+        Generate an answer to a prompt.
+
+        Args:
+            prompt: Prompt text
+            timeout: Seconds the request may take (None = the client's default)
+            response_schema: Ask for JSON output matching this schema (Gemini's
+                OpenAPI subset: type, properties, items, required, ...)
+
+        Raises:
+            LLMRequestError, TimeoutError or ConnectionError on request failures
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release pooled connections."""
+
+
+class GeminiClient(LLMClient):
+    """Gemini through the google-generativeai SDK (which keeps its own connections)."""
+
+    def __init__(self, api_key: str, model: str = DEFAULT_MODEL, temperature: float = 0.0):
+        if not api_key:
+            raise ValueError("API key not provided. Set GEMINI_API_KEY environment variable or pass api_key parameter.")
+        import google.generativeai as genai
+
+        # Configure the genai library with the API key
+        genai.configure(api_key=api_key)
+        self.model = model
+        self.temperature = temperature
+        self._model = genai.GenerativeModel(model_name=model, generation_config={"temperature": temperature})
+
+    def generate_content(self, prompt: str, timeout: Optional[float] = None,
+                         response_schema: Optional[Dict[str, Any]] = None) -> LLMResponse:
+        request_options = {'timeout': timeout} if timeout is not None else None
+        generation_config = None
+        if response_schema is not None:
+            generation_config = {"temperature": self.temperature, "response_mime_type": "application/json",
+                                 "response_schema": response_schema}
+        return self._model.generate_content(prompt, generation_config=generation_config,
+                                            request_options=request_options)
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, reused across requests and threads."""
+
+    def __init__(self, scheme: str, host: str, port: Optional[int], max_idle: int):
+        self._factory = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        self._host = host
+        self._port = port
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self.created = 0
+        self._lock = threading.Lock()
+
+    def get(self, timeout: float):
+        """Take an idle connection (most recently used first) or open a new one."""
+        try:
+            connection = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            connection = self._factory(self._host, self._port, timeout=timeout)
+            with self._lock:
+                self.created += 1
+            reused = False
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection, reused
+
+    def put(self, connection) -> None:
+        """Return a healthy connection for reuse (closed if the pool is full)."""
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HTTPLLMClient(LLMClient):
+    """
+    Any server speaking the Gemini REST generateContent API.
+
+    Used with the local stand-in server (python -m audio_analysis.mock_llm)
+    or with the Gemini API itself. Connections are kept alive and pooled,
+    so consecutive requests skip the TCP (and TLS) handshake.
+    """
+
+    def __init__(self, base_url: str, model: str = DEFAULT_MODEL, api_key: Optional[str] = None,
+                 temperature: float = 0.0, timeout: float = 120.0, max_idle_connections: int = 8):
+        if not base_url:
+            raise ValueError("base_url is required for the HTTP LLM client (set LLM_BASE_URL)")
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Invalid LLM base URL '{base_url}'")
+        self.path = f"{parts.path.rstrip('/')}/v1beta/models/{model}:generateContent"
+        self.model = model
+        self.api_key = api_key
+        self.temperature = temperature
+        self.timeout = timeout
+        self._pool = _ConnectionPool(parts.scheme, parts.hostname, parts.port, max_idle_connections)
+
+    @property
+    def connections_created(self) -> int:
+        """Connections opened so far (stays low when connections are reused)."""
+        return self._pool.created
+
+    def generate_content(self, prompt: str, timeout: Optional[float] = None,
+                         response_schema: Optional[Dict[str, Any]] = None) -> LLMResponse:
+        generation_config = {"temperature": self.temperature}
+        if response_schema is not None:
+            generation_config.update(responseMimeType="application/json", responseSchema=response_schema)
+        body = json.dumps({
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": generation_config
+        }).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['x-goog-api-key'] = self.api_key
+
+        status, response_headers, data = self._send(body, headers, timeout if timeout is not None else self.timeout)
+        if status != 200:
+            raise LLMRequestError(status, self._error_message(data), self._retry_after(response_headers))
+        try:
+            payload = json.loads(data.decode('utf-8'))
+        except ValueError:
+            raise LLMRequestError(502, "Response body is not JSON")
+        return LLMResponse(self._extract_text(payload))
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _send(self, body: bytes, headers: Dict[str, str], timeout: float):
+        """POST the request; a reused connection the server already closed is retried once on a new one."""
+        for _ in range(2):
+            connection, reused = self._pool.get(timeout)
+            try:
+                connection.request('POST', self.path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except socket.timeout:
+                connection.close()
+                raise TimeoutError(f"LLM request timed out after {timeout:.1f} s")
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused:
+                    continue
+                raise ConnectionError("LLM server closed the connection")
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise ConnectionError(f"LLM request failed: {e}") from e
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._pool.put(connection)
+            return response.status, response.headers, data
+        raise ConnectionError("LLM server closed the connection")
+
+    @staticmethod
+    def _retry_after(headers) -> Optional[float]:
+        try:
+            return float(headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _error_message(data: bytes) -> str:
+        try:
+            return json.loads(data.decode('utf-8'))['error']['message']
+        except (ValueError, KeyError, TypeError):
+            return 'request failed'
+
+    @staticmethod
+    def _extract_text(payload: Dict[str, Any]) -> str:
+        try:
+            parts = payload['candidates'][0]['content']['parts']
+        except (KeyError, IndexError, TypeError):
+            raise LLMRequestError(502, f"Unexpected response from the LLM API: {json.dumps(payload)[:200]}")
+        return ''.join(part.get('text', '') for part in parts)
+
+
+def create_llm_client(backend: str = 'gemini', api_key: Optional[str] = None, model: str = DEFAULT_MODEL,
+                      base_url: Optional[str] = None, mock_options: Optional[Dict[str, Any]] = None) -> LLMClient:
+    """
+    Create the LLM client for a backend.
+
+    Args:
+        backend: 'gemini' (SDK, needs api_key), 'http' (Gemini REST API at
+            base_url) or 'mock' (in-process stand-in, no network)
+        api_key: Gemini API key
+        model: Model name
+        base_url: Server URL for the 'http' backend
+        mock_options: Keyword arguments of MockLLMBackend for the 'mock' backend
+
+    Returns:
+        The client
+    """
+    if backend == 'gemini':
+        return GeminiClient(api_key, model)
+    if backend == 'http':
+        return HTTPLLMClient(base_url, model, api_key=api_key)
+    if backend == 'mock':
+        from .mock_llm import MockLLMBackend, MockLLMClient
+        return MockLLMClient(MockLLMBackend(**(mock_options or {})))
+    raise ValueError(f"Unknown LLM backend '{backend}' (expected one of {', '.join(LLM_BACKENDS)})")
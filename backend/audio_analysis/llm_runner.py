@@ -0,0 +1,302 @@
+import asyncio
+import http.client
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .json_repair import InvalidResponseError, parse_json_response
+from .llm_client import LLMClient
+from .rate_limiter import RateLimiter
+from .request_observers import record_repair, record_retry, timed_request
+
+
+# Error classes of the retry policy (also the reasons reported to request observers)
+RATE_LIMIT = 'rate_limit'
+TRANSIENT = 'transient'
+INVALID_JSON = 'invalid_json'
+FATAL = 'fatal'
+
+
+class DeadlineExceededError(TimeoutError):
+    """The request (including its retries) did not finish before its deadline."""
+
+
+class RequestCancelledError(Exception):
+    """The request was cancelled by the caller or because the runner was closed."""
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classify a request failure for the retry policy.
+
+    HTTP statuses come from LLMRequestError.status or the `code` of
+    google.api_core exceptions (ResourceExhausted is 429, ServiceUnavailable
+    503, ...). Rate limits and server or network errors are worth retrying;
+    other client errors and unexpected exceptions are not.
+
+    Returns:
+        RATE_LIMIT, TRANSIENT, INVALID_JSON or FATAL
+    """
+    if isinstance(error, InvalidResponseError):
+        return INVALID_JSON
+    status = getattr(error, 'status', None)
+    if not isinstance(status, int):
+        status = getattr(error, 'code', None)
+    if isinstance(status, int) and 100 <= status < 600:
+        if status == 429:
+            return RATE_LIMIT
+        if status in (408, 409) or status >= 500:
+            return TRANSIENT
+        return FATAL
+    if isinstance(error, (TimeoutError, ConnectionError, http.client.HTTPException)):
+        return TRANSIENT
+    return FATAL
+
+
+class RetryPolicy:
+    """
+    Which failures are retried, how often and after how long.
+
+    Rate limits and transient errors back off exponentially with jitter (a
+    server's Retry-After wins if it is longer); invalid JSON is retried at once.
+    """
+
+    def __init__(self, max_attempts: int = 5, initial_delay: float = 2.0, max_delay: float = 60.0,
+                 multiplier: float = 2.0, jitter: float = 0.5):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def should_retry(self, error_class: str, attempt: int) -> bool:
+        """Whether to retry after the given (1-based) attempt failed."""
+        return error_class != FATAL and attempt < self.max_attempts
+
+    def delay(self, error_class: str, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Seconds to wait before the next attempt."""
+        if error_class == INVALID_JSON:
+            return 0.0
+        delay = min(self.initial_delay * self.multiplier ** (attempt - 1), self.max_delay)
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return min(delay, self.max_delay)
+
+
+class LLMRunner:
+    """
+    Shared request layer of the content and disfluency analyzers.
+
+    Every request goes through one client (connection reuse), the shared rate
+    limiter, a cap on concurrent requests and one retry policy. With a response
+    schema, requests ask for structured JSON output; answers that still fail
+    to parse are repaired locally (json_repair) before a retry is considered,
+    and every successful repair is reported as a retry avoided. Requests take
+    an optional deadline (covering all attempts and waits) and a cancel event;
+    close() cancels everything in flight. Batches of prompts run concurrently
+    on the runner's threads (map_json, or iter_json to handle answers as they
+    arrive), and agenerate_json is an awaitable version of generate_json for
+    asyncio callers.
+    """
+
+    def __init__(self, client: LLMClient, rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None, max_concurrency: int = 4,
+                 default_deadline: Optional[float] = None, structured_output: bool = True):
+        """
+        Args:
+            client: LLM client (shared by every caller)
+            rate_limiter: Spaces requests to stay under the API quota
+            retry_policy: Retry policy (default: 5 attempts, 2 s initial backoff)
+            max_concurrency: Requests in flight at once, across all callers
+            default_deadline: Seconds a request may take including retries (None = no limit)
+            structured_output: Send response schemas (JSON mode) with the requests
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.max_concurrency = max_concurrency
+        self.default_deadline = default_deadline
+        self.structured_output = structured_output
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='llm')
+        self._active = []  # Cancel events of requests in flight (one entry per request)
+        self._active_lock = threading.Lock()
+        self._closed = False
+
+    def generate_json(self, analyzer: str, prompt: str, validate: Optional[Callable[[Any], None]] = None,
+                      deadline: Optional[float] = None, cancel: Optional[threading.Event] = None,
+                      schema: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Send a prompt and parse the JSON answer, retrying per the policy.
+
+        Args:
+            analyzer: Name of the calling analyzer (for request observers)
+            prompt: Prompt text
+            validate: Raises InvalidResponseError if the parsed answer is unusable
+            deadline: Seconds the request may take including retries (default: the runner's)
+            cancel: Event that aborts the request when set
+            schema: Response schema (Gemini OpenAPI subset) for structured output
+
+        Returns:
+            The parsed JSON answer
+
+        Raises:
+            DeadlineExceededError: If the deadline passed before an answer arrived
+            RequestCancelledError: If the request was cancelled
+            The last error, once it is not retryable or the attempts are used up
+        """
+        deadline = deadline if deadline is not None else self.default_deadline
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        cancel = cancel or threading.Event()
+        with self._active_lock:
+            if self._closed:
+                raise RequestCancelledError("LLM runner is closed")
+            self._active.append(cancel)
+        try:
+            return self._run(analyzer, prompt, validate, deadline_at, cancel,
+                             schema if self.structured_output else None)
+        finally:
+            with self._active_lock:
+                self._active.remove(cancel)
+
+    def map_json(self, analyzer: str, prompts: List[str], validate: Optional[Callable[[Any], None]] = None,
+                 deadline: Optional[float] = None, cancel: Optional[threading.Event] = None,
+                 schema: Optional[Dict[str, Any]] = None) -> List[Union[Any, Exception]]:
+        """
+        Run several prompts concurrently (up to the concurrency cap).
+
+        Returns:
+            One entry per prompt, in order: the parsed answer or the exception
+            that ended its request
+        """
+        results = [None] * len(prompts)
+        for index, result in self.iter_json(analyzer, prompts, validate, deadline, cancel, schema):
+            results[index] = result
+        return results
+
+    def iter_json(self, analyzer: str, prompts: List[str], validate: Optional[Callable[[Any], None]] = None,
+                  deadline: Optional[float] = None, cancel: Optional[threading.Event] = None,
+                  schema: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[int, Union[Any, Exception]]]:
+        """
+        Run several prompts concurrently, yielding each answer as soon as it arrives.
+
+        Requests not yet started are dropped if the caller stops iterating.
+
+        Returns:
+            Iterator of (prompt index, parsed answer or the exception that
+            ended its request), in completion order
+        """
+        if self._closed:
+            raise RequestCancelledError("LLM runner is closed")
+        if len(prompts) == 1:
+            try:
+                yield 0, self.generate_json(analyzer, prompts[0], validate, deadline, cancel, schema)
+            except Exception as e:
+                yield 0, e
+            return
+
+        futures = {
+            self._executor.submit(self.generate_json, analyzer, prompt, validate, deadline, cancel, schema): index
+            for index, prompt in enumerate(prompts)
+        }
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def agenerate_json(self, analyzer: str, prompt: str, validate: Optional[Callable[[Any], None]] = None,
+                             deadline: Optional[float] = None, schema: Optional[Dict[str, Any]] = None) -> Any:
+        """Awaitable generate_json; cancelling the awaiting task cancels the request."""
+        cancel = threading.Event()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, partial(
+            self.generate_json, analyzer, prompt, validate, deadline, cancel, schema
+        ))
+        try:
+            return await future
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    def close(self) -> None:
+        """Cancel the requests in flight, stop accepting new ones and release connections."""
+        with self._active_lock:
+            self._closed = True
+            for cancel in self._active:
+                cancel.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
+
+    def _run(self, analyzer: str, prompt: str, validate: Optional[Callable[[Any], None]],
+             deadline_at: Optional[float], cancel: threading.Event, schema: Optional[Dict[str, Any]]) -> Any:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return self._attempt(analyzer, prompt, validate, deadline_at, cancel, schema)
+            except (DeadlineExceededError, RequestCancelledError):
+                raise
+            except Exception as e:
+                error_class = classify_error(e)
+                if not self.retry_policy.should_retry(error_class, attempt):
+                    raise
+                delay = self.retry_policy.delay(error_class, attempt, e)
+                remaining = self._remaining(deadline_at)
+                if remaining is not None and delay >= remaining:
+                    raise DeadlineExceededError(
+                        f"Deadline reached after {attempt} attempt(s); last error: {e}"
+                    ) from e
+                record_retry(analyzer, error_class)
+                print(f"{analyzer} request attempt {attempt} failed ({error_class}): {e}. "
+                      f"Retrying in {delay:.2f} seconds...")
+                if delay > 0 and cancel.wait(delay):
+                    raise RequestCancelledError("LLM request cancelled") from e
+
+    def _attempt(self, analyzer: str, prompt: str, validate: Optional[Callable[[Any], None]],
+                 deadline_at: Optional[float], cancel: threading.Event, schema: Optional[Dict[str, Any]]) -> Any:
+        self._check(deadline_at, cancel)
+        if self.rate_limiter is not None:
+            if self.rate_limiter.acquire(max_wait=self._remaining(deadline_at), cancel=cancel) is None:
+                raise DeadlineExceededError("Deadline would pass while waiting for a rate limiter slot")
+            self._check(deadline_at, cancel)
+
+        if not self._slots.acquire(timeout=self._remaining(deadline_at)):
+            raise DeadlineExceededError("Deadline passed while waiting for a free request slot")
+        try:
+            self._check(deadline_at, cancel)
+            response = timed_request(analyzer, self.client.generate_content, prompt,
+                                     timeout=self._remaining(deadline_at), response_schema=schema)
+        finally:
+            self._slots.release()
+
+        result, repair = parse_json_response(response.text)
+        if validate is not None:
+            validate(result)
+        if repair is not None:
+            # Before local repair this answer would have been requested again
+            record_repair(analyzer, repair)
+        return result
+
+    @staticmethod
+    def _remaining(deadline_at: Optional[float]) -> Optional[float]:
+        return max(0.0, deadline_at - time.monotonic()) if deadline_at is not None else None
+
+    def _check(self, deadline_at: Optional[float], cancel: threading.Event) -> None:
+        if cancel.is_set():
+            raise RequestCancelledError("LLM request cancelled")
+        if deadline_at is not None and time.monotonic() >= deadline_at:
+            raise DeadlineExceededError("LLM request deadline exceeded")
@@ -0,0 +1,378 @@
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from .llm_client import LLMClient, LLMRequestError, LLMResponse
+
+
+_FILLERS = {'um', 'uh', 'erm', 'er', 'ah', 'hmm'}
+
+_QUALITY_DIMENSIONS = (
+    'clarity', 'coherence', 'engagement', 'relevance', 'depth',
+    'accuracy', 'tone', 'conciseness', 'readability'
+)
+
+_PROMPT_TEXT = re.compile(r'(?:Text to analyze|Content to analyze): "(.*)"\s*JSON response only', re.S)
+
+_GENERATE_PATH = re.compile(r'^/v1(?:beta)?/models/([^/:]+):generateContent$')
+
+
+class LatencyDistribution:
+    """
+    Simulated request latency in seconds.
+
+    Specs: "0.5" or "constant:0.5", "uniform:LOW,HIGH", "normal:MEAN,STD"
+    (clipped at 0) and "lognormal:MEDIAN,SIGMA" (long tail, like real LLM APIs).
+    """
+
+    KINDS = ('constant', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, kind: str = 'constant', params: Tuple[float, ...] = (0.0,)):
+        expected = {'constant': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+        if kind not in expected:
+            raise ValueError(f"Unknown latency distribution '{kind}' (expected one of {', '.join(self.KINDS)})")
+        if len(params) != expected[kind] or any(p < 0 for p in params):
+            raise ValueError(f"Latency distribution '{kind}' takes {expected[kind]} non-negative parameter(s)")
+        self.kind = kind
+        self.params = tuple(params)
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyDistribution':
+        """Parse a spec like "lognormal:0.8,0.4"."""
+        kind, _, values = spec.partition(':') if ':' in spec else ('constant', '', spec)
+        try:
+            params = tuple(float(value) for value in values.split(',') if value.strip())
+        except ValueError:
+            raise ValueError(f"Invalid latency spec '{spec}'")
+        return cls(kind.strip(), params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == 'constant':
+            return self.params[0]
+        if self.kind == 'uniform':
+            return rng.uniform(*self.params)
+        if self.kind == 'normal':
+            return max(0.0, rng.gauss(*self.params))
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+class MockLLMBackend:
+    """
+    Offline stand-in for Gemini answering the analyzers' prompts.
+
+    Content prompts get a schema-valid presentationAnalysis, disfluency prompts
+    a tokens/tags answer tagging fillers and repeated words. A request may be
+    rejected with a 429 (randomly, or when the simulated per-minute quota is
+    exceeded) or be answered with malformed JSON. Rejections return at once,
+    answers after a latency drawn from the distribution. All draws come from
+    one seeded generator, so a sequential run is repeatable; one instance can
+    be shared by threads.
+    """
+
+    # Ways an answer can be malformed; JSON mode (structured output) rules out prose around the JSON
+    MALFORMED_KINDS = ('truncated', 'trailing_comma', 'wrapped', 'prose', 'missing_fields')
+    JSON_MODE_MALFORMED_KINDS = ('truncated', 'trailing_comma', 'missing_fields')
+
+    def __init__(self, latency: Any = 0.0, rate_limit_rate: float = 0.0, malformed_rate: float = 0.0,
+                 requests_per_minute: float = 0, seed: int = 0, code_fence: bool = True):
+        """
+        Args:
+            latency: LatencyDistribution, spec string or constant seconds
+            rate_limit_rate: Probability of answering a request with 429
+            malformed_rate: Probability of answering with unparsable or incomplete JSON
+            requests_per_minute: Simulated quota; requests beyond it within a
+                sliding minute get 429 (0 = unlimited)
+            seed: Seed of the random draws
+            code_fence: Wrap answers in ```json fences like Gemini does (not in JSON mode)
+        """
+        for name, rate in (('rate_limit_rate', rate_limit_rate), ('malformed_rate', malformed_rate)):
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+        if isinstance(latency, LatencyDistribution):
+            self.latency = latency
+        elif isinstance(latency, str):
+            self.latency = LatencyDistribution.parse(latency)
+        else:
+            self.latency = LatencyDistribution('constant', (float(latency),))
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.requests_per_minute = requests_per_minute
+        self.code_fence = code_fence
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self.stats = {'requests': 0, 'answered': 0, 'rate_limited': 0, 'quota_exceeded': 0, 'malformed': 0,
+                      'timed_out': 0}
+
+    def generate(self, prompt: str, timeout: Optional[float] = None, json_mode: bool = False) -> str:
+        """
+        Answer a prompt.
+
+        Args:
+            prompt: Prompt text
+            timeout: Seconds the caller waits; longer latencies time out
+            json_mode: The request asked for structured (application/json) output
+
+        Returns:
+            Response text
+
+        Raises:
+            LLMRequestError: 429 for injected rate limits and exceeded quota
+            TimeoutError: If the drawn latency exceeds the timeout
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            latency = self.latency.sample(self._rng)
+            rate_limited = self._rng.random() < self.rate_limit_rate
+            malformed_kind = None
+            if self._rng.random() < self.malformed_rate:
+                malformed_kind = self._rng.choice(self.JSON_MODE_MALFORMED_KINDS if json_mode else self.MALFORMED_KINDS)
+            # Truncated answers stop in their last quarter, as when the output token limit is hit
+            cut = self._rng.uniform(0.75, 1.0)
+
+        # Rejections come back right away, like the real API's
+        quota_wait = self._quota_wait()
+        if quota_wait is not None:
+            self._count('quota_exceeded')
+            raise LLMRequestError(429, "Resource has been exhausted (e.g. check quota).", retry_after=quota_wait)
+        if rate_limited:
+            self._count('rate_limited')
+            raise LLMRequestError(429, "Rate limit exceeded (injected by the mock backend).")
+        if timeout is not None and latency > timeout:
+            time.sleep(max(0.0, timeout))
+            self._count('timed_out')
+            raise TimeoutError(f"LLM request timed out after {timeout:.1f} s")
+        if latency > 0:
+            time.sleep(latency)
+
+        text = _PROMPT_TEXT.search(prompt)
+        text = text.group(1) if text else ''
+        payload = disfluency_answer(text) if 'disfluencies' in prompt else content_answer(text)
+        if malformed_kind is not None:
+            self._count('malformed')
+            return self._malform(payload, malformed_kind, cut, json_mode)
+        self._count('answered')
+        return self._format(json.dumps(payload), json_mode)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _quota_wait(self) -> Optional[float]:
+        """Seconds until the quota admits another request, or None if this one is admitted."""
+        if not self.requests_per_minute:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 60.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.requests_per_minute:
+                return 60.0 - (now - self._recent[0])
+            self._recent.append(now)
+            return None
+
+    def _format(self, text: str, json_mode: bool) -> str:
+        return f"```json\n{text}\n```" if self.code_fence and not json_mode else text
+
+    def _malform(self, payload: Dict[str, Any], kind: str, cut: float, json_mode: bool) -> str:
+        text = json.dumps(payload, indent=2)
+        if kind == 'truncated':
+            return self._format(text[:max(1, int(len(text) * cut))], json_mode)
+        if kind == 'trailing_comma':
+            return self._format(re.sub(r'(["\d\]}])(\s*[}\]])', r'\1,\2', text), json_mode)
+        if kind == 'wrapped':
+            return f"Here is the analysis you asked for:\n{text}\nLet me know if you need anything else."
+        if kind == 'prose':
+            return "I'm sorry, here is my assessment of the passage: it reads well overall."
+        # missing_fields: valid JSON without the fields the analyzers need
+        return self._format(json.dumps({key: value for key, value in payload.items()
+                                        if key not in ('tags', 'presentationAnalysis')}), json_mode)
+
+
+class MockLLMClient(LLMClient):
+    """In-process client for a MockLLMBackend (no server, no network)."""
+
+    def __init__(self, backend: Optional[MockLLMBackend] = None):
+        self.backend = backend or MockLLMBackend()
+
+    def generate_content(self, prompt: str, timeout: Optional[float] = None,
+                         response_schema: Optional[Dict[str, Any]] = None) -> LLMResponse:
+        return LLMResponse(self.backend.generate(prompt, timeout, json_mode=response_schema is not None))
+
+
+def disfluency_answer(text: str) -> Dict[str, Any]:
+    """Tag fillers and immediately repeated words of a sentence."""
+    tokens = re.findall(r"\w+|[^\w\s]", text)
+    tags = []
+    for i, token in enumerate(tokens):
+        if token.lower() in _FILLERS:
+            tags.append('B-FILLER')
+        elif i > 0 and token.isalpha() and token.lower() == tokens[i - 1].lower():
+            tags.append('B-REP')
+        else:
+            tags.append('O')
+    return {'tokens': tokens, 'tags': tags, 'explanation': 'Tagged fillers and repeated words (mock backend).'}
+
+
+def content_answer(text: str) -> Dict[str, Any]:
+    """Deterministic content assessment; scores depend only on the passage length."""
+    word_count = len(text.split())
+    metrics = {}
+    for i, dimension in enumerate(_QUALITY_DIMENSIONS):
+        metrics[dimension] = {
+            'score': round(5.0 + ((word_count + i * 7) % 40) / 10, 1),
+            'description': f'{dimension.capitalize()} of the passage',
+            'positive feedback': f'The {dimension} is adequate for a passage of {word_count} words.',
+            'negative feedback': f'The {dimension} could be improved.'
+        }
+    overall = round(sum(m['score'] for m in metrics.values()) / len(metrics), 2)
+    return {
+        'presentationAnalysis': {
+            'contentQualityMetrics': metrics,
+            'overallScore': overall,
+            'summaryFeedback': 'Assessment generated by the mock LLM backend.',
+            'recommendedActions': ['Add concrete examples', 'Shorten long sentences',
+                                   'Summarize the key points', 'Reduce filler words']
+        }
+    }
+
+
+class _MockGeminiHandler(BaseHTTPRequestHandler):
+    """Gemini REST API subset: POST /v1beta/models/{model}:generateContent and GET /stats."""
+
+    # Keep-alive, so pooled clients reuse their connections
+    protocol_version = 'HTTP/1.1'
+    backend: MockLLMBackend = None
+    quiet = False
+
+    def do_POST(self):
+        # Read the body first: with keep-alive, leftover bytes would corrupt the next request
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not _GENERATE_PATH.match(self.path.split('?')[0]):
+            self._send_json(404, {'error': {'code': 404, 'message': f'Unknown path {self.path}', 'status': 'NOT_FOUND'}})
+            return
+        try:
+            request = json.loads(body or b'{}')
+            prompt = ''.join(part.get('text', '') for content in request.get('contents', [])
+                             for part in content.get('parts', []))
+            json_mode = request.get('generationConfig', {}).get('responseMimeType') == 'application/json'
+        except (ValueError, AttributeError, TypeError):
+            self._send_json(400, {'error': {'code': 400, 'message': 'Invalid JSON payload', 'status': 'INVALID_ARGUMENT'}})
+            return
+
+        try:
+            text = self.backend.generate(prompt, json_mode=json_mode)
+        except LLMRequestError as e:
+            headers = {'Retry-After': f"{math.ceil(e.retry_after)}"} if e.retry_after else {}
+            self._send_json(e.status, {'error': {'code': e.status, 'message': e.message, 'status': 'RESOURCE_EXHAUSTED'}},
+                            headers)
+            return
+        except TimeoutError as e:
+            self._send_json(504, {'error': {'code': 504, 'message': str(e), 'status': 'DEADLINE_EXCEEDED'}})
+            return
+        self._send_json(200, {
+            'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}],
+            'usageMetadata': {'promptTokenCount': len(prompt) // 4, 'candidatesTokenCount': len(text) // 4}
+        })
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.backend.get_stats())
+        else:
+            self._send_json(404, {'error': {'code': 404, 'message': f'Unknown path {self.path}', 'status': 'NOT_FOUND'}})
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def create_mock_server(backend: MockLLMBackend, host: str = '127.0.0.1', port: int = 8765,
+                       quiet: bool = False) -> ThreadingHTTPServer:
+    """
+    Create a threaded HTTP server answering Gemini REST requests from a backend.
+
+    Port 0 picks a free port (see server.server_address). Call serve_forever()
+    to run it, e.g. on a daemon thread in load tests.
+    """
+    handler = type('MockGeminiHandler', (_MockGeminiHandler,), {'backend': backend, 'quiet': quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        prog='python -m audio_analysis.mock_llm',
+        description='Local stand-in for the Gemini API. Point the backend at it with '
+                    'LLM_BACKEND=http LLM_BASE_URL=http://HOST:PORT.'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument('--latency', default='0',
+                        help='Latency distribution: SECONDS, uniform:LOW,HIGH, normal:MEAN,STD '
+                             'or lognormal:MEDIAN,SIGMA (default: 0)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help='Probability of answering with 429 (default: 0)')
+    parser.add_argument('--malformed-rate', type=float, default=0.0,
+                        help='Probability of answering with malformed JSON (default: 0)')
+    parser.add_argument('--requests-per-minute', type=float, default=0,
+                        help='Simulated quota; requests beyond it get 429 (default: unlimited)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the random draws (default: 0)')
+    parser.add_argument('--quiet', action='store_true', help='Do not log requests')
+    return parser
+
+
+def main(argv=None) -> int:
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    try:
+        backend = MockLLMBackend(latency=args.latency, rate_limit_rate=args.rate_limit_rate,
+                                 malformed_rate=args.malformed_rate,
+                                 requests_per_minute=args.requests_per_minute, seed=args.seed)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    server = create_mock_server(backend, args.host, args.port, quiet=args.quiet)
+    host, port = server.server_address[:2]
+    print(f"Mock Gemini API on http://{host}:{port} (latency {backend.latency!r}, "
+          f"429 rate {args.rate_limit_rate:g}, malformed rate {args.malformed_rate:g})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Stats: {json.dumps(backend.get_stats())}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
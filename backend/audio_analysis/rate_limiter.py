@@ -0,0 +1,47 @@
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter for Gemini API requests.
+
+    One instance is shared by every analyzer (and every concurrent analysis)
+    in the process, so the combined request rate stays under the API quota.
+    Requests are spaced evenly: at most `requests_per_minute` per minute.
+    """
+
+    def __init__(self, requests_per_minute: float = 15):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.requests_per_minute = requests_per_minute
+        self.interval = 60.0 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait: Optional[float] = None, cancel: Optional[threading.Event] = None) -> Optional[float]:
+        """
+        Block until the next request slot is available.
+
+        Args:
+            max_wait: Give up (without taking a slot) if the wait would be longer
+            cancel: Event that interrupts the wait when set (the slot stays used)
+
+        Returns:
+            Number of seconds spent waiting, or None if the slot is further
+            away than max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            if max_wait is not None and slot - now > max_wait:
+                return None
+            self._next_slot = slot + self.interval
+        wait_time = slot - now
+        if wait_time > 0:
+            if cancel is not None:
+                cancel.wait(wait_time)
+            else:
+                time.sleep(wait_time)
+        return wait_time
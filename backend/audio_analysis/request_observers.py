@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Any, Callable, List
+
+
+class RequestObserver:
+    """
+    Receives the outcome of every Gemini API request made by the analyzers.
+
+    Register an instance with add_request_observer (e.g. the application's
+    metrics); observers must be fast and must not raise.
+    """
+
+    def on_request(self, analyzer: str, seconds: float, outcome: str) -> None:
+        """Called after each request with its latency and 'success' or 'error'."""
+
+    def on_retry(self, analyzer: str, reason: str) -> None:
+        """Called before a request is retried ('rate_limit', 'transient' or 'invalid_json')."""
+
+    def on_repair(self, analyzer: str, repair: str) -> None:
+        """Called when a malformed answer was fixed locally instead of retried ('extracted' or 'repaired')."""
+
+
+_observers: List[RequestObserver] = []
+_observers_lock = threading.Lock()
+
+
+def add_request_observer(observer: RequestObserver) -> None:
+    """Register an observer for Gemini requests of every analyzer in the process."""
+    with _observers_lock:
+        if observer not in _observers:
+            _observers.append(observer)
+
+
+def remove_request_observer(observer: RequestObserver) -> None:
+    """Unregister an observer."""
+    with _observers_lock:
+        if observer in _observers:
+            _observers.remove(observer)
+
+
+def timed_request(analyzer: str, request: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Make a request and report its latency and outcome to the observers.
+
+    Args:
+        analyzer: Name of the calling analyzer (e.g. 'content')
+        request: Function making the API call (e.g. client.generate_content)
+
+    Returns:
+        The request's return value; its exceptions propagate
+    """
+    started_at = time.perf_counter()
+    outcome = 'error'
+    try:
+        response = request(*args, **kwargs)
+        outcome = 'success'
+        return response
+    finally:
+        seconds = time.perf_counter() - started_at
+        for observer in list(_observers):
+            observer.on_request(analyzer, seconds, outcome)
+
+
+def record_retry(analyzer: str, reason: str) -> None:
+    """Report that a request is about to be retried."""
+    for observer in list(_observers):
+        observer.on_retry(analyzer, reason)
+
+
+def record_repair(analyzer: str, repair: str) -> None:
+    """Report that a malformed answer was repaired, avoiding a retry."""
+    for observer in list(_observers):
+        observer.on_repair(analyzer, repair)
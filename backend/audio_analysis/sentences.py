@@ -0,0 +1,135 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+
+# Fallback when NLTK or its Punkt data is unavailable: split after ., ! or ? followed by whitespace
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+# Words and punctuation marks, each at least one LLM token
+_TOKEN_PIECE = re.compile(r'\w+|[^\w\s]')
+
+_tokenizer: Optional[Callable[[str], List[str]]] = None
+_tokenizer_checked = False
+_tokenizer_lock = threading.Lock()
+
+# Segmentations of recent texts, so the content and disfluency analyzers split a transcript once
+SEGMENTATION_CACHE_SIZE = 16
+_segmentations: 'OrderedDict[str, Tuple[str, ...]]' = OrderedDict()
+_segmentations_lock = threading.Lock()
+
+
+def ensure_sentence_tokenizer() -> bool:
+    """
+    Load the NLTK Punkt sentence tokenizer from the installed NLTK data.
+
+    Called once by the analyzer service warm-up, so no analysis pays for
+    loading it. Nothing is downloaded at runtime: install the data with
+    `python -m nltk.downloader punkt_tab` (setup.py does). Without it,
+    sentences are split on punctuation.
+
+    Returns:
+        True if NLTK sentence tokenization is available
+    """
+    global _tokenizer, _tokenizer_checked
+    with _tokenizer_lock:
+        if _tokenizer_checked:
+            return _tokenizer is not None
+        try:
+            from nltk.tokenize import sent_tokenize
+            # The first call loads the Punkt model (kept by NLTK for later calls)
+            sent_tokenize("Check the tokenizer. It works.")
+            _tokenizer = sent_tokenize
+        except (ImportError, LookupError):
+            _tokenizer = None
+        _tokenizer_checked = True
+        if _tokenizer is not None:
+            # Drop segmentations made with the punctuation fallback
+            with _segmentations_lock:
+                _segmentations.clear()
+        return _tokenizer is not None
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences (NLTK Punkt if available, else punctuation-based).
+
+    The segmentations of the most recent texts are cached, so analyzers
+    working on the same transcript split it only once.
+    """
+    if not _tokenizer_checked:
+        ensure_sentence_tokenizer()
+    with _segmentations_lock:
+        sentences = _segmentations.get(text)
+        if sentences is not None:
+            _segmentations.move_to_end(text)
+            return list(sentences)
+
+    if _tokenizer is not None:
+        sentences = tuple(_tokenizer(text))
+    else:
+        sentences = tuple(sentence for sentence in _SENTENCE_END.split(text.strip()) if sentence)
+    with _segmentations_lock:
+        _segmentations[text] = sentences
+        while len(_segmentations) > SEGMENTATION_CACHE_SIZE:
+            _segmentations.popitem(last=False)
+    return list(sentences)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the LLM token count of a text without a model tokenizer.
+
+    About four characters per token for English prose, and at least one
+    token per word or punctuation mark.
+    """
+    pieces = sum(1 for _ in _TOKEN_PIECE.finditer(text))
+    return max(pieces, (len(text) + 3) // 4)
+
+
+def pack_sentences(sentences: List[str], max_tokens: int, overlap_tokens: int = 0,
+                   token_counts: Optional[List[int]] = None) -> List[str]:
+    """
+    Pack consecutive sentences into chunks of at most max_tokens estimated tokens.
+
+    A sentence longer than the budget becomes a chunk of its own.
+
+    Args:
+        sentences: Sentences in order
+        max_tokens: Token budget of a chunk
+        overlap_tokens: Repeat up to this many tokens of trailing sentences
+            of a chunk at the start of the next one (context across the cut)
+        token_counts: Estimated tokens of each sentence, if already known
+
+    Returns:
+        Chunk texts (sentences joined by spaces)
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be at least 1")
+    chunks = []
+    current: List[Tuple[str, int]] = []
+    current_tokens = 0
+
+    if token_counts is None:
+        token_counts = [estimate_tokens(sentence) for sentence in sentences]
+    for sentence, tokens in zip(sentences, token_counts):
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(text for text, _ in current))
+            # Start the next chunk with the trailing sentences that fit in the overlap
+            carried: List[Tuple[str, int]] = []
+            carried_tokens = 0
+            for previous in reversed(current):
+                if carried_tokens + previous[1] > overlap_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous[1]
+            while carried and carried_tokens + tokens > max_tokens:
+                carried_tokens -= carried.pop(0)[1]
+            current, current_tokens = carried, carried_tokens
+        current.append((sentence, tokens))
+        current_tokens += tokens
+
+    if current:
+        chunks.append(" ".join(text for text, _ in current))
+    return chunks
@@ -0,0 +1,116 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .sentences import estimate_tokens, pack_sentences, split_sentences
+
+
+# Characters compared when matching words: lowercase letters and digits
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+# Characters searched past a word's expected position when locating it in the text
+_WORD_GAP = 16
+
+
+def normalize_word(word: str) -> str:
+    """Lowercase a word and drop punctuation and spacing, for matching tokens to transcribed words."""
+    return _NON_WORD.sub('', word.lower())
+
+
+class TranscriptDocument:
+    """
+    A transcript segmented once after transcription, shared by the content and disfluency analyzers.
+
+    Holds the text, its sentences with their character offsets and estimated
+    token counts, and the Whisper word timings when the transcription has them:
+    the words, and their start and end seconds as one (words, 2) float32 array.
+    """
+
+    def __init__(self, text: str, words: Optional[List[str]] = None, word_times: Optional[np.ndarray] = None):
+        self.text = text.strip()
+        self.sentences = split_sentences(self.text) if self.text else []
+        self.offsets = self._sentence_offsets(self.text, self.sentences)
+        self.token_counts = [estimate_tokens(sentence) for sentence in self.sentences]
+        self.words = words or []
+        self.word_times = (np.asarray(word_times, dtype=np.float32).reshape(-1, 2) if self.words
+                           else np.empty((0, 2), dtype=np.float32))
+        if len(self.word_times) != len(self.words):
+            raise ValueError("words and word_times must have the same length")
+        self._sentence_words = None
+
+    @classmethod
+    def from_whisper(cls, result: Dict[str, Any]) -> 'TranscriptDocument':
+        """Build the document from a Whisper transcription result (words if transcribed with word_timestamps)."""
+        timed_words = [word for segment in result.get('segments', []) for word in segment.get('words', [])]
+        words = [word['word'].strip() for word in timed_words]
+        word_times = np.array([(word['start'], word['end']) for word in timed_words], dtype=np.float32)
+        return cls(result.get('text', ''), words, word_times)
+
+    @classmethod
+    def coerce(cls, transcript: Union[str, 'TranscriptDocument']) -> 'TranscriptDocument':
+        """Use a document as is; segment a plain text transcript."""
+        return transcript if isinstance(transcript, cls) else cls(transcript)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.token_counts)
+
+    @property
+    def has_word_times(self) -> bool:
+        return len(self.words) > 0
+
+    def chunks(self, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+        """Whole sentences packed into chunks of at most max_tokens estimated tokens (see pack_sentences)."""
+        return pack_sentences(self.sentences, max_tokens, overlap_tokens, self.token_counts)
+
+    def sentence_words(self, index: int) -> Tuple[int, int]:
+        """
+        Range [first, end) of the timed words spoken in a sentence.
+
+        Words are assigned to the sentence their text starts in, by one merge
+        of the word and sentence offsets (computed on first use).
+        """
+        if self._sentence_words is None:
+            self._sentence_words = self._merge_sentence_words()
+        return self._sentence_words[index]
+
+    def _merge_sentence_words(self) -> List[Tuple[int, int]]:
+        # Character offset of each word in the text (words follow the text's order, a few characters apart)
+        starts = []
+        position = 0
+        for word in self.words:
+            start = self.text.find(word, position, position + len(word) + _WORD_GAP) if word else -1
+            if start < 0:
+                start = position
+            starts.append(start)
+            position = start + len(word)
+
+        ranges = []
+        word = 0
+        for _, end in self.offsets:
+            first = word
+            while word < len(starts) and starts[word] < end:
+                word += 1
+            ranges.append((first, word))
+        if ranges and word < len(starts):
+            # Words after the last sentence's end belong to it
+            ranges[-1] = (ranges[-1][0], len(starts))
+        return ranges
+
+    def __str__(self) -> str:
+        return self.text
+
+    @staticmethod
+    def _sentence_offsets(text: str, sentences: List[str]) -> List[Tuple[int, int]]:
+        """(start, end) character offsets of each sentence in the text."""
+        offsets = []
+        position = 0
+        for sentence in sentences:
+            start = text.find(sentence, position)
+            if start < 0:
+                # The tokenizer normalized the sentence; assume it follows the previous one
+                start = position
+            position = start + len(sentence)
+            offsets.append((start, position))
+        return offsets
@@ -0,0 +1,7 @@
+"""
+Benchmarks for the Auto PPT Evaluation pipeline
+
+Run from the backend directory:
+    python -m benchmarks.run --output results.json [--baseline baseline.json]
+    python -m benchmarks.compare results.json baseline.json
+"""
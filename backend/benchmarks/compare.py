@@ -0,0 +1,125 @@
+"""
+Compare benchmark results against a stored baseline
+
+Usage (from the backend directory):
+    python -m benchmarks.compare results.json baseline.json --tolerance 0.15
+
+A benchmark regresses when its median time grows by more than the tolerance
+(relative) and by more than the noise floor (absolute seconds). Exits with
+status 1 if any benchmark regressed.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+
+# Environment fields that make timings incomparable when they differ
+ENVIRONMENT_FIELDS = ('platform', 'machine', 'cpu_count', 'python')
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Load a results file written by benchmarks.run"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    tolerance: float = 0.15, noise_floor: float = 0.005) -> Dict[str, Any]:
+    """
+    Compare the median times of two result sets
+
+    Args:
+        current: Results of this run
+        baseline: Stored baseline results
+        tolerance: Allowed relative slowdown (0.15 = 15%)
+        noise_floor: Slowdowns below this many seconds are ignored
+
+    Returns:
+        Per-benchmark comparisons, the regressed and improved benchmark IDs,
+        benchmarks missing on either side and environment differences
+    """
+    current_by_id = {entry['id']: entry for entry in current.get('results', []) if entry.get('status') == 'ok'}
+    baseline_by_id = {entry['id']: entry for entry in baseline.get('results', []) if entry.get('status') == 'ok'}
+
+    comparisons = []
+    regressions, improvements = [], []
+    for benchmark_id in sorted(set(current_by_id) & set(baseline_by_id)):
+        now = current_by_id[benchmark_id]['median_seconds']
+        before = baseline_by_id[benchmark_id]['median_seconds']
+        ratio = now / before if before > 0 else float('inf') if now > 0 else 1.0
+        delta = now - before
+        if ratio > 1 + tolerance and delta > noise_floor:
+            verdict = 'regressed'
+            regressions.append(benchmark_id)
+        elif ratio < 1 / (1 + tolerance) and -delta > noise_floor:
+            verdict = 'improved'
+            improvements.append(benchmark_id)
+        else:
+            verdict = 'unchanged'
+        comparisons.append({
+            'id': benchmark_id,
+            'baseline_seconds': before,
+            'current_seconds': now,
+            'ratio': round(ratio, 3),
+            'verdict': verdict
+        })
+
+    current_env = current.get('environment', {})
+    baseline_env = baseline.get('environment', {})
+    return {
+        'comparisons': comparisons,
+        'regressions': regressions,
+        'improvements': improvements,
+        'missing_in_current': sorted(set(baseline_by_id) - set(current_by_id)),
+        'missing_in_baseline': sorted(set(current_by_id) - set(baseline_by_id)),
+        'environment_differences': {
+            field: {'baseline': baseline_env.get(field), 'current': current_env.get(field)}
+            for field in ENVIRONMENT_FIELDS if baseline_env.get(field) != current_env.get(field)
+        }
+    }
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    """Render a comparison as a text table"""
+    lines = [f"{'benchmark':<55} {'baseline':>10} {'current':>10} {'ratio':>7}  verdict"]
+    for row in comparison['comparisons']:
+        lines.append(f"{row['id']:<55} {row['baseline_seconds']:>10.4f} {row['current_seconds']:>10.4f} "
+                     f"{row['ratio']:>7.2f}  {row['verdict']}")
+    if comparison['missing_in_current']:
+        lines.append(f"Missing in this run: {', '.join(comparison['missing_in_current'])}")
+    if comparison['missing_in_baseline']:
+        lines.append(f"New (no baseline): {', '.join(comparison['missing_in_baseline'])}")
+    for field, values in comparison['environment_differences'].items():
+        lines.append(f"Warning: {field} differs (baseline {values['baseline']}, current {values['current']})")
+    lines.append(f"{len(comparison['regressions'])} regressed, {len(comparison['improvements'])} improved, "
+                 f"{len(comparison['comparisons'])} compared")
+    return '\n'.join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.compare',
+        description='Compare benchmark results against a baseline.'
+    )
+    parser.add_argument('results', help='Results of this run (JSON from benchmarks.run)')
+    parser.add_argument('baseline', help='Baseline results (JSON from benchmarks.run)')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed relative slowdown before a benchmark counts as regressed (default: 0.15)')
+    parser.add_argument('--noise-floor', type=float, default=0.005,
+                        help='Ignore slowdowns smaller than this many seconds (default: 0.005)')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    comparison = compare_results(load_results(args.results), load_results(args.baseline),
+                                 args.tolerance, args.noise_floor)
+    print(format_comparison(comparison))
+    return 1 if comparison['regressions'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,389 @@
+"""
+Benchmark harness - times frame sampling, analyzers and full analyses on synthetic videos
+
+Usage (from the backend directory):
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --suites sampling,analyzers
+    python -m benchmarks.run --output results.json --baseline baseline.json
+
+Suites:
+    sampling   The shared frame sampling pipeline: fixed-rate and adaptive
+               decoding, and frame cache replay
+    analyzers  Each analyzer's process_video, and Whisper transcription of
+               the synthetic audio track
+    e2e        VideoAnalysisService.analyze_video_path with the mock Gemini
+               backend (and Whisper stubbed unless --transcriber real), plus the
+               per-stage profile of each run
+
+Videos are generated once into --video-dir and reused. Each benchmark runs
+--warmup untimed and --repeats timed iterations; the median is compared
+against the baseline.
+"""
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import get_config
+from app.models.analysis_options import AnalysisOptions, ANALYSIS_PRESETS, MOTION_ANALYZERS
+from app.services.analyzer_service import AnalyzerService
+from app.services.video_analysis_service import VideoAnalysisService
+from app.utils.audio_processor import AudioProcessor
+from app.utils.exceptions import ValidationError
+from app.utils.profiling import profile_stage
+from video_analysis.frame_cache import configure_frame_cache
+from video_analysis.frame_sampling import AdaptiveFrameSampler, FrameSampler, create_frame_sampler
+
+from .compare import compare_results, format_comparison, load_results
+from .stubs import StubWhisperModel, make_transcript
+from .synthetic_video import DEFAULT_SPECS, QUICK_SPECS, ensure_videos
+
+
+SUITES = ('sampling', 'analyzers', 'e2e')
+
+# Analyzer packages whose versions are recorded with the results
+PACKAGES = ('numpy', 'opencv-python', 'mediapipe', 'torch', 'transformers', 'openai-whisper', 'moviepy')
+
+def time_call(func: Callable[[], Any], repeats: int, warmup: int) -> Dict[str, Any]:
+    """
+    Time a function over several runs
+
+    Args:
+        func: Function to time
+        repeats: Timed runs
+        warmup: Untimed runs before the timed ones
+
+    Returns:
+        Median/min/max wall time, median CPU time, frames per run and
+        frames per second, or status 'failed' with the error
+    """
+    try:
+        for _ in range(warmup):
+            func()
+        runs = []
+        for _ in range(repeats):
+            with profile_stage() as profile:
+                func()
+            runs.append(profile)
+    except Exception as e:
+        return {'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+
+    walls = [run['wall_seconds'] for run in runs]
+    median = statistics.median(walls)
+    frames = runs[-1]['frames_inferred']
+    return {
+        'status': 'ok',
+        'repeats': repeats,
+        'median_seconds': round(median, 4),
+        'min_seconds': round(min(walls), 4),
+        'max_seconds': round(max(walls), 4),
+        'cpu_seconds': round(statistics.median(run['cpu_seconds'] for run in runs), 4),
+        'frames_decoded': runs[-1]['frames_decoded'],
+        'frames_inferred': frames,
+        'frames_per_second': round(frames / median, 2) if frames and median > 0 else None,
+        'peak_rss_delta_mb': max((run['peak_rss_delta_mb'] or 0.0) for run in runs)
+    }
+
+
+def make_entry(suite: str, name: str, video: str, measurement: Dict[str, Any]) -> Dict[str, Any]:
+    """Result entry of one benchmark"""
+    entry = {'id': f"{suite}/{name}/{video}", 'suite': suite, 'name': name, 'video': video}
+    entry.update(measurement)
+    return entry
+
+
+def consume(sampler) -> None:
+    """Iterate over every frame of a sampler"""
+    for _ in sampler:
+        pass
+
+
+def run_sampling_suite(videos: Dict[str, Dict[str, Any]], options: AnalysisOptions,
+                       args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Time the frame sampling shared by every analyzer"""
+    results = []
+    max_resolution = options.preset.max_resolution
+    for video, info in videos.items():
+        path = info['path']
+        benchmarks = {
+            'fixed': lambda: consume(FrameSampler(path, options.target_fps, max_resolution, show_progress=False)),
+            'adaptive': lambda: consume(AdaptiveFrameSampler(
+                path, options.target_fps, min_fps=1.0, max_resolution=max_resolution, show_progress=False
+            ))
+        }
+        for name, func in benchmarks.items():
+            results.append(make_entry('sampling', name, video, time_call(func, args.repeats, args.warmup)))
+
+        # Replaying sampled frames from the frame cache (filled by the warm-up run)
+        with tempfile.TemporaryDirectory(prefix='benchmark_frame_cache_') as cache_dir:
+            configure_frame_cache(cache_dir)
+            try:
+                replay = lambda: consume(create_frame_sampler(path, options.target_fps, max_resolution,
+                                                              show_progress=False))
+                results.append(make_entry('sampling', 'cache_replay', video,
+                                          time_call(replay, args.repeats, max(1, args.warmup))))
+            finally:
+                configure_frame_cache(None)
+    return results
+
+
+def run_analyzer_suite(service: AnalyzerService, whisper_model, videos: Dict[str, Dict[str, Any]],
+                       options: AnalysisOptions, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Time each analyzer's process_video and Whisper transcription"""
+    results = []
+    preset = options.preset
+    for video, info in videos.items():
+        path = info['path']
+        for name, _ in MOTION_ANALYZERS:
+            analyzer = service.get_analyzer(name)
+            if analyzer is None:
+                results.append(make_entry('analyzers', name, video, {'status': 'skipped', 'error': 'not available'}))
+                continue
+            run = lambda analyzer=analyzer: analyzer.process_video(
+                path, target_fps=options.target_fps, show_progress=False,
+                max_resolution=preset.max_resolution, model_complexity=preset.model_complexity,
+                min_fps=options.min_fps
+            )
+            results.append(make_entry('analyzers', name, video, time_call(run, args.repeats, args.warmup)))
+
+        expression = service.get_analyzer('expression')
+        if expression is None:
+            results.append(make_entry('analyzers', 'expression', video, {'status': 'skipped', 'error': 'not available'}))
+        else:
+            run = lambda: expression.process_video(
+                path, target_fps=options.target_fps, show_progress=False,
+                max_resolution=preset.max_resolution, batch_size=preset.expression_batch_size
+            )
+            results.append(make_entry('analyzers', 'expression', video, time_call(run, args.repeats, args.warmup)))
+
+        results.append(make_entry('analyzers', 'whisper', video,
+                                  time_transcription(whisper_model, info, args)))
+    return results
+
+
+def time_transcription(whisper_model, info: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Time Whisper on the audio track of a synthetic video"""
+    if whisper_model is None:
+        return {'status': 'skipped', 'error': 'Whisper not available'}
+    if not info.get('has_audio'):
+        return {'status': 'skipped', 'error': 'video has no audio track (moviepy not installed)'}
+
+    audio_processor = AudioProcessor(whisper_model)
+    with tempfile.TemporaryDirectory(prefix='benchmark_audio_') as audio_dir:
+        audio_path = os.path.join(audio_dir, 'audio.wav')
+        audio_processor.extract_audio_from_video(info['path'], audio_path)
+        measurement = time_call(lambda: whisper_model.transcribe(audio_path), args.repeats, args.warmup)
+    if measurement['status'] == 'ok':
+        measurement['realtime_factor'] = round(measurement['median_seconds'] / info['duration'], 4)
+    return measurement
+
+
+def run_e2e_suite(service: AnalyzerService, stub_whisper: Optional[StubWhisperModel],
+                  videos: Dict[str, Dict[str, Any]], options: AnalysisOptions,
+                  args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Time whole analyses through VideoAnalysisService, with per-stage medians"""
+    results = []
+    analysis_service = VideoAnalysisService(service)
+    for video, info in videos.items():
+        if stub_whisper is not None:
+            stub_whisper.transcript = make_transcript(info['duration'], info['seed'])
+
+        analysis_ids = []
+
+        def analyze():
+            analysis_ids.append(analysis_service.analyze_video_path(info['path'], options, filename=video))
+
+        results.append(make_entry('e2e', args.preset, video, time_call(analyze, args.repeats, args.warmup)))
+
+        # Per-stage medians over the timed runs
+        stage_walls: Dict[str, List[float]] = {}
+        stage_errors: Dict[str, Optional[str]] = {}
+        for analysis_id in analysis_ids[args.warmup:]:
+            record = service.get_analysis_record(analysis_id)
+            for step, profile in record.metadata.get('profile', {}).items():
+                stage_walls.setdefault(step, []).append(profile['wall_seconds'])
+                if profile['status'] == 'failed':
+                    step_result = record.partial_results.get(step)
+                    stage_errors[step] = step_result.get('error') if isinstance(step_result, dict) else None
+        for step, walls in stage_walls.items():
+            measurement = {
+                'status': 'failed' if step in stage_errors else 'ok',
+                'repeats': len(walls),
+                'median_seconds': round(statistics.median(walls), 4),
+                'min_seconds': round(min(walls), 4),
+                'max_seconds': round(max(walls), 4)
+            }
+            if step in stage_errors:
+                measurement['error'] = stage_errors[step]
+            results.append(make_entry('e2e_stage', f"{args.preset}:{step}", video, measurement))
+    return results
+
+
+def build_analyzer_service(args: argparse.Namespace):
+    """
+    Load the analyzers with Gemini replaced by the mock LLM backend
+
+    Returns:
+        Tuple of (analyzer service, real Whisper model or None, stub Whisper
+        model installed for the end-to-end suite or None)
+    """
+    config = get_config(args.config).get_analyzer_config()
+    # Caches would turn repeated runs into cache hits; Gemini requests never leave the process
+    config.update(frame_cache_dir=None, landmark_store_dir=None, gemini_requests_per_minute=1e9,
+                  llm_backend='mock', mock_llm={'latency': args.llm_latency, 'seed': 0})
+    service = AnalyzerService(config)
+    service.initialize_all_analyzers()
+
+    whisper_model = service.get_whisper_model(options_for(args).preset.whisper_model)
+    stub_whisper = None
+    if args.transcriber == 'stub':
+        stub_whisper = StubWhisperModel('')
+        service.get_whisper_model = lambda model_size=None: stub_whisper
+    return service, whisper_model, stub_whisper
+
+
+def options_for(args: argparse.Namespace) -> AnalysisOptions:
+    """Analysis options of the benchmark runs"""
+    return AnalysisOptions.from_request(preset=args.preset, target_fps=args.target_fps)
+
+
+def get_environment() -> Dict[str, Any]:
+    """Machine and package versions the results were measured with"""
+    packages = {}
+    for package in PACKAGES:
+        try:
+            packages[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            packages[package] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages,
+        'git_commit': commit
+    }
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Render results as a text table"""
+    lines = [f"{'benchmark':<55} {'median s':>10} {'min s':>10} {'fps':>9}  status"]
+    for entry in results:
+        if entry['status'] == 'ok':
+            fps = entry.get('frames_per_second')
+            lines.append(f"{entry['id']:<55} {entry['median_seconds']:>10.4f} {entry['min_seconds']:>10.4f} "
+                         f"{fps if fps is not None else '-':>9}  ok")
+        else:
+            lines.append(f"{entry['id']:<55} {'':>10} {'':>10} {'':>9}  {entry['status']}: {entry.get('error')}")
+    return '\n'.join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.run',
+        description='Benchmark the analysis pipeline on deterministic synthetic videos.'
+    )
+    parser.add_argument('-o', '--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against these results; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed relative slowdown against the baseline (default: 0.15)')
+    parser.add_argument('--noise-floor', type=float, default=0.005,
+                        help='Ignore slowdowns smaller than this many seconds (default: 0.005)')
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help=f"Comma-separated suites to run ({', '.join(SUITES)}; default: all)")
+    parser.add_argument('--quick', action='store_true', help='Use two short videos instead of the full set')
+    parser.add_argument('--videos', help='Comma-separated names of the videos to use (default: all of the set)')
+    parser.add_argument('--video-dir', default=os.path.join(tempfile.gettempdir(), 'auto_ppt_benchmark_videos'),
+                        help='Directory for the generated videos (reused across runs)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark (default: 3)')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per benchmark (default: 1)')
+    parser.add_argument('--preset', choices=list(ANALYSIS_PRESETS.keys()), default='standard',
+                        help='Analysis preset (default: standard)')
+    parser.add_argument('--target-fps', type=float, help="Target FPS (default: the preset's FPS)")
+    parser.add_argument('--transcriber', choices=['stub', 'real'], default='stub',
+                        help='Whisper in the e2e suite: a fixed transcript (default) or the real model')
+    parser.add_argument('--llm-latency', default='0',
+                        help='Latency of the mock Gemini backend: SECONDS or a distribution such as '
+                             'lognormal:0.8,0.4 (default: 0)')
+    parser.add_argument('--config', help='Configuration name (development, production)')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    suites = [suite.strip() for suite in args.suites.split(',') if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown or args.repeats < 1 or args.warmup < 0:
+        print(f"Error: unknown suites {sorted(unknown)}" if unknown else "Error: --repeats must be at least 1 "
+              "and --warmup at least 0", file=sys.stderr)
+        return 2
+    try:
+        options = options_for(args)
+    except ValidationError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    specs = QUICK_SPECS if args.quick else DEFAULT_SPECS
+    if args.videos:
+        names = [name.strip() for name in args.videos.split(',')]
+        specs = [spec for spec in DEFAULT_SPECS + QUICK_SPECS if spec.name in names]
+        if len(specs) != len(set(names)):
+            print(f"Error: unknown videos; available: {', '.join(s.name for s in DEFAULT_SPECS + QUICK_SPECS)}",
+                  file=sys.stderr)
+            return 2
+    videos = ensure_videos(specs, args.video_dir)
+
+    started_at = time.perf_counter()
+    results = []
+    if 'sampling' in suites:
+        results += run_sampling_suite(videos, options, args)
+    if 'analyzers' in suites or 'e2e' in suites:
+        service, whisper_model, stub_whisper = build_analyzer_service(args)
+        if 'analyzers' in suites:
+            results += run_analyzer_suite(service, whisper_model, videos, options, args)
+        if 'e2e' in suites:
+            results += run_e2e_suite(service, stub_whisper, videos, options, args)
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'environment': get_environment(),
+        'settings': {
+            'suites': suites, 'repeats': args.repeats, 'warmup': args.warmup, 'preset': args.preset,
+            'target_fps': options.target_fps, 'transcriber': args.transcriber, 'llm_latency': args.llm_latency
+        },
+        'videos': {name: {key: value for key, value in info.items() if key != 'path'}
+                   for name, info in videos.items()},
+        'duration_seconds': round(time.perf_counter() - started_at, 2),
+        'results': results
+    }
+
+    print(format_results(results))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        comparison = compare_results(report, load_results(args.baseline), args.tolerance, args.noise_floor)
+        print(format_comparison(comparison))
+        return 1 if comparison['regressions'] else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Offline stand-ins used by the end-to-end benchmark
+
+make_transcript produces a fixed transcript (with fillers and repetitions
+for the disfluency tagger) and StubWhisperModel returns it instead of
+transcribing, so the LLM stages always get the same input. Gemini is
+replaced by the mock LLM backend (audio_analysis.mock_llm).
+"""
+import random
+from typing import Any, Dict
+
+
+_WORDS = (
+    "today we will look at how the results of the project changed over the last quarter and what "
+    "this means for the next steps of the team the first part covers the data the second part the "
+    "method and the last part the open questions that we still need to answer together"
+).split()
+
+
+def make_transcript(duration: float, seed: int = 0, words_per_minute: float = 150) -> str:
+    """Deterministic transcript of a talk of the given length, with fillers and repetitions"""
+    rng = random.Random(seed)
+    words = []
+    sentence_length = 0
+    for i in range(max(1, int(duration / 60 * words_per_minute))):
+        word = _WORDS[i % len(_WORDS)]
+        roll = rng.random()
+        if roll < 0.04:
+            words.append(rng.choice(['um', 'uh']) + ',')
+        elif roll < 0.06:
+            words.append(word)
+        words.append(word)
+        sentence_length += 1
+        if sentence_length >= rng.randint(10, 18):
+            words[-1] += '.'
+            sentence_length = 0
+    text = ' '.join(words)
+    return text[0].upper() + text[1:].rstrip('.,') + '.'
+
+
+class StubWhisperModel:
+    """Whisper stand-in returning a fixed transcript"""
+
+    def __init__(self, transcript: str):
+        self.transcript = transcript
+
+    def transcribe(self, audio_path: str, **kwargs) -> Dict[str, Any]:
+        if not kwargs.get('word_timestamps'):
+            return {'text': self.transcript, 'segments': []}
+        # Evenly paced words (150 per minute)
+        words = [{'word': f" {word}", 'start': i * 0.4, 'end': i * 0.4 + 0.35}
+                 for i, word in enumerate(self.transcript.split())]
+        return {'text': self.transcript, 'segments': [{'words': words}]}
@@ -0,0 +1,261 @@
+"""
+Deterministic synthetic presentation videos for benchmarks
+
+Each video shows a slide panel and a stylized presenter (head, eyes, torso,
+arms) whose head, body and hands move along fixed trajectories, rendered
+frame by frame with OpenCV. With moviepy installed a synthetic speech-like
+audio track (syllable-rate modulated voiced tone with pauses) is muxed in,
+so audio extraction and transcription can be timed too.
+
+The same spec always renders the same frames; generated files are reused
+from the video directory, keyed by the spec and GENERATOR_VERSION.
+"""
+import hashlib
+import json
+import math
+import os
+import random
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+
+# Bump when the rendering changes, so cached videos are regenerated
+GENERATOR_VERSION = 1
+
+AUDIO_SAMPLE_RATE = 16000
+
+
+@dataclass(frozen=True)
+class SyntheticVideoSpec:
+    """Size, rate and length of a synthetic video"""
+    name: str
+    width: int
+    height: int
+    fps: float
+    duration: float
+    seed: int = 0
+    with_audio: bool = True
+
+    @property
+    def frame_count(self) -> int:
+        return int(round(self.duration * self.fps))
+
+    @property
+    def key(self) -> str:
+        """Short hash identifying the rendered content"""
+        params = dict(asdict(self), version=GENERATOR_VERSION)
+        params.pop('name')
+        return hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:10]
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}_{self.key}.mp4"
+
+
+# Resolutions, frame rates and lengths covered by a full run
+DEFAULT_SPECS: List[SyntheticVideoSpec] = [
+    SyntheticVideoSpec('360p30_10s', 640, 360, 30, 10),
+    SyntheticVideoSpec('720p30_10s', 1280, 720, 30, 10),
+    SyntheticVideoSpec('1080p30_10s', 1920, 1080, 30, 10),
+    SyntheticVideoSpec('720p60_10s', 1280, 720, 60, 10),
+    SyntheticVideoSpec('720p30_60s', 1280, 720, 30, 60),
+]
+
+# Small set for quick local checks
+QUICK_SPECS: List[SyntheticVideoSpec] = [
+    SyntheticVideoSpec('360p30_5s', 640, 360, 30, 5),
+    SyntheticVideoSpec('720p30_5s', 1280, 720, 30, 5),
+]
+
+
+def _background(width: int, height: int) -> np.ndarray:
+    """Vertical gray-blue gradient (BGR)"""
+    ramp = np.linspace(70, 150, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = np.clip(ramp + 40, 0, 255).astype(np.uint8)
+    frame[..., 1] = ramp.astype(np.uint8)
+    frame[..., 2] = np.clip(ramp - 20, 0, 255).astype(np.uint8)
+    return frame
+
+
+def _draw_slide(frame: np.ndarray, spec: SyntheticVideoSpec, slide_index: int) -> None:
+    """Slide panel with a title bar and bullet lines (changes every 8 seconds)"""
+    h, w = frame.shape[:2]
+    x0, y0, x1, y1 = int(w * 0.04), int(h * 0.08), int(w * 0.48), int(h * 0.80)
+    cv2.rectangle(frame, (x0, y0), (x1, y1), (245, 245, 245), -1)
+    cv2.rectangle(frame, (x0, y0), (x1, y0 + int(h * 0.08)), (150, 90, 40), -1)
+
+    rng = random.Random(spec.seed * 1000 + slide_index)
+    line_height = max(4, int(h * 0.025))
+    y = y0 + int(h * 0.14)
+    while y < y1 - line_height * 2:
+        length = rng.uniform(0.4, 0.95) * (x1 - x0 - int(w * 0.06))
+        cv2.circle(frame, (x0 + int(w * 0.02), y + line_height // 2), max(2, line_height // 3), (60, 60, 60), -1)
+        cv2.rectangle(frame, (x0 + int(w * 0.04), y), (x0 + int(w * 0.04 + length), y + line_height),
+                      (110, 110, 110), -1)
+        y += line_height * 3
+
+
+def _draw_presenter(frame: np.ndarray, t: float) -> None:
+    """Presenter figure; head, body and arms move on incommensurate periods"""
+    h, w = frame.shape[:2]
+    scale = h / 720.0
+    cx = int(w * 0.72 + math.sin(t * 0.4) * w * 0.06)
+    lean = math.sin(t * 0.7) * 12 * scale
+
+    # Torso and legs
+    shoulder_y = int(h * 0.45)
+    hip_y = int(h * 0.80)
+    torso = np.array([
+        (cx - 70 * scale + lean, shoulder_y), (cx + 70 * scale + lean, shoulder_y),
+        (cx + 55 * scale, hip_y), (cx - 55 * scale, hip_y)
+    ], dtype=np.int32)
+    cv2.fillPoly(frame, [torso], (80, 50, 30))
+    for side in (-1, 1):
+        cv2.line(frame, (cx + int(side * 30 * scale), hip_y), (cx + int(side * 40 * scale), h - 1),
+                 (50, 40, 30), max(1, int(24 * scale)))
+
+    # Arms: the right hand gestures, the left one sways slightly
+    for side, amplitude, period in ((-1, 0.25, 0.9), (1, 0.9, 1.7)):
+        shoulder = (int(cx + side * 70 * scale + lean), shoulder_y + int(10 * scale))
+        angle = math.pi / 2 - side * (0.35 + amplitude * (0.5 + 0.5 * math.sin(t * period)))
+        elbow = (int(shoulder[0] + math.cos(angle) * side * 90 * scale),
+                 int(shoulder[1] + math.sin(angle) * 90 * scale))
+        hand = (int(elbow[0] + side * 60 * scale * math.cos(t * period)),
+                int(elbow[1] - 70 * scale * max(0.0, math.sin(t * period))))
+        cv2.line(frame, shoulder, elbow, (80, 50, 30), max(1, int(22 * scale)))
+        cv2.line(frame, elbow, hand, (140, 170, 210), max(1, int(16 * scale)))
+        cv2.circle(frame, hand, max(2, int(14 * scale)), (150, 180, 220), -1)
+
+    # Head: yaw shifts the face features, pitch moves the head up and down
+    head_radius = int(60 * scale)
+    head_x = int(cx + lean + math.sin(t * 0.55) * 10 * scale)
+    head_y = int(shoulder_y - head_radius * 1.4 + math.sin(t * 0.8) * 8 * scale)
+    cv2.circle(frame, (head_x, head_y), head_radius, (150, 180, 220), -1)
+    yaw = math.sin(t * 0.5) * 0.4
+    for side in (-1, 1):
+        eye = (int(head_x + (side * 0.35 + yaw * 0.5) * head_radius), int(head_y - 0.15 * head_radius))
+        cv2.circle(frame, eye, max(2, int(head_radius * 0.12)), (255, 255, 255), -1)
+        cv2.circle(frame, eye, max(1, int(head_radius * 0.06)), (40, 30, 20), -1)
+    mouth_open = max(1, int(head_radius * 0.08 * (1 + math.sin(t * 25))))
+    cv2.ellipse(frame, (int(head_x + yaw * 0.5 * head_radius), int(head_y + 0.45 * head_radius)),
+                (int(head_radius * 0.3), mouth_open), 0, 0, 360, (60, 60, 150), -1)
+
+
+def render_frame(spec: SyntheticVideoSpec, frame_index: int, background: np.ndarray) -> np.ndarray:
+    """Render one BGR frame of a synthetic video"""
+    t = frame_index / spec.fps
+    frame = background.copy()
+    _draw_slide(frame, spec, int(t // 8))
+    _draw_presenter(frame, t)
+    return frame
+
+
+def synthesize_audio(duration: float, seed: int = 0, sample_rate: int = AUDIO_SAMPLE_RATE) -> np.ndarray:
+    """
+    Speech-like mono signal in [-1, 1]
+
+    A voiced tone with a few harmonics and slowly drifting pitch, gated at a
+    syllable rate of about 4 Hz, with a pause every few seconds.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    pitch = 140 + 25 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in (1, 2, 3, 4))
+    syllables = np.clip(np.sin(2 * np.pi * 4.0 * t), 0, None) ** 0.5
+    pauses = (np.sin(2 * np.pi * t / 5.0) > -0.85).astype(np.float64)
+    noise = rng.normal(0, 0.02, t.shape)
+    signal = voiced * syllables * pauses * 0.25 + noise
+    return np.clip(signal, -1.0, 1.0)
+
+
+def _mux_audio(silent_path: str, output_path: str, spec: SyntheticVideoSpec) -> bool:
+    """Add the synthetic audio track with moviepy (False if moviepy is not installed)"""
+    try:
+        from moviepy.editor import VideoFileClip
+        from moviepy.audio.AudioClip import AudioArrayClip
+    except ImportError:
+        return False
+
+    samples = synthesize_audio(spec.duration, spec.seed)
+    video = VideoFileClip(silent_path)
+    audio = AudioArrayClip(np.column_stack([samples, samples]), fps=AUDIO_SAMPLE_RATE)
+    try:
+        video.set_audio(audio).write_videofile(
+            output_path, codec='libx264', audio_codec='aac', fps=spec.fps,
+            preset='medium', threads=1, verbose=False, logger=None
+        )
+    finally:
+        video.close()
+        audio.close()
+    return True
+
+
+def generate_video(spec: SyntheticVideoSpec, output_path: str) -> Dict[str, object]:
+    """
+    Render a synthetic video to a file
+
+    Args:
+        spec: Video to render
+        output_path: Destination .mp4 path
+
+    Returns:
+        Description of the written video (spec, whether it has audio)
+
+    Raises:
+        RuntimeError: If OpenCV cannot write the video
+    """
+    silent_path = output_path + '.silent.mp4' if spec.with_audio else output_path
+    writer = cv2.VideoWriter(silent_path, cv2.VideoWriter_fourcc(*'mp4v'), spec.fps, (spec.width, spec.height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open a video writer for {silent_path}")
+    background = _background(spec.width, spec.height)
+    try:
+        for frame_index in range(spec.frame_count):
+            writer.write(render_frame(spec, frame_index, background))
+    finally:
+        writer.release()
+
+    has_audio = False
+    if spec.with_audio:
+        has_audio = _mux_audio(silent_path, output_path, spec)
+        if has_audio:
+            os.remove(silent_path)
+        else:
+            os.replace(silent_path, output_path)
+    return dict(asdict(spec), has_audio=has_audio, key=spec.key)
+
+
+def ensure_videos(specs: List[SyntheticVideoSpec], video_dir: str) -> Dict[str, Dict[str, object]]:
+    """
+    Generate the videos that are not in the video directory yet
+
+    Args:
+        specs: Videos to provide
+        video_dir: Directory holding generated videos
+
+    Returns:
+        Per spec name: path, file hash and description of the video
+    """
+    os.makedirs(video_dir, exist_ok=True)
+    videos = {}
+    for spec in specs:
+        path = os.path.join(video_dir, spec.filename)
+        info_path = path + '.json'
+        if os.path.exists(path) and os.path.exists(info_path):
+            with open(info_path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+        else:
+            print(f"Generating {spec.name} ({spec.width}x{spec.height}, {spec.fps:g} fps, {spec.duration:g} s)...")
+            info = generate_video(spec, path)
+            with open(path, 'rb') as f:
+                info['sha256'] = hashlib.sha256(f.read()).hexdigest()
+            with open(info_path, 'w', encoding='utf-8') as f:
+                json.dump(info, f, indent=2)
+        info['path'] = path
+        videos[spec.name] = info
+    return videos
@@ -3,6 +3,7 @@ Evaluation module for comprehensive presentation scoring
 """
 
 from .evaluator import PresentationEvaluator
+from .batch_evaluator import BatchEvaluator
 
-__all__ = ['PresentationEvaluator']
+__all__ = ['PresentationEvaluator', 'BatchEvaluator']
 __version__ = "1.0.0"
@@ -0,0 +1,316 @@
+"""
+Vectorized evaluation of many presentations at once
+
+PresentationEvaluator scores one analysis at a time and also builds the
+feedback text. For course dashboards only the scores matter, so the
+BatchEvaluator first extracts the handful of numbers each category rule reads
+into one NumPy column per feature (one row per analysis), then applies the
+same threshold rules and weighted sums to whole columns. Overall scores,
+grades, percentile ranks and grade distributions for thousands of analyses
+take a single pass.
+
+Scores match PresentationEvaluator.evaluate_presentation for the same
+weights, grade boundaries and categories.
+"""
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+from .evaluator import PresentationEvaluator
+
+
+# Grade of scores outside every range (same as PresentationEvaluator.get_grade)
+FALLBACK_GRADE = "Needs Improvement"
+
+POSITIVE_EMOTIONS = ['Happy', 'Surprise']
+NEUTRAL_EMOTIONS = ['Neutral']
+NEGATIVE_EMOTIONS = ['Angry', 'Sad']
+
+HAND_ACTIVITY_SCORES = {'moderate': 85, 'high': 70}
+
+
+def _is_valid(analysis_results: Dict, name: str) -> bool:
+    """Whether an analyzer ran without error"""
+    return name in analysis_results and 'error' not in analysis_results[name]
+
+
+class BatchEvaluator:
+    """Scores many analyses with the weights and grades of a PresentationEvaluator"""
+
+    # Feature columns, filled with NaN where the input is missing
+    FEATURES = [
+        'body_std_dev_angle', 'body_center_percentage', 'head_stability', 'hand_activity_score',
+        'word_count', 'disfluency_count', 'speech_duration',
+        'content_score_sum', 'content_score_count',
+        'expression_positive', 'expression_neutral', 'expression_negative', 'expression_variety',
+        'detection_rate_sum', 'detection_rate_count', 'audio_quality'
+    ]
+
+    def __init__(self, evaluator: Optional[PresentationEvaluator] = None):
+        """
+        Args:
+            evaluator: Evaluator whose weights and score ranges are applied
+                (default: a PresentationEvaluator with the built-in rubric)
+        """
+        self.evaluator = evaluator or PresentationEvaluator()
+        self.categories = list(self.evaluator.weights.keys())
+
+    def extract_features(self, analyses: Sequence[Dict], transcripts: Sequence[Optional[str]]) -> Dict[str, np.ndarray]:
+        """
+        Collect the inputs of every category rule into feature columns
+
+        Args:
+            analyses: Analyzer results of each analysis
+            transcripts: Transcript of each analysis (None if there is none)
+
+        Returns:
+            Feature name -> (N,) float array, NaN where the input is missing
+        """
+        n = len(analyses)
+        features = {name: np.full(n, np.nan) for name in self.FEATURES}
+        for i, (results, transcript) in enumerate(zip(analyses, transcripts)):
+            if _is_valid(results, 'body_rotation'):
+                body_data = results['body_rotation']
+                features['body_std_dev_angle'][i] = body_data.get('std_dev_angle', 10)
+                dir_percentages = body_data.get('direction_percentages', {})
+                if dir_percentages:
+                    features['body_center_percentage'][i] = dir_percentages.get('center', 0)
+            if _is_valid(results, 'head_motion'):
+                features['head_stability'][i] = results['head_motion'].get('stability_score', 50)
+            if _is_valid(results, 'hand_motion'):
+                activity_level = results['hand_motion'].get('activity_level', 'low')
+                features['hand_activity_score'][i] = HAND_ACTIVITY_SCORES.get(activity_level, 60)
+
+            if transcript:
+                features['word_count'][i] = len(transcript.split())
+                features['speech_duration'][i] = results.get('body_rotation', {}).get('duration_seconds', 60)
+                if _is_valid(results, 'disfluency'):
+                    features['disfluency_count'][i] = results['disfluency'].get('total_disfluencies', 0)
+
+            if _is_valid(results, 'content') and 'presentationAnalysis' in results['content']:
+                analysis = results['content']['presentationAnalysis']
+                metric_scores = [
+                    data['score'] for data in analysis.get('contentQualityMetrics', {}).values()
+                    if isinstance(data, dict) and 'score' in data
+                ]
+                features['content_score_sum'][i] = sum(score * 10 for score in metric_scores) \
+                    + analysis.get('overallScore', 50) * 10
+                features['content_score_count'][i] = len(metric_scores) + 1
+
+            if _is_valid(results, 'expression'):
+                average_scores = results['expression'].get('average_scores', {})
+                features['expression_positive'][i] = sum(average_scores.get(e, 0) for e in POSITIVE_EMOTIONS)
+                features['expression_neutral'][i] = sum(average_scores.get(e, 0) for e in NEUTRAL_EMOTIONS)
+                features['expression_negative'][i] = sum(average_scores.get(e, 0) for e in NEGATIVE_EMOTIONS)
+                features['expression_variety'][i] = sum(1 for score in average_scores.values() if score > 0.1)
+
+            detection_rates = [
+                results[name].get('detection_rate', 0)
+                for name in ('body_rotation', 'head_motion', 'expression') if _is_valid(results, name)
+            ]
+            if detection_rates:
+                features['detection_rate_sum'][i] = sum(detection_rates)
+                features['detection_rate_count'][i] = len(detection_rates)
+
+            if 'content' in results or 'disfluency' in results:
+                if _is_valid(results, 'content'):
+                    features['audio_quality'][i] = 90
+                elif _is_valid(results, 'disfluency'):
+                    features['audio_quality'][i] = 75
+                else:
+                    features['audio_quality'][i] = 50
+        return features
+
+    def score_categories(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Apply the category rules to the feature columns
+
+        Returns:
+            (N, categories) array of category scores, in self.categories order
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std_dev = features['body_std_dev_angle']
+            center = features['body_center_percentage']
+            head = features['head_stability']
+            body_language = [
+                np.minimum(np.maximum(0, 100 - std_dev * 5), 100),
+                np.select([center > 70, center > 50],
+                          [85 + (center - 70) * 0.5, 70 + (center - 50) * 0.75],
+                          np.maximum(40, center)),
+                np.select([(head >= 70) & (head <= 90), head > 90], [85, 70], np.maximum(50, head)),
+                features['hand_activity_score']
+            ]
+
+            word_count = features['word_count']
+            disfluency_rate = np.where(word_count > 0, features['disfluency_count'] / word_count * 100, 0)
+            disfluency_rate[np.isnan(features['disfluency_count'])] = np.nan
+            duration = features['speech_duration']
+            wpm = np.where(duration > 0, word_count / duration * 60, 0)
+            wpm[np.isnan(word_count)] = np.nan
+            vocal_delivery = [
+                np.select([disfluency_rate < 2, disfluency_rate < 5, disfluency_rate < 10, disfluency_rate >= 10],
+                          [95, 80, 65, 45], np.nan),
+                np.select([(wpm >= 140) & (wpm <= 180),
+                           ((wpm >= 120) & (wpm < 140)) | ((wpm > 180) & (wpm <= 200)),
+                           ~np.isnan(wpm)],
+                          [90, 75, 60], np.nan)
+            ]
+
+            content_quality = [features['content_score_sum'] / features['content_score_count']]
+
+            positive = features['expression_positive']
+            negative = features['expression_negative']
+            variety = features['expression_variety']
+            facial_expression = [
+                np.select([(positive > 0.3) & (features['expression_neutral'] > 0.4) & (negative < 0.2),
+                           (positive > 0.2) & (negative < 0.3),
+                           ~np.isnan(positive)],
+                          [90, 75, 60], np.nan),
+                np.select([variety >= 3, variety >= 2, ~np.isnan(variety)], [85, 70, 55], np.nan)
+            ]
+
+            avg_detection = features['detection_rate_sum'] / features['detection_rate_count']
+            technical_aspects = [
+                np.select([avg_detection > 0.9, avg_detection > 0.7, ~np.isnan(avg_detection)],
+                          [95, 80, 60], np.nan),
+                features['audio_quality']
+            ]
+
+        subscores = {
+            'body_language': body_language,
+            'vocal_delivery': vocal_delivery,
+            'content_quality': content_quality,
+            'facial_expression': facial_expression,
+            'technical_aspects': technical_aspects
+        }
+        scores = np.empty((len(word_count), len(self.categories)))
+        for j, category in enumerate(self.categories):
+            values = np.stack(subscores[category], axis=1)
+            present = ~np.isnan(values)
+            count = present.sum(axis=1)
+            total = np.where(present, values, 0).sum(axis=1)
+            # Categories without any input score 50, as in the single evaluator
+            scores[:, j] = np.round(np.where(count > 0, total / np.maximum(count, 1), 50), 1)
+        return scores
+
+    def overall_scores(self, category_scores: np.ndarray, category_mask: np.ndarray) -> np.ndarray:
+        """
+        Weighted average of the evaluated categories of each analysis
+
+        Args:
+            category_scores: (N, categories) scores from score_categories
+            category_mask: (N, categories) bool, True where a category is evaluated
+
+        Returns:
+            (N,) overall scores, NaN where no weighted category was evaluated
+        """
+        weights = np.array([self.evaluator.weights[category] for category in self.categories], dtype=float)
+        weighted = np.where(category_mask, category_scores * weights, 0).sum(axis=1)
+        total_weight = np.where(category_mask, weights, 0).sum(axis=1)
+        return np.where(total_weight > 0, weighted / np.where(total_weight > 0, total_weight, 1), np.nan)
+
+    def grade_indices(self, scores: np.ndarray) -> np.ndarray:
+        """
+        Vectorized PresentationEvaluator.get_grade
+
+        Returns:
+            (N,) index into self.grade_labels
+        """
+        ranges = list(self.evaluator.score_ranges.values())
+        indices = np.full(len(scores), -1)
+        for i, (min_score, max_score) in enumerate(ranges):
+            indices[(indices < 0) & (scores >= min_score) & (scores <= max_score)] = i
+
+        # Scores between two ranges get the grade of the closest range below
+        lower = np.full(len(scores), len(ranges))
+        lower_min = np.full(len(scores), -np.inf)
+        for i, (min_score, _) in enumerate(ranges):
+            below = (scores >= min_score) & (min_score > lower_min)
+            lower[below] = i
+            lower_min[below] = min_score
+        return np.where(indices >= 0, indices, lower)
+
+    @property
+    def grade_labels(self) -> List[str]:
+        """Grade names by grade index (the last one is the fallback grade)"""
+        return [grade.replace('_', ' ').title() for grade in self.evaluator.score_ranges] + [FALLBACK_GRADE]
+
+    def evaluate(self, analyses: Sequence[Dict], transcripts: Sequence[Optional[str]],
+                 categories: Optional[Sequence[Optional[List[str]]]] = None) -> Dict[str, Any]:
+        """
+        Score many analyses at once
+
+        Args:
+            analyses: Analyzer results of each analysis
+            transcripts: Transcript of each analysis (None if there is none)
+            categories: Weight keys of the categories evaluated for each analysis
+                (None = all categories, an empty list = none, as in evaluate_presentation)
+
+        Returns:
+            Dictionary with per-analysis 'overall_scores', 'grades',
+            'percentile_ranks' (percent of scored analyses scoring at or below) and
+            'category_scores' ((N, categories), NaN where not evaluated), plus
+            the 'grade_distribution', 'statistics' of the overall scores and
+            mean score by category ('category_means'). Analyses without any
+            weighted category have no score: NaN score and rank, grade None,
+            and they are left out of the distribution and statistics (counted
+            as 'unscored').
+        """
+        n = len(analyses)
+        category_scores = self.score_categories(self.extract_features(analyses, transcripts))
+
+        category_mask = np.ones((n, len(self.categories)), dtype=bool)
+        if categories is not None:
+            for i, selected in enumerate(categories):
+                if selected is not None:
+                    category_mask[i] = [category in selected for category in self.categories]
+        category_scores[~category_mask] = np.nan
+
+        # Grades are taken from the unrounded score, like the single evaluator
+        unrounded = self.overall_scores(category_scores, category_mask)
+        overall = np.round(unrounded, 1)
+        scored = ~np.isnan(overall)
+        scored_scores = overall[scored]
+        grade_indices = self.grade_indices(unrounded)
+        labels = self.grade_labels
+
+        sorted_scores = np.sort(scored_scores)
+        percentile_ranks = np.where(
+            scored,
+            np.round(np.searchsorted(sorted_scores, overall, side='right') / max(len(sorted_scores), 1) * 100, 1),
+            np.nan
+        )
+
+        grade_distribution = {}
+        for i, count in enumerate(np.bincount(grade_indices[scored], minlength=len(labels)).tolist()):
+            if count or i < len(labels) - 1:
+                grade_distribution[labels[i]] = grade_distribution.get(labels[i], 0) + count
+
+        with np.errstate(invalid='ignore'):
+            category_means = {
+                self.evaluator.CATEGORY_NAMES[category]: (
+                    round(float(np.nanmean(category_scores[:, j])), 1)
+                    if category_mask[:, j].any() else None
+                )
+                for j, category in enumerate(self.categories)
+            }
+
+        count = len(scored_scores)
+        return {
+            'overall_scores': overall,
+            'grades': [labels[i] if has_score else None
+                       for i, has_score in zip(grade_indices.tolist(), scored.tolist())],
+            'percentile_ranks': percentile_ranks,
+            'category_scores': category_scores,
+            'grade_distribution': grade_distribution,
+            'statistics': {
+                'count': count,
+                'unscored': n - count,
+                'mean': round(float(scored_scores.mean()), 1) if count else None,
+                'median': round(float(np.median(scored_scores)), 1) if count else None,
+                'std_dev': round(float(scored_scores.std()), 1) if count else None,
+                'min': float(scored_scores.min()) if count else None,
+                'max': float(scored_scores.max()) if count else None
+            },
+            'category_means': category_means
+        }
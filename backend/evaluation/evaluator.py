@@ -2,14 +2,32 @@
 Comprehensive Presentation Evaluation System
 Calculates overall scores and detailed feedback for presentations
 """
+import copy
 import json
 from datetime import datetime
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 
 class PresentationEvaluator:
     """Main evaluator that combines all analysis results into comprehensive scores"""
     
+    # Analysis results each category is computed from
+    CATEGORY_INPUTS = {
+        'body_language': ['body_rotation', 'head_motion', 'hand_motion'],
+        'vocal_delivery': ['content', 'disfluency'],
+        'content_quality': ['content'],
+        'facial_expression': ['expression'],
+        'technical_aspects': ['body_rotation', 'head_motion', 'expression', 'content', 'disfluency']
+    }
+    
+    CATEGORY_NAMES = {
+        'body_language': 'Body Language & Posture',
+        'vocal_delivery': 'Vocal Delivery & Speech',
+        'content_quality': 'Content Quality & Structure',
+        'facial_expression': 'Facial Expression & Engagement',
+        'technical_aspects': 'Technical Quality'
+    }
+    
     def __init__(self):
         # Define scoring weights for different aspects
         self.weights = {
@@ -285,8 +303,10 @@ class PresentationEvaluator:
                 scores['video_quality'] = 60
                 feedback.append("→ Consider improving video quality/lighting")
         
-        # Audio quality (based on transcription success)
-        if 'content' in analysis_results and 'error' not in analysis_results['content']:
+        # Audio quality (based on transcription success); not scored when no audio analyzer ran
+        if 'content' not in analysis_results and 'disfluency' not in analysis_results:
+            pass
+        elif 'content' in analysis_results and 'error' not in analysis_results['content']:
             scores['audio_quality'] = 90
             feedback.append("✓ Good audio quality")
         elif 'disfluency' in analysis_results and 'error' not in analysis_results['disfluency']:
@@ -311,36 +331,30 @@ class PresentationEvaluator:
         }
     
     def calculate_overall_score(self, category_scores: Dict) -> Dict:
-        """Calculate the final overall presentation score"""
+        """
+        Calculate the final overall presentation score
+        
+        overall_score and grade are None when no weighted category was evaluated.
+        """
         weighted_score = 0
         total_weight = 0
         
-        category_mapping = {
-            'body_language': 'Body Language & Posture',
-            'vocal_delivery': 'Vocal Delivery & Speech',
-            'content_quality': 'Content Quality & Structure',
-            'facial_expression': 'Facial Expression & Engagement',
-            'technical_aspects': 'Technical Quality'
-        }
-        
         for weight_key, weight in self.weights.items():
-            category_name = category_mapping[weight_key]
+            category_name = self.CATEGORY_NAMES[weight_key]
             if category_name in category_scores:
                 score = category_scores[category_name]['overall_score']
                 weighted_score += score * weight
                 total_weight += weight
         
-        # Normalize if some categories are missing
+        # Normalize if some categories are missing; without any weighted category there is no score
         if total_weight > 0:
             final_score = weighted_score / total_weight
+            overall_score, grade = round(final_score, 1), self.get_grade(final_score)
         else:
-            final_score = 50
-        
-        # Determine grade
-        grade = self.get_grade(final_score)
+            overall_score, grade = None, None
         
         return {
-            'overall_score': round(final_score, 1),
+            'overall_score': overall_score,
             'grade': grade,
             'total_possible': 100,
             'category_weights': self.weights,
@@ -349,12 +363,31 @@ class PresentationEvaluator:
     
     def get_grade(self, score: float) -> str:
         """Convert numerical score to letter grade"""
+        lower_grade, lower_min = None, None
         for grade, (min_score, max_score) in self.score_ranges.items():
             if min_score <= score <= max_score:
                 return grade.replace('_', ' ').title()
+            # Scores between two ranges (e.g. 89.5) get the grade of the range below
+            if min_score <= score and (lower_min is None or min_score > lower_min):
+                lower_grade, lower_min = grade, min_score
+        if lower_grade is not None:
+            return lower_grade.replace('_', ' ').title()
         return "Needs Improvement"
     
-    def generate_improvement_suggestions(self, category_scores: Dict, overall_score: float) -> List[str]:
+    def with_rubric(self, weights: Dict[str, float], score_ranges: Dict[str, Tuple[float, float]]) -> 'PresentationEvaluator':
+        """
+        Get a copy of this evaluator that scores with other weights and grade boundaries
+        
+        Args:
+            weights: Category weights keyed like self.weights
+            score_ranges: Grade -> (min score, max score), checked in order
+        """
+        evaluator = copy.copy(self)
+        evaluator.weights = dict(weights)
+        evaluator.score_ranges = dict(score_ranges)
+        return evaluator
+    
+    def generate_improvement_suggestions(self, category_scores: Dict, overall_score: Optional[float]) -> List[str]:
         """Generate personalized improvement suggestions"""
         suggestions = []
         
@@ -376,6 +409,9 @@ class PresentationEvaluator:
                 elif 'Technical Quality' in category:
                     suggestions.append("🎯 Improve recording setup with better lighting and audio equipment")
         
+        if overall_score is None:
+            return suggestions[:5]
+        
         # Overall suggestions based on total score
         if overall_score < 60:
             suggestions.append("📚 Consider taking a presentation skills course or workshop")
@@ -388,32 +424,66 @@ class PresentationEvaluator:
         
         return suggestions[:5]  # Limit to top 5 suggestions
     
-    def evaluate_presentation(self, analysis_results: Dict, transcript: str = None) -> Dict:
-        """Main method to evaluate the entire presentation"""
-        evaluation_timestamp = datetime.now().isoformat()
+    def evaluate_category(self, category: str, analysis_results: Dict, transcript: str = None) -> Dict:
+        """Evaluate a single category by its weight key (e.g. 'body_language')"""
+        if category == 'body_language':
+            return self.evaluate_body_language(analysis_results)
+        if category == 'vocal_delivery':
+            return self.evaluate_vocal_delivery(analysis_results, transcript)
+        if category == 'content_quality':
+            return self.evaluate_content_quality(analysis_results)
+        if category == 'facial_expression':
+            return self.evaluate_facial_expression(analysis_results)
+        if category == 'technical_aspects':
+            return self.evaluate_technical_aspects(analysis_results)
+        raise ValueError(f"Unknown evaluation category: {category}")
+    
+    def get_ready_categories(self, finished_steps: List[str]) -> List[str]:
+        """Get categories whose input analyses have all finished"""
+        finished = set(finished_steps)
+        return [
+            category for category, inputs in self.CATEGORY_INPUTS.items()
+            if all(step in finished for step in inputs)
+        ]
+    
+    def get_relevant_categories(self, selected_steps: List[str]) -> List[str]:
+        """
+        Get categories that have at least one input among the selected analyzers
         
+        Args:
+            selected_steps: Names of analyzers that run in this analysis
+            
+        Returns:
+            List of category weight keys
+        """
+        selected = set(selected_steps)
+        return [
+            category for category, inputs in self.CATEGORY_INPUTS.items()
+            if any(step in selected for step in inputs)
+        ]
+    
+    def evaluate_presentation(self, analysis_results: Dict, transcript: str = None,
+                              categories: List[str] = None) -> Dict:
+        """
+        Main method to evaluate the entire presentation
+        
+        Args:
+            analysis_results: Results of the individual analyzers
+            transcript: Speech transcript, if available
+            categories: Weight keys of categories to evaluate (None: all; an
+                empty list evaluates none)
+        """
         # Evaluate each category
         category_evaluations = {}
+        for category in self.weights.keys() if categories is None else categories:
+            category_eval = self.evaluate_category(category, analysis_results, transcript)
+            category_evaluations[category_eval['category']] = category_eval
         
-        # Body Language
-        body_eval = self.evaluate_body_language(analysis_results)
-        category_evaluations[body_eval['category']] = body_eval
-        
-        # Vocal Delivery
-        vocal_eval = self.evaluate_vocal_delivery(analysis_results, transcript)
-        category_evaluations[vocal_eval['category']] = vocal_eval
-        
-        # Content Quality
-        content_eval = self.evaluate_content_quality(analysis_results)
-        category_evaluations[content_eval['category']] = content_eval
-        
-        # Facial Expression
-        expression_eval = self.evaluate_facial_expression(analysis_results)
-        category_evaluations[expression_eval['category']] = expression_eval
-        
-        # Technical Aspects
-        technical_eval = self.evaluate_technical_aspects(analysis_results)
-        category_evaluations[technical_eval['category']] = technical_eval
+        return self.build_evaluation(category_evaluations)
+    
+    def build_evaluation(self, category_evaluations: Dict) -> Dict:
+        """Combine category evaluations into the full evaluation result"""
+        evaluation_timestamp = datetime.now().isoformat()
         
         # Calculate overall score
         overall_evaluation = self.calculate_overall_score(category_evaluations)
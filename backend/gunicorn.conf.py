@@ -0,0 +1,92 @@
+"""
+Gunicorn configuration - preloaded models shared by forked workers
+
+The master process imports the application with PRELOAD_MODELS set, which
+loads Whisper, the expression model and the other analyzers synchronously and
+freezes them; the workers are then forked and share those pages
+copy-on-write instead of each loading its own copies.
+
+Analysis records, their SSE event streams and batches live in the memory of
+the worker that accepted the upload, so the server runs a single worker by
+default and scales with threads. To use more cores, run several single-worker
+instances behind a load balancer that routes every request of an analysis to
+the same instance (sticky routing); within one Gunicorn instance the workers
+accept connections in no particular order, so GUNICORN_WORKERS > 1 only suits
+clients that never look an analysis up again.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import multiprocessing
+import os
+import time
+
+
+_started_at = time.perf_counter()
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+# Analyses and their records stay in the worker that accepted the upload (see above)
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+
+def _cuda_requested():
+    """Whether the application would load its models on a CUDA device (USE_GPU and a device present)"""
+    if os.environ.get('USE_GPU', 'True').lower() != 'true':
+        return False
+    # Ask NVML rather than the CUDA runtime, which would leave the master unable to fork CUDA-using workers
+    os.environ.setdefault('PYTORCH_NVML_BASED_CUDA_CHECK', '1')
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+preload_app = os.environ.get('PRELOAD_MODELS', 'True').lower() == 'true'
+# CUDA contexts do not survive fork: on GPU hosts every worker loads its own models
+gpu_disabled_preload = preload_app and _cuda_requested()
+preload_app = preload_app and not gpu_disabled_preload
+# Read by the application (app.config.Config.PRELOAD_MODELS) when the master imports it
+os.environ['PRELOAD_MODELS'] = str(preload_app)
+
+# Torch/OpenMP threads per worker; by default the cores are split between the workers
+torch_threads = int(os.environ.get('TORCH_THREADS_PER_WORKER', 0)) or max(1, multiprocessing.cpu_count() // workers)
+
+
+def _format_memory(memory):
+    """Format get_memory_usage() output for the log"""
+    return ', '.join(f"{name} {value} MB" for name, value in memory.items()) or 'n/a'
+
+
+def when_ready(server):
+    """Report the master's startup time and memory (including preloaded models)"""
+    from app.utils.preload import get_memory_usage
+
+    if gpu_disabled_preload:
+        server.log.warning("CUDA is available and USE_GPU is set: models are loaded by each worker, "
+                           "not preloaded (set USE_GPU=False to preload them on the CPU)")
+    if workers > 1:
+        server.log.warning(f"{workers} workers: analyses are only visible to the worker that accepted "
+                           "the upload; status, events and results requests may return 404")
+    server.log.info(
+        f"Master ready in {time.perf_counter() - _started_at:.1f}s "
+        f"(preload_models={preload_app}, workers={workers}, torch_threads={torch_threads}); "
+        f"memory: {_format_memory(get_memory_usage())}"
+    )
+
+
+def post_fork(server, worker):
+    """Limit the numeric libraries' threads in the new worker"""
+    from app.utils.preload import configure_worker_threads
+
+    configure_worker_threads(torch_threads)
+
+
+def post_worker_init(worker):
+    """Report the worker's memory once it has loaded the application"""
+    from app.utils.preload import configure_worker_threads, get_memory_usage
+
+    # Without preloading, torch was only imported now, in the worker itself
+    configure_worker_threads(torch_threads)
+    worker.log.info(f"Worker {worker.pid} booted; memory: {_format_memory(get_memory_usage())}")
@@ -71,6 +71,9 @@ def install_dependencies():
     for dep in optional_deps:
         run_command(f"pip install {dep}", f"Installing {dep.split('==')[0]} (optional)")
     
+    # Sentence tokenizer data for transcript segmentation (the server never downloads it)
+    run_command(f"{sys.executable} -m nltk.downloader -q punkt_tab", "Downloading NLTK Punkt data (optional)")
+    
     return success
 
 def create_env_file():
@@ -0,0 +1,80 @@
+import pytest
+
+from audio_analysis.disfluency_analyzer.timeline import (
+    align_tokens, build_disfluency_timeline, iter_disfluency_spans
+)
+from audio_analysis.transcript import TranscriptDocument
+
+
+WORDS = ["Um,", "so", "I", "I", "don't", "want", "to,", "uh,", "talk", "about", "sooo", "ice-cream.",
+         "Okay.", "Next", "one."]
+
+TOKENS = ["Um", ",", "so", "I", "I", "do", "n't", "want", "to", ",", "uh", ",", "talk", "about", "sooooo",
+          "ice", "cream", "."]
+
+
+@pytest.fixture
+def document():
+    # Word i is spoken from 0.5 * i to 0.5 * i + 0.4 seconds
+    result = {
+        'text': ' ' + ' '.join(WORDS),
+        'segments': [{'words': [{'word': ' ' + word, 'start': i * 0.5, 'end': i * 0.5 + 0.4}
+                                for i, word in enumerate(WORDS)]}]
+    }
+    return TranscriptDocument.from_whisper(result)
+
+
+def test_disfluency_spans():
+    tags = ["O", "B-FILLER", "I-FILLER", "O", "I-REP", "B-REP", "B-INTERJ"]
+    assert list(iter_disfluency_spans(tags)) == [("FILLER", 1, 3), ("REP", 5, 6), ("INTERJ", 6, 7)]
+
+
+def test_align_tokens_splits_and_joins_words():
+    matches = align_tokens(TOKENS, WORDS, 0, 12)
+
+    assert matches[0] == (0, 0)          # "Um" without its comma
+    assert matches[1] is None            # Punctuation matches nothing
+    assert matches[5:7] == [(4, 4), (4, 4)]  # "do" + "n't" cover "don't"
+    assert matches[14] is None           # "sooooo" is not "sooo"
+    assert matches[15:17] == [(11, 11), (11, 11)]  # "ice" + "cream" cover "ice-cream."
+
+
+def test_align_tokens_resyncs_after_dropped_words():
+    assert align_tokens(["so", "want", "to", "talk"], WORDS, 0, 12) == [(1, 1), (5, 5), (6, 6), (8, 8)]
+
+
+def test_align_tokens_offsets_by_first_word():
+    assert align_tokens(["Okay"], WORDS, 12, 13) == [(12, 12)]
+
+
+def test_sentence_words(document):
+    assert len(document.sentences) == 3
+    assert [document.sentence_words(i) for i in range(3)] == [(0, 12), (12, 13), (13, 15)]
+
+
+def test_timeline(document):
+    tagged = [
+        {'sentence_index': 0, 'tokens': TOKENS,
+         'tags': ["B-FILLER", "O", "O", "B-REP", "I-REP", "O", "O", "O", "O", "O", "B-FILLER", "O", "O", "O",
+                  "B-LENGTHEN", "O", "O", "O"]},
+        {'sentence_index': 1, 'tokens': ["Okay", "."], 'tags': ["B-INTERJ", "O"]},
+        {'sentence_index': 2, 'error': 'Tagging failed', 'tokens': [], 'tags': []}
+    ]
+    timeline = build_disfluency_timeline(document, tagged)
+
+    assert [(event['type'], event['text'], event['start'], event['end'], event['approximate'])
+            for event in timeline] == [
+        ('FILLER', 'Um', 0.0, 0.4, False),
+        ('REP', 'I I', 1.0, 1.9, False),
+        ('FILLER', 'uh', 3.5, 3.9, False),
+        # Unmatched: placed between the end of "about" and the start of "ice-cream."
+        ('LENGTHEN', 'sooooo', 4.9, 5.5, True),
+        ('INTERJ', 'Okay', 6.0, 6.4, False),
+    ]
+    assert timeline[-1]['sentence_index'] == 1
+
+
+def test_timeline_needs_word_times():
+    document = TranscriptDocument("Um, so. Okay.")
+    assert not document.has_word_times
+    assert build_disfluency_timeline(document, [{'sentence_index': 0, 'tokens': ["Um"], 'tags': ["B-FILLER"]}]) == []
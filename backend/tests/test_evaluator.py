@@ -0,0 +1,113 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from evaluation.batch_evaluator import BatchEvaluator
+from evaluation.evaluator import PresentationEvaluator
+
+CATEGORIES = list(PresentationEvaluator.CATEGORY_INPUTS)
+
+
+def random_results(rng):
+    """Analyzer results with missing, failed and partial steps"""
+    results = {}
+    if rng.random() < 0.8:
+        results['body_rotation'] = {'std_dev_angle': rng.uniform(0, 25), 'detection_rate': rng.random(),
+                                    'direction_percentages': {'center': rng.uniform(0, 100)},
+                                    'duration_seconds': rng.uniform(10, 300)}
+    if rng.random() < 0.8:
+        results['head_motion'] = {'stability_score': rng.uniform(0, 100), 'detection_rate': rng.random()}
+    if rng.random() < 0.8:
+        results['hand_motion'] = {'activity_level': rng.choice(['low', 'moderate', 'high'])}
+    if rng.random() < 0.7:
+        results['expression'] = {'average_scores': {'Happy': rng.random() * 0.5, 'Neutral': rng.random() * 0.5},
+                                 'detection_rate': rng.random()}
+    if rng.random() < 0.7:
+        results['content'] = {'error': 'Analysis failed'} if rng.random() < 0.2 else {
+            'presentationAnalysis': {'overallScore': rng.uniform(0, 10),
+                                     'contentQualityMetrics': {'clarity': {'score': rng.randint(0, 10)}}}}
+    if rng.random() < 0.6:
+        results['disfluency'] = {'total_disfluencies': rng.randint(0, 40)}
+    return results
+
+
+@pytest.fixture
+def evaluator():
+    return PresentationEvaluator()
+
+
+def test_no_categories_means_none_are_evaluated(evaluator):
+    evaluation = evaluator.evaluate_presentation({'head_motion': {'stability_score': 90}}, None, categories=[])
+
+    assert evaluation['category_evaluations'] == {}
+    assert evaluation['overall_evaluation']['evaluated_categories'] == 0
+    assert evaluation['overall_evaluation']['overall_score'] is None
+    assert evaluation['overall_evaluation']['grade'] is None
+    assert evaluation['summary']['total_score'] is None
+    assert evaluation['improvement_suggestions'] == []
+
+
+def test_zero_weighted_categories_give_no_score(evaluator):
+    evaluator = evaluator.with_rubric(dict(evaluator.weights, body_language=0), evaluator.score_ranges)
+    evaluation = evaluator.evaluate_presentation({'head_motion': {'stability_score': 90}}, None,
+                                                 categories=['body_language'])
+
+    assert len(evaluation['category_evaluations']) == 1
+    assert evaluation['overall_evaluation']['overall_score'] is None
+
+
+def test_categories_default_to_all(evaluator):
+    evaluation = evaluator.evaluate_presentation({}, None)
+    assert len(evaluation['category_evaluations']) == len(CATEGORIES)
+
+
+def test_only_selected_categories_are_evaluated(evaluator):
+    evaluation = evaluator.evaluate_presentation({'head_motion': {'stability_score': 90}}, None,
+                                                 categories=['body_language'])
+    assert list(evaluation['category_evaluations']) == [evaluator.CATEGORY_NAMES['body_language']]
+
+
+def test_relevant_categories(evaluator):
+    assert evaluator.get_relevant_categories(['expression']) == ['facial_expression', 'technical_aspects']
+    assert evaluator.get_relevant_categories(['gaze_motion']) == []
+
+
+@pytest.mark.parametrize('rubric', [
+    None,
+    ({'body_language': 1, 'vocal_delivery': 0, 'content_quality': 0.3, 'facial_expression': 0.2,
+      'technical_aspects': 0},
+     {'A': (85, 100), 'B': (70, 84.9), 'C': (50, 69), 'needs_improvement': (0, 40)}),
+])
+def test_batch_evaluator_matches_single_evaluations(evaluator, rubric):
+    if rubric is not None:
+        evaluator = evaluator.with_rubric(*rubric)
+    rng = random.Random(1)
+    analyses = [random_results(rng) for _ in range(200)]
+    transcripts = [rng.choice([None, '', ' '.join(['word'] * rng.randint(0, 800))]) for _ in analyses]
+    categories = [rng.choice([None, [], rng.sample(CATEGORIES, rng.randint(1, 5))]) for _ in analyses]
+
+    batch = BatchEvaluator(evaluator).evaluate(analyses, transcripts, categories)
+
+    for i, (results, transcript, selected) in enumerate(zip(analyses, transcripts, categories)):
+        single = evaluator.evaluate_presentation(results, transcript, selected)
+        overall_score = single['overall_evaluation']['overall_score']
+        if overall_score is None:
+            assert math.isnan(batch['overall_scores'][i])
+            assert math.isnan(batch['percentile_ranks'][i])
+        else:
+            assert batch['overall_scores'][i] == pytest.approx(overall_score)
+        assert batch['grades'][i] == single['overall_evaluation']['grade']
+        for j, category in enumerate(CATEGORIES):
+            category_evaluation = single['category_evaluations'].get(evaluator.CATEGORY_NAMES[category])
+            if category_evaluation is None:
+                assert math.isnan(batch['category_scores'][i, j])
+            else:
+                assert batch['category_scores'][i, j] == pytest.approx(category_evaluation['overall_score'])
+    unscored = [i for i, selected in enumerate(categories) if selected == []]
+    assert np.all(np.isnan(batch['category_scores'][unscored]))
+    # Unscored analyses are left out of the statistics and grade distribution
+    assert batch['statistics']['unscored'] >= len(unscored) > 0
+    assert batch['statistics']['count'] == sum(batch['grade_distribution'].values())
+    assert batch['statistics']['count'] + batch['statistics']['unscored'] == len(analyses)
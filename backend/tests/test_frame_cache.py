@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+
+from video_analysis.frame_cache import META_FILE, FrameCache
+
+FRAME = np.zeros((8, 8, 3), dtype=np.uint8)   # 192 bytes
+
+
+def write_entry(cache, key, frames=2, mtime=None):
+    writer = cache.create_writer(key)
+    for i in range(frames):
+        writer.append(i, FRAME + i, 1, 1.0)
+    writer.commit({'video_fps': 5.0})
+    if mtime is not None and os.path.exists(cache.entry_dir(key)):
+        os.utime(os.path.join(cache.entry_dir(key), META_FILE), (mtime, mtime))
+
+
+def entry_size(tmp_path):
+    cache = FrameCache(str(tmp_path / 'probe'), 10 ** 9)
+    write_entry(cache, 'probe')
+    return cache.get_size()
+
+
+def test_round_trip(tmp_path):
+    cache = FrameCache(str(tmp_path / 'cache'), 10 ** 9)
+    write_entry(cache, 'video')
+
+    frames = cache.load('video')
+    assert frames.frames.shape == (2, 8, 8, 3)
+    assert frames.frames[1].max() == 1
+    assert frames.frame_indices.tolist() == [0, 1]
+    assert frames.meta['video_fps'] == 5.0
+    assert cache.load('missing') is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    size = entry_size(tmp_path)
+    cache = FrameCache(str(tmp_path / 'cache'), int(size * 2.5))
+    write_entry(cache, 'first', mtime=1000)
+    write_entry(cache, 'second', mtime=2000)
+    cache.load('first')                      # first is now the most recently used
+    write_entry(cache, 'third')
+
+    assert cache.load('second') is None
+    assert cache.load('first') is not None
+    assert cache.load('third') is not None
+    assert cache.get_size() <= cache.max_bytes
+
+
+def test_entry_larger_than_the_cache_is_not_written(tmp_path):
+    cache = FrameCache(str(tmp_path / 'cache'), FRAME.nbytes * 2)
+    write_entry(cache, 'long', frames=3)
+
+    assert cache.load('long') is None
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_discarded_recording_leaves_nothing(tmp_path):
+    cache = FrameCache(str(tmp_path / 'cache'), 10 ** 9)
+    writer = cache.create_writer('video')
+    writer.append(0, FRAME, 1, 1.0)
+    writer.discard()
+
+    assert os.listdir(cache.cache_dir) == []
+
+
+@pytest.mark.parametrize('shape', [(4, 4, 3), (8, 8, 1)])
+def test_frame_shape_change_stops_recording(tmp_path, shape):
+    cache = FrameCache(str(tmp_path / 'cache'), 10 ** 9)
+    writer = cache.create_writer('video')
+    writer.append(0, FRAME, 1, 1.0)
+    writer.append(1, np.zeros(shape, dtype=np.uint8), 1, 1.0)
+    writer.commit({})
+
+    assert cache.load('video') is None
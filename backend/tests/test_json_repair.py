@@ -0,0 +1,52 @@
+import pytest
+
+from audio_analysis.json_repair import EXTRACTED, REPAIRED, InvalidResponseError, parse_json_response, repair_json
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('{"score": 8}', {'score': 8}),
+    ('  [1, 2]  ', [1, 2]),
+    ('```json\n{"score": 8}\n```', {'score': 8}),
+    ('```\n{"score": 8}\n```', {'score': 8}),
+])
+def test_valid_json_is_parsed_as_is(text, expected):
+    assert parse_json_response(text) == (expected, None)
+
+
+def test_json_inside_prose_is_extracted():
+    assert parse_json_response('Here is the analysis: {"score": 8} Let me know!') == ({'score': 8}, EXTRACTED)
+
+
+@pytest.mark.parametrize('text, expected', [
+    # Trailing commas
+    ('{"tags": ["O", "B-FILLER",], }', {'tags': ['O', 'B-FILLER']}),
+    # Truncated inside a string value: the string is closed
+    ('{"score": 8, "feedback": "Clear struct', {'score': 8, 'feedback': 'Clear struct'}),
+    # Truncated inside an array
+    ('{"score": 8, "tokens": ["a", "b"', {'score': 8, 'tokens': ['a', 'b']}),
+    # Truncated after a key or inside a literal: the incomplete member is dropped
+    ('{"score": 8, "feedback":', {'score': 8}),
+    ('{"score": 8, "done": tr', {'score': 8}),
+    # Truncated list of objects
+    ('[{"index": 0}, {"index": 1}, {"ind', [{'index': 0}, {'index': 1}, {}]),
+])
+def test_malformed_json_is_repaired(text, expected):
+    assert parse_json_response(text) == (expected, REPAIRED)
+
+
+def test_repair_ignores_text_after_the_value():
+    assert repair_json('{"a": [1, 2]} and {"b": 3}') == '{"a": [1, 2]}'
+
+
+def test_repair_drops_dangling_escape():
+    assert repair_json('{"a": "x\\') == '{"a": "x"}'
+
+
+def test_repair_needs_an_object_or_array():
+    assert repair_json('no json here') is None
+
+
+@pytest.mark.parametrize('text', ['', 'I cannot help with that.', '[1 2]', '{"a" 1 2}'])
+def test_unrecoverable_text_raises(text):
+    with pytest.raises(InvalidResponseError):
+        parse_json_response(text)
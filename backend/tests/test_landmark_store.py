@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+from video_analysis.landmark_store import LandmarkStore, LandmarkTrackWriter
+
+
+class Sampler:
+    video_path = 'talk.mp4'
+    video_fps = 10.0
+    frame_count = 20
+    duration = 2.0
+    effective_fps = 5.0
+    sampling_rate = 2
+    frames_read = 20
+    frames_sampled = 10
+
+
+def record(store, analysis_id, mtime=None):
+    recorder = store.create_recorder(analysis_id)
+    writer = recorder.create_writer('pose')
+    for i in range(10):
+        landmarks = None if i == 3 else np.full((33, 3), i / 10, dtype=np.float32)
+        writer.add(i * 2, landmarks, 640, 480, 1, 1.0)
+    writer.finish(Sampler())
+    recorder.save(writer)
+    if mtime is not None:
+        os.utime(store.entry_dir(analysis_id), (mtime, mtime))
+
+
+def test_recorded_track_round_trip(tmp_path):
+    store = LandmarkStore(str(tmp_path))
+    record(store, 'talk')
+
+    track = store.load_track('talk', 'pose')
+    assert store.list_sources('talk') == ['pose']
+    assert len(track) == 10
+    frames = list(track)
+    assert frames[3][0] is None
+    assert frames[5][0].shape == (33, 3)
+    assert frames[5][0][0, 0] == pytest.approx(0.5, abs=1e-3)
+
+    series = track.motion_series()
+    assert series['times'][:2] == [0.0, 0.2]
+    assert series['detected'][3] is False
+    assert series['movement'][3] is None and series['movement'][4] is None
+    assert store.load_track('talk', 'hands') is None
+
+
+def test_store_is_bounded_and_evicts_least_recently_used(tmp_path):
+    probe = LandmarkStore(str(tmp_path / 'probe'))
+    record(probe, 'probe')
+    size = probe.get_size()
+
+    store = LandmarkStore(str(tmp_path / 'store'), int(size * 2.5))
+    record(store, 'first', mtime=1000)
+    record(store, 'second', mtime=2000)
+    store.load_track('first', 'pose')        # first is now the most recently used
+    record(store, 'third')
+
+    assert sorted(os.listdir(store.store_dir)) == ['first', 'third']
+    assert store.get_size() <= store.max_bytes
+
+
+def test_recording_analysis_is_never_evicted(tmp_path):
+    store = LandmarkStore(str(tmp_path), 1)
+    record(store, 'talk')
+
+    assert os.listdir(store.store_dir) == ['talk']
+
+
+def test_delete(tmp_path):
+    store = LandmarkStore(str(tmp_path))
+    record(store, 'talk')
+    store.delete('talk')
+
+    assert store.list_sources('talk') == []
+    assert os.listdir(store.store_dir) == []
+
+
+def test_writer_rejects_unknown_sources():
+    with pytest.raises(ValueError):
+        LandmarkTrackWriter('iris')
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from audio_analysis import rate_limiter
+from audio_analysis.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Stands in for time.monotonic/time.sleep; sleeping advances the clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_requests_are_spaced_evenly(clock):
+    limiter = RateLimiter(requests_per_minute=30)
+
+    waits = [limiter.acquire() for _ in range(4)]
+
+    assert waits == [0, 2.0, 2.0, 2.0]
+    assert clock.now == pytest.approx(1006.0)
+
+
+def test_idle_time_is_not_banked(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    limiter.acquire()
+    clock.now += 10
+
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == pytest.approx(1.0)
+
+
+def test_max_wait_gives_up_without_taking_the_slot(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    limiter.acquire()
+
+    assert limiter.acquire(max_wait=0.5) is None
+    assert clock.sleeps == []
+    assert limiter.acquire(max_wait=1.0) == pytest.approx(1.0)
+
+
+def test_cancel_event_interrupts_the_wait(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    cancel = threading.Event()
+    cancel.set()
+    limiter.acquire()
+
+    assert limiter.acquire(cancel=cancel) == pytest.approx(1.0)
+    assert clock.sleeps == []
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        RateLimiter(requests_per_minute=0)
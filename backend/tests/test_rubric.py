@@ -0,0 +1,59 @@
+import re
+
+import pytest
+
+from app.models.rubric import RUBRIC_PROFILES, RubricProfile
+from app.utils.exceptions import ValidationError
+
+
+def test_default_profile():
+    assert RubricProfile.from_request() is RUBRIC_PROFILES['default']
+    assert RubricProfile.from_request(profile=' default ') is RUBRIC_PROFILES['default']
+    assert RubricProfile.from_request(profile='') is RUBRIC_PROFILES['default']
+
+
+def test_custom_weights_are_merged_into_the_default_weights():
+    rubric = RubricProfile.from_request(profile='course-101', weights={'content_quality': 0.5, 'technical_aspects': 0})
+
+    assert rubric.name == 'course-101'
+    assert rubric.weights == dict(RUBRIC_PROFILES['default'].weights, content_quality=0.5, technical_aspects=0.0)
+    assert rubric.score_ranges == RUBRIC_PROFILES['default'].score_ranges
+
+
+def test_custom_rubric_without_a_name_is_named_after_its_settings():
+    rubric = RubricProfile.from_request(weights={'content_quality': 0.5})
+
+    assert rubric.name.startswith('custom-')
+    assert RubricProfile.from_request(weights={'content_quality': 0.5}).name == rubric.name
+    assert RubricProfile.from_request(weights={'content_quality': 0.6}).name != rubric.name
+    assert RubricProfile.from_request(score_ranges={'pass': [50, 100], 'fail': [0, 49.9]}).name.startswith('custom-')
+
+
+def test_score_ranges_keep_their_order():
+    rubric = RubricProfile.from_request(profile='pass-fail', score_ranges={'pass': [50, 100], 'fail': [0, 49.9]})
+
+    assert list(rubric.score_ranges.items()) == [('pass', (50.0, 100.0)), ('fail', (0.0, 49.9))]
+    assert rubric.to_dict()['score_ranges'] == {'pass': [50.0, 100.0], 'fail': [0.0, 49.9]}
+
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'profile': 'default', 'weights': {'content_quality': 1}}, 'built-in'),
+    ({'profile': 'nope'}, 'Unknown rubric profile'),
+    ({'profile': '  '}, 'non-empty'),
+    ({'profile': 3}, 'non-empty'),
+    ({'weights': ['content_quality']}, 'object keyed by category'),
+    ({'weights': {'charisma': 1}}, 'Unknown category'),
+    ({'weights': {'content_quality': -1}}, 'non-negative'),
+    ({'weights': {'content_quality': True}}, 'non-negative'),
+    ({'weights': {'content_quality': float('nan')}}, 'non-negative'),
+    ({'weights': {category: 0 for category in RUBRIC_PROFILES['default'].weights}}, 'must be positive'),
+    ({'score_ranges': {}}, 'non-empty object'),
+    ({'score_ranges': {'pass': [50]}}, '[min, max]'),
+    ({'score_ranges': {'pass': ['50', 100]}}, '[min, max]'),
+    ({'score_ranges': {'pass': [60, 50]}}, '0 <= min <= max <= 100'),
+    ({'score_ranges': {'pass': [0, 101]}}, '0 <= min <= max <= 100'),
+    ({'score_ranges': {' ': [0, 100]}}, 'must not be empty'),
+])
+def test_invalid_rubrics_are_rejected(kwargs, message):
+    with pytest.raises(ValidationError, match=re.escape(message)):
+        RubricProfile.from_request(**kwargs)
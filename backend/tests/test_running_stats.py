@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from video_analysis.running_stats import CategoryCounter, P2Quantile, RunningStats
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(7).normal(10.0, 3.0, 5000)
+
+
+def test_running_stats_match_numpy(values):
+    stats = RunningStats()
+    stats.update(values)
+
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(np.mean(values))
+    assert stats.variance == pytest.approx(np.var(values))
+    assert stats.std == pytest.approx(np.std(values))
+    assert stats.min == values.min()
+    assert stats.max == values.max()
+    # P² estimate of the median
+    assert stats.median == pytest.approx(np.median(values), abs=0.1)
+
+
+def test_weighted_values_count_as_repeated_values():
+    weighted, repeated = RunningStats(), RunningStats()
+    for value, weight in [(1.0, 3), (4.0, 1), (2.5, 2), (7.0, 4), (3.0, 1), (5.0, 2)]:
+        weighted.add(value, weight)
+        for _ in range(weight):
+            repeated.add(value)
+
+    assert weighted.count == repeated.count == 13
+    assert weighted.mean == pytest.approx(repeated.mean)
+    assert weighted.variance == pytest.approx(repeated.variance)
+    assert weighted.median == pytest.approx(repeated.median)
+
+
+def test_merge_matches_single_pass(values):
+    whole = RunningStats()
+    whole.update(values)
+    shards = [RunningStats() for _ in range(4)]
+    for shard, part in zip(shards, np.array_split(values, 4)):
+        shard.update(part)
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+
+    assert merged.count == whole.count
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.variance == pytest.approx(whole.variance)
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+    assert merged.median == pytest.approx(np.median(values), abs=0.2)
+
+
+def test_merge_into_empty_and_of_empty():
+    stats = RunningStats()
+    stats.update([1.0, 2.0, 3.0])
+
+    assert RunningStats().merge(stats).to_dict() == stats.to_dict()
+    assert stats.merge(RunningStats()).count == 3
+
+
+def test_exact_mode_and_mixed_merge(values):
+    exact = RunningStats(exact=True)
+    exact.update(values)
+
+    assert exact.median == pytest.approx(np.median(values))
+    assert exact.std == pytest.approx(np.std(values))
+    with pytest.raises(ValueError):
+        exact.merge(RunningStats())
+
+
+def test_empty_stats_report_zeros():
+    assert RunningStats().to_dict() == {'count': 0, 'mean': 0.0, 'median': 0.0, 'std': 0.0, 'min': 0.0, 'max': 0.0}
+
+
+def test_p2_quantile_is_exact_for_five_values_or_fewer():
+    quantile = P2Quantile(0.5)
+    for value in [5.0, 1.0, 4.0]:
+        quantile.add(value)
+    assert quantile.value == 4.0
+
+    merged = P2Quantile(0.5)
+    merged.merge(quantile)
+    assert merged.count == 3
+    assert merged.value == 4.0
+
+
+@pytest.mark.parametrize('p', [0.1, 0.9])
+def test_p2_quantile_estimates_other_quantiles(p):
+    values = np.random.default_rng(3).uniform(0, 100, 20000)
+    quantile = P2Quantile(p)
+    for value in values:
+        quantile.add(value)
+    assert quantile.value == pytest.approx(np.quantile(values, p), abs=1.0)
+
+
+def test_p2_quantile_rejects_invalid_quantiles():
+    with pytest.raises(ValueError):
+        P2Quantile(1.0)
+    with pytest.raises(ValueError):
+        P2Quantile(0.5).merge(P2Quantile(0.25))
+
+
+def test_category_counter_labels_percentages_and_merge():
+    first, second = CategoryCounter(['left', 'right', 'center']), CategoryCounter(['left', 'right', 'center'])
+    first.add(0, 3)
+    first.add(2)
+    second.add(2, 4)
+    first.merge(second)
+
+    assert first.total == 8
+    assert first.percentages() == {'left': 37.5, 'center': 62.5}
+    assert first.dominant() == 'center'
+    assert CategoryCounter().dominant() is None
+    assert CategoryCounter().percentages() == {}
+    with pytest.raises(ValueError):
+        first.merge(CategoryCounter())
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import numpy as np
+
+from app.models.analysis_options import AnalysisOptions
+from app.services.analyzer_service import AnalyzerService
+from app.services.video_analysis_service import VideoAnalysisService
+
+
+class SharedModelStub:
+    """
+    Whisper stand-in that, like the real model, breaks when two transcriptions overlap
+
+    transcribe() installs per-call state on the shared instance (as Whisper's
+    KV-cache and alignment hooks do) and times the words from it.
+    """
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.hooks = None
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio_path, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.hooks = audio_path
+        time.sleep(0.05)
+        offset = 0.0 if self.hooks == audio_path else 100.0
+        with self._lock:
+            self.active -= 1
+        words = [{'word': ' Hello', 'start': offset, 'end': offset + 0.4},
+                 {'word': ' there.', 'start': offset + 0.5, 'end': offset + 0.9}]
+        return {'text': ' Hello there.', 'segments': [{'words': words}]}
+
+
+def test_concurrent_analyses_transcribe_one_at_a_time(tmp_path, monkeypatch):
+    model = SharedModelStub()
+    analyzer_service = AnalyzerService()
+    monkeypatch.setattr(analyzer_service, 'get_whisper_model', lambda model_size=None: model)
+    service = VideoAnalysisService(analyzer_service)
+    monkeypatch.setattr(service.audio_processor, 'extract_audio_from_video',
+                        lambda video_path, audio_path: open(audio_path, 'wb').close() or True)
+
+    documents = []
+
+    def analyze(i):
+        record = analyzer_service.create_analysis_record(f"talk{i}.mp4")
+        context = {'options': AnalysisOptions.from_request(preset='draft')}
+        result = service._run_content_analysis(record.analysis_id, f"talk{i}.mp4",
+                                               str(tmp_path / f"talk{i}.wav"), context)
+        assert result['llm_analysis'] is False
+        documents.append(context['transcript_document'])
+
+    threads = [threading.Thread(target=analyze, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert model.max_active == 1
+    assert len(documents) == 4
+    for document in documents:
+        assert document.words == ['Hello', 'there.']
+        np.testing.assert_allclose(document.word_times, [[0.0, 0.4], [0.5, 0.9]], rtol=1e-6)
@@ -1,10 +1,11 @@
-import cv2
 import numpy as np
 import torch
 from PIL import Image
 from transformers import AutoImageProcessor, SiglipForImageClassification
 from dataclasses import dataclass
-from tqdm import tqdm
+from typing import List, Optional
+
+from ..frame_sampling import create_frame_sampler
 
 @dataclass
 class EmotionAnalysisResult:
@@ -23,17 +24,25 @@ class FacialExpressionAnalyzer:
 
     def _analyze_frame(self, image_rgb: np.ndarray) -> dict:
         """Analyze a single frame and return emotion probabilities"""
-        pil_image = Image.fromarray(image_rgb).convert("RGB")
-        inputs = self.processor(images=pil_image, return_tensors="pt")
+        return self._analyze_frames([image_rgb])[0]
+    
+    def _analyze_frames(self, images_rgb: List[np.ndarray]) -> List[dict]:
+        """Analyze a batch of frames in one forward pass and return emotion probabilities per frame"""
+        pil_images = [Image.fromarray(image_rgb).convert("RGB") for image_rgb in images_rgb]
+        inputs = self.processor(images=pil_images, return_tensors="pt")
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
         
         with torch.no_grad():
             logits = self.model(**inputs).logits
-            probs = torch.nn.functional.softmax(logits, dim=1).squeeze().tolist()
+            probs = torch.nn.functional.softmax(logits, dim=1).tolist()
         
-        return {self.labels[str(i)]: probs[i] for i in range(len(probs))}
+        return [
+            {self.labels[str(i)]: frame_probs[i] for i in range(len(frame_probs))}
+            for frame_probs in probs
+        ]
     
-    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True) -> EmotionAnalysisResult:
+    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True,
+                      max_resolution: Optional[int] = None, batch_size: int = 1) -> EmotionAnalysisResult:
         """
         Process video and calculate average scores for all emotions
         
@@ -41,72 +50,42 @@ class FacialExpressionAnalyzer:
             video_path: Path to the video file
             target_fps: Target frames per second to analyze (None = use video's native FPS)
             show_progress: Whether to display a progress bar during processing
+            max_resolution: Longest side of analyzed frames in pixels (None = native resolution)
+            batch_size: Number of sampled frames classified per forward pass
             
         Returns:
             EmotionAnalysisResult: Emotion analysis results including totals and averages
         """
-        # Open video file
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Error: Could not open video at {video_path}")
-        
-        # Get video properties
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / video_fps if video_fps > 0 else 0
-        
-        # Calculate sampling rate based on target_fps
-        if target_fps is None:
-            # Use all frames (sampling rate of 1)
-            sampling_rate = 1
-            effective_fps = video_fps
-        else:
-            # Ensure target_fps doesn't exceed video's actual FPS
-            effective_fps = min(target_fps, video_fps)
-            
-            # Calculate the sampling rate (how many frames to skip)
-            # If video is 30fps and we want 5fps, we process every 6th frame
-            sampling_rate = max(1, int(round(video_fps / effective_fps)))
+        # Open video file; sampling rate is video FPS / target FPS, rounded
+        sampler = create_frame_sampler(video_path, target_fps, max_resolution, show_progress)
+        video_fps = sampler.video_fps
+        duration = sampler.duration
+        effective_fps = sampler.effective_fps
+        sampling_rate = sampler.sampling_rate
+        batch_size = max(1, batch_size)
         
         # Variables to store analysis results
         emotion_totals = {emotion: 0.0 for emotion in self.labels.values()}
         analyzed_frames = 0
-        frame_index = 0
-        
-        # Create progress bar if requested
-        if show_progress:
-            pbar = tqdm(total=frame_count, desc="Processing video")
+        batch = []
         
-        # Start processing
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            # Process every Nth frame based on calculated sampling rate
-            if frame_index % sampling_rate == 0:
-                # Process the frame
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                scores = self._analyze_frame(frame_rgb)
-                
-                # Accumulate emotion scores
+        def flush_batch():
+            # Accumulate emotion scores
+            for scores in self._analyze_frames(batch):
                 for emotion, score in scores.items():
                     emotion_totals[emotion] += score
-                
-                analyzed_frames += 1
-            
-            frame_index += 1
-            
-            # Update progress bar
-            if show_progress:
-                pbar.update(1)
+            batch.clear()
         
-        # Close progress bar
-        if show_progress:
-            pbar.close()
-            
-        # Release resources
-        cap.release()
+        # Start processing
+        for _, frame_rgb in sampler:
+            batch.append(frame_rgb)
+            analyzed_frames += 1
+            if len(batch) >= batch_size:
+                flush_batch()
+        if batch:
+            flush_batch()
+        
+        frame_index = sampler.frames_read
         
         # Compute average emotion scores
         if analyzed_frames == 0:
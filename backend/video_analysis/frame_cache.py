@@ -0,0 +1,249 @@
+"""
+On-disk cache of sampled, downscaled video frames
+
+Decoding is a large share of every analyzer run, and every motion analyzer
+(plus the expression analyzer) decodes the same video with the same
+sampling settings. When the cache is enabled, the first analyzer to sample a
+video records its frames; later analyzers, and re-runs with different
+thresholds or evaluator weights, read them back zero-copy from a
+memory-mapped file instead of decoding the container again.
+
+Each entry is a directory named by the video's content hash and the sampling
+configuration, holding:
+- frames.u8: raw uint8 RGB frames, memory-mapped as (n, height, width, 3)
+- index.npz: source frame index, sample weight and sample gap of each frame
+- meta.json: video properties and array shape
+
+Entries are evicted least-recently-used first once the cache exceeds its
+size limit. An entry that would not fit on its own is not written.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+CACHE_VERSION = 1
+
+FRAMES_FILE = 'frames.u8'
+INDEX_FILE = 'index.npz'
+META_FILE = 'meta.json'
+
+
+class CachedFrames:
+    """Frames and sampling metadata of one cache entry"""
+
+    def __init__(self, entry_dir: str):
+        with open(os.path.join(entry_dir, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+
+        count = self.meta['frames_sampled']
+        if count:
+            self.frames = np.memmap(os.path.join(entry_dir, FRAMES_FILE), dtype=np.uint8, mode='r',
+                                    shape=(count, *self.meta['frame_shape']))
+        else:
+            self.frames = np.empty((0, 0, 0, 3), dtype=np.uint8)
+        with np.load(os.path.join(entry_dir, INDEX_FILE)) as index:
+            self.frame_indices = index['frame_indices']
+            self.sample_weights = index['sample_weights']
+            self.sample_gaps = index['sample_gaps']
+
+
+class FrameCacheWriter:
+    """
+    Records the frames of one sampler run into a temporary entry
+
+    The entry only becomes visible when commit() is called after the whole
+    video was sampled; discard() removes a partial recording.
+    """
+
+    def __init__(self, cache: 'FrameCache', key: str):
+        self.cache = cache
+        self.key = key
+        self.temp_dir = os.path.join(cache.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        os.makedirs(self.temp_dir)
+        self._frames_file = open(os.path.join(self.temp_dir, FRAMES_FILE), 'wb')
+        self._frame_shape = None
+        self._frame_indices = []
+        self._sample_weights = []
+        self._sample_gaps = []
+        self.bytes_written = 0
+        self.active = True
+
+    def append(self, frame_index: int, frame_rgb: np.ndarray, sample_weight: int, sample_gap: float) -> None:
+        """Record one sampled frame (stops recording if the entry grows too large)"""
+        if not self.active:
+            return
+        if self._frame_shape is None:
+            self._frame_shape = frame_rgb.shape
+        if frame_rgb.shape != self._frame_shape or self.bytes_written + frame_rgb.nbytes > self.cache.max_bytes:
+            self.discard()
+            return
+
+        self._frames_file.write(np.ascontiguousarray(frame_rgb, dtype=np.uint8).tobytes())
+        self.bytes_written += frame_rgb.nbytes
+        self._frame_indices.append(frame_index)
+        self._sample_weights.append(sample_weight)
+        self._sample_gaps.append(sample_gap)
+
+    def commit(self, meta: Dict) -> None:
+        """Publish the recorded frames under the cache key"""
+        if not self.active:
+            return
+        self.active = False
+        self._frames_file.close()
+
+        np.savez(os.path.join(self.temp_dir, INDEX_FILE),
+                 frame_indices=np.array(self._frame_indices, dtype=np.int64),
+                 sample_weights=np.array(self._sample_weights, dtype=np.int32),
+                 sample_gaps=np.array(self._sample_gaps, dtype=np.float32))
+        meta = dict(meta, version=CACHE_VERSION, frames_sampled=len(self._frame_indices),
+                    frame_shape=list(self._frame_shape or (0, 0, 3)))
+        with open(os.path.join(self.temp_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        try:
+            os.replace(self.temp_dir, self.cache.entry_dir(self.key))
+        except OSError:
+            # Another run published the same entry first
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            return
+        self.cache.evict()
+
+    def discard(self) -> None:
+        """Drop the recording"""
+        if not self.active:
+            return
+        self.active = False
+        self._frames_file.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class FrameCache:
+    """
+    Size-bounded, content-addressed cache of sampled frames
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Total size limit of the cache
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def content_hash(self, video_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 of a video file, memoized per path, size and modification time"""
+        stat = os.stat(video_path)
+        stat_key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._hashes.get(stat_key)
+        if cached:
+            return cached
+
+        sha256 = hashlib.sha256()
+        with open(video_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        with self._lock:
+            self._hashes[stat_key] = digest
+        return digest
+
+    def make_key(self, video_path: str, target_fps: Optional[float], max_resolution: Optional[int],
+                 min_fps: Optional[float] = None) -> str:
+        """Cache key for a video and sampling configuration"""
+        config = f"v{CACHE_VERSION}-fps{target_fps}-res{max_resolution}-min{min_fps}"
+        config_hash = hashlib.sha256(config.encode('utf-8')).hexdigest()[:12]
+        return f"{self.content_hash(video_path)}-{config_hash}"
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key: str) -> Optional[CachedFrames]:
+        """Open a cache entry, marking it as recently used (None on a miss)"""
+        entry_dir = self.entry_dir(key)
+        try:
+            frames = CachedFrames(entry_dir)
+            os.utime(os.path.join(entry_dir, META_FILE))
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(entry_dir):
+                print(f"Discarding unreadable frame cache entry {key}: {e}")
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        if frames.meta.get('version') != CACHE_VERSION:
+            return None
+        return frames
+
+    def create_writer(self, key: str) -> Optional[FrameCacheWriter]:
+        """Start recording an entry (None if the cache directory is not writable)"""
+        try:
+            return FrameCacheWriter(self, key)
+        except OSError as e:
+            print(f"Frame cache disabled for this run: {e}")
+            return None
+
+    def get_size(self) -> int:
+        """Total size of the published entries in bytes"""
+        return sum(size for _, size, _ in self._list_entries())
+
+    def _list_entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(entry_dir, META_FILE)
+            if name.startswith('.') or not os.path.exists(meta_path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
+            entries.append((entry_dir, size, os.path.getmtime(meta_path)))
+        return entries
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits its size limit"""
+        with self._lock:
+            entries = sorted(self._list_entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for entry_dir, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            for entry_dir, _, _ in self._list_entries():
+                shutil.rmtree(entry_dir, ignore_errors=True)
+
+
+_frame_cache: Optional[FrameCache] = None
+
+
+def configure_frame_cache(cache_dir: Optional[str], max_bytes: int = 0) -> Optional[FrameCache]:
+    """
+    Enable (or, with cache_dir=None, disable) the frame cache used by all analyzers
+
+    Args:
+        cache_dir: Directory for cache entries
+        max_bytes: Total size limit of the cache
+
+    Returns:
+        The configured cache, or None if disabled
+    """
+    global _frame_cache
+    _frame_cache = FrameCache(cache_dir, max_bytes) if cache_dir and max_bytes > 0 else None
+    return _frame_cache
+
+
+def get_frame_cache() -> Optional[FrameCache]:
+    """Get the configured frame cache (None if disabled)"""
+    return _frame_cache
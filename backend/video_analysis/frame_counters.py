@@ -0,0 +1,70 @@
+"""
+Per-thread frame counters for profiling pipeline stages
+
+Frame samplers report every frame they decode and every frame they hand to
+an analyzer (which runs its detector or model on it) to the counters active
+on the current thread, if any:
+
+    with count_frames() as counts:
+        analyzer.process_video(video_path)
+    print(counts['frames_decoded'], counts['frames_inferred'])
+
+Frames replayed from the frame cache are inferred but not decoded. The time
+an analyzer spends on each frame (from the sampler yielding it until the
+analyzer asks for the next one) is passed to the optional on_frame callback.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+
+_local = threading.local()
+
+
+@contextmanager
+def count_frames(on_frame: Optional[Callable[[float], None]] = None) -> Iterator[Dict[str, int]]:
+    """
+    Count the frames decoded and inferred on this thread inside the block
+
+    Blocks can be nested; frames counted by an inner block are added to the
+    outer one when the inner block exits.
+
+    Args:
+        on_frame: Called with the seconds the analyzer spent on each frame
+    """
+    counts = {'frames_decoded': 0, 'frames_inferred': 0}
+    previous = getattr(_local, 'state', None)
+    _local.state = (counts, on_frame)
+    try:
+        yield counts
+    finally:
+        _local.state = previous
+        if previous is not None:
+            for key, value in counts.items():
+                previous[0][key] += value
+
+
+@contextmanager
+def count_frame(decoded: bool = True) -> Iterator[None]:
+    """
+    Record a frame handed to an analyzer; samplers yield the frame inside this block
+
+    Args:
+        decoded: Whether the frame was decoded from the video (False when replayed from cache)
+    """
+    state = getattr(_local, 'state', None)
+    if state is None:
+        yield
+        return
+
+    counts, on_frame = state
+    counts['frames_inferred'] += 1
+    if decoded:
+        counts['frames_decoded'] += 1
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        if on_frame is not None:
+            on_frame(time.perf_counter() - started_at)
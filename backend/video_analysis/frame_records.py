@@ -0,0 +1,48 @@
+"""
+Compact per-frame records shared by the motion analyzers
+
+Per-frame results are slotted dataclasses. Their landmarks are fixed-shape
+int32 arrays of pixel coordinates (one row per landmark, in the order given
+by the analyzer's *_LANDMARKS tuple) instead of string-keyed dicts of
+tuples, and their directions are small integer codes indexing the
+analyzer's *_DIRECTIONS tuple.
+
+Detection steps return the detector's landmarks as (points, 3) float32
+arrays of normalized x, y, z (see landmark_array), which is also the form
+recorded in the landmark store.
+"""
+from typing import Sequence
+
+import numpy as np
+
+
+def landmark_array(landmarks: Sequence) -> np.ndarray:
+    """
+    Convert a MediaPipe landmark list to an array
+
+    Args:
+        landmarks: MediaPipe landmark list (objects with normalized x, y and z)
+
+    Returns:
+        (len(landmarks), 3) float32 array of (x, y, z)
+    """
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32)
+
+
+def landmark_pixels(landmarks: np.ndarray, indices: Sequence[int], width: int, height: int) -> np.ndarray:
+    """
+    Convert selected normalized landmarks to pixel coordinates
+
+    Args:
+        landmarks: (points, 3) array of normalized landmarks (see landmark_array)
+        indices: Indices of the landmarks to keep, in output row order
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        (len(indices), 2) int32 array of (x, y) pixel coordinates, truncated
+        like int(lm.x * width)
+    """
+    coords = landmarks[list(indices), :2].astype(np.float64)
+    coords *= (width, height)
+    return coords.astype(np.int32)
@@ -0,0 +1,343 @@
+"""
+Frame sampling shared by all video analyzers
+
+Every analyzer samples a video the same way: the sampling interval is the
+video FPS divided by the target FPS, rounded to the nearest integer, frames
+between samples are grabbed without being decoded, and sampled frames are
+downscaled to the requested analysis resolution before inference.
+
+AdaptiveFrameSampler additionally drops to a floor FPS while the scene is
+static. Each sample then stands for a different amount of time, reported as
+sample_weight (in target-FPS frames) so analyzers can time-weight their
+statistics.
+
+When the frame cache is enabled (see frame_cache.py), create_frame_sampler
+replays previously sampled frames from disk instead of decoding the video.
+"""
+import cv2
+import numpy as np
+from typing import Iterator, Optional, Tuple, Union
+
+from .frame_cache import CachedFrames, FrameCacheWriter, get_frame_cache
+from .frame_counters import count_frame
+
+
+def get_sampling_interval(video_fps: float, target_fps: Optional[float] = None) -> int:
+    """
+    Get the number of source frames per analyzed frame
+
+    Args:
+        video_fps: Native frame rate of the video
+        target_fps: Target frames per second to analyze (None = every frame)
+
+    Returns:
+        Sampling interval (1 = analyze every frame)
+    """
+    if target_fps is None or video_fps <= 0 or target_fps >= video_fps:
+        return 1
+    return max(1, int(round(video_fps / target_fps)))
+
+
+def resize_to_max_resolution(frame: np.ndarray, max_resolution: Optional[int] = None) -> np.ndarray:
+    """
+    Downscale a frame so that its longest side is at most max_resolution pixels
+
+    Frames that are already small enough are returned unchanged.
+    """
+    if not max_resolution:
+        return frame
+
+    h, w = frame.shape[:2]
+    longest_side = max(h, w)
+    if longest_side <= max_resolution:
+        return frame
+
+    scale = max_resolution / longest_side
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+class FrameSampler:
+    """
+    Iterate over the sampled frames of a video as RGB arrays
+
+    Usage:
+        sampler = FrameSampler(video_path, target_fps=5.0, max_resolution=720)
+        for frame_index, frame_rgb in sampler:
+            ...
+        print(sampler.frames_read, sampler.frames_sampled)
+
+    After each yielded frame, sample_weight is the number of target-FPS frames
+    the sample stands for and sample_gap the number of target-FPS frames since
+    the previous sample (both always 1 at a fixed rate).
+    """
+
+    def __init__(self, video_path: str, target_fps: Optional[float] = None,
+                 max_resolution: Optional[int] = None, show_progress: bool = True,
+                 desc: str = "Processing video", cache_writer: Optional[FrameCacheWriter] = None):
+        """
+        Open a video for sampling
+
+        Args:
+            video_path: Path to the video file
+            target_fps: Target frames per second to analyze (None = use video's native FPS)
+            max_resolution: Longest side of analyzed frames in pixels (None = native resolution)
+            show_progress: Whether to display a progress bar during processing
+            desc: Progress bar description
+            cache_writer: Records the sampled frames into the frame cache
+
+        Raises:
+            ValueError: If the video cannot be opened
+        """
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Error: Could not open video at {video_path}")
+
+        self.video_path = video_path
+        self.video_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.duration = self.frame_count / self.video_fps if self.video_fps > 0 else 0
+        self.effective_fps = self.video_fps if target_fps is None else min(target_fps, self.video_fps)
+        self.sampling_rate = get_sampling_interval(self.video_fps, target_fps)
+        self.max_resolution = max_resolution
+        self.show_progress = show_progress
+        self.desc = desc
+        self.cache_writer = cache_writer
+
+        self.frames_read = 0
+        self.frames_sampled = 0
+        self.sample_weight = 1
+        self.sample_gap = 1
+
+    def timestamp(self, frame_index: int) -> float:
+        """Get the timestamp in seconds of a source frame"""
+        return frame_index / self.video_fps if self.video_fps > 0 else 0.0
+
+    def _next_step(self, frame_index: int, frame: np.ndarray) -> int:
+        """Number of source frames from this sample to the next one"""
+        return self.sampling_rate
+
+    def _create_progress_bar(self):
+        if not self.show_progress:
+            return None
+        try:
+            from tqdm import tqdm
+            return tqdm(total=self.frame_count, desc=self.desc)
+        except ImportError:
+            print("tqdm not installed, progress bar disabled")
+            return None
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        pbar = self._create_progress_bar()
+        next_sample = 0
+        previous_sample = None
+        try:
+            while self.cap.isOpened():
+                frame_index = self.frames_read
+                if frame_index == next_sample:
+                    ret, frame = self.cap.read()
+                else:
+                    # Skipped frames only advance the decoder position
+                    ret, frame = self.cap.grab(), None
+                if not ret:
+                    break
+
+                self.frames_read += 1
+                if pbar is not None:
+                    pbar.update(1)
+                if frame is None:
+                    continue
+
+                self.frames_sampled += 1
+                frame = resize_to_max_resolution(frame, self.max_resolution)
+
+                step = self._next_step(frame_index, frame)
+                next_sample = frame_index + step
+                if self.frame_count > frame_index:
+                    step = min(step, self.frame_count - frame_index)
+                self.sample_weight = max(1, -(-step // self.sampling_rate))
+                if previous_sample is not None:
+                    self.sample_gap = (frame_index - previous_sample) / self.sampling_rate
+                previous_sample = frame_index
+
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                if self.cache_writer is not None:
+                    self.cache_writer.append(frame_index, frame_rgb, self.sample_weight, self.sample_gap)
+                with count_frame():
+                    yield frame_index, frame_rgb
+
+            if self.cache_writer is not None:
+                self.cache_writer.commit(self.get_cache_meta())
+        finally:
+            if pbar is not None:
+                pbar.close()
+            if self.cache_writer is not None:
+                self.cache_writer.discard()
+            self.cap.release()
+
+    def get_cache_meta(self) -> dict:
+        """Video properties stored with cached frames"""
+        return {
+            'video_fps': self.video_fps,
+            'frame_count': self.frame_count,
+            'effective_fps': self.effective_fps,
+            'sampling_rate': self.sampling_rate,
+            'frames_read': self.frames_read
+        }
+
+
+class AdaptiveFrameSampler(FrameSampler):
+    """
+    Frame sampler that spends detector calls where motion happens
+
+    The difference between consecutive samples, measured on a tiny grayscale
+    copy of each frame, decides the next step: while it is above
+    motion_threshold frames are sampled at target_fps, otherwise at min_fps.
+    A static stretch is therefore covered by a few long samples, and
+    sample_weight tells analyzers how many target-FPS frames each one stands
+    for. Motion that starts during a long step is picked up at the next
+    sample, i.e. within 1 / min_fps seconds.
+    """
+
+    def __init__(self, video_path: str, target_fps: Optional[float] = None,
+                 min_fps: float = 1.0, max_resolution: Optional[int] = None,
+                 show_progress: bool = True, desc: str = "Processing video",
+                 motion_threshold: float = 0.01, energy_resolution: int = 64,
+                 cache_writer: Optional[FrameCacheWriter] = None):
+        """
+        Open a video for adaptive sampling
+
+        Args:
+            video_path: Path to the video file
+            target_fps: Sampling rate during motion (None = video's native FPS)
+            min_fps: Sampling rate during static segments
+            max_resolution: Longest side of analyzed frames in pixels (None = native resolution)
+            show_progress: Whether to display a progress bar during processing
+            desc: Progress bar description
+            motion_threshold: Mean absolute gray-level difference (0-1, per
+                target-FPS frame) above which a segment counts as motion
+            energy_resolution: Longest side of the frames used to measure motion
+            cache_writer: Records the sampled frames into the frame cache
+
+        Raises:
+            ValueError: If the video cannot be opened or min_fps is not positive
+        """
+        if min_fps <= 0:
+            raise ValueError("min_fps must be a positive number")
+        super().__init__(video_path, target_fps, max_resolution, show_progress, desc, cache_writer)
+        self.min_fps = min(min_fps, self.effective_fps) if self.effective_fps > 0 else min_fps
+        self.slow_factor = max(1, int(round(self.effective_fps / self.min_fps))) if self.effective_fps > 0 else 1
+        self.motion_threshold = motion_threshold
+        self.energy_resolution = energy_resolution
+        self.motion_samples = 0
+        self._previous_small = None
+        self._previous_index = None
+
+    def motion_energy(self, frame_index: int, frame: np.ndarray) -> float:
+        """
+        Mean absolute difference to the previous sample, per target-FPS frame
+
+        Args:
+            frame_index: Source index of the frame
+            frame: Sampled BGR frame
+
+        Returns:
+            Motion energy between 0 and 1 (1.0 for the first sample)
+        """
+        small = resize_to_max_resolution(frame, self.energy_resolution)
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.int16)
+        previous, previous_index = self._previous_small, self._previous_index
+        self._previous_small, self._previous_index = small, frame_index
+
+        if previous is None or previous.shape != small.shape:
+            return 1.0
+        gap = max(1.0, (frame_index - previous_index) / self.sampling_rate)
+        return float(np.abs(small - previous).mean()) / 255.0 / gap
+
+    def _next_step(self, frame_index: int, frame: np.ndarray) -> int:
+        if self.motion_energy(frame_index, frame) > self.motion_threshold:
+            self.motion_samples += 1
+            return self.sampling_rate
+        return self.sampling_rate * self.slow_factor
+
+
+class CachedFrameSampler:
+    """
+    Replays frames recorded in the frame cache with the FrameSampler interface
+
+    Frames are views into a read-only memory map, so nothing is decoded or copied.
+    """
+
+    def __init__(self, cached: CachedFrames, video_path: str):
+        meta = cached.meta
+        self.cached = cached
+        self.video_path = video_path
+        self.video_fps = meta['video_fps']
+        self.frame_count = meta['frame_count']
+        self.duration = self.frame_count / self.video_fps if self.video_fps > 0 else 0
+        self.effective_fps = meta['effective_fps']
+        self.sampling_rate = meta['sampling_rate']
+
+        self.frames_read = 0
+        self.frames_sampled = 0
+        self.sample_weight = 1
+        self.sample_gap = 1
+
+    def timestamp(self, frame_index: int) -> float:
+        """Get the timestamp in seconds of a source frame"""
+        return frame_index / self.video_fps if self.video_fps > 0 else 0.0
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        cached = self.cached
+        for i in range(len(cached.frame_indices)):
+            self.frames_sampled += 1
+            self.sample_weight = int(cached.sample_weights[i])
+            self.sample_gap = float(cached.sample_gaps[i])
+            with count_frame(decoded=False):
+                yield int(cached.frame_indices[i]), cached.frames[i]
+        self.frames_read = cached.meta['frames_read']
+
+
+def create_frame_sampler(video_path: str, target_fps: Optional[float] = None,
+                         max_resolution: Optional[int] = None, show_progress: bool = True,
+                         desc: str = "Processing video",
+                         min_fps: Optional[float] = None) -> Union[FrameSampler, CachedFrameSampler]:
+    """
+    Create the sampler an analyzer should use
+
+    With the frame cache enabled, a video sampled before with the same
+    settings is replayed from the cache; otherwise the new sampler records
+    its frames for the next run.
+
+    Args:
+        video_path: Path to the video file
+        target_fps: Target frames per second (the ceiling when sampling adaptively)
+        max_resolution: Longest side of analyzed frames in pixels (None = native resolution)
+        show_progress: Whether to display a progress bar during processing
+        desc: Progress bar description
+        min_fps: Floor FPS for static segments (None = fixed-rate sampling)
+
+    Returns:
+        CachedFrameSampler on a cache hit, AdaptiveFrameSampler if min_fps is
+        below the target rate, otherwise FrameSampler
+    """
+    adaptive = min_fps is not None and (target_fps is None or min_fps < target_fps)
+
+    cache_writer = None
+    cache = get_frame_cache()
+    if cache is not None:
+        key = cache.make_key(video_path, target_fps, max_resolution, min_fps if adaptive else None)
+        cached = cache.load(key)
+        if cached is not None:
+            return CachedFrameSampler(cached, video_path)
+        cache_writer = cache.create_writer(key)
+
+    try:
+        if adaptive:
+            return AdaptiveFrameSampler(video_path, target_fps, min_fps, max_resolution, show_progress, desc,
+                                        cache_writer=cache_writer)
+        return FrameSampler(video_path, target_fps, max_resolution, show_progress, desc, cache_writer)
+    except Exception:
+        if cache_writer is not None:
+            cache_writer.discard()
+        raise
@@ -0,0 +1,352 @@
+"""
+Per-analysis store of raw detector landmarks
+
+Most tuning only changes the geometry computed on top of the landmarks
+(tilt and pitch thresholds, the hand motion z-score threshold, the body
+rotation normalization), not the detections themselves. The motion analyzers
+therefore split every frame into a detection step (MediaPipe Pose, Face Mesh
+or Hands) and a measurement step. The detections of every sampled frame are
+recorded as float16 arrays, and an analyzer's recompute() replays them
+through the measurement step with new parameters, without decoding the
+video or running a detector.
+
+Each analysis gets a directory with one <source>.npz per detector, shared by
+every analyzer that uses that detector:
+- landmarks: (frames, max_detections, points, 3) float16 normalized x, y, z
+- counts: number of detections in each frame (0 = nothing detected)
+- frame_indices, sample_weights, sample_gaps: sampling of each frame
+- meta: JSON with the video properties reported in the statistics
+
+The store is bounded like the frame cache: once its tracks exceed the size
+limit, the analyses used least recently (recorded or loaded) are removed
+first. Directories left behind by records of a previous server run are
+therefore evicted before any track of a current analysis.
+"""
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+# Landmark sources and the maximum number of detections per frame
+LANDMARK_SOURCES = {'pose': 1, 'face_mesh': 1, 'hands': 2}
+
+# Sampler attributes stored with a track
+SAMPLER_META_FIELDS = ('video_fps', 'frame_count', 'duration', 'effective_fps', 'sampling_rate',
+                       'frames_read', 'frames_sampled')
+
+
+class LandmarkTrack:
+    """
+    Recorded detections of one detector for every sampled frame of a video
+
+    A track has the same attributes as a frame sampler (video_fps, duration,
+    frames_read, sample_weight, ...) and iterates over (landmarks, width,
+    height) per sampled frame, so analyzers summarize it exactly like a live
+    run. landmarks is None when nothing was detected, a (points, 3) array for
+    single-detection sources and a (detections, points, 3) array for hands.
+    """
+
+    def __init__(self, source: str, landmarks: np.ndarray, counts: np.ndarray, frame_indices: np.ndarray,
+                 sample_weights: np.ndarray, sample_gaps: np.ndarray, meta: Dict):
+        self.source = source
+        self.landmarks = landmarks
+        self.counts = counts
+        self.frame_indices = frame_indices
+        self.sample_weights = sample_weights
+        self.sample_gaps = sample_gaps
+        self.meta = meta
+
+        self.video_path = meta.get('video_path')
+        self.video_fps = meta['video_fps']
+        self.frame_count = meta['frame_count']
+        self.duration = meta['duration']
+        self.effective_fps = meta['effective_fps']
+        self.sampling_rate = meta['sampling_rate']
+        self.frame_width, self.frame_height = meta['frame_size']
+        self.frames_read = meta['frames_read']
+        self.frames_sampled = meta['frames_sampled']
+        self.sample_weight = 1
+        self.sample_gap = 1
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __iter__(self) -> Iterator[Tuple[Optional[np.ndarray], int, int]]:
+        single = LANDMARK_SOURCES[self.source] == 1
+        for i, count in enumerate(self.counts.tolist()):
+            self.sample_weight = int(self.sample_weights[i])
+            self.sample_gap = float(self.sample_gaps[i])
+            if count == 0:
+                landmarks = None
+            elif single:
+                landmarks = self.landmarks[i, 0].astype(np.float32)
+            else:
+                landmarks = self.landmarks[i, :count].astype(np.float32)
+            yield landmarks, self.frame_width, self.frame_height
+
+    def motion_series(self) -> Dict[str, List]:
+        """
+        Time series of the track for timelines
+
+        Returns:
+            'times' (seconds of each sampled frame), 'detected' (whether anything
+            was detected) and 'movement' (displacement of the detections' centroid
+            since the previous sample, in fractions of the frame; None where this
+            or the previous sample has no detection)
+        """
+        times = self.frame_indices / self.video_fps if self.video_fps else np.zeros(len(self))
+        movement = np.full(len(self), np.nan, dtype=np.float32)
+        if len(self) > 1 and self.landmarks.shape[2] > 0:
+            present = np.arange(self.landmarks.shape[1])[None, :] < self.counts[:, None]
+            detection_centers = self.landmarks[..., :2].astype(np.float32).mean(axis=2)
+            centroids = (detection_centers * present[..., None]).sum(axis=1) / np.maximum(self.counts, 1)[:, None]
+            centroids[self.counts == 0] = np.nan
+            movement[1:] = np.linalg.norm(np.diff(centroids, axis=0), axis=1)
+        return {
+            'times': np.round(times, 3).tolist(),
+            'detected': (self.counts > 0).tolist(),
+            'movement': [None if np.isnan(value) else round(value, 4) for value in movement.tolist()]
+        }
+
+    def save(self, path: str) -> None:
+        """Write the track to an .npz file (atomically)"""
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp.npz"
+        np.savez(temp_path,
+                 landmarks=self.landmarks,
+                 counts=self.counts,
+                 frame_indices=self.frame_indices,
+                 sample_weights=self.sample_weights,
+                 sample_gaps=self.sample_gaps,
+                 meta=np.array(json.dumps(dict(self.meta, source=self.source))))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'LandmarkTrack':
+        """Read a track written by save()"""
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(meta['source'], data['landmarks'], data['counts'], data['frame_indices'],
+                       data['sample_weights'], data['sample_gaps'], meta)
+
+
+class LandmarkTrackWriter:
+    """
+    Collects the detections of one analyzer run into a LandmarkTrack
+
+    The track is only available (as .track) after finish() was called at the
+    end of a complete run.
+    """
+
+    def __init__(self, source: str):
+        if source not in LANDMARK_SOURCES:
+            raise ValueError(f"Unknown landmark source: {source}")
+        self.source = source
+        self.max_detections = LANDMARK_SOURCES[source]
+        self.track: Optional[LandmarkTrack] = None
+        self._landmarks: List[Optional[np.ndarray]] = []
+        self._frame_indices: List[int] = []
+        self._sample_weights: List[int] = []
+        self._sample_gaps: List[float] = []
+        self._point_count = 0
+        self._frame_size = (0, 0)
+
+    def add(self, frame_index: int, landmarks: Optional[np.ndarray], width: int, height: int,
+            sample_weight: int, sample_gap: float) -> None:
+        """
+        Record the detections of one sampled frame
+
+        Args:
+            frame_index: Source frame index
+            landmarks: Normalized landmarks as returned by the analyzer's detection
+                step ((points, 3), or (detections, points, 3) for hands), None if
+                nothing was detected
+            width: Analyzed frame width in pixels
+            height: Analyzed frame height in pixels
+            sample_weight: Target-FPS frames the sample stands for
+            sample_gap: Distance to the previous sample in target-FPS frames
+        """
+        if landmarks is not None:
+            landmarks = np.asarray(landmarks, dtype=np.float16).reshape(-1, *np.shape(landmarks)[-2:])
+            landmarks = landmarks[:self.max_detections]
+            self._point_count = landmarks.shape[1]
+        self._landmarks.append(landmarks)
+        self._frame_indices.append(frame_index)
+        self._sample_weights.append(sample_weight)
+        self._sample_gaps.append(sample_gap)
+        self._frame_size = (width, height)
+
+    def finish(self, sampler) -> LandmarkTrack:
+        """
+        Build the track once the sampler has gone through the whole video
+
+        Args:
+            sampler: The frame sampler the detections came from
+
+        Returns:
+            The recorded track (also stored as .track)
+        """
+        frames = len(self._landmarks)
+        landmarks = np.zeros((frames, self.max_detections, self._point_count, 3), dtype=np.float16)
+        counts = np.zeros(frames, dtype=np.uint8)
+        for i, detections in enumerate(self._landmarks):
+            # Point counts can only differ if the detector settings changed mid-run
+            if detections is not None and detections.shape[1] == self._point_count:
+                landmarks[i, :len(detections)] = detections
+                counts[i] = len(detections)
+
+        meta = {name: getattr(sampler, name) for name in SAMPLER_META_FIELDS}
+        meta.update(video_path=sampler.video_path, frame_size=list(self._frame_size))
+        self.track = LandmarkTrack(
+            self.source, landmarks, counts,
+            np.array(self._frame_indices, dtype=np.int64),
+            np.array(self._sample_weights, dtype=np.int32),
+            np.array(self._sample_gaps, dtype=np.float32),
+            meta
+        )
+        self._landmarks = []
+        return self.track
+
+
+def iter_detections(sampler, detect: Callable[[np.ndarray], Optional[np.ndarray]],
+                    landmark_writer: Optional[LandmarkTrackWriter] = None
+                    ) -> Iterator[Tuple[Optional[np.ndarray], int, int]]:
+    """
+    Run a detection step over every sampled frame
+
+    Yields the same (landmarks, width, height) items as iterating over a
+    LandmarkTrack, recording them when a writer is given.
+
+    Args:
+        sampler: Frame sampler to read frames from
+        detect: Detection step, mapping an RGB frame to normalized landmarks or None
+        landmark_writer: Optional writer recording the detections
+
+    Yields:
+        Tuple of (landmarks or None, frame width, frame height)
+    """
+    for frame_index, frame_rgb in sampler:
+        height, width = frame_rgb.shape[:2]
+        landmarks = detect(frame_rgb)
+        if landmark_writer is not None:
+            landmark_writer.add(frame_index, landmarks, width, height,
+                                sampler.sample_weight, sampler.sample_gap)
+        yield landmarks, width, height
+    if landmark_writer is not None:
+        landmark_writer.finish(sampler)
+
+
+class LandmarkRecorder:
+    """Saves the landmark tracks of one analysis, one per detector"""
+
+    def __init__(self, store: 'LandmarkStore', entry_dir: str):
+        self.store = store
+        self.entry_dir = entry_dir
+        self.sources: List[str] = []
+
+    def create_writer(self, source: str) -> Optional[LandmarkTrackWriter]:
+        """Get a writer for a detector, or None if its landmarks were already recorded"""
+        if source in self.sources:
+            return None
+        return LandmarkTrackWriter(source)
+
+    def save(self, writer: LandmarkTrackWriter) -> bool:
+        """
+        Save a finished writer's track
+
+        Returns:
+            True if a track was saved (False if the run did not finish)
+        """
+        if writer.track is None or writer.source in self.sources:
+            return False
+        os.makedirs(self.entry_dir, exist_ok=True)
+        writer.track.save(os.path.join(self.entry_dir, f"{writer.source}.npz"))
+        self.sources.append(writer.source)
+        os.utime(self.entry_dir)
+        self.store.evict(keep=self.entry_dir)
+        return True
+
+
+class LandmarkStore:
+    """Size-bounded directory of landmark tracks, one subdirectory per analysis"""
+
+    def __init__(self, store_dir: str, max_bytes: int = 0):
+        """
+        Args:
+            store_dir: Directory holding the per-analysis track directories
+            max_bytes: Total size limit of the tracks (0 = unbounded)
+        """
+        self.store_dir = store_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def entry_dir(self, analysis_id: str) -> str:
+        return os.path.join(self.store_dir, analysis_id)
+
+    def create_recorder(self, analysis_id: str) -> LandmarkRecorder:
+        """Start recording the tracks of an analysis"""
+        return LandmarkRecorder(self, self.entry_dir(analysis_id))
+
+    def load_track(self, analysis_id: str, source: str) -> Optional[LandmarkTrack]:
+        """Load a recorded track, marking the analysis as recently used (None if not recorded)"""
+        path = os.path.join(self.entry_dir(analysis_id), f"{source}.npz")
+        if source not in LANDMARK_SOURCES or not os.path.exists(path):
+            return None
+        track = LandmarkTrack.load(path)
+        try:
+            os.utime(self.entry_dir(analysis_id))
+        except OSError:
+            pass
+        return track
+
+    def list_sources(self, analysis_id: str) -> List[str]:
+        """Detectors with recorded tracks for an analysis"""
+        return [source for source in LANDMARK_SOURCES
+                if os.path.exists(os.path.join(self.entry_dir(analysis_id), f"{source}.npz"))]
+
+    def delete(self, analysis_id: str) -> None:
+        """Remove all tracks of an analysis"""
+        with self._lock:
+            shutil.rmtree(self.entry_dir(analysis_id), ignore_errors=True)
+
+    def get_size(self) -> int:
+        """Total size of the stored tracks in bytes"""
+        return sum(size for _, size, _ in self._list_entries())
+
+    def _list_entries(self):
+        entries = []
+        for entry in os.scandir(self.store_dir):
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            try:
+                size = sum(track.stat().st_size for track in os.scandir(entry.path) if track.is_file())
+                entries.append((entry.path, size, entry.stat().st_mtime))
+            except OSError:
+                # Removed concurrently
+                continue
+        return entries
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Remove least recently used analyses until the store fits its size limit
+
+        Args:
+            keep: Entry directory never to remove (the analysis being recorded)
+        """
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            entries = sorted(self._list_entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for entry_dir, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if entry_dir == keep:
+                    continue
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
@@ -1,21 +1,38 @@
-import cv2
 import math
+from array import array
 import numpy as np
 import time
+from functools import partial
 from typing import Dict, Optional
 from dataclasses import dataclass
 import mediapipe as mp
 
+from ..frame_records import landmark_array, landmark_pixels
+from ..frame_sampling import create_frame_sampler
+from ..landmark_store import LandmarkTrack, LandmarkTrackWriter, iter_detections
+from ..running_stats import CategoryCounter, RunningStats
+
+# Rotation direction codes (index into ROTATION_DIRECTIONS)
+ROTATION_NONE, ROTATION_CLOCKWISE, ROTATION_ANTICLOCKWISE = range(3)
+ROTATION_DIRECTIONS = ("none", "clockwise", "anticlockwise")
+
+# Row order of RotationAnalysisResult.landmarks
+ROTATION_LANDMARKS = ("left_shoulder", "right_shoulder")
+
 # Data class for single-frame rotation analysis
-@dataclass
+@dataclass(slots=True)
 class RotationAnalysisResult:
     rotation_angle: float  # in degrees
-    rotation_direction: str  # "clockwise", "anticlockwise", or "none"
+    direction_code: int  # ROTATION_NONE, ROTATION_CLOCKWISE or ROTATION_ANTICLOCKWISE
     shoulder_distance: float
-    landmarks: Dict
+    landmarks: np.ndarray  # (2, 2) int32 pixel coordinates, rows in ROTATION_LANDMARKS order
     frame_number: int = None
     timestamp: float = None
 
+    @property
+    def rotation_direction(self) -> str:
+        return ROTATION_DIRECTIONS[self.direction_code]
+
 # Data class for video-level rotation statistics
 @dataclass
 class VideoRotationStats:
@@ -33,138 +50,144 @@ class VideoRotationStats:
 
 # Analyzer for body rotation relative to the camera (inferred from shoulder width)
 class BodyRotationAnalyzer:
-    def __init__(self, min_detection_confidence: float = 0.7):
+    # Detector whose landmarks are recorded, and the parameters (with their
+    # valid ranges) that can be changed when recomputing from them
+    LANDMARK_SOURCE = 'pose'
+    TUNABLE_PARAMETERS = {'reference_quantile': (0.5, 1.0)}
+
+    def __init__(self, min_detection_confidence: float = 0.7, model_complexity: int = 1,
+                 reference_quantile: float = 1.0):
+        """
+        Args:
+            min_detection_confidence: Confidence threshold for MediaPipe Pose.
+            model_complexity: Default MediaPipe Pose model complexity.
+            reference_quantile: Quantile of the measured shoulder distances taken as the
+                frontal (0°) width; 1.0 uses the maximum, lower values ignore outlier frames.
+        """
         self.min_detection_confidence = min_detection_confidence
+        self.model_complexity = model_complexity
+        self.reference_quantile = reference_quantile
         self.mp_pose = mp.solutions.pose
 
-    def _analyze_frame(self, image_rgb: np.ndarray) -> Optional[RotationAnalysisResult]:
+    def _detect(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[np.ndarray]:
+        """Run MediaPipe Pose on a frame, returning its (33, 3) normalized landmarks or None"""
         with self.mp_pose.Pose(
             static_image_mode=True,
-            model_complexity=1,
+            model_complexity=model_complexity,
             min_detection_confidence=self.min_detection_confidence
         ) as pose:
             results = pose.process(image_rgb)
             if not results.pose_landmarks:
                 return None
-
-            landmarks = results.pose_landmarks.landmark
-            left_shoulder = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-            right_shoulder = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-
-            h, w = image_rgb.shape[:2]
-            left_shoulder_px = (int(left_shoulder.x * w), int(left_shoulder.y * h))
-            right_shoulder_px = (int(right_shoulder.x * w), int(right_shoulder.y * h))
-            
-            # Calculate Euclidean distance between shoulders (as a proxy for frontal view)
-            shoulder_distance = math.hypot(right_shoulder_px[0] - left_shoulder_px[0],
-                                           right_shoulder_px[1] - left_shoulder_px[1])
-            # Store landmarks and additional info
-            landmarks_dict = {
-                "left_shoulder": left_shoulder_px,
-                "right_shoulder": right_shoulder_px
-            }
-            
-            # For rotation direction, compare z-values:
-            # If left_shoulder.z > right_shoulder.z, left shoulder is further away => rotation to right (clockwise)
-            if left_shoulder.z > right_shoulder.z:
-                rotation_direction = "clockwise"
-            elif left_shoulder.z < right_shoulder.z:
-                rotation_direction = "anticlockwise"
-            else:
-                rotation_direction = "none"
-
-            # Initially, we cannot compute the rotation angle without a reference.
-            # We'll return the measured shoulder_distance along with a placeholder angle of 0.
-            result = RotationAnalysisResult(
-                rotation_angle=0.0,  # to be updated later using a reference maximum distance
-                rotation_direction=rotation_direction,
-                shoulder_distance=shoulder_distance,
-                landmarks=landmarks_dict
-            )
-            return result
-
-    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True) -> VideoRotationStats:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Error: Could not open video at {video_path}")
+            return landmark_array(results.pose_landmarks.landmark)
+
+    def _measure(self, pose_landmarks: np.ndarray, w: int, h: int) -> Optional[RotationAnalysisResult]:
+        """Measure shoulder width and rotation direction from detected pose landmarks"""
+        shoulder_indices = (self.mp_pose.PoseLandmark.LEFT_SHOULDER.value,
+                            self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value)
+        left_shoulder_z, right_shoulder_z = pose_landmarks[list(shoulder_indices), 2].tolist()
+        shoulders_px = landmark_pixels(pose_landmarks, shoulder_indices, w, h)
         
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / video_fps if video_fps > 0 else 0
-
-        if target_fps is None:
-            sampling_rate = 1
-            effective_fps = video_fps
+        # Calculate Euclidean distance between shoulders (as a proxy for frontal view)
+        dx, dy = (shoulders_px[1] - shoulders_px[0]).tolist()
+        shoulder_distance = math.hypot(dx, dy)
+        
+        # For rotation direction, compare z-values:
+        # If left_shoulder.z > right_shoulder.z, left shoulder is further away => rotation to right (clockwise)
+        if left_shoulder_z > right_shoulder_z:
+            rotation_direction = ROTATION_CLOCKWISE
+        elif left_shoulder_z < right_shoulder_z:
+            rotation_direction = ROTATION_ANTICLOCKWISE
         else:
-            effective_fps = min(target_fps, video_fps)
-            sampling_rate = max(1, int(round(video_fps / effective_fps)))
+            rotation_direction = ROTATION_NONE
+
+        # Initially, we cannot compute the rotation angle without a reference.
+        # We'll return the measured shoulder_distance along with a placeholder angle of 0.
+        result = RotationAnalysisResult(
+            rotation_angle=0.0,  # to be updated later using a reference maximum distance
+            direction_code=rotation_direction,
+            shoulder_distance=shoulder_distance,
+            landmarks=shoulders_px
+        )
+        return result
 
-        # We will collect shoulder distances for all frames to determine the max (assumed frontal view)
-        shoulder_distances = []
-        rotation_angles = []
-        rotation_directions = []
+    def _analyze_frame(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[RotationAnalysisResult]:
+        pose_landmarks = self._detect(image_rgb, model_complexity)
+        if pose_landmarks is None:
+            return None
+        h, w = image_rgb.shape[:2]
+        return self._measure(pose_landmarks, w, h)
+
+    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True,
+                      max_resolution: Optional[int] = None,
+                      model_complexity: Optional[int] = None,
+                      min_fps: Optional[float] = None,
+                      landmark_writer: Optional[LandmarkTrackWriter] = None) -> VideoRotationStats:
+        sampler = create_frame_sampler(video_path, target_fps, max_resolution, show_progress,
+                                       desc="Processing video (rotation)", min_fps=min_fps)
+        if model_complexity is None:
+            model_complexity = self.model_complexity
+        detections = iter_detections(sampler, partial(self._detect, model_complexity=model_complexity),
+                                     landmark_writer)
+        return self._summarize(video_path, sampler, detections)
+
+    def recompute(self, track: LandmarkTrack) -> VideoRotationStats:
+        """Recompute the statistics from recorded pose landmarks, without decoding or detection"""
+        return self._summarize(track.video_path, track, track)
+
+    def _summarize(self, video_path: str, sampler, detections) -> VideoRotationStats:
+        video_fps = sampler.video_fps
+        duration = sampler.duration
+        effective_fps = sampler.effective_fps
+        sampling_rate = sampler.sampling_rate
+
+        # Shoulder distances are needed until the reference (assumed frontal view) is known,
+        # so they are kept in a compact float array rather than as per-frame results
+        shoulder_distances = array('d')
+        sample_weights = array('l')
+        rotation_directions = CategoryCounter(ROTATION_DIRECTIONS)
         frames_with_detection = 0
-        frame_index = 0
-        results_list = []
         start_time = time.time()
 
-        if show_progress:
-            try:
-                from tqdm import tqdm
-                pbar = tqdm(total=frame_count, desc="Processing video (rotation)")
-            except ImportError:
-                show_progress = False
-                print("tqdm not installed, progress bar disabled")
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            if frame_index % sampling_rate == 0:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                result = self._analyze_frame(frame_rgb)
-                if result is not None:
-                    frames_with_detection += 1
-                    shoulder_distances.append(result.shoulder_distance)
-                    # Temporarily store result; we'll compute rotation angle later once we have max distance
-                    result.frame_number = frame_index
-                    result.timestamp = frame_index / video_fps
-                    results_list.append(result)
-                    rotation_directions.append(result.rotation_direction)
-            frame_index += 1
-            if show_progress:
-                pbar.update(1)
-        if show_progress:
-            pbar.close()
+        for pose_landmarks, width, height in detections:
+            if pose_landmarks is None:
+                continue
+            result = self._measure(pose_landmarks, width, height)
+            if result is not None:
+                frames_with_detection += 1
+                shoulder_distances.append(result.shoulder_distance)
+                sample_weights.append(sampler.sample_weight)
+                rotation_directions.add(result.direction_code, sampler.sample_weight)
         processing_time = time.time() - start_time
-        cap.release()
+        frame_index = sampler.frames_read
 
         if not shoulder_distances:
             print("No valid detection in video frames for rotation analysis.")
             return None
 
-        # Use the maximum measured shoulder distance as the reference for a frontal view.
-        max_shoulder_distance = max(shoulder_distances)
-
-        # Now, update each result with an estimated rotation angle.
-        # Assuming a simple perspective model: rotation_angle = arccos(current_distance / max_distance)
-        for res in results_list:
-            ratio = res.shoulder_distance / max_shoulder_distance
-            # Ensure the ratio is within [0, 1]
-            ratio = max(0.0, min(1.0, ratio))
-            res.rotation_angle = math.degrees(math.acos(ratio))
-            rotation_angles.append(res.rotation_angle)
-
-        mean_rotation_angle = np.mean(rotation_angles)
-        median_rotation_angle = np.median(rotation_angles)
-        std_dev_rotation_angle = np.std(rotation_angles)
-        min_rotation_angle = np.min(rotation_angles)
-        max_rotation_angle = np.max(rotation_angles)
-        direction_counts = {d: rotation_directions.count(d) for d in set(rotation_directions)}
-        total_dirs = len(rotation_directions)
-        rotation_direction_percentages = {d: (count / total_dirs) * 100 for d, count in direction_counts.items()}
-        dominant_rotation_direction = max(direction_counts, key=direction_counts.get)
-        detection_rate = frames_with_detection / (frame_count / sampling_rate) * 100
+        # Use the widest measured shoulder distance (the reference_quantile of all
+        # distances; the maximum by default) as the reference for a frontal view.
+        distances = np.frombuffer(shoulder_distances)
+        reference_distance = float(np.quantile(distances, self.reference_quantile))
+
+        # Estimate each frame's rotation angle.
+        # Assuming a simple perspective model: rotation_angle = arccos(current_distance / reference_distance)
+        if reference_distance > 0:
+            ratios = np.clip(distances / reference_distance, 0.0, 1.0)
+        else:
+            ratios = np.ones_like(distances)
+        rotation_angles = RunningStats()
+        for angle, weight in zip(np.degrees(np.arccos(ratios)).tolist(), sample_weights):
+            rotation_angles.add(angle, weight)
+
+        mean_rotation_angle = rotation_angles.mean
+        median_rotation_angle = rotation_angles.median
+        std_dev_rotation_angle = rotation_angles.std
+        min_rotation_angle = rotation_angles.min
+        max_rotation_angle = rotation_angles.max
+        rotation_direction_percentages = rotation_directions.percentages()
+        dominant_rotation_direction = rotation_directions.dominant()
+        detection_rate = frames_with_detection / sampler.frames_sampled * 100
 
         print(f"\nRotation Analysis Complete for {video_path}")
         print(f"- Duration: {duration:.2f} seconds")
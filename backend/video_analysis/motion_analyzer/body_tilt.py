@@ -1,21 +1,38 @@
-import cv2
 import math
 import numpy as np
 import time
+from functools import partial
 from typing import Dict, Optional
 from dataclasses import dataclass
 import mediapipe as mp
 
+from ..frame_records import landmark_array, landmark_pixels
+from ..frame_sampling import create_frame_sampler
+from ..landmark_store import LandmarkTrack, LandmarkTrackWriter, iter_detections
+from ..running_stats import CategoryCounter, RunningStats
+
+# Tilt direction codes (index into TILT_DIRECTIONS)
+TILT_NONE, TILT_LEFT, TILT_RIGHT = range(3)
+TILT_DIRECTIONS = ("none", "left", "right")
+
+# Row order of TiltAnalysisResult.landmarks
+TILT_LANDMARKS = ("left_shoulder", "right_shoulder", "left_hip", "right_hip",
+                  "shoulder_midpoint", "hip_midpoint")
+
 # Data class for single-frame tilt analysis
-@dataclass
+@dataclass(slots=True)
 class TiltAnalysisResult:
     status: str
     angle: float
-    direction: str  # "left", "right", or "none"
-    landmarks: Dict
+    direction_code: int  # TILT_NONE, TILT_LEFT or TILT_RIGHT
+    landmarks: np.ndarray  # (6, 2) int32 pixel coordinates, rows in TILT_LANDMARKS order
     frame_number: int = None
     timestamp: float = None
 
+    @property
+    def direction(self) -> str:
+        return TILT_DIRECTIONS[self.direction_code]
+
 # Data class for video-level tilt statistics
 @dataclass
 class VideoTiltStats:
@@ -34,152 +51,137 @@ class VideoTiltStats:
 
 # Analyzer for body tilt (spine alignment relative to vertical axis)
 class BodyTiltAnalyzer:
-    def __init__(self, min_detection_confidence: float = 0.7, tilt_threshold: float = 5):
+    # Detector whose landmarks are recorded, and the parameters (with their
+    # valid ranges) that can be changed when recomputing from them
+    LANDMARK_SOURCE = 'pose'
+    TUNABLE_PARAMETERS = {'tilt_threshold': (0.0, 90.0)}
+
+    def __init__(self, min_detection_confidence: float = 0.7, tilt_threshold: float = 5,
+                 model_complexity: int = 1):
         self.min_detection_confidence = min_detection_confidence
         self.tilt_threshold = tilt_threshold
+        self.model_complexity = model_complexity
         self.mp_pose = mp.solutions.pose
 
-    def _analyze_frame(self, image_rgb: np.ndarray) -> Optional[TiltAnalysisResult]:
+    def _detect(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[np.ndarray]:
+        """Run MediaPipe Pose on a frame, returning its (33, 3) normalized landmarks or None"""
         with self.mp_pose.Pose(
             static_image_mode=True,
-            model_complexity=1,
+            model_complexity=model_complexity,
             min_detection_confidence=self.min_detection_confidence
         ) as pose:
             results = pose.process(image_rgb)
             if not results.pose_landmarks:
                 return None
-
-            landmarks = results.pose_landmarks.landmark
-
-            # Get key landmarks: shoulders and hips
-            left_shoulder = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-            right_shoulder = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-            left_hip = landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value]
-            right_hip = landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value]
-
-            # Convert normalized coordinates to pixel coordinates
-            h, w = image_rgb.shape[:2]
-            left_shoulder_px = (int(left_shoulder.x * w), int(left_shoulder.y * h))
-            right_shoulder_px = (int(right_shoulder.x * w), int(right_shoulder.y * h))
-            left_hip_px = (int(left_hip.x * w), int(left_hip.y * h))
-            right_hip_px = (int(right_hip.x * w), int(right_hip.y * h))
-
-            # Calculate midpoints
-            shoulder_midpoint = (
-                (left_shoulder_px[0] + right_shoulder_px[0]) // 2, 
-                (left_shoulder_px[1] + right_shoulder_px[1]) // 2
-            )
-            hip_midpoint = (
-                (left_hip_px[0] + right_hip_px[0]) // 2, 
-                (left_hip_px[1] + right_hip_px[1]) // 2
-            )
-
-            # Calculate angle between the spine (line joining midpoints) and the vertical axis.
-            dx = shoulder_midpoint[0] - hip_midpoint[0]
-            dy = shoulder_midpoint[1] - hip_midpoint[1]
-            if dx == 0:
-                spine_angle = 0
-            else:
-                spine_angle = math.degrees(math.atan2(dx, dy))
-            spine_angle = abs(spine_angle)
-            if spine_angle > 90:
-                spine_angle = 180 - spine_angle
-
-            # Determine tilt direction based on horizontal shift of shoulders vs. hips.
-            if shoulder_midpoint[0] > hip_midpoint[0]:
-                tilt_direction = "right"
-            elif shoulder_midpoint[0] < hip_midpoint[0]:
-                tilt_direction = "left"
-            else:
-                tilt_direction = "none"
-
-            if spine_angle < self.tilt_threshold:
-                alignment_status = "Vertical"
-            else:
-                alignment_status = f"Tilted {tilt_direction} by {spine_angle:.2f}°"
-
-            landmarks_dict = {
-                "left_shoulder": left_shoulder_px,
-                "right_shoulder": right_shoulder_px,
-                "left_hip": left_hip_px,
-                "right_hip": right_hip_px,
-                "shoulder_midpoint": shoulder_midpoint,
-                "hip_midpoint": hip_midpoint
-            }
-
-            result = TiltAnalysisResult(
-                status=alignment_status,
-                angle=spine_angle,
-                direction=tilt_direction,
-                landmarks=landmarks_dict
-            )
-            return result
-
-    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True) -> VideoTiltStats:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Error: Could not open video at {video_path}")
-
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / video_fps if video_fps > 0 else 0
-
-        if target_fps is None:
-            sampling_rate = 1
-            effective_fps = video_fps
+            return landmark_array(results.pose_landmarks.landmark)
+
+    def _measure(self, pose_landmarks: np.ndarray, w: int, h: int) -> Optional[TiltAnalysisResult]:
+        """Compute the spine tilt from detected pose landmarks"""
+        pose_landmark = self.mp_pose.PoseLandmark
+
+        # Key landmarks (shoulders and hips) in pixel coordinates, plus room for the midpoints
+        landmarks = np.empty((len(TILT_LANDMARKS), 2), dtype=np.int32)
+        landmarks[:4] = landmark_pixels(
+            pose_landmarks,
+            (pose_landmark.LEFT_SHOULDER.value, pose_landmark.RIGHT_SHOULDER.value,
+             pose_landmark.LEFT_HIP.value, pose_landmark.RIGHT_HIP.value),
+            w, h
+        )
+
+        # Calculate midpoints
+        landmarks[4] = (landmarks[0] + landmarks[1]) // 2
+        landmarks[5] = (landmarks[2] + landmarks[3]) // 2
+        shoulder_midpoint = landmarks[4]
+        hip_midpoint = landmarks[5]
+
+        # Calculate angle between the spine (line joining midpoints) and the vertical axis.
+        dx = int(shoulder_midpoint[0] - hip_midpoint[0])
+        dy = int(shoulder_midpoint[1] - hip_midpoint[1])
+        if dx == 0:
+            spine_angle = 0
         else:
-            effective_fps = min(target_fps, video_fps)
-            sampling_rate = max(1, int(round(video_fps / effective_fps)))
+            spine_angle = math.degrees(math.atan2(dx, dy))
+        spine_angle = abs(spine_angle)
+        if spine_angle > 90:
+            spine_angle = 180 - spine_angle
+
+        # Determine tilt direction based on horizontal shift of shoulders vs. hips.
+        if dx > 0:
+            tilt_direction = TILT_RIGHT
+        elif dx < 0:
+            tilt_direction = TILT_LEFT
+        else:
+            tilt_direction = TILT_NONE
 
-        angles = []
-        directions = []
+        if spine_angle < self.tilt_threshold:
+            alignment_status = "Vertical"
+        else:
+            alignment_status = f"Tilted {TILT_DIRECTIONS[tilt_direction]} by {spine_angle:.2f}°"
+
+        result = TiltAnalysisResult(
+            status=alignment_status,
+            angle=spine_angle,
+            direction_code=tilt_direction,
+            landmarks=landmarks
+        )
+        return result
+
+    def _analyze_frame(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[TiltAnalysisResult]:
+        pose_landmarks = self._detect(image_rgb, model_complexity)
+        if pose_landmarks is None:
+            return None
+        h, w = image_rgb.shape[:2]
+        return self._measure(pose_landmarks, w, h)
+
+    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True,
+                      max_resolution: Optional[int] = None,
+                      model_complexity: Optional[int] = None,
+                      min_fps: Optional[float] = None,
+                      landmark_writer: Optional[LandmarkTrackWriter] = None) -> VideoTiltStats:
+        sampler = create_frame_sampler(video_path, target_fps, max_resolution, show_progress,
+                                       desc="Processing video (tilt)", min_fps=min_fps)
+        if model_complexity is None:
+            model_complexity = self.model_complexity
+        detections = iter_detections(sampler, partial(self._detect, model_complexity=model_complexity),
+                                     landmark_writer)
+        return self._summarize(video_path, sampler, detections)
+
+    def recompute(self, track: LandmarkTrack) -> VideoTiltStats:
+        """Recompute the statistics from recorded pose landmarks, without decoding or detection"""
+        return self._summarize(track.video_path, track, track)
+
+    def _summarize(self, video_path: str, sampler, detections) -> VideoTiltStats:
+        video_fps = sampler.video_fps
+        duration = sampler.duration
+        effective_fps = sampler.effective_fps
+        sampling_rate = sampler.sampling_rate
+
+        angles = RunningStats()
+        directions = CategoryCounter(TILT_DIRECTIONS)
         frames_with_detection = 0
-        frame_index = 0
         start_time = time.time()
 
-        if show_progress:
-            try:
-                from tqdm import tqdm
-                pbar = tqdm(total=frame_count, desc="Processing video (tilt)")
-            except ImportError:
-                show_progress = False
-                print("tqdm not installed, progress bar disabled")
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            if frame_index % sampling_rate == 0:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                result = self._analyze_frame(frame_rgb)
-                if result is not None:
-                    frames_with_detection += 1
-                    angles.append(result.angle)
-                    directions.append(result.direction)
-                    result.frame_number = frame_index
-                    result.timestamp = frame_index / video_fps
-
-            frame_index += 1
-            if show_progress:
-                pbar.update(1)
-        if show_progress:
-            pbar.close()
+        for pose_landmarks, width, height in detections:
+            if pose_landmarks is None:
+                continue
+            result = self._measure(pose_landmarks, width, height)
+            if result is not None:
+                frames_with_detection += 1
+                angles.add(result.angle, sampler.sample_weight)
+                directions.add(result.direction_code, sampler.sample_weight)
         processing_time = time.time() - start_time
-        cap.release()
-
-        if angles:
-            mean_angle = np.mean(angles)
-            median_angle = np.median(angles)
-            std_dev_angle = np.std(angles)
-            min_angle = np.min(angles)
-            max_angle = np.max(angles)
-            direction_counts = {d: directions.count(d) for d in set(directions)}
-            total_dirs = len(directions)
-            direction_percentages = {d: (count / total_dirs) * 100 for d, count in direction_counts.items()}
-            dominant_direction = max(direction_counts, key=direction_counts.get)
+        frame_index = sampler.frames_read
+
+        if angles.count:
+            mean_angle = angles.mean
+            median_angle = angles.median
+            std_dev_angle = angles.std
+            min_angle = angles.min
+            max_angle = angles.max
+            direction_percentages = directions.percentages()
+            dominant_direction = directions.dominant()
             stability_score = std_dev_angle
-            detection_rate = frames_with_detection / (frame_count / sampling_rate) * 100
+            detection_rate = frames_with_detection / sampler.frames_sampled * 100
 
             print(f"\nTilt Analysis Complete for {video_path}")
             print(f"- Duration: {duration:.2f} seconds")
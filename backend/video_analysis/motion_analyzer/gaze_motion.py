@@ -2,20 +2,38 @@ import cv2
 import math
 import numpy as np
 import time
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Union
 import mediapipe as mp
 
-@dataclass
+from ..frame_sampling import create_frame_sampler
+from ..running_stats import CategoryCounter
+
+# Gaze direction codes (index into GAZE_DIRECTIONS and GAZE_TEXTS)
+GAZE_CENTER, GAZE_LEFT, GAZE_RIGHT, GAZE_UNCERTAIN = range(4)
+GAZE_DIRECTIONS = ("center", "left", "right", "uncertain")
+GAZE_TEXTS = ("Looking center", "Looking left", "Looking right", "Gaze direction uncertain")
+
+# Row order of AnalysisResult.landmarks; pupils that were not located are (-1, -1)
+GAZE_LANDMARKS = ("left_pupil", "right_pupil")
+
+@dataclass(slots=True)
 class AnalysisResult:
     """Data class to store results of a single frame analysis"""
     status: str
     angle: float
-    direction: str
-    landmarks: Dict = field(default_factory=dict)
+    direction_code: int  # GAZE_CENTER, GAZE_LEFT, GAZE_RIGHT or GAZE_UNCERTAIN
+    landmarks: np.ndarray  # (2, 2) int32 pupil coordinates, rows in GAZE_LANDMARKS order
     frame_number: Optional[int] = None
     timestamp: Optional[float] = None
-    additional_info: Dict = field(default_factory=dict)
+
+    @property
+    def direction(self) -> str:
+        return GAZE_DIRECTIONS[self.direction_code]
+
+    @property
+    def gaze_text(self) -> str:
+        return GAZE_TEXTS[self.direction_code]
 
 @dataclass
 class VideoAnalysisStats:
@@ -60,17 +78,13 @@ class GazeMotionAnalyzer:
         
         # Get gaze information
         if gaze.is_right():
-            gaze_direction = "right"
-            gaze_text = "Looking right"
+            gaze_direction = GAZE_RIGHT
         elif gaze.is_left():
-            gaze_direction = "left"
-            gaze_text = "Looking left"
+            gaze_direction = GAZE_LEFT
         elif gaze.is_center():
-            gaze_direction = "center"
-            gaze_text = "Looking center"
+            gaze_direction = GAZE_CENTER
         else:
-            gaze_direction = "uncertain"
-            gaze_text = "Gaze direction uncertain"
+            gaze_direction = GAZE_UNCERTAIN
         
         # Get pupil positions if detected
         left_pupil = gaze.pupil_left_coords()
@@ -82,25 +96,19 @@ class GazeMotionAnalyzer:
         else:
             eye_contact_status = "Not maintaining eye contact"
         
-        # Store landmarks and additional info
-        landmarks_dict = {}
+        # Store pupil landmarks
+        landmarks = np.full((len(GAZE_LANDMARKS), 2), -1, dtype=np.int32)
         if left_pupil:
-            landmarks_dict["left_pupil"] = left_pupil
+            landmarks[0] = left_pupil
         if right_pupil:
-            landmarks_dict["right_pupil"] = right_pupil
-            
-        additional_info = {
-            "eye_contact": eye_contact_status,
-            "gaze_text": gaze_text
-        }
+            landmarks[1] = right_pupil
         
         # Create analysis result
         result = AnalysisResult(
             status=eye_contact_status,
             angle=0.0,  # No angle measurement for gaze
-            direction=gaze_direction,
-            landmarks=landmarks_dict,
-            additional_info=additional_info
+            direction_code=gaze_direction,
+            landmarks=landmarks
         )
         
         return result
@@ -115,7 +123,10 @@ class GazeMotionAnalyzer:
         
         return result
     
-    def process_video(self, video_path: str, target_fps: Optional[float] = None, show_progress: bool = True) -> VideoAnalysisStats:
+    def process_video(self, video_path: str, target_fps: Optional[float] = None, show_progress: bool = True,
+                      max_resolution: Optional[int] = None,
+                      model_complexity: Optional[int] = None,
+                      min_fps: Optional[float] = None) -> VideoAnalysisStats:
         """
         Process video and analyze gaze frame by frame, only collecting statistics
         
@@ -123,116 +134,63 @@ class GazeMotionAnalyzer:
             video_path: Path to the video file
             target_fps: Target frames per second for analysis; if None, uses original video FPS
             show_progress: Whether to display a progress bar during processing
+            max_resolution: Longest side of analyzed frames in pixels; if None, uses original resolution
+            model_complexity: Accepted for a uniform analyzer interface; GazeTracking has a single model
+            min_fps: Floor FPS for static segments (adaptive sampling); if None, samples at target_fps
             
         Returns:
             VideoAnalysisStats: Statistical summary of analysis
         """
         # Open video file
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Error: Could not open video at {video_path}")
+        sampler = create_frame_sampler(video_path, target_fps, max_resolution, show_progress,
+                                       min_fps=min_fps)
         
         # Get video properties
-        original_fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / original_fps if original_fps > 0 else 0
+        original_fps = sampler.video_fps
+        frame_count = sampler.frame_count
+        duration = sampler.duration
         
-        # Determine processing FPS and calculate frame skipping
-        processing_fps = original_fps if target_fps is None else target_fps
-        
-        # Calculate frames to skip
-        if processing_fps >= original_fps:
-            # If target FPS is higher or equal to original, process every frame
-            frame_interval = 1
-        else:
-            # Skip frames to match desired FPS
-            frame_interval = int(original_fps / processing_fps)
+        # Processing FPS and frames to skip
+        processing_fps = sampler.effective_fps
+        frame_interval = sampler.sampling_rate
         
         # Variables to store analysis results
-        directions = []
+        directions = CategoryCounter(GAZE_DIRECTIONS)
         eye_contact_counts = {"Maintaining eye contact": 0, "Not maintaining eye contact": 0}
-        timestamps = []
         frames_with_detection = 0
-        frame_results = []
         
         # Start timing
         start_time = time.time()
         
-        # Process frames
-        frame_index = 0
-        
-        # Create progress bar if requested
-        if show_progress:
-            try:
-                from tqdm import tqdm
-                pbar = tqdm(total=frame_count, desc="Processing video")
-            except ImportError:
-                show_progress = False
-                print("tqdm not installed, progress bar disabled")
-        
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            # Process frames based on calculated interval
-            if frame_index % frame_interval == 0:
-                # Process the frame
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                result = self._analyze_frame(frame_rgb)
-                
-                if result is not None:
-                    frames_with_detection += 1
-                    directions.append(result.direction)
-                    timestamps.append(frame_index / original_fps)
-                    eye_contact_counts[result.status] += 1
-                    
-                    # Set frame metadata
-                    result.frame_number = frame_index
-                    result.timestamp = frame_index / original_fps
-                    
-                    frame_results.append({
-                        "frame": frame_index,
-                        "timestamp": frame_index / original_fps,
-                        "direction": result.direction,
-                        "status": result.status
-                    })
+        # Process sampled frames
+        for frame_index, frame_rgb in sampler:
+            result = self._analyze_frame(frame_rgb)
             
-            frame_index += 1
-            
-            # Update progress bar
-            if show_progress:
-                pbar.update(1)
-        
-        # Close progress bar
-        if show_progress:
-            pbar.close()
+            if result is not None:
+                frames_with_detection += 1
+                directions.add(result.direction_code, sampler.sample_weight)
+                eye_contact_counts[result.status] += sampler.sample_weight
             
         # Calculate processing time
         processing_time = time.time() - start_time
         effective_fps = frame_count / processing_time
-        
-        # Release resources
-        cap.release()
+        frame_index = sampler.frames_read
         
         # Calculate statistics only if we have enough data
-        if directions:
+        if directions.total:
             # Direction analysis
-            direction_counts = {dir: directions.count(dir) for dir in set(directions)}
-            total_directions = len(directions)
-            direction_percentages = {dir: (count / total_directions) * 100 
-                                    for dir, count in direction_counts.items()}
+            direction_percentages = directions.percentages()
             
             # Find dominant direction
-            dominant_direction = max(direction_counts, key=direction_counts.get)
+            dominant_direction = directions.dominant()
             
             # Calculate eye contact percentage
             total_frames_with_detection = sum(eye_contact_counts.values())
             eye_contact_percentage = (eye_contact_counts["Maintaining eye contact"] / 
                                       total_frames_with_detection * 100) if total_frames_with_detection > 0 else 0
             
-            # Calculate detection rate
-            frames_expected = frame_count // frame_interval
+            # Calculate detection rate over the frames actually sampled
+            frames_expected = sampler.frames_sampled
             detection_rate = frames_with_detection / frames_expected * 100
             
             # Create statistics object
@@ -1,21 +1,43 @@
-import cv2
 import math
+from array import array
+from itertools import permutations
 import numpy as np
 import time
+from functools import partial
 from typing import Dict, List, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 import mediapipe as mp
 
-@dataclass
+from ..frame_records import landmark_array
+from ..frame_sampling import create_frame_sampler
+from ..landmark_store import LandmarkTrack, LandmarkTrackWriter, iter_detections
+from ..running_stats import RunningStats
+
+# Motion direction codes (index into MOTION_DIRECTIONS), based on the z-score threshold
+MOTION_NORMAL, MOTION_EXCESSIVE = range(2)
+MOTION_DIRECTIONS = ("normal", "excessive")
+
+# MediaPipe Hands landmarks per hand (wrist is landmark 0)
+HAND_LANDMARK_COUNT = 21
+
+@dataclass(slots=True)
 class AnalysisResult:
     """Data class to store results of a single frame analysis."""
     status: str
     angle: float                   # Here, we continue using 'angle' to store motion distance (pixels)
-    direction: str                 # 'excessive' or 'normal' based on z-score threshold
-    landmarks: Dict = field(default_factory=dict)
+    landmarks: np.ndarray          # (n_hands, 21, 2) int32 pixel coordinates in MediaPipe landmark order
+    centers: np.ndarray            # (n_hands, 2) int32 hand centers in pixels
+    direction_code: int = MOTION_NORMAL
     frame_number: Optional[int] = None
     timestamp: Optional[float] = None
-    additional_info: Dict = field(default_factory=dict)
+
+    @property
+    def direction(self) -> str:
+        return MOTION_DIRECTIONS[self.direction_code]
+
+    @property
+    def hand_count(self) -> int:
+        return self.landmarks.shape[0]
 
 @dataclass
 class VideoAnalysisStats:
@@ -41,198 +63,194 @@ class VideoAnalysisStats:
 class HandMotionAnalyzer:
     """Analyzer for hand movement during presentations using normalized metrics (z-score)."""
     
-    def __init__(self, min_detection_confidence: float = 0.7, zscore_threshold: float = 2.0):
+    # Detector whose landmarks are recorded, and the parameters (with their
+    # valid ranges) that can be changed when recomputing from them
+    LANDMARK_SOURCE = 'hands'
+    TUNABLE_PARAMETERS = {'zscore_threshold': (0.0, 10.0)}
+    
+    def __init__(self, min_detection_confidence: float = 0.7, zscore_threshold: float = 2.0,
+                 model_complexity: int = 1):
         """
         Args:
             min_detection_confidence: Confidence threshold for MediaPipe hands.
             zscore_threshold: Z-score value above which hand movement is flagged as 'excessive'.
+            model_complexity: Default MediaPipe hands model complexity (0 or 1; higher values use 1).
         """
         self.min_detection_confidence = min_detection_confidence
         self.zscore_threshold = zscore_threshold  # Relative threshold in terms of standard deviations
+        self.model_complexity = model_complexity
         self.mp_hands = mp.solutions.hands
         self.prev_hand_positions = None  # To store hand positions from the previous frame
     
-    def _analyze_frame(self, image_rgb: np.ndarray) -> Optional[AnalysisResult]:
-        """Analyze a single frame to compute hand motion distance."""
+    def _detect(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[np.ndarray]:
+        """Run MediaPipe Hands on a frame, returning (n_hands, 21, 3) normalized landmarks or None."""
         with self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=2,
+            model_complexity=min(model_complexity, 1),
             min_detection_confidence=self.min_detection_confidence
         ) as hands:
             results = hands.process(image_rgb)
             if not results.multi_hand_landmarks:
                 return None
+            return np.stack([landmark_array(hand_landmarks.landmark)
+                             for hand_landmarks in results.multi_hand_landmarks])
+
+    def _measure(self, hand_coords: np.ndarray, w: int, h: int) -> Optional[AnalysisResult]:
+        """Compute hand motion distance from detected hand landmarks (uses the previous frame's hands)."""
+        hand_coords = hand_coords.astype(np.float64)
+        scale = np.array((w, h), dtype=np.float64)
+        # Save all landmarks (the wrist is row 0) in pixels for visualization if needed
+        hand_landmarks_px = (hand_coords[:, :, :2] * scale).astype(np.int32)
+        # Center of each hand (average of all landmark coordinates)
+        current_hand_positions = (hand_coords[:, :, :2].mean(axis=1) * scale).astype(np.int32)
+
+        # Compute motion distance between previous and current positions
+        motion_distance = 0
+        if self.prev_hand_positions is not None and len(self.prev_hand_positions) > 0:
+            distances = self._match_hand_distances(current_hand_positions, self.prev_hand_positions)
+            # Only use pairs that are reasonably close (avoid mismatches)
+            distances = distances[distances < w / 2]
+            if distances.size > 0:
+                motion_distance = float(distances.mean())
+        
+        # Update previous hand positions for next frame
+        self.prev_hand_positions = current_hand_positions
+        
+        # For compatibility, we use the field 'angle' to store motion distance.
+        # The direction stays 'normal' here; excessive motion is flagged after z-score normalization.
+        result = AnalysisResult(
+            status="Hand motion detected",
+            angle=motion_distance,
+            landmarks=hand_landmarks_px,
+            centers=current_hand_positions
+        )
+        return result
+
+    def _analyze_frame(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[AnalysisResult]:
+        """Analyze a single frame to compute hand motion distance."""
+        hand_coords = self._detect(image_rgb, model_complexity)
+        if hand_coords is None:
+            return None
+        h, w = image_rgb.shape[:2]
+        return self._measure(hand_coords, w, h)
+
+    @staticmethod
+    def _match_hand_distances(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        """
+        Match current hand centers to previous ones and return the matched distances.
+
+        Hands are paired one-to-one so that the total distance is minimal (an exact
+        assignment; with at most two hands per frame every pairing can be checked),
+        so two hands crossing each other are not both matched to the same hand.
 
-            h, w = image_rgb.shape[:2]
-            current_hand_positions = []
-            hand_landmarks_dict = {}
-            
-            # Loop over detected hands
-            for hand_idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                # Use wrist as reference position
-                wrist = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST.value]
-                wrist_px = (int(wrist.x * w), int(wrist.y * h))
-                
-                # Calculate center of hand (average of all landmark coordinates)
-                hand_x_sum = 0
-                hand_y_sum = 0
-                for landmark in hand_landmarks.landmark:
-                    hand_x_sum += landmark.x
-                    hand_y_sum += landmark.y
-                hand_center = (
-                    int((hand_x_sum / len(hand_landmarks.landmark)) * w),
-                    int((hand_y_sum / len(hand_landmarks.landmark)) * h)
-                )
-                
-                current_hand_positions.append(hand_center)
-                hand_landmarks_dict[f"hand_{hand_idx}_wrist"] = wrist_px
-                hand_landmarks_dict[f"hand_{hand_idx}_center"] = hand_center
-                # Save all landmarks for visualization if needed
-                for i, landmark in enumerate(hand_landmarks.landmark):
-                    landmark_px = (int(landmark.x * w), int(landmark.y * h))
-                    hand_landmarks_dict[f"hand_{hand_idx}_landmark_{i}"] = landmark_px
+        Args:
+            current: (n, 2) hand centers in the current frame.
+            previous: (m, 2) hand centers in the previous frame.
+
+        Returns:
+            Distances (pixels) of the min(n, m) matched pairs.
+        """
+        # Pairwise distances via broadcasting: (n, m)
+        distances = np.linalg.norm(
+            current[:, None, :].astype(np.float64) - previous[None, :, :], axis=-1
+        )
+        if distances.shape[0] > distances.shape[1]:
+            distances = distances.T
 
-            # Compute motion distance between previous and current positions
-            motion_distance = 0
-            if self.prev_hand_positions is not None and len(self.prev_hand_positions) > 0:
-                total_distance = 0
-                valid_pairs = 0
-                # For each current hand, find the closest previous hand position
-                for curr_pos in current_hand_positions:
-                    distances = [np.sqrt((curr_pos[0] - prev_pos[0])**2 + (curr_pos[1] - prev_pos[1])**2)
-                                 for prev_pos in self.prev_hand_positions]
-                    closest_distance = min(distances) if distances else 0
-                    # Only use pairs that are reasonably close (avoid mismatches)
-                    if closest_distance < w / 2:
-                        total_distance += closest_distance
-                        valid_pairs += 1
-                if valid_pairs > 0:
-                    motion_distance = total_distance / valid_pairs
-            
-            # Update previous hand positions for next frame
-            self.prev_hand_positions = current_hand_positions
-            
-            # For compatibility, we use the field 'angle' to store motion distance.
-            # We leave 'direction' empty here; it will be set later after z-score normalization.
-            result = AnalysisResult(
-                status="Hand motion detected",
-                angle=motion_distance,
-                direction="",
-                landmarks=hand_landmarks_dict
-            )
-            return result
+        rows = np.arange(distances.shape[0])
+        assignments = np.array(list(permutations(range(distances.shape[1]), distances.shape[0])))
+        costs = distances[rows, assignments].sum(axis=1)
+        return distances[rows, assignments[np.argmin(costs)]]
 
-    def process_video(self, video_path: str, target_fps: Optional[float] = None, show_progress: bool = True) -> VideoAnalysisStats:
+    def process_video(self, video_path: str, target_fps: Optional[float] = None, show_progress: bool = True,
+                      max_resolution: Optional[int] = None,
+                      model_complexity: Optional[int] = None,
+                      min_fps: Optional[float] = None,
+                      landmark_writer: Optional[LandmarkTrackWriter] = None) -> VideoAnalysisStats:
         """
         Process video frame by frame and analyze hand movements using a normalized z-score metric.
         """
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Error: Could not open video at {video_path}")
-        
-        original_fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / original_fps if original_fps > 0 else 0
+        sampler = create_frame_sampler(video_path, target_fps, max_resolution, show_progress,
+                                       min_fps=min_fps)
+        if model_complexity is None:
+            model_complexity = self.model_complexity
+        detections = iter_detections(sampler, partial(self._detect, model_complexity=model_complexity),
+                                     landmark_writer)
+        return self._summarize(video_path, sampler, detections)
+
+    def recompute(self, track: LandmarkTrack) -> VideoAnalysisStats:
+        """Recompute the statistics from recorded hand landmarks, without decoding or detection."""
+        return self._summarize(track.video_path, track, track)
+
+    def _summarize(self, video_path: str, sampler, detections) -> VideoAnalysisStats:
+        original_fps = sampler.video_fps
+        frame_count = sampler.frame_count
+        duration = sampler.duration
         
-        # Determine processing FPS and calculate frame interval for skipping
-        processing_fps = original_fps if target_fps is None else target_fps
-        frame_interval = 1 if processing_fps >= original_fps else int(original_fps / processing_fps)
+        # Processing FPS and frame interval for skipping
+        processing_fps = sampler.effective_fps
         
-        motion_distances = []
-        timestamps = []
+        # Per-frame distances are kept (as a compact float array) because z-scores
+        # need the final mean and standard deviation
+        motion_distances = array('d')
+        sample_weights = array('l')
+        motion_stats = RunningStats()
+        hand_counts = RunningStats()
         frames_with_detection = 0
-        frame_results = []
-        hand_count_per_frame = []
-        excessive_frames_flag = []  # To record whether each frame is excessive
         
         start_time = time.time()
         self.prev_hand_positions = None  # Reset previous hand positions
         
-        frame_index = 0
-        if show_progress:
-            try:
-                from tqdm import tqdm
-                pbar = tqdm(total=frame_count, desc="Processing video")
-            except ImportError:
-                show_progress = False
-                print("tqdm not installed, progress bar disabled")
-        
         # First pass: Collect motion distances for each processed frame.
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            if frame_index % frame_interval == 0:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                result = self._analyze_frame(frame_rgb)
-                if result is not None:
-                    frames_with_detection += 1
-                    motion_distance = result.angle
-                    motion_distances.append(motion_distance)
-                    timestamps.append(frame_index / original_fps)
-                    
-                    # Count detected hands from landmarks (using the 'center' key)
-                    unique_hands = set(key.split('_')[1] for key in result.landmarks.keys() if key.startswith('hand_') and 'center' in key)
-                    hand_count = len(unique_hands)
-                    hand_count_per_frame.append(hand_count)
-                    
-                    # Store preliminary frame result (z-score evaluation will follow)
-                    frame_results.append({
-                        "frame": frame_index,
-                        "timestamp": frame_index / original_fps,
-                        "motion_distance": motion_distance,
-                        "hands_detected": hand_count,
-                        "status": result.status
-                    })
-            frame_index += 1
-            if show_progress:
-                pbar.update(1)
-        if show_progress:
-            pbar.close()
+        for hand_coords, width, height in detections:
+            if hand_coords is None:
+                continue
+            result = self._measure(hand_coords, width, height)
+            if result is not None:
+                frames_with_detection += 1
+                # Motion per target-FPS frame, so long adaptive steps do not inflate it
+                motion_distance = result.angle / sampler.sample_gap
+                motion_distances.append(motion_distance)
+                sample_weights.append(sampler.sample_weight)
+                motion_stats.add(motion_distance, sampler.sample_weight)
+                hand_counts.add(result.hand_count, sampler.sample_weight)
         
         processing_time = time.time() - start_time
-        effective_fps = frame_count / processing_time
-        
-        cap.release()
+        effective_fps = frame_count / processing_time if processing_time > 0 else 0.0
+        frame_index = sampler.frames_read
         
         # If no motion data was collected, return early.
-        if not motion_distances:
+        if not motion_stats.count:
             print("No valid hand detection in video frames. Unable to generate statistics.")
             return None
         
         # Second pass: Compute overall statistics and z-scores.
-        mean_motion = np.mean(motion_distances)
-        std_dev_motion = np.std(motion_distances)
-        median_motion = np.median(motion_distances)
-        max_motion = np.max(motion_distances)
-        
-        # Compute z-scores for each frame's motion distance.
-        # Note: if std_dev_motion is zero (e.g. no movement variation), set all z-scores to zero.
-        z_scores = [(md - mean_motion) / std_dev_motion if std_dev_motion > 0 else 0 for md in motion_distances]
-        
-        # Flag frames with excessive movement based on z-score threshold.
-        excessive_motion_frames = 0
-        for z in z_scores:
-            if z > self.zscore_threshold:
-                excessive_motion_frames += 1
-                excessive_frames_flag.append(True)
-            else:
-                excessive_frames_flag.append(False)
+        mean_motion = motion_stats.mean
+        std_dev_motion = motion_stats.std
+        median_motion = motion_stats.median
+        max_motion = motion_stats.max
         
-        # Define 'direction' for each frame result based on the z-score.
-        # (We update the frame_results list with the z-score info if desired.)
-        for idx, res in enumerate(frame_results):
-            res["z_score"] = z_scores[idx]
-            res["excessive_motion"] = "excessive" if z_scores[idx] > self.zscore_threshold else "normal"
+        # Compute z-scores for each frame's motion distance and flag frames with
+        # excessive movement based on the z-score threshold, in one vectorized pass.
+        # Note: if std_dev_motion is zero (e.g. no movement variation), all z-scores are zero.
+        distances = np.frombuffer(motion_distances, dtype=np.float64)
+        if std_dev_motion > 0:
+            z_scores = (distances - mean_motion) / std_dev_motion
+        else:
+            z_scores = np.zeros_like(distances)
+        excessive = z_scores > self.zscore_threshold
+        excessive_motion_frames = int(np.count_nonzero(excessive))
         
-        # Calculate overall excessive motion rate (percentage of frames with high z-score)
-        excessive_motion_rate = (excessive_motion_frames / frames_with_detection) * 100 if frames_with_detection > 0 else 0
+        # Calculate overall excessive motion rate (time-weighted percentage of frames with high z-score)
+        weights = np.frombuffer(sample_weights, dtype=sample_weights.typecode)
+        excessive_motion_rate = float(weights[excessive].sum() / weights.sum() * 100)
         
         # Average number of hands detected per frame
-        avg_hands_per_frame = np.mean(hand_count_per_frame) if hand_count_per_frame else 0
+        avg_hands_per_frame = hand_counts.mean
         
-        # Detection rate based on expected processed frames
-        frames_expected = frame_count // frame_interval
+        # Detection rate based on the frames actually sampled
+        frames_expected = sampler.frames_sampled
         detection_rate = frames_with_detection / frames_expected * 100
         
         # Composite movement score: scale the mean motion relative to baseline;
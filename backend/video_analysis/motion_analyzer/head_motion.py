@@ -1,22 +1,40 @@
-import cv2
 import math
 import numpy as np
 import time
+from functools import partial
 from typing import Dict, Optional
 from dataclasses import dataclass
 import mediapipe as mp
 
+from ..frame_records import landmark_array, landmark_pixels
+from ..frame_sampling import create_frame_sampler
+from ..landmark_store import LandmarkTrack, LandmarkTrackWriter, iter_detections
+from ..running_stats import CategoryCounter, RunningStats
 
-@dataclass
+
+# Tilt direction codes (index into TILT_DIRECTIONS)
+TILT_NONE, TILT_LEFT, TILT_RIGHT = range(3)
+TILT_DIRECTIONS = ("none", "left", "right")
+
+# Row order of AnalysisResult.landmarks, and the Face Mesh indices they come from
+TILT_LANDMARKS = ("left_eye", "right_eye", "nose_tip", "chin", "eye_midpoint")
+FACE_MESH_INDICES = (33, 263, 1, 152)  # left/right eye outer corners, nose tip, chin
+
+
+@dataclass(slots=True)
 class AnalysisResult:
     """Data class to store results of a single frame analysis"""
     status: str
     angle: float
-    direction: str
-    landmarks: Dict
+    direction_code: int  # TILT_NONE, TILT_LEFT or TILT_RIGHT
+    landmarks: np.ndarray  # (5, 2) int32 pixel coordinates, rows in TILT_LANDMARKS order
     frame_number: int = None
     timestamp: float = None
 
+    @property
+    def direction(self) -> str:
+        return TILT_DIRECTIONS[self.direction_code]
+
 @dataclass
 class VideoAnalysisStats:
     """Data class to store statistical results of video analysis"""
@@ -36,18 +54,25 @@ class VideoAnalysisStats:
 class HeadTiltAnalyzer:
     """Analyzer for head tilt using MediaPipe Face Mesh"""
     
-    def __init__(self, min_detection_confidence: float = 0.5, tilt_threshold: float = 5):
+    # Detector whose landmarks are recorded, and the parameters (with their
+    # valid ranges) that can be changed when recomputing from them
+    LANDMARK_SOURCE = 'face_mesh'
+    TUNABLE_PARAMETERS = {'tilt_threshold': (0.0, 90.0)}
+    
+    def __init__(self, min_detection_confidence: float = 0.5, tilt_threshold: float = 5,
+                 model_complexity: int = 1):
         self.min_detection_confidence = min_detection_confidence
         self.tilt_threshold = tilt_threshold
+        self.model_complexity = model_complexity
         self.mp_face_mesh = mp.solutions.face_mesh
     
-    def _analyze_frame(self, image_rgb: np.ndarray) -> Optional[AnalysisResult]:
-        """Analyze a single frame for head tilt statistics only"""
-        # Initialize Face Mesh (using static image mode)
+    def _detect(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[np.ndarray]:
+        """Run Face Mesh on a frame, returning its normalized landmarks or None"""
+        # Initialize Face Mesh (using static image mode); iris refinement is skipped at complexity 0
         with self.mp_face_mesh.FaceMesh(
             static_image_mode=True,
             max_num_faces=1,
-            refine_landmarks=True,
+            refine_landmarks=model_complexity > 0,
             min_detection_confidence=self.min_detection_confidence
         ) as face_mesh:
             results = face_mesh.process(image_rgb)
@@ -55,141 +80,117 @@ class HeadTiltAnalyzer:
             if not results.multi_face_landmarks:
                 return None
             
-            face_landmarks = results.multi_face_landmarks[0]
-            
-            # Extract key landmarks
-            left_eye = face_landmarks.landmark[33]  # Left eye outer corner
-            right_eye = face_landmarks.landmark[263]  # Right eye outer corner
-            nose_tip = face_landmarks.landmark[1]
-            chin = face_landmarks.landmark[152]
-            
-            # Get image dimensions
-            h, w = image_rgb.shape[:2]
-            
-            # Convert normalized coordinates to pixel coordinates
-            left_eye_px = (int(left_eye.x * w), int(left_eye.y * h))
-            right_eye_px = (int(right_eye.x * w), int(right_eye.y * h))
-            nose_tip_px = (int(nose_tip.x * w), int(nose_tip.y * h))
-            chin_px = (int(chin.x * w), int(chin.y * h))
-            
-            # Calculate the midpoint between eyes
-            eye_midpoint = ((left_eye_px[0] + right_eye_px[0]) // 2,
-                            (left_eye_px[1] + right_eye_px[1]) // 2)
-            
-            # Compute differences
-            dx = chin_px[0] - eye_midpoint[0]
-            dy = chin_px[1] - eye_midpoint[1]
-            
-            # Calculate tilt angle (angle between vertical and the line from eye midpoint to chin)
-            if dx == 0:
-                face_tilt_angle = 0
-            else:
-                face_tilt_angle = math.degrees(math.atan2(dx, dy))
-            
-            # Normalize angle (0-90°)
-            face_tilt_angle = abs(face_tilt_angle)
-            if face_tilt_angle > 90:
-                face_tilt_angle = 180 - face_tilt_angle
-            
-            # Determine tilt direction
-            if chin_px[0] > eye_midpoint[0]:
-                tilt_direction = "right"
-            elif chin_px[0] < eye_midpoint[0]:
-                tilt_direction = "left"
-            else:
-                tilt_direction = "none"
-            
-            # Status message
-            if face_tilt_angle < self.tilt_threshold:
-                face_tilt_status = "Upright"
-            else:
-                face_tilt_status = f"Tilted {tilt_direction} by {face_tilt_angle:.2f}°"
-            
-            landmarks_dict = {
-                "left_eye": left_eye_px,
-                "right_eye": right_eye_px,
-                "nose_tip": nose_tip_px,
-                "chin": chin_px,
-                "eye_midpoint": eye_midpoint
-            }
-            
-            return AnalysisResult(
-                status=face_tilt_status,
-                angle=face_tilt_angle,
-                direction=tilt_direction,
-                landmarks=landmarks_dict
-            )
+            return landmark_array(results.multi_face_landmarks[0].landmark)
     
-    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True) -> VideoAnalysisStats:
-        """
-        Process video and analyze face tilt frame by frame, only collecting statistics.
-        """
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Error: Could not open video at {video_path}")
+    def _measure(self, face_landmarks: np.ndarray, w: int, h: int) -> Optional[AnalysisResult]:
+        """Compute head tilt statistics from detected Face Mesh landmarks"""
+        # Extract key landmarks in pixel coordinates
+        landmarks = np.empty((len(TILT_LANDMARKS), 2), dtype=np.int32)
+        landmarks[:4] = landmark_pixels(face_landmarks, FACE_MESH_INDICES, w, h)
+        
+        # Calculate the midpoint between eyes
+        landmarks[4] = (landmarks[0] + landmarks[1]) // 2
+        
+        # Compute differences between the chin and the eye midpoint
+        dx = int(landmarks[3, 0] - landmarks[4, 0])
+        dy = int(landmarks[3, 1] - landmarks[4, 1])
         
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / video_fps if video_fps > 0 else 0
+        # Calculate tilt angle (angle between vertical and the line from eye midpoint to chin)
+        if dx == 0:
+            face_tilt_angle = 0
+        else:
+            face_tilt_angle = math.degrees(math.atan2(dx, dy))
+        
+        # Normalize angle (0-90°)
+        face_tilt_angle = abs(face_tilt_angle)
+        if face_tilt_angle > 90:
+            face_tilt_angle = 180 - face_tilt_angle
         
-        if target_fps is None:
-            sampling_rate = 1
-            effective_fps = video_fps
+        # Determine tilt direction
+        if dx > 0:
+            tilt_direction = TILT_RIGHT
+        elif dx < 0:
+            tilt_direction = TILT_LEFT
         else:
-            effective_fps = min(target_fps, video_fps)
-            sampling_rate = max(1, int(round(video_fps / effective_fps)))
+            tilt_direction = TILT_NONE
+        
+        # Status message
+        if face_tilt_angle < self.tilt_threshold:
+            face_tilt_status = "Upright"
+        else:
+            face_tilt_status = f"Tilted {TILT_DIRECTIONS[tilt_direction]} by {face_tilt_angle:.2f}°"
+        
+        return AnalysisResult(
+            status=face_tilt_status,
+            angle=face_tilt_angle,
+            direction_code=tilt_direction,
+            landmarks=landmarks
+        )
+    
+    def _analyze_frame(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[AnalysisResult]:
+        """Analyze a single frame for head tilt statistics only"""
+        face_landmarks = self._detect(image_rgb, model_complexity)
+        if face_landmarks is None:
+            return None
+        h, w = image_rgb.shape[:2]
+        return self._measure(face_landmarks, w, h)
+    
+    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True,
+                      max_resolution: Optional[int] = None,
+                      model_complexity: Optional[int] = None,
+                      min_fps: Optional[float] = None,
+                      landmark_writer: Optional[LandmarkTrackWriter] = None) -> VideoAnalysisStats:
+        """
+        Process video and analyze face tilt frame by frame, only collecting statistics.
+        """
+        sampler = create_frame_sampler(video_path, target_fps, max_resolution, show_progress,
+                                       min_fps=min_fps)
+        if model_complexity is None:
+            model_complexity = self.model_complexity
+        detections = iter_detections(sampler, partial(self._detect, model_complexity=model_complexity),
+                                     landmark_writer)
+        return self._summarize(video_path, sampler, detections)
+    
+    def recompute(self, track: LandmarkTrack) -> VideoAnalysisStats:
+        """Recompute the statistics from recorded Face Mesh landmarks, without decoding or detection"""
+        return self._summarize(track.video_path, track, track)
+    
+    def _summarize(self, video_path: str, sampler, detections) -> VideoAnalysisStats:
+        video_fps = sampler.video_fps
+        duration = sampler.duration
+        effective_fps = sampler.effective_fps
+        sampling_rate = sampler.sampling_rate
         
-        angles = []
-        directions = []
+        angles = RunningStats()
+        directions = CategoryCounter(TILT_DIRECTIONS)
         frames_with_detection = 0
-        frame_index = 0
         
         start_time = time.time()
         
-        if show_progress:
-            try:
-                from tqdm import tqdm
-                pbar = tqdm(total=frame_count, desc="Processing video")
-            except ImportError:
-                show_progress = False
-                print("tqdm not installed, progress bar disabled")
+        for face_landmarks, width, height in detections:
+            if face_landmarks is None:
+                continue
+            result = self._measure(face_landmarks, width, height)
+            
+            if result is not None:
+                frames_with_detection += 1
+                angles.add(result.angle, sampler.sample_weight)
+                directions.add(result.direction_code, sampler.sample_weight)
         
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            if frame_index % sampling_rate == 0:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                result = self._analyze_frame(frame_rgb)
-                
-                if result is not None:
-                    frames_with_detection += 1
-                    angles.append(result.angle)
-                    directions.append(result.direction)
-            
-            frame_index += 1
-            if show_progress:
-                pbar.update(1)
-        
-        if show_progress:
-            pbar.close()
         processing_time = time.time() - start_time
-        cap.release()
+        frame_index = sampler.frames_read
         
-        if angles:
-            mean_angle = np.mean(angles)
-            median_angle = np.median(angles)
-            std_dev_angle = np.std(angles)
-            min_angle = np.min(angles)
-            max_angle = np.max(angles)
-            
-            direction_counts = {d: directions.count(d) for d in set(directions)}
-            total = len(directions)
-            direction_percentages = {d: (count / total) * 100 for d, count in direction_counts.items()}
-            dominant_direction = max(direction_counts, key=direction_counts.get)
+        if angles.count:
+            mean_angle = angles.mean
+            median_angle = angles.median
+            std_dev_angle = angles.std
+            min_angle = angles.min
+            max_angle = angles.max
+            
+            direction_percentages = directions.percentages()
+            dominant_direction = directions.dominant()
             stability_score = std_dev_angle
-            detection_rate = frames_with_detection / (frame_count / sampling_rate) * 100
+            detection_rate = frames_with_detection / sampler.frames_sampled * 100
             
             stats = VideoAnalysisStats(
                 mean_angle=mean_angle,
@@ -218,4 +219,8 @@ class HeadTiltAnalyzer:
             return stats
         else:
             print("No face detected in any frame.")
-            return None
\ No newline at end of file
+            return None
+
+
+# Exported under the name used by the motion analyzer package
+HeadMotionAnalyzer = HeadTiltAnalyzer
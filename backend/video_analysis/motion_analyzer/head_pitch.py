@@ -2,20 +2,34 @@ import cv2
 import math
 import numpy as np
 import time
+from functools import partial
 from typing import Dict, Optional
 from dataclasses import dataclass
 import mediapipe as mp
 
-@dataclass
+from ..frame_records import landmark_array, landmark_pixels
+from ..frame_sampling import create_frame_sampler
+from ..landmark_store import LandmarkTrack, LandmarkTrackWriter, iter_detections
+from ..running_stats import CategoryCounter, RunningStats
+
+# Pitch direction codes (index into PITCH_DIRECTIONS)
+PITCH_NEUTRAL, PITCH_FORWARD, PITCH_BACKWARD = range(3)
+PITCH_DIRECTIONS = ("neutral", "forward", "backward")
+
+@dataclass(slots=True)
 class AnalysisResult:
     """Data class to store results of a single frame analysis."""
     status: str
     angle: float                   # Absolute pitch angle (in degrees)
-    direction: str                 # "forward" (chin down) or "backward" (chin up) or "neutral"
-    landmarks: Dict
+    direction_code: int            # PITCH_NEUTRAL, PITCH_FORWARD (chin down) or PITCH_BACKWARD (chin up)
+    landmarks: np.ndarray          # (6, 2) int32 pixel coordinates, rows in landmark_indices order
     frame_number: Optional[int] = None
     timestamp: Optional[float] = None
 
+    @property
+    def direction(self) -> str:
+        return PITCH_DIRECTIONS[self.direction_code]
+
 @dataclass
 class VideoAnalysisStats:
     """Data class to store statistical results of video analysis."""
@@ -35,14 +49,22 @@ class VideoAnalysisStats:
 class HeadPitchAnalyzer:
     """Analyzer for head forward/backward (pitch) movement using MediaPipe Face Mesh and solvePnP."""
     
-    def __init__(self, min_detection_confidence: float = 0.5, pitch_threshold: float = 5):
+    # Detector whose landmarks are recorded, and the parameters (with their
+    # valid ranges) that can be changed when recomputing from them
+    LANDMARK_SOURCE = 'face_mesh'
+    TUNABLE_PARAMETERS = {'pitch_threshold': (0.0, 90.0)}
+    
+    def __init__(self, min_detection_confidence: float = 0.5, pitch_threshold: float = 5,
+                 model_complexity: int = 1):
         """
         Args:
             min_detection_confidence: Minimum confidence for face detection.
             pitch_threshold: Threshold (in degrees) below which the head is considered 'neutral'.
+            model_complexity: Default detector complexity; 0 disables iris landmark refinement.
         """
         self.min_detection_confidence = min_detection_confidence
         self.pitch_threshold = pitch_threshold
+        self.model_complexity = model_complexity
         self.mp_face_mesh = mp.solutions.face_mesh
         
         # Define 3D model points for head pose estimation (in millimeters)
@@ -66,6 +88,7 @@ class HeadPitchAnalyzer:
             "left_mouth": 61,    # left mouth corner
             "right_mouth": 291   # right mouth corner
         }
+        self._landmark_rows = tuple(self.landmark_indices.values())
     
     def _get_euler_angles(self, rotation_matrix: np.ndarray) -> tuple:
         """
@@ -79,13 +102,13 @@ class HeadPitchAnalyzer:
         roll = float(euler_angles[2])
         return pitch, yaw, roll
 
-    def _analyze_frame(self, image_rgb: np.ndarray) -> Optional[AnalysisResult]:
-        """Analyze a single frame to estimate head pitch (forward/backward lean)."""
+    def _detect(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[np.ndarray]:
+        """Run Face Mesh on a frame, returning its normalized landmarks or None"""
         # Initialize Face Mesh for the frame
         with self.mp_face_mesh.FaceMesh(
             static_image_mode=True,
             max_num_faces=1,
-            refine_landmarks=True,
+            refine_landmarks=model_complexity > 0,
             min_detection_confidence=self.min_detection_confidence
         ) as face_mesh:
             results = face_mesh.process(image_rgb)
@@ -93,133 +116,120 @@ class HeadPitchAnalyzer:
             if not results.multi_face_landmarks:
                 return None
             
-            face_landmarks = results.multi_face_landmarks[0]
-            h, w = image_rgb.shape[:2]
-            
-            # Extract the required 2D image points from the detected landmarks.
-            image_points = []
-            landmarks_dict = {}
-            for key, idx in self.landmark_indices.items():
-                lm = face_landmarks.landmark[idx]
-                coord = (int(lm.x * w), int(lm.y * h))
-                image_points.append(coord)
-                landmarks_dict[key] = coord
-            image_points = np.array(image_points, dtype="double")
-            
-            # Define camera matrix using image dimensions.
-            focal_length = w
-            center = (w / 2, h / 2)
-            camera_matrix = np.array([
-                [focal_length, 0, center[0]],
-                [0, focal_length, center[1]],
-                [0, 0, 1]
-            ], dtype="double")
-            dist_coeffs = np.zeros((4,1))  # Assuming no lens distortion
-            
-            # Solve the PnP problem to estimate head pose.
-            success, rotation_vector, translation_vector = cv2.solvePnP(
-                self.model_points, image_points, camera_matrix, dist_coeffs, flags=cv2.SOLVEPNP_ITERATIVE
-            )
-            if not success:
-                return None
-            
-            # Convert rotation vector to rotation matrix.
-            rotation_matrix, _ = cv2.Rodrigues(rotation_vector)
-            # Extract Euler angles.
-            pitch, yaw, roll = self._get_euler_angles(rotation_matrix)
-            
-            # For pitch, positive value often indicates head leaning forward (chin down),
-            # while a negative value indicates head leaning backward (chin up).
-            # We'll use the absolute pitch angle for reporting,
-            # but keep the sign to determine the direction.
-            abs_pitch = abs(pitch)
-            if abs_pitch < self.pitch_threshold:
-                pitch_status = "Neutral"
-                pitch_direction = "neutral"
+            return landmark_array(results.multi_face_landmarks[0].landmark)
+    
+    def _measure(self, face_landmarks: np.ndarray, w: int, h: int) -> Optional[AnalysisResult]:
+        """Estimate head pitch (forward/backward lean) from detected Face Mesh landmarks."""
+        # Extract the required 2D image points from the detected landmarks.
+        landmarks = landmark_pixels(face_landmarks, self._landmark_rows, w, h)
+        image_points = landmarks.astype(np.float64)
+        
+        # Define camera matrix using image dimensions.
+        focal_length = w
+        center = (w / 2, h / 2)
+        camera_matrix = np.array([
+            [focal_length, 0, center[0]],
+            [0, focal_length, center[1]],
+            [0, 0, 1]
+        ], dtype="double")
+        dist_coeffs = np.zeros((4,1))  # Assuming no lens distortion
+        
+        # Solve the PnP problem to estimate head pose.
+        success, rotation_vector, translation_vector = cv2.solvePnP(
+            self.model_points, image_points, camera_matrix, dist_coeffs, flags=cv2.SOLVEPNP_ITERATIVE
+        )
+        if not success:
+            return None
+        
+        # Convert rotation vector to rotation matrix.
+        rotation_matrix, _ = cv2.Rodrigues(rotation_vector)
+        # Extract Euler angles.
+        pitch, yaw, roll = self._get_euler_angles(rotation_matrix)
+        
+        # For pitch, positive value often indicates head leaning forward (chin down),
+        # while a negative value indicates head leaning backward (chin up).
+        # We'll use the absolute pitch angle for reporting,
+        # but keep the sign to determine the direction.
+        abs_pitch = abs(pitch)
+        if abs_pitch < self.pitch_threshold:
+            pitch_status = "Neutral"
+            pitch_direction = PITCH_NEUTRAL
+        else:
+            if pitch > 0:
+                pitch_status = f"Leaning forward (chin down) by {abs_pitch:.2f}°"
+                pitch_direction = PITCH_FORWARD
             else:
-                if pitch > 0:
-                    pitch_status = f"Leaning forward (chin down) by {abs_pitch:.2f}°"
-                    pitch_direction = "forward"
-                else:
-                    pitch_status = f"Leaning backward (chin up) by {abs_pitch:.2f}°"
-                    pitch_direction = "backward"
-            
-            return AnalysisResult(
-                status=pitch_status,
-                angle=abs_pitch,
-                direction=pitch_direction,
-                landmarks=landmarks_dict
-            )
+                pitch_status = f"Leaning backward (chin up) by {abs_pitch:.2f}°"
+                pitch_direction = PITCH_BACKWARD
+        
+        return AnalysisResult(
+            status=pitch_status,
+            angle=abs_pitch,
+            direction_code=pitch_direction,
+            landmarks=landmarks
+        )
+    
+    def _analyze_frame(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[AnalysisResult]:
+        """Analyze a single frame to estimate head pitch (forward/backward lean)."""
+        face_landmarks = self._detect(image_rgb, model_complexity)
+        if face_landmarks is None:
+            return None
+        h, w = image_rgb.shape[:2]
+        return self._measure(face_landmarks, w, h)
     
-    def process_video(self, video_path: str, target_fps: Optional[float] = None, show_progress: bool = True) -> VideoAnalysisStats:
+    def process_video(self, video_path: str, target_fps: Optional[float] = None, show_progress: bool = True,
+                      max_resolution: Optional[int] = None,
+                      model_complexity: Optional[int] = None,
+                      min_fps: Optional[float] = None,
+                      landmark_writer: Optional[LandmarkTrackWriter] = None) -> VideoAnalysisStats:
         """
         Process video and analyze head pitch (forward/backward lean) frame by frame.
         """
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Error: Could not open video at {video_path}")
-        
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / video_fps if video_fps > 0 else 0
-        
-        # Determine sampling rate for processing
-        if target_fps is None:
-            sampling_rate = 1
-            effective_fps = video_fps
-        else:
-            effective_fps = min(target_fps, video_fps)
-            sampling_rate = max(1, int(round(video_fps / effective_fps)))
+        sampler = create_frame_sampler(video_path, target_fps, max_resolution, show_progress,
+                                       min_fps=min_fps)
+        if model_complexity is None:
+            model_complexity = self.model_complexity
+        detections = iter_detections(sampler, partial(self._detect, model_complexity=model_complexity),
+                                     landmark_writer)
+        return self._summarize(video_path, sampler, detections)
+    
+    def recompute(self, track: LandmarkTrack) -> VideoAnalysisStats:
+        """Recompute the statistics from recorded Face Mesh landmarks, without decoding or detection."""
+        return self._summarize(track.video_path, track, track)
+    
+    def _summarize(self, video_path: str, sampler, detections) -> VideoAnalysisStats:
+        video_fps = sampler.video_fps
+        duration = sampler.duration
+        effective_fps = sampler.effective_fps
+        sampling_rate = sampler.sampling_rate
         
-        angles = []
-        directions = []
+        angles = RunningStats()
+        directions = CategoryCounter(PITCH_DIRECTIONS)
         frames_with_detection = 0
-        frame_index = 0
         
         start_time = time.time()
-        if show_progress:
-            try:
-                from tqdm import tqdm
-                pbar = tqdm(total=frame_count, desc="Processing video")
-            except ImportError:
-                show_progress = False
-                print("tqdm not installed, progress bar disabled")
-        
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            if frame_index % sampling_rate == 0:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                result = self._analyze_frame(frame_rgb)
-                if result is not None:
-                    frames_with_detection += 1
-                    angles.append(result.angle)
-                    directions.append(result.direction)
-            
-            frame_index += 1
-            if show_progress:
-                pbar.update(1)
-        
-        if show_progress:
-            pbar.close()
+        for face_landmarks, width, height in detections:
+            if face_landmarks is None:
+                continue
+            result = self._measure(face_landmarks, width, height)
+            if result is not None:
+                frames_with_detection += 1
+                angles.add(result.angle, sampler.sample_weight)
+                directions.add(result.direction_code, sampler.sample_weight)
         processing_time = time.time() - start_time
-        cap.release()
+        frame_index = sampler.frames_read
         
-        if angles:
-            mean_angle = np.mean(angles)
-            median_angle = np.median(angles)
-            std_dev_angle = np.std(angles)
-            min_angle = np.min(angles)
-            max_angle = np.max(angles)
+        if angles.count:
+            mean_angle = angles.mean
+            median_angle = angles.median
+            std_dev_angle = angles.std
+            min_angle = angles.min
+            max_angle = angles.max
             
-            direction_counts = {d: directions.count(d) for d in set(directions)}
-            total = len(directions)
-            direction_percentages = {d: (count / total) * 100 for d, count in direction_counts.items()}
-            dominant_direction = max(direction_counts, key=direction_counts.get)
+            direction_percentages = directions.percentages()
+            dominant_direction = directions.dominant()
             stability_score = std_dev_angle
-            detection_rate = frames_with_detection / (frame_count / sampling_rate) * 100
+            detection_rate = frames_with_detection / sampler.frames_sampled * 100
             
             stats = VideoAnalysisStats(
                 mean_angle=mean_angle,
@@ -2,16 +2,22 @@ import cv2
 import math
 import numpy as np
 import time
-from typing import Dict, Optional
+from functools import partial
+from typing import Optional
 from dataclasses import dataclass
 import mediapipe as mp
 
-@dataclass
+from ..frame_records import landmark_array, landmark_pixels
+from ..frame_sampling import create_frame_sampler
+from ..landmark_store import LandmarkTrack, LandmarkTrackWriter, iter_detections
+from ..running_stats import RunningStats
+
+@dataclass(slots=True)
 class AnalysisResult:
     """Data class to store results of a single frame analysis"""
     status: str
     yaw_angle: float
-    landmarks: Dict
+    landmarks: np.ndarray  # (6, 2) int32 pixel coordinates, rows in landmark_indices order
     frame_number: int = None
     timestamp: float = None
 
@@ -31,8 +37,13 @@ class VideoAnalysisStats:
 class HeadRotationAnalyzer:
     """Analyzer for head rotation (yaw) using MediaPipe Face Mesh and solvePnP"""
     
-    def __init__(self, min_detection_confidence: float = 0.5):
+    # Detector whose landmarks are recorded; yaw has no tunable parameters
+    LANDMARK_SOURCE = 'face_mesh'
+    TUNABLE_PARAMETERS = {}
+    
+    def __init__(self, min_detection_confidence: float = 0.5, model_complexity: int = 1):
         self.min_detection_confidence = min_detection_confidence
+        self.model_complexity = model_complexity
         self.mp_face_mesh = mp.solutions.face_mesh
         
         # Define indices for key landmarks:
@@ -46,6 +57,7 @@ class HeadRotationAnalyzer:
             "left_mouth": 61,
             "right_mouth": 291
         }
+        self._landmark_rows = tuple(self.landmark_indices.values())
         # 3D model points (in a canonical coordinate system, unit: millimeters)
         self.model_points = np.array([
             (0.0, 0.0, 0.0),          # Nose tip
@@ -68,125 +80,116 @@ class HeadRotationAnalyzer:
         roll = float(euler_angles[2])
         return pitch, yaw, roll
 
-    def _analyze_frame(self, image_rgb: np.ndarray) -> Optional[AnalysisResult]:
-        """Analyze a single frame to detect head rotation (yaw)"""
+    def _detect(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[np.ndarray]:
+        """Run Face Mesh on a frame, returning its normalized landmarks or None"""
+        # Iris refinement is skipped at complexity 0
         with self.mp_face_mesh.FaceMesh(
             static_image_mode=True,
             max_num_faces=1,
-            refine_landmarks=True,
+            refine_landmarks=model_complexity > 0,
             min_detection_confidence=self.min_detection_confidence
         ) as face_mesh:
             results = face_mesh.process(image_rgb)
             if not results.multi_face_landmarks:
                 return None
-            
-            face_landmarks = results.multi_face_landmarks[0]
-            h, w = image_rgb.shape[:2]
-            
-            # Extract the 2D image points for our landmarks
-            image_points = []
-            landmarks_dict = {}
-            for key, idx in self.landmark_indices.items():
-                lm = face_landmarks.landmark[idx]
-                coord = (int(lm.x * w), int(lm.y * h))
-                image_points.append(coord)
-                landmarks_dict[key] = coord
-            image_points = np.array(image_points, dtype="double")
-            
-            # Define camera parameters: focal length based on image width, center at image center
-            focal_length = w
-            center = (w / 2, h / 2)
-            camera_matrix = np.array([
-                [focal_length, 0, center[0]],
-                [0, focal_length, center[1]],
-                [0, 0, 1]
-            ], dtype="double")
-            
-            dist_coeffs = np.zeros((4,1))  # Assuming no lens distortion
-            
-            # Solve the PnP problem to get rotation and translation vectors
-            success, rotation_vector, translation_vector = cv2.solvePnP(
-                self.model_points, image_points, camera_matrix, dist_coeffs, flags=cv2.SOLVEPNP_ITERATIVE
-            )
-            
-            if not success:
-                return None
-            
-            # Convert rotation vector to rotation matrix
-            rotation_matrix, _ = cv2.Rodrigues(rotation_vector)
-            # Extract Euler angles (pitch, yaw, roll)
-            pitch, yaw, roll = self._get_euler_angles(rotation_matrix)
-            # We are interested in yaw (rotation around the vertical axis)
-            yaw_angle = yaw  # in degrees
-            
-            # Create a status message
-            status_msg = f"Head rotated with yaw = {yaw_angle:.2f}°"
-            
-            return AnalysisResult(
-                status=status_msg,
-                yaw_angle=yaw_angle,
-                landmarks=landmarks_dict
-            )
+            return landmark_array(results.multi_face_landmarks[0].landmark)
     
-    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True) -> VideoAnalysisStats:
+    def _measure(self, face_landmarks: np.ndarray, w: int, h: int) -> Optional[AnalysisResult]:
+        """Estimate head rotation (yaw) from detected Face Mesh landmarks"""
+        # Extract the 2D image points for our landmarks
+        landmarks = landmark_pixels(face_landmarks, self._landmark_rows, w, h)
+        image_points = landmarks.astype(np.float64)
+        
+        # Define camera parameters: focal length based on image width, center at image center
+        focal_length = w
+        center = (w / 2, h / 2)
+        camera_matrix = np.array([
+            [focal_length, 0, center[0]],
+            [0, focal_length, center[1]],
+            [0, 0, 1]
+        ], dtype="double")
+        
+        dist_coeffs = np.zeros((4,1))  # Assuming no lens distortion
+        
+        # Solve the PnP problem to get rotation and translation vectors
+        success, rotation_vector, translation_vector = cv2.solvePnP(
+            self.model_points, image_points, camera_matrix, dist_coeffs, flags=cv2.SOLVEPNP_ITERATIVE
+        )
+        
+        if not success:
+            return None
+        
+        # Convert rotation vector to rotation matrix
+        rotation_matrix, _ = cv2.Rodrigues(rotation_vector)
+        # Extract Euler angles (pitch, yaw, roll)
+        pitch, yaw, roll = self._get_euler_angles(rotation_matrix)
+        # We are interested in yaw (rotation around the vertical axis)
+        yaw_angle = yaw  # in degrees
+        
+        # Create a status message
+        status_msg = f"Head rotated with yaw = {yaw_angle:.2f}°"
+        
+        return AnalysisResult(
+            status=status_msg,
+            yaw_angle=yaw_angle,
+            landmarks=landmarks
+        )
+    
+    def _analyze_frame(self, image_rgb: np.ndarray, model_complexity: int = 1) -> Optional[AnalysisResult]:
+        """Analyze a single frame to detect head rotation (yaw)"""
+        face_landmarks = self._detect(image_rgb, model_complexity)
+        if face_landmarks is None:
+            return None
+        h, w = image_rgb.shape[:2]
+        return self._measure(face_landmarks, w, h)
+    
+    def process_video(self, video_path: str, target_fps: float = None, show_progress: bool = True,
+                      max_resolution: Optional[int] = None,
+                      model_complexity: Optional[int] = None,
+                      min_fps: Optional[float] = None,
+                      landmark_writer: Optional[LandmarkTrackWriter] = None) -> VideoAnalysisStats:
         """
         Process video and analyze head rotation (yaw) frame by frame.
         """
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Error: Could not open video at {video_path}")
-        
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / video_fps if video_fps > 0 else 0
-        
-        if target_fps is None:
-            sampling_rate = 1
-            effective_fps = video_fps
-        else:
-            effective_fps = min(target_fps, video_fps)
-            sampling_rate = max(1, int(round(video_fps / effective_fps)))
+        sampler = create_frame_sampler(video_path, target_fps, max_resolution, show_progress,
+                                       min_fps=min_fps)
+        if model_complexity is None:
+            model_complexity = self.model_complexity
+        detections = iter_detections(sampler, partial(self._detect, model_complexity=model_complexity),
+                                     landmark_writer)
+        return self._summarize(video_path, sampler, detections)
+    
+    def recompute(self, track: LandmarkTrack) -> VideoAnalysisStats:
+        """Recompute the statistics from recorded Face Mesh landmarks, without decoding or detection"""
+        return self._summarize(track.video_path, track, track)
+    
+    def _summarize(self, video_path: str, sampler, detections) -> VideoAnalysisStats:
+        video_fps = sampler.video_fps
+        duration = sampler.duration
+        effective_fps = sampler.effective_fps
+        sampling_rate = sampler.sampling_rate
         
-        yaw_angles = []
+        yaw_angles = RunningStats()
         frames_with_detection = 0
-        frame_index = 0
         start_time = time.time()
         
-        if show_progress:
-            try:
-                from tqdm import tqdm
-                pbar = tqdm(total=frame_count, desc="Processing video")
-            except ImportError:
-                show_progress = False
-                print("tqdm not installed, progress bar disabled")
-        
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            if frame_index % sampling_rate == 0:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                result = self._analyze_frame(frame_rgb)
-                if result is not None:
-                    frames_with_detection += 1
-                    yaw_angles.append(result.yaw_angle)
-            frame_index += 1
-            if show_progress:
-                pbar.update(1)
-        
-        if show_progress:
-            pbar.close()
+        for face_landmarks, width, height in detections:
+            if face_landmarks is None:
+                continue
+            result = self._measure(face_landmarks, width, height)
+            if result is not None:
+                frames_with_detection += 1
+                yaw_angles.add(result.yaw_angle, sampler.sample_weight)
         processing_time = time.time() - start_time
-        cap.release()
+        frame_index = sampler.frames_read
         
-        if yaw_angles:
-            mean_yaw = np.mean(yaw_angles)
-            median_yaw = np.median(yaw_angles)
-            std_dev_yaw = np.std(yaw_angles)
-            min_yaw = np.min(yaw_angles)
-            max_yaw = np.max(yaw_angles)
-            detection_rate = frames_with_detection / (frame_count / sampling_rate) * 100
+        if yaw_angles.count:
+            mean_yaw = yaw_angles.mean
+            median_yaw = yaw_angles.median
+            std_dev_yaw = yaw_angles.std
+            min_yaw = yaw_angles.min
+            max_yaw = yaw_angles.max
+            detection_rate = frames_with_detection / sampler.frames_sampled * 100
             
             stats = VideoAnalysisStats(
                 mean_yaw=mean_yaw,
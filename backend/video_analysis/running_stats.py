@@ -0,0 +1,327 @@
+"""
+Streaming statistics shared by the video analyzers
+
+Analyzers feed one value per sampled frame into these accumulators instead of
+collecting Python lists, so memory stays constant no matter how long the
+recording is:
+
+- RunningStats: count, mean and variance (Welford), min/max and a P² median
+  estimate. Accumulators built on separate shards of a video can be merged.
+- CategoryCounter: per-label counts, percentages and the dominant label.
+
+Values can carry an integer weight (e.g. the number of target-FPS frames an
+adaptively sampled frame stands for); a value with weight k counts as k
+identical values.
+
+Pass exact=True to RunningStats to keep every value and compute exact
+statistics with NumPy instead (useful when checking the estimates).
+"""
+import math
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+class P2Quantile:
+    """
+    P² (piecewise-parabolic) quantile estimator
+
+    Tracks a single quantile with five markers (Jain & Chlamtac, 1985), using
+    O(1) memory. Until five values have been seen the quantile is exact.
+    """
+
+    def __init__(self, p: float = 0.5):
+        """
+        Args:
+            p: Quantile to estimate, between 0 and 1 (0.5 = median)
+        """
+        if not 0.0 < p < 1.0:
+            raise ValueError(f"Quantile must be between 0 and 1, got {p}")
+        self.p = p
+        self.count = 0
+        self._initial: List[float] = []
+        self._heights: List[float] = []
+        self._positions: List[float] = []
+        self._desired: List[float] = []
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        """Add one observation"""
+        self.count += 1
+        if self.count <= 5:
+            self._initial.append(value)
+            if self.count == 5:
+                self._start_markers(sorted(self._initial))
+            return
+
+        q = self._heights
+        n = self._positions
+
+        # Find the cell containing the value, extending the extremes if needed
+        if value < q[0]:
+            q[0] = value
+            cell = 0
+        elif value >= q[4]:
+            q[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while cell < 3 and value >= q[cell + 1]:
+                cell += 1
+
+        for i in range(cell + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Move the three middle markers towards their desired positions
+        for i in range(1, 4):
+            offset = self._desired[i] - n[i]
+            if (offset >= 1 and n[i + 1] - n[i] > 1) or (offset <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = height
+                n[i] += step
+
+    def _start_markers(self, values: List[float]) -> None:
+        p = self.p
+        self._heights = list(values)
+        self._positions = [0.0, 1.0, 2.0, 3.0, 4.0]
+        self._desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q = self._heights
+        n = self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def merge(self, other: 'P2Quantile') -> None:
+        """
+        Merge another estimator of the same quantile into this one
+
+        Estimators that have seen at most five values are replayed exactly.
+        Otherwise marker positions are added and marker heights averaged,
+        weighted by count, which is an approximation.
+        """
+        if other.p != self.p:
+            raise ValueError("Cannot merge estimators of different quantiles")
+        if other.count <= 5:
+            for value in other._initial:
+                self.add(value)
+            return
+        if self.count <= 5:
+            pending = self._initial
+            self.count = other.count
+            self._initial = list(other._initial)
+            self._heights = list(other._heights)
+            self._positions = list(other._positions)
+            self._desired = list(other._desired)
+            for value in pending:
+                self.add(value)
+            return
+
+        total = self.count + other.count
+        heights = [
+            (a * self.count + b * other.count) / total
+            for a, b in zip(self._heights, other._heights)
+        ]
+        heights[0] = min(self._heights[0], other._heights[0])
+        heights[4] = max(self._heights[4], other._heights[4])
+        self._heights = sorted(heights)
+        # Positions are 0-based, so adding both sets counts the first marker twice
+        self._positions = [a + b + (1 if i > 0 else 0)
+                           for i, (a, b) in enumerate(zip(self._positions, other._positions))]
+        self._desired = [a + b + increment
+                         for a, b, increment in zip(self._desired, other._desired, self._increments)]
+        self.count = total
+
+    @property
+    def value(self) -> float:
+        """Current quantile estimate (0.0 if no values were added)"""
+        if self.count == 0:
+            return 0.0
+        if self.count <= 5:
+            return float(np.quantile(self._initial, self.p))
+        return self._heights[2]
+
+
+class RunningStats:
+    """
+    Constant-memory accumulator for a stream of numbers
+
+    Usage:
+        stats = RunningStats()
+        for angle in angles:
+            stats.add(angle)
+        stats.mean, stats.std, stats.median, stats.min, stats.max
+    """
+
+    def __init__(self, exact: bool = False):
+        """
+        Args:
+            exact: Keep all values and compute exact statistics (O(n) memory)
+        """
+        self.exact = exact
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._median = None if exact else P2Quantile(0.5)
+        self._values: Optional[List[float]] = [] if exact else None
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """
+        Add one value
+
+        Args:
+            value: Value to add
+            weight: Number of times the value counts (a positive integer)
+        """
+        value = float(value)
+        self.count += weight
+        delta = value - self._mean
+        self._mean += delta * weight / self.count
+        self._m2 += weight * delta * (value - self._mean)
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+        if self.exact:
+            self._values.extend([value] * weight)
+        else:
+            for _ in range(weight):
+                self._median.add(value)
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add several values"""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """
+        Merge statistics accumulated on another shard into this one
+
+        Args:
+            other: Accumulator with the same exact setting
+
+        Returns:
+            self, for chaining
+        """
+        if other.exact != self.exact:
+            raise ValueError("Cannot merge exact and streaming statistics")
+        if other.count == 0:
+            return self
+
+        total = self.count + other.count
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self._mean += delta * other.count / total
+        self.count = total
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+
+        if self.exact:
+            self._values.extend(other._values)
+        else:
+            self._median.merge(other._median)
+        return self
+
+    @property
+    def mean(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return float(np.mean(self._values)) if self.exact else self._mean
+
+    @property
+    def variance(self) -> float:
+        """Population variance (same as np.var)"""
+        if self.count == 0:
+            return 0.0
+        return float(np.var(self._values)) if self.exact else self._m2 / self.count
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation (same as np.std)"""
+        if self.count == 0:
+            return 0.0
+        return float(np.std(self._values)) if self.exact else math.sqrt(self.variance)
+
+    @property
+    def median(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return float(np.median(self._values)) if self.exact else self._median.value
+
+    @property
+    def min(self) -> float:
+        return self._min if self.count else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._max if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Summary of the accumulated statistics"""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'median': self.median,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max
+        }
+
+
+class CategoryCounter:
+    """
+    Counts of categorical per-frame values (e.g. movement directions)
+
+    When labels are given, values are integer codes indexing the labels and
+    percentages() / dominant() report the label names.
+    """
+
+    def __init__(self, labels: Optional[Sequence[str]] = None):
+        """
+        Args:
+            labels: Names of the integer codes that will be counted
+        """
+        self.labels = tuple(labels) if labels is not None else None
+        self.counts: Counter = Counter()
+
+    def add(self, label: Hashable, weight: int = 1) -> None:
+        """Count an occurrence of a label (weight = number of occurrences)"""
+        self.counts[label] += weight
+
+    def merge(self, other: 'CategoryCounter') -> 'CategoryCounter':
+        """Merge counts from another shard into this one"""
+        if other.labels != self.labels:
+            raise ValueError("Cannot merge counters with different labels")
+        self.counts.update(other.counts)
+        return self
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def percentages(self) -> Dict[Hashable, float]:
+        """Share of each label, in percent"""
+        total = self.total
+        if total == 0:
+            return {}
+        return {self._label(value): count / total * 100 for value, count in self.counts.items()}
+
+    def dominant(self) -> Optional[Hashable]:
+        """Most frequent label (None if nothing was counted)"""
+        if not self.counts:
+            return None
+        return self._label(max(self.counts, key=self.counts.get))
+
+    def _label(self, value: Hashable) -> Hashable:
+        return self.labels[value] if self.labels is not None else value
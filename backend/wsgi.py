@@ -0,0 +1,8 @@
+"""
+Auto PPT Evaluation System - WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from app.app_factory import create_app
+
+app = create_app()